@@ -37,7 +37,10 @@ var
     Params : TStringList;
     REQUEST_FILE : String;
     RESPONSE_FILE : String;
+    REQUEST_ID : String;
     ROOT_DIR: String;
+    SPOOL_DIR : String;
+    RESIDENT_RUNNING : Boolean;
 
 // ============================================================================
 // GLOBAL CONSTANTS
@@ -46,6 +49,8 @@ var
 const
     constScriptProjectName = 'Altium_API';
     REPLACEALL = 1;  // Flag for StringReplace to replace all occurrences
+    RESIDENT_POLL_MS = 20;  // Idle poll interval of the resident Serve loop
+    RESIDENT_HEARTBEAT_MS = 1000;  // Ready marker refresh interval of the idle Serve loop
 
 // ============================================================================
 // FORWARD DECLARATIONS
@@ -64,6 +69,13 @@ function JSONPairStr(const Name, Value: String; IsString: Boolean): String; forw
 function BuildJSONObject(Pairs: TStringList; IndentLevel: Integer = 0): String; forward;
 function BuildJSONArray(Items: TStringList; ArrayName: String = ''; IndentLevel: Integer = 0): String; forward;
 function WriteJSONToFile(JSON: TStringList; FileName: String = ''): String; forward;
+function BuildJSONLine(Pairs: TStringList): String; forward;
+function BuildJSONInlineArray(Items: TStringList; ArrayName: String): String; forward;
+procedure SaveLinesAtomic(Lines: TStringList; FileName: String); forward;
+function Utf8CodePoint(const S: String; var I: Integer): Integer; forward;
+function Utf8Length(const S: String): Integer; forward;
+function Adler32Hex(const S: String): String; forward;
+procedure WriteEnvelopeToFile(Body: String; FileName: String; RequestId: String); forward;
 procedure AddJSONProperty(List: TStringList; Name: String; Value: String; IsString: Boolean = True); forward;
 procedure AddJSONNumber(List: TStringList; Name: String; Value: Double); forward;
 procedure AddJSONInteger(List: TStringList; Name: String; Value: Integer); forward;
@@ -71,7 +83,10 @@ procedure AddJSONBoolean(List: TStringList; Name: String; Value: Boolean); forwa
 
 // From helpers.pas
 procedure ExtractParameter(Line: String); forward;
+function BuildResponseJSON(Success: Boolean; Data: String; ErrorMsg: String): String; forward;
 procedure WriteResponse(Success: Boolean; Data: String; ErrorMsg: String); forward;
+function StreamDirectory: String; forward;
+function WriteStreamPart(Records: TStringList; PartIndex: Integer): Integer; forward;
 
 // From board_init.pas
 function SetBoardSize(Width, Height: Double): String; forward;
@@ -143,7 +158,10 @@ function CreateSchematicSymbol(SymbolName: String; PinsList: TStringList): Strin
 function GetSchematicData(ROOT_DIR: String): String; forward;
 function GetSchematicComponentsWithParameters(ROOT_DIR: String): String; forward;
 function CheckSchematicPCBSync(ROOT_DIR: String): String; forward;
+function CompileDesignProject(Project: IProject): Boolean; forward;
+procedure FillPinNetMap(Project: IProject; PinNetMap: TStringList); forward;
 function GetWholeDesignJSON(ROOT_DIR: String): String; forward;
+function GetWholeDesignNDJSON(ROOT_DIR: String): String; forward;
 
 // From command_executors_board.pas
 function ExecuteSetBoardSize(RequestData: TStringList): String; forward;
@@ -180,6 +198,7 @@ function ExecuteAlignComponents(RequestData: TStringList): String; forward;
 
 // From command_router.pas
 function ExecuteCommand(CommandName: String): String; forward;
+function ExecuteBatch(BatchRequest: TStringList): String; forward;
 
 // ============================================================================
 // IMPLEMENTATIONS
@@ -216,6 +235,7 @@ begin
     // Set the file paths
     REQUEST_FILE := ROOT_DIR + 'request.json';
     RESPONSE_FILE := ROOT_DIR + 'response.json';
+    SPOOL_DIR := ROOT_DIR + 'spool\';
 end;
 
 
@@ -334,15 +354,186 @@ begin
     end;
 end;
 
-// Function to convert JSON TStringList to string
+// Return the JSON TStringList as text. If FileName names a file (not the
+// output directory some callers pass), the JSON is also saved there with
+// SaveLinesAtomic so a reader never sees a partially written file
 
 function WriteJSONToFile(JSON: TStringList; FileName: String = ''): String;
 begin
-    // Simply return the JSON as text
-    // The FileName parameter is kept for compatibility but not used
+    if (FileName <> '') and not DirectoryExists(FileName) then
+        SaveLinesAtomic(JSON, FileName);
     Result := JSON.Text;
 end;
 
+// Build a JSON object on a single line (one NDJSON record)
+
+function BuildJSONLine(Pairs: TStringList): String;
+var
+    i: Integer;
+begin
+    Result := '{';
+    for i := 0 to Pairs.Count - 1 do
+    begin
+        if i > 0 then
+            Result := Result + ', ';
+        Result := Result + Pairs[i];
+    end;
+    Result := Result + '}';
+end;
+
+// Build a named JSON array on a single line, for use inside BuildJSONLine
+
+function BuildJSONInlineArray(Items: TStringList; ArrayName: String): String;
+var
+    i: Integer;
+begin
+    Result := '"' + JSONEscapeString(ArrayName) + '": [';
+    for i := 0 to Items.Count - 1 do
+    begin
+        if i > 0 then
+            Result := Result + ', ';
+        Result := Result + Items[i];
+    end;
+    Result := Result + ']';
+end;
+
+// Save Lines as UTF-8 under a temporary name and rename it into place so
+// the Python bridge never reads a partially written file
+
+procedure SaveLinesAtomic(Lines: TStringList; FileName: String);
+var
+    TempFile: String;
+begin
+    TempFile := FileName + '.tmp';
+    if FileExists(TempFile) then
+        DeleteFile(TempFile);
+    Lines.SaveToFile(TempFile, TEncoding.UTF8);
+
+    if FileExists(FileName) then
+        DeleteFile(FileName);
+    RenameFile(TempFile, FileName);
+end;
+
+// Code point of the character at S[I], joining a UTF-16 surrogate pair.
+// I is left on the last Char read.
+
+function Utf8CodePoint(const S: String; var I: Integer): Integer;
+var
+    Low: Integer;
+begin
+    Result := Ord(S[I]);
+    if (Result >= $D800) and (Result <= $DBFF) and (I < Length(S)) then
+    begin
+        Low := Ord(S[I + 1]);
+        if (Low >= $DC00) and (Low <= $DFFF) then
+        begin
+            Result := $10000 + ((Result - $D800) shl 10) + (Low - $DC00);
+            I := I + 1;
+        end;
+    end;
+end;
+
+// Length of S in bytes once encoded as UTF-8
+
+function Utf8Length(const S: String): Integer;
+var
+    I, C: Integer;
+begin
+    Result := 0;
+    I := 1;
+    while I <= Length(S) do
+    begin
+        C := Utf8CodePoint(S, I);
+        if C < $80 then
+            Result := Result + 1
+        else if C < $800 then
+            Result := Result + 2
+        else if C < $10000 then
+            Result := Result + 3
+        else
+            Result := Result + 4;
+        I := I + 1;
+    end;
+end;
+
+// Adler-32 checksum of the UTF-8 bytes of S as 8 lowercase hex digits
+// (B then A). The two halves are kept apart so nothing overflows a signed
+// 32-bit Integer.
+
+function Adler32Hex(const S: String): String;
+var
+    I, J, C, Count, A, B: Integer;
+    Bytes: array[0..3] of Integer;
+begin
+    A := 1;
+    B := 0;
+    I := 1;
+    while I <= Length(S) do
+    begin
+        C := Utf8CodePoint(S, I);
+        if C < $80 then
+        begin
+            Bytes[0] := C;
+            Count := 1;
+        end
+        else if C < $800 then
+        begin
+            Bytes[0] := $C0 or (C shr 6);
+            Bytes[1] := $80 or (C and $3F);
+            Count := 2;
+        end
+        else if C < $10000 then
+        begin
+            Bytes[0] := $E0 or (C shr 12);
+            Bytes[1] := $80 or ((C shr 6) and $3F);
+            Bytes[2] := $80 or (C and $3F);
+            Count := 3;
+        end
+        else
+        begin
+            Bytes[0] := $F0 or (C shr 18);
+            Bytes[1] := $80 or ((C shr 12) and $3F);
+            Bytes[2] := $80 or ((C shr 6) and $3F);
+            Bytes[3] := $80 or (C and $3F);
+            Count := 4;
+        end;
+        for J := 0 to Count - 1 do
+        begin
+            A := (A + Bytes[J]) mod 65521;
+            B := (B + A) mod 65521;
+        end;
+        I := I + 1;
+    end;
+    Result := LowerCase(IntToHex(B, 4) + IntToHex(A, 4));
+end;
+
+// Write Body to FileName behind a one-line envelope header carrying the
+// request id, body length and Adler-32 checksum. The file is written as
+// UTF-8 with SaveLinesAtomic, and the length and checksum are those of the
+// UTF-8 bytes, so non-ASCII text (Ohm and micro signs, curly quotes) survives the trip.
+
+procedure WriteEnvelopeToFile(Body: String; FileName: String; RequestId: String);
+var
+    Output: TStringList;
+    Header: String;
+begin
+    Output := TStringList.Create;
+    try
+        // Normalise line breaks the way SaveToFile writes them so the
+        // length and checksum describe the exact bytes on disk
+        Output.Text := Body;
+        Body := Output.Text;
+
+        Header := '{"request_id": "' + JSONEscapeString(RequestId) + '", ' +
+                  '"length": ' + IntToStr(Utf8Length(Body)) + ', ' +
+                  '"adler32": "' + Adler32Hex(Body) + '"}';
+        Output.Text := Header + #13#10 + Body;
+        SaveLinesAtomic(Output, FileName);
+    finally
+        Output.Free;
+    end;
+end;
+
 // Helper function to add a simple property to a JSON object
 
 procedure AddJSONProperty(List: TStringList; Name: String; Value: String; IsString: Boolean = True);
@@ -414,13 +605,13 @@ begin
 end;
 
 
+// Build the {"success": ..., "result"/"error": ...} object for one command
 
-procedure WriteResponse(Success: Boolean; Data: String; ErrorMsg: String);
+function BuildResponseJSON(Success: Boolean; Data: String; ErrorMsg: String): String;
 var
     ActualSuccess: Boolean;
     ActualErrorMsg: String;
     ResultProps: TStringList;
-    Response: TStringList;
 begin
     // Check if Data contains an error message
     if (Pos('ERROR:', Data) = 1) then
@@ -436,7 +627,6 @@ begin
 
     // Create response props
     ResultProps := TStringList.Create;
-    Response := TStringList.Create;
 
     try
         // Add properties
@@ -455,16 +645,46 @@ begin
             AddJSONProperty(ResultProps, 'error', ActualErrorMsg);
         end;
 
-        // Build response
-        Response.Text := BuildJSONObject(ResultProps);
-        Response.SaveToFile(RESPONSE_FILE);
+        Result := BuildJSONObject(ResultProps);
     finally
         ResultProps.Free;
-        Response.Free;
     end;
 end;
 
 
+procedure WriteResponse(Success: Boolean; Data: String; ErrorMsg: String);
+begin
+    // Build response and write it atomically with its envelope header
+    WriteEnvelopeToFile(BuildResponseJSON(Success, Data, ErrorMsg), RESPONSE_FILE, REQUEST_ID);
+end;
+
+// Directory receiving the NDJSON part files of the current streamed request
+
+function StreamDirectory: String;
+begin
+    Result := ROOT_DIR + 'stream_' + REQUEST_ID + '\';
+end;
+
+// Write Records as NDJSON part number PartIndex (part_00000.ndjson, ...),
+// clear Records and return the next part index. Parts are renamed into
+// place, so the bridge can parse each one as soon as it appears.
+
+function WriteStreamPart(Records: TStringList; PartIndex: Integer): Integer;
+var
+    PartName: String;
+begin
+    if not DirectoryExists(StreamDirectory) then
+        CreateDir(StreamDirectory);
+
+    PartName := IntToStr(PartIndex);
+    PartName := 'part_' + StringOfChar('0', 5 - Length(PartName)) + PartName + '.ndjson';
+    SaveLinesAtomic(Records, StreamDirectory + PartName);
+
+    Records.Clear;
+    Result := PartIndex + 1;
+end;
+
+
 
 
 // ============================================================================
@@ -5767,6 +5987,74 @@ begin
     end;
 end;
 
+// Compile the project so the Design Manager connectivity data is populated.
+// Returns False if the flattened document is still missing afterwards.
+
+function CompileDesignProject(Project: IProject): Boolean;
+begin
+    // ALWAYS trigger full IDE compilation to ensure net connectivity data is populated
+    ResetParameters;
+    AddStringParameter('Action', 'Compile');
+    AddStringParameter('ObjectKind', 'Project');
+    RunProcess('WorkspaceManager:Compile');
+
+    // Wait for compilation to complete
+    Sleep(8000);  // Wait 8 seconds for compilation to finish
+
+    // VERIFIED: DM_Compile (from GetPinData.pas line 90)
+    // Call DM_Compile AFTER RunProcess to refresh the Design Manager data
+    Project.DM_Compile;
+
+    // Verify compilation succeeded
+    Result := Project.DM_DocumentFlattened <> Nil;
+end;
+
+// Fill PinNetMap with 'Designator|PinNumber=NetName' for every schematic pin
+// This uses INetItem.DM_NetName instead of IPin.DM_FlattenedNetName
+
+procedure FillPinNetMap(Project: IProject; PinNetMap: TStringList);
+var
+    Doc     : IDocument;
+    Net     : INet;
+    NetPin  : INetItem;
+    NetName : String;
+    i, j, k : Integer;
+begin
+    // Build pin-to-net map by iterating through nets (GetPinData.pas approach)
+    For i := 0 to Project.DM_LogicalDocumentCount - 1 Do
+    Begin
+        Doc := Project.DM_LogicalDocuments(i);
+
+        If Doc.DM_DocumentKind = 'SCH' Then
+        Begin
+            // VERIFIED: DM_NetCount and DM_Nets (from GetPinData.pas line 114, 116)
+            For j := 0 to Doc.DM_NetCount - 1 Do
+            Begin
+                Net := Doc.DM_Nets(j);
+
+                // Get net name from first pin (GetPinData.pas line 121, 65)
+                NetName := '';
+                if Net.DM_PinCount > 0 then
+                begin
+                    NetPin := Net.DM_Pins(0);
+                    // VERIFIED: DM_NetName on INetItem (GetPinData.pas line 65)
+                    NetName := NetPin.DM_NetName;
+                end;
+
+                // Map all pins in this net to the net name
+                // VERIFIED: DM_PinCount and DM_Pins (from GetPinData.pas line 121, 122)
+                For k := 0 to Net.DM_PinCount - 1 Do
+                Begin
+                    NetPin := Net.DM_Pins(k);
+                    // Create unique key: ComponentDesignator|PinNumber
+                    // VERIFIED: DM_LogicalPartDesignator (GetPinData.pas line 124) and DM_PinNumber (line 66)
+                    PinNetMap.Values[NetPin.DM_LogicalPartDesignator + '|' + NetPin.DM_PinNumber] := NetName;
+                End;
+            End;
+        End;
+    End;
+end;
+
 // Function to get the entire schematic design in one JSON call
 // This combines component data, parameters, pins, and nets
 // Uses ONLY verified DM (Design Manager) interface methods from working examples
@@ -5776,7 +6064,6 @@ var
     Workspace       : IWorkspace;
     Project         : IProject;
     Doc             : IDocument;
-    FlatHierarchy   : IDocument;
     Net             : INet;
     DMComp          : IComponent;
     DMPart          : IPart;
@@ -5801,7 +6088,7 @@ var
     PinName         : String;
     NetName         : String;
 
-    i, j, k         : Integer;
+    i, j            : Integer;
     PartIdx         : Integer;
     PinIdx          : Integer;
 begin
@@ -5817,22 +6104,7 @@ begin
         Exit;
     end;
 
-    // ALWAYS trigger full IDE compilation to ensure net connectivity data is populated
-    ResetParameters;
-    AddStringParameter('Action', 'Compile');
-    AddStringParameter('ObjectKind', 'Project');
-    RunProcess('WorkspaceManager:Compile');
-
-    // Wait for compilation to complete
-    Sleep(8000);  // Wait 8 seconds for compilation to finish
-
-    // VERIFIED: DM_Compile (from GetPinData.pas line 90)
-    // Call DM_Compile AFTER RunProcess to refresh the Design Manager data
-    Project.DM_Compile;
-
-    // Verify compilation succeeded
-    FlatHierarchy := Project.DM_DocumentFlattened;
-    If (FlatHierarchy = Nil) Then
+    If not CompileDesignProject(Project) Then
     Begin
         Result := '{"error": "Project compilation failed - DM_DocumentFlattened is still nil after compilation"}';
         Exit;
@@ -5848,39 +6120,7 @@ begin
     PinNetMap.Duplicates := dupIgnore;
 
     try
-        // Build pin-to-net map by iterating through nets (GetPinData.pas approach)
-        For i := 0 to Project.DM_LogicalDocumentCount - 1 Do
-        Begin
-            Doc := Project.DM_LogicalDocuments(i);
-
-            If Doc.DM_DocumentKind = 'SCH' Then
-            Begin
-                // VERIFIED: DM_NetCount and DM_Nets (from GetPinData.pas line 114, 116)
-                For j := 0 to Doc.DM_NetCount - 1 Do
-                Begin
-                    Net := Doc.DM_Nets(j);
-
-                    // Get net name from first pin (GetPinData.pas line 121, 65)
-                    NetName := '';
-                    if Net.DM_PinCount > 0 then
-                    begin
-                        NetPin := Net.DM_Pins(0);
-                        // VERIFIED: DM_NetName on INetItem (GetPinData.pas line 65)
-                        NetName := NetPin.DM_NetName;
-                    end;
-
-                    // Map all pins in this net to the net name
-                    // VERIFIED: DM_PinCount and DM_Pins (from GetPinData.pas line 121, 122)
-                    For k := 0 to Net.DM_PinCount - 1 Do
-                    Begin
-                        NetPin := Net.DM_Pins(k);
-                        // Create unique key: ComponentDesignator|PinNumber
-                        // VERIFIED: DM_LogicalPartDesignator (GetPinData.pas line 124) and DM_PinNumber (line 66)
-                        PinNetMap.Values[NetPin.DM_LogicalPartDesignator + '|' + NetPin.DM_PinNumber] := NetName;
-                    End;
-                End;
-            End;
-        End;
+        FillPinNetMap(Project, PinNetMap);
 
         // Second pass: Get component data
         // VERIFIED: DM_LogicalDocumentCount and DM_LogicalDocuments (from GetPinData.pas line 109, 111)
@@ -6055,6 +6295,208 @@ begin
 end;
 
 
+// Streaming variant of GetWholeDesignJSON. Instead of building one large
+// string, records are written as NDJSON (one object per line) into numbered
+// part files in StreamDirectory, chunk_records records per part:
+//   {"type": "project", "path": ...}   (first record)
+//   {"type": "component", "designator": ..., "sheet": ..., "pins": [...]}
+//   {"type": "net", "name": ..., "pin_count": ...}
+// The bridge parses each part as soon as it is renamed into place. The
+// response only carries the number of parts and records written.
+
+function GetWholeDesignNDJSON(ROOT_DIR: String): String;
+var
+    Workspace       : IWorkspace;
+    Project         : IProject;
+    Doc             : IDocument;
+    Net             : INet;
+    DMComp          : IComponent;
+    DMPart          : IPart;
+    DMPin           : IPin;
+    NetPin          : INetItem;
+
+    Records         : TStringList;
+    RecordProps     : TStringList;
+    PinsArray       : TStringList;
+    PinProps        : TStringList;
+    PinNetMap       : TStringList;
+
+    Designator      : String;
+    PinNumber       : String;
+    NetName         : String;
+
+    ChunkRecords    : Integer;
+    PartIndex       : Integer;
+    RecordCount     : Integer;
+    i, j            : Integer;
+    PartIdx         : Integer;
+    PinIdx          : Integer;
+begin
+    Result := '';
+
+    Workspace := GetWorkspace;
+    Project := Workspace.DM_FocusedProject;
+
+    If (Project = Nil) Then
+    begin
+        Result := 'ERROR: No project is currently open';
+        Exit;
+    end;
+
+    If not CompileDesignProject(Project) Then
+    Begin
+        Result := 'ERROR: Project compilation failed - DM_DocumentFlattened is still nil after compilation';
+        Exit;
+    End;
+
+    ChunkRecords := StrToIntDef(Params.Values['chunk_records'], 200);
+    if ChunkRecords < 1 then
+        ChunkRecords := 1;
+    PartIndex := 0;
+    RecordCount := 0;
+
+    Records := TStringList.Create;
+    PinNetMap := TStringList.Create;
+    PinNetMap.Duplicates := dupIgnore;
+
+    try
+        FillPinNetMap(Project, PinNetMap);
+
+        // Project record, so the bridge knows which project the design belongs to
+        RecordProps := TStringList.Create;
+        try
+            AddJSONProperty(RecordProps, 'type', 'project');
+            AddJSONProperty(RecordProps, 'path', Project.DM_ProjectFullPath);
+            Records.Add(BuildJSONLine(RecordProps));
+            RecordCount := RecordCount + 1;
+        finally
+            RecordProps.Free;
+        end;
+
+        // Component records
+        For i := 0 to Project.DM_LogicalDocumentCount - 1 Do
+        Begin
+            Doc := Project.DM_LogicalDocuments(i);
+
+            If Doc.DM_DocumentKind = 'SCH' Then
+            Begin
+                For j := 0 to Doc.DM_ComponentCount - 1 Do
+                Begin
+                    DMComp := Doc.DM_Components(j);
+                    Designator := DMComp.DM_LogicalDesignator;
+
+                    RecordProps := TStringList.Create;
+                    PinsArray := TStringList.Create;
+                    try
+                        AddJSONProperty(RecordProps, 'type', 'component');
+                        AddJSONProperty(RecordProps, 'designator', Designator);
+                        AddJSONProperty(RecordProps, 'sheet', ExtractFileName(Doc.DM_FullPath));
+
+                        // Same pin rules as GetWholeDesignJSON: every pin of a
+                        // single-part component, connected pins of multi-part ones
+                        if (DMComp.DM_SubPartCount = 1) then
+                        begin
+                            for PinIdx := 0 to DMComp.DM_PinCount - 1 do
+                            begin
+                                DMPin := DMComp.DM_Pins(PinIdx);
+                                PinNumber := DMPin.DM_PinNumber;
+                                NetName := PinNetMap.Values[Designator + '|' + PinNumber];
+                                if NetName = '' then
+                                    NetName := '?';
+
+                                PinProps := TStringList.Create;
+                                try
+                                    AddJSONProperty(PinProps, 'name', PinNumber);
+                                    AddJSONProperty(PinProps, 'net', NetName);
+                                    PinsArray.Add(BuildJSONLine(PinProps));
+                                finally
+                                    PinProps.Free;
+                                end;
+                            end;
+                        end
+                        else if (DMComp.DM_SubPartCount > 1) then
+                        begin
+                            for PartIdx := 0 to DMComp.DM_SubPartCount - 1 do
+                            begin
+                                DMPart := DMComp.DM_SubParts(PartIdx);
+                                for PinIdx := 0 to DMPart.DM_PinCount - 1 do
+                                begin
+                                    DMPin := DMPart.DM_Pins(PinIdx);
+                                    PinNumber := DMPin.DM_PinNumber;
+                                    NetName := PinNetMap.Values[Designator + '|' + PinNumber];
+
+                                    if (NetName <> '') then
+                                    begin
+                                        PinProps := TStringList.Create;
+                                        try
+                                            AddJSONProperty(PinProps, 'name', PinNumber);
+                                            AddJSONProperty(PinProps, 'net', NetName);
+                                            PinsArray.Add(BuildJSONLine(PinProps));
+                                        finally
+                                            PinProps.Free;
+                                        end;
+                                    end;
+                                end;
+                            end;
+                        end;
+
+                        RecordProps.Add(BuildJSONInlineArray(PinsArray, 'pins'));
+                        Records.Add(BuildJSONLine(RecordProps));
+                        RecordCount := RecordCount + 1;
+                    finally
+                        PinsArray.Free;
+                        RecordProps.Free;
+                    end;
+
+                    if Records.Count >= ChunkRecords then
+                        PartIndex := WriteStreamPart(Records, PartIndex);
+                End;
+            End;
+        End;
+
+        // Net records
+        For i := 0 to Project.DM_LogicalDocumentCount - 1 Do
+        Begin
+            Doc := Project.DM_LogicalDocuments(i);
+
+            for j := 0 to Doc.DM_NetCount - 1 do
+            begin
+                Net := Doc.DM_Nets(j);
+
+                NetName := '';
+                if Net.DM_PinCount > 0 then
+                begin
+                    NetPin := Net.DM_Pins(0);
+                    NetName := NetPin.DM_NetName;
+                end;
+
+                RecordProps := TStringList.Create;
+                try
+                    AddJSONProperty(RecordProps, 'type', 'net');
+                    AddJSONProperty(RecordProps, 'name', NetName);
+                    AddJSONInteger(RecordProps, 'pin_count', Net.DM_PinCount);
+                    Records.Add(BuildJSONLine(RecordProps));
+                    RecordCount := RecordCount + 1;
+                finally
+                    RecordProps.Free;
+                end;
+
+                if Records.Count >= ChunkRecords then
+                    PartIndex := WriteStreamPart(Records, PartIndex);
+            end;
+        End;
+
+        if Records.Count > 0 then
+            PartIndex := WriteStreamPart(Records, PartIndex);
+
+        Result := '{"parts": ' + IntToStr(PartIndex) + ', "records": ' + IntToStr(RecordCount) + '}';
+    finally
+        Records.Free;
+        PinNetMap.Free;
+    end;
+end;
+
+
 
 
 
@@ -7259,7 +7701,10 @@ end;
 function ExecuteCommand(CommandName: String): String;
 begin
     Result := '';
-    EnsureDocumentFocused(CommandName);
+
+    // Control commands do not touch any document
+    if (CommandName <> 'batch') and (CommandName <> 'shutdown') then
+        EnsureDocumentFocused(CommandName);
 
     // Direct command execution based on the command name
     case CommandName of
@@ -7285,6 +7730,8 @@ begin
             Result := CheckSchematicPCBSync(ROOT_DIR);
         'get_whole_design_json':
             Result := GetWholeDesignJSON(ROOT_DIR);
+        'stream_whole_design':
+            Result := GetWholeDesignNDJSON(ROOT_DIR);
         'get_pcb_layers':
             Result := GetPCBLayers(ROOT_DIR);
         'get_board_outline':
@@ -7350,9 +7797,101 @@ begin
             Result := ExecuteAddVia(RequestData);
         'add_copper_pour':
             Result := ExecuteAddCopperPour(RequestData);
+        // Several commands in one script launch
+        'batch':
+            Result := ExecuteBatch(RequestData);
+        // Ends the resident Serve loop after this response is written
+        'shutdown':
+        begin
+            RESIDENT_RUNNING := False;
+            Result := 'Resident server stopped';
+        end;
     else
-        ShowMessage('Error: Unknown command: ' + CommandName);
+        // A modal dialog would stall the resident loop
+        if not RESIDENT_RUNNING then
+            ShowMessage('Error: Unknown command: ' + CommandName);
+    end;
+end;
+
+// Run each sub-command of a batch request in order and return a JSON array
+// with one {"success": ..., "result"/"error": ...} object per command.
+// Sub-commands start at their own "command" line; the globals RequestData
+// and Params are pointed at that slice while it runs, so the executors parse
+// their parameters exactly as they do for a single request.
+
+function ExecuteBatch(BatchRequest: TStringList): String;
+var
+    i, j: Integer;
+    Line, SubCommand, SubResult: String;
+    ValueStart: Integer;
+    SavedRequestData, SavedParams: TStringList;
+    SubRequest, SubParams, Results: TStringList;
+begin
+    SavedRequestData := RequestData;
+    SavedParams := Params;
+    Results := TStringList.Create;
+    try
+        // Skip past the top-level "command": "batch" line
+        i := 0;
+        while (i < BatchRequest.Count) and (Pos('"command":', BatchRequest[i]) = 0) do
+            i := i + 1;
+        i := i + 1;
+
+        while i < BatchRequest.Count do
+        begin
+            Line := BatchRequest[i];
+            i := i + 1;
+
+            if Pos('"command":', Line) > 0 then
+            begin
+                ValueStart := Pos(':', Line) + 1;
+                SubCommand := TrimJSON(Copy(Line, ValueStart, Length(Line) - ValueStart + 1));
+
+                // Collect the lines up to the next sub-command
+                SubRequest := TStringList.Create;
+                SubParams := TStringList.Create;
+                SubParams.Delimiter := '=';
+                try
+                    SubRequest.Add(Line);
+                    while (i < BatchRequest.Count) and (Pos('"command":', BatchRequest[i]) = 0) do
+                    begin
+                        SubRequest.Add(BatchRequest[i]);
+                        i := i + 1;
+                    end;
+
+                    RequestData := SubRequest;
+                    Params := SubParams;
+                    for j := 1 to SubRequest.Count - 1 do
+                        ExtractParameter(SubRequest[j]);
+
+                    if SubCommand = 'batch' then
+                        SubResult := 'ERROR: Batches cannot be nested'
+                    else
+                    begin
+                        try
+                            SubResult := ExecuteCommand(SubCommand);
+                        except
+                            SubResult := 'ERROR: Exception occurred during ' + SubCommand;
+                        end;
+                    end;
+                finally
+                    RequestData := SavedRequestData;
+                    Params := SavedParams;
+                    SubRequest.Free;
+                    SubParams.Free;
+                end;
+
+                Results.Add(Trim(BuildResponseJSON(SubResult <> '', SubResult, 'Command execution failed')));
+            end;
+        end;
+
+        Result := BuildJSONArray(Results);
+    finally
+        RequestData := SavedRequestData;
+        Params := SavedParams;
+        Results.Free;
     end;
+end;
 
 
 
@@ -7392,14 +7931,9 @@ end;
 // MAIN ENTRY POINT
 // ============================================================================
 
-// Main procedure to run the bridge
-procedure Run;
+// Locate the server directory from the script project and set the file paths
+procedure InitializeBridge;
 var
-    CommandType: String;
-    Result: String;
-    i: Integer;
-    Line: String;
-    ValueStart: Integer;
     Workspace: IWorkspace;
     Project: IProject;
     ProjectCount: Integer;
@@ -7408,8 +7942,6 @@ var
     ProjectIdx: Integer;
     LastSlashPos: Integer;
 begin
-    DebugLog('=== Script Started ===');
-    
     // Calculate root directory from script location
     Workspace := GetWorkspace;
     if (Workspace <> nil) then
@@ -7456,13 +7988,19 @@ begin
     //             'RootDir: ' + RootDir + #13#10 + 
     //             'ROOT_DIR (global): ' + ROOT_DIR + #13#10 + 
     //             'REQUEST_FILE: ' + REQUEST_FILE);
+end;
 
-    // Check if request file exists
-    if not FileExists(REQUEST_FILE) then
-    begin
-        ShowMessage('Error: No request file found.' + #13#10 + 'ROOT_DIR: ' + ROOT_DIR + #13#10 + 'Full path: ' + REQUEST_FILE);
-        Exit;
-    end;
+// Parse one request file, execute its command and write the response
+procedure HandleRequest(RequestFile: String);
+var
+    CommandType: String;
+    Result: String;
+    i: Integer;
+    Line: String;
+    ValueStart: Integer;
+begin
+    REQUEST_ID := '';
+    RESPONSE_FILE := ROOT_DIR + 'response.json';
 
     try
         // Initialize parameters list
@@ -7472,7 +8010,7 @@ begin
         // Read the request file
         RequestData := TStringList.Create;
         try
-            RequestData.LoadFromFile(REQUEST_FILE);
+            RequestData.LoadFromFile(RequestFile);
 
             // Default command type
             CommandType := '';
@@ -7482,12 +8020,16 @@ begin
             begin
                 Line := RequestData[i];
 
-                // Extract command
+                // Extract command (batch requests carry more "command" lines
+                // for their sub-commands; only the first one is the request's)
                 if Pos('"command":', Line) > 0 then
                 begin
-                    ValueStart := Pos(':', Line) + 1;
-                    CommandType := Copy(Line, ValueStart, Length(Line) - ValueStart + 1);
-                    CommandType := TrimJSON(CommandType);
+                    if CommandType = '' then
+                    begin
+                        ValueStart := Pos(':', Line) + 1;
+                        CommandType := Copy(Line, ValueStart, Length(Line) - ValueStart + 1);
+                        CommandType := TrimJSON(CommandType);
+                    end;
                 end
                 else
                 begin
@@ -7496,6 +8038,11 @@ begin
                 end;
             end;
 
+            // Echoed back in the response envelope header
+            REQUEST_ID := Params.Values['request_id'];
+            if REQUEST_ID <> '' then
+                RESPONSE_FILE := ROOT_DIR + 'response_' + REQUEST_ID + '.json';
+
             // Execute the command if valid
             if CommandType <> '' then
             begin
@@ -7508,13 +8055,15 @@ begin
                 else
                 begin
                     WriteResponse(False, '', 'Command execution failed');
-                    ShowMessage('Error: Command execution failed');
+                    if not RESIDENT_RUNNING then
+                        ShowMessage('Error: Command execution failed');
                 end;
             end
             else
             begin
                 WriteResponse(False, '', 'No command specified');
-                ShowMessage('Error: No command specified');
+                if not RESIDENT_RUNNING then
+                    ShowMessage('Error: No command specified');
             end;
         finally
             RequestData.Free;
@@ -7523,6 +8072,128 @@ begin
     except
         // Simple exception handling without the specific exception type
         WriteResponse(False, '', 'Exception occurred during script execution');
-        ShowMessage('Error: Exception occurred during script execution');
+        if not RESIDENT_RUNNING then
+            ShowMessage('Error: Exception occurred during script execution');
+    end;
+end;
+
+// Serve the request files matching Pattern in Directory, oldest name first,
+// deleting each one once it has been answered. Returns how many were served.
+function ServePendingRequests(Directory: String; Pattern: String): Integer;
+var
+    SearchRec: TSearchRec;
+    Pending: TStringList;
+    Resident: Boolean;
+    i: Integer;
+begin
+    Result := 0;
+    Resident := RESIDENT_RUNNING;
+    Pending := TStringList.Create;
+    try
+        // Requests are renamed into place from *.tmp, so every match is complete
+        if FindFirst(Directory + Pattern, faAnyFile, SearchRec) = 0 then
+        begin
+            repeat
+                Pending.Add(SearchRec.Name);
+            until FindNext(SearchRec) <> 0;
+            FindClose(SearchRec);
+        end;
+        Pending.Sort;
+
+        i := 0;
+        while i < Pending.Count do
+        begin
+            HandleRequest(Directory + Pending[i]);
+            DeleteFile(Directory + Pending[i]);
+            Result := Result + 1;
+            i := i + 1;
+
+            // A shutdown request ends the resident loop; later requests stay spooled
+            if Resident and not RESIDENT_RUNNING then
+                Break;
+        end;
+    finally
+        Pending.Free;
+    end;
+end;
+
+// Main procedure to run the bridge
+procedure Run;
+begin
+    DebugLog('=== Script Started ===');
+
+    RESIDENT_RUNNING := False;
+    InitializeBridge;
+
+    // Fixed request file written by older clients
+    if FileExists(REQUEST_FILE) then
+    begin
+        HandleRequest(REQUEST_FILE);
+        DeleteFile(REQUEST_FILE);
+    end;
+
+    // Requests issued together each queue a launch; the first launch serves
+    // all of them and the later ones find nothing left to do
+    if ServePendingRequests(ROOT_DIR, 'request_*.json') = 0 then
+        DebugLog('No pending requests');
+end;
+
+// Write the resident loop's ready marker. It is rewritten as a heartbeat, so
+// the bridge can tell a running loop from a marker left by one that died.
+procedure WriteReadyMarker;
+var
+    ReadyMarker: TStringList;
+begin
+    ReadyMarker := TStringList.Create;
+    try
+        ReadyMarker.Add(DateTimeToStr(Now));
+        ReadyMarker.SaveToFile(SPOOL_DIR + 'server.ready');
+    finally
+        ReadyMarker.Free;
+    end;
+end;
+
+// Resident mode: stay loaded and serve the request files dropped into the
+// spool directory, oldest name first, until a "shutdown" request arrives.
+// Started once with ProcName="Altium_API>Serve" instead of one launch per call.
+procedure Serve;
+var
+    LastBeat: TDateTime;
+begin
+    DebugLog('=== Resident Server Started ===');
+
+    InitializeBridge;
+    if not DirectoryExists(SPOOL_DIR) then
+        CreateDir(SPOOL_DIR);
+
+    // Tell the bridge the loop is up
+    WriteReadyMarker;
+    LastBeat := Now;
+
+    RESIDENT_RUNNING := True;
+    try
+        while RESIDENT_RUNNING do
+        begin
+            if ServePendingRequests(SPOOL_DIR, '*.json') = 0 then
+            begin
+                // Heartbeat (TDateTime counts days), then keep Altium responsive while idle
+                if (Now - LastBeat) * 86400000 >= RESIDENT_HEARTBEAT_MS then
+                begin
+                    WriteReadyMarker;
+                    LastBeat := Now;
+                end;
+                Application.ProcessMessages;
+                Sleep(RESIDENT_POLL_MS);
+            end
+            else
+            begin
+                WriteReadyMarker;
+                LastBeat := Now;
+            end;
+        end;
+    finally
+        RESIDENT_RUNNING := False;
+        DeleteFile(SPOOL_DIR + 'server.ready');
+        DebugLog('=== Resident Server Stopped ===');
     end;
 end;
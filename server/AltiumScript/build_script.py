@@ -246,7 +246,10 @@ class AltiumScriptBuilder:
         output_lines.append("    Params : TStringList;")
         output_lines.append("    REQUEST_FILE : String;")
         output_lines.append("    RESPONSE_FILE : String;")
+        output_lines.append("    REQUEST_ID : String;")
         output_lines.append("    ROOT_DIR: String;")
+        output_lines.append("    SPOOL_DIR : String;")
+        output_lines.append("    RESIDENT_RUNNING : Boolean;")
         output_lines.append("")
 
         # Global constants
@@ -257,6 +260,8 @@ class AltiumScriptBuilder:
         output_lines.append("const")
         output_lines.append("    constScriptProjectName = 'Altium_API';")
         output_lines.append("    REPLACEALL = 1;  // Flag for StringReplace to replace all occurrences")
+        output_lines.append("    RESIDENT_POLL_MS = 20;  // Idle poll interval of the resident Serve loop")
+        output_lines.append("    RESIDENT_HEARTBEAT_MS = 1000;  // Ready marker refresh interval of the idle Serve loop")
         output_lines.append("")
 
         # Forward declarations
@@ -326,14 +331,9 @@ class AltiumScriptBuilder:
         output_lines.append("// MAIN ENTRY POINT")
         output_lines.append("// ============================================================================")
         output_lines.append("")
-        output_lines.append("// Main procedure to run the bridge")
-        output_lines.append("procedure Run;")
+        output_lines.append("// Locate the server directory from the script project and set the file paths")
+        output_lines.append("procedure InitializeBridge;")
         output_lines.append("var")
-        output_lines.append("    CommandType: String;")
-        output_lines.append("    Result: String;")
-        output_lines.append("    i: Integer;")
-        output_lines.append("    Line: String;")
-        output_lines.append("    ValueStart: Integer;")
         output_lines.append("    Workspace: IWorkspace;")
         output_lines.append("    Project: IProject;")
         output_lines.append("    ProjectCount: Integer;")
@@ -342,8 +342,6 @@ class AltiumScriptBuilder:
         output_lines.append("    ProjectIdx: Integer;")
         output_lines.append("    LastSlashPos: Integer;")
         output_lines.append("begin")
-        output_lines.append("    DebugLog('=== Script Started ===');")
-        output_lines.append("    ")
         output_lines.append("    // Calculate root directory from script location")
         output_lines.append("    Workspace := GetWorkspace;")
         output_lines.append("    if (Workspace <> nil) then")
@@ -390,13 +388,19 @@ class AltiumScriptBuilder:
         output_lines.append("    //             'RootDir: ' + RootDir + #13#10 + ")
         output_lines.append("    //             'ROOT_DIR (global): ' + ROOT_DIR + #13#10 + ")
         output_lines.append("    //             'REQUEST_FILE: ' + REQUEST_FILE);")
+        output_lines.append("end;")
         output_lines.append("")
-        output_lines.append("    // Check if request file exists")
-        output_lines.append("    if not FileExists(REQUEST_FILE) then")
-        output_lines.append("    begin")
-        output_lines.append("        ShowMessage('Error: No request file found.' + #13#10 + 'ROOT_DIR: ' + ROOT_DIR + #13#10 + 'Full path: ' + REQUEST_FILE);")
-        output_lines.append("        Exit;")
-        output_lines.append("    end;")
+        output_lines.append("// Parse one request file, execute its command and write the response")
+        output_lines.append("procedure HandleRequest(RequestFile: String);")
+        output_lines.append("var")
+        output_lines.append("    CommandType: String;")
+        output_lines.append("    Result: String;")
+        output_lines.append("    i: Integer;")
+        output_lines.append("    Line: String;")
+        output_lines.append("    ValueStart: Integer;")
+        output_lines.append("begin")
+        output_lines.append("    REQUEST_ID := '';")
+        output_lines.append("    RESPONSE_FILE := ROOT_DIR + 'response.json';")
         output_lines.append("")
         output_lines.append("    try")
         output_lines.append("        // Initialize parameters list")
@@ -406,7 +410,7 @@ class AltiumScriptBuilder:
         output_lines.append("        // Read the request file")
         output_lines.append("        RequestData := TStringList.Create;")
         output_lines.append("        try")
-        output_lines.append("            RequestData.LoadFromFile(REQUEST_FILE);")
+        output_lines.append("            RequestData.LoadFromFile(RequestFile);")
         output_lines.append("")
         output_lines.append("            // Default command type")
         output_lines.append("            CommandType := '';")
@@ -416,12 +420,16 @@ class AltiumScriptBuilder:
         output_lines.append("            begin")
         output_lines.append("                Line := RequestData[i];")
         output_lines.append("")
-        output_lines.append("                // Extract command")
+        output_lines.append("                // Extract command (batch requests carry more \"command\" lines")
+        output_lines.append("                // for their sub-commands; only the first one is the request's)")
         output_lines.append("                if Pos('\"command\":', Line) > 0 then")
         output_lines.append("                begin")
-        output_lines.append("                    ValueStart := Pos(':', Line) + 1;")
-        output_lines.append("                    CommandType := Copy(Line, ValueStart, Length(Line) - ValueStart + 1);")
-        output_lines.append("                    CommandType := TrimJSON(CommandType);")
+        output_lines.append("                    if CommandType = '' then")
+        output_lines.append("                    begin")
+        output_lines.append("                        ValueStart := Pos(':', Line) + 1;")
+        output_lines.append("                        CommandType := Copy(Line, ValueStart, Length(Line) - ValueStart + 1);")
+        output_lines.append("                        CommandType := TrimJSON(CommandType);")
+        output_lines.append("                    end;")
         output_lines.append("                end")
         output_lines.append("                else")
         output_lines.append("                begin")
@@ -430,6 +438,11 @@ class AltiumScriptBuilder:
         output_lines.append("                end;")
         output_lines.append("            end;")
         output_lines.append("")
+        output_lines.append("            // Echoed back in the response envelope header")
+        output_lines.append("            REQUEST_ID := Params.Values['request_id'];")
+        output_lines.append("            if REQUEST_ID <> '' then")
+        output_lines.append("                RESPONSE_FILE := ROOT_DIR + 'response_' + REQUEST_ID + '.json';")
+        output_lines.append("")
         output_lines.append("            // Execute the command if valid")
         output_lines.append("            if CommandType <> '' then")
         output_lines.append("            begin")
@@ -442,13 +455,15 @@ class AltiumScriptBuilder:
         output_lines.append("                else")
         output_lines.append("                begin")
         output_lines.append("                    WriteResponse(False, '', 'Command execution failed');")
-        output_lines.append("                    ShowMessage('Error: Command execution failed');")
+        output_lines.append("                    if not RESIDENT_RUNNING then")
+        output_lines.append("                        ShowMessage('Error: Command execution failed');")
         output_lines.append("                end;")
         output_lines.append("            end")
         output_lines.append("            else")
         output_lines.append("            begin")
         output_lines.append("                WriteResponse(False, '', 'No command specified');")
-        output_lines.append("                ShowMessage('Error: No command specified');")
+        output_lines.append("                if not RESIDENT_RUNNING then")
+        output_lines.append("                    ShowMessage('Error: No command specified');")
         output_lines.append("            end;")
         output_lines.append("        finally")
         output_lines.append("            RequestData.Free;")
@@ -457,7 +472,129 @@ class AltiumScriptBuilder:
         output_lines.append("    except")
         output_lines.append("        // Simple exception handling without the specific exception type")
         output_lines.append("        WriteResponse(False, '', 'Exception occurred during script execution');")
-        output_lines.append("        ShowMessage('Error: Exception occurred during script execution');")
+        output_lines.append("        if not RESIDENT_RUNNING then")
+        output_lines.append("            ShowMessage('Error: Exception occurred during script execution');")
+        output_lines.append("    end;")
+        output_lines.append("end;")
+        output_lines.append("")
+        output_lines.append("// Serve the request files matching Pattern in Directory, oldest name first,")
+        output_lines.append("// deleting each one once it has been answered. Returns how many were served.")
+        output_lines.append("function ServePendingRequests(Directory: String; Pattern: String): Integer;")
+        output_lines.append("var")
+        output_lines.append("    SearchRec: TSearchRec;")
+        output_lines.append("    Pending: TStringList;")
+        output_lines.append("    Resident: Boolean;")
+        output_lines.append("    i: Integer;")
+        output_lines.append("begin")
+        output_lines.append("    Result := 0;")
+        output_lines.append("    Resident := RESIDENT_RUNNING;")
+        output_lines.append("    Pending := TStringList.Create;")
+        output_lines.append("    try")
+        output_lines.append("        // Requests are renamed into place from *.tmp, so every match is complete")
+        output_lines.append("        if FindFirst(Directory + Pattern, faAnyFile, SearchRec) = 0 then")
+        output_lines.append("        begin")
+        output_lines.append("            repeat")
+        output_lines.append("                Pending.Add(SearchRec.Name);")
+        output_lines.append("            until FindNext(SearchRec) <> 0;")
+        output_lines.append("            FindClose(SearchRec);")
+        output_lines.append("        end;")
+        output_lines.append("        Pending.Sort;")
+        output_lines.append("")
+        output_lines.append("        i := 0;")
+        output_lines.append("        while i < Pending.Count do")
+        output_lines.append("        begin")
+        output_lines.append("            HandleRequest(Directory + Pending[i]);")
+        output_lines.append("            DeleteFile(Directory + Pending[i]);")
+        output_lines.append("            Result := Result + 1;")
+        output_lines.append("            i := i + 1;")
+        output_lines.append("")
+        output_lines.append("            // A shutdown request ends the resident loop; later requests stay spooled")
+        output_lines.append("            if Resident and not RESIDENT_RUNNING then")
+        output_lines.append("                Break;")
+        output_lines.append("        end;")
+        output_lines.append("    finally")
+        output_lines.append("        Pending.Free;")
+        output_lines.append("    end;")
+        output_lines.append("end;")
+        output_lines.append("")
+        output_lines.append("// Main procedure to run the bridge")
+        output_lines.append("procedure Run;")
+        output_lines.append("begin")
+        output_lines.append("    DebugLog('=== Script Started ===');")
+        output_lines.append("")
+        output_lines.append("    RESIDENT_RUNNING := False;")
+        output_lines.append("    InitializeBridge;")
+        output_lines.append("")
+        output_lines.append("    // Fixed request file written by older clients")
+        output_lines.append("    if FileExists(REQUEST_FILE) then")
+        output_lines.append("    begin")
+        output_lines.append("        HandleRequest(REQUEST_FILE);")
+        output_lines.append("        DeleteFile(REQUEST_FILE);")
+        output_lines.append("    end;")
+        output_lines.append("")
+        output_lines.append("    // Requests issued together each queue a launch; the first launch serves")
+        output_lines.append("    // all of them and the later ones find nothing left to do")
+        output_lines.append("    if ServePendingRequests(ROOT_DIR, 'request_*.json') = 0 then")
+        output_lines.append("        DebugLog('No pending requests');")
+        output_lines.append("end;")
+        output_lines.append("")
+        output_lines.append("// Write the resident loop's ready marker. It is rewritten as a heartbeat, so")
+        output_lines.append("// the bridge can tell a running loop from a marker left by one that died.")
+        output_lines.append("procedure WriteReadyMarker;")
+        output_lines.append("var")
+        output_lines.append("    ReadyMarker: TStringList;")
+        output_lines.append("begin")
+        output_lines.append("    ReadyMarker := TStringList.Create;")
+        output_lines.append("    try")
+        output_lines.append("        ReadyMarker.Add(DateTimeToStr(Now));")
+        output_lines.append("        ReadyMarker.SaveToFile(SPOOL_DIR + 'server.ready');")
+        output_lines.append("    finally")
+        output_lines.append("        ReadyMarker.Free;")
+        output_lines.append("    end;")
+        output_lines.append("end;")
+        output_lines.append("")
+        output_lines.append("// Resident mode: stay loaded and serve the request files dropped into the")
+        output_lines.append("// spool directory, oldest name first, until a \"shutdown\" request arrives.")
+        output_lines.append("// Started once with ProcName=\"Altium_API>Serve\" instead of one launch per call.")
+        output_lines.append("procedure Serve;")
+        output_lines.append("var")
+        output_lines.append("    LastBeat: TDateTime;")
+        output_lines.append("begin")
+        output_lines.append("    DebugLog('=== Resident Server Started ===');")
+        output_lines.append("")
+        output_lines.append("    InitializeBridge;")
+        output_lines.append("    if not DirectoryExists(SPOOL_DIR) then")
+        output_lines.append("        CreateDir(SPOOL_DIR);")
+        output_lines.append("")
+        output_lines.append("    // Tell the bridge the loop is up")
+        output_lines.append("    WriteReadyMarker;")
+        output_lines.append("    LastBeat := Now;")
+        output_lines.append("")
+        output_lines.append("    RESIDENT_RUNNING := True;")
+        output_lines.append("    try")
+        output_lines.append("        while RESIDENT_RUNNING do")
+        output_lines.append("        begin")
+        output_lines.append("            if ServePendingRequests(SPOOL_DIR, '*.json') = 0 then")
+        output_lines.append("            begin")
+        output_lines.append("                // Heartbeat (TDateTime counts days), then keep Altium responsive while idle")
+        output_lines.append("                if (Now - LastBeat) * 86400000 >= RESIDENT_HEARTBEAT_MS then")
+        output_lines.append("                begin")
+        output_lines.append("                    WriteReadyMarker;")
+        output_lines.append("                    LastBeat := Now;")
+        output_lines.append("                end;")
+        output_lines.append("                Application.ProcessMessages;")
+        output_lines.append("                Sleep(RESIDENT_POLL_MS);")
+        output_lines.append("            end")
+        output_lines.append("            else")
+        output_lines.append("            begin")
+        output_lines.append("                WriteReadyMarker;")
+        output_lines.append("                LastBeat := Now;")
+        output_lines.append("            end;")
+        output_lines.append("        end;")
+        output_lines.append("    finally")
+        output_lines.append("        RESIDENT_RUNNING := False;")
+        output_lines.append("        DeleteFile(SPOOL_DIR + 'server.ready');")
+        output_lines.append("        DebugLog('=== Resident Server Stopped ===');")
         output_lines.append("    end;")
         output_lines.append("end;")
         output_lines.append("")
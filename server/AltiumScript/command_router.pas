@@ -6,20 +6,24 @@ unit command_router;
 interface
 
 uses
-    PCB, Classes, SysUtils, globals, json_utils,
+    PCB, Classes, SysUtils, globals, json_utils, helpers,
     command_executors_components, command_executors_library,
     command_executors_placement, command_executors_board,
     project_utils, library_utils, pcb_utils, schematic_utils,
     other_utils, pcb_layout_duplicator;
 
 function ExecuteCommand(CommandName: String): String;
+function ExecuteBatch(BatchRequest: TStringList): String;
 
 implementation
 
 function ExecuteCommand(CommandName: String): String;
 begin
     Result := '';
-    EnsureDocumentFocused(CommandName);
+
+    // Control commands do not touch any document
+    if (CommandName <> 'batch') and (CommandName <> 'shutdown') then
+        EnsureDocumentFocused(CommandName);
 
     // Direct command execution based on the command name
     case CommandName of
@@ -45,6 +49,8 @@ begin
             Result := CheckSchematicPCBSync(ROOT_DIR);
         'get_whole_design_json':
             Result := GetWholeDesignJSON(ROOT_DIR);
+        'stream_whole_design':
+            Result := GetWholeDesignNDJSON(ROOT_DIR);
         'get_pcb_layers':
             Result := GetPCBLayers(ROOT_DIR);
         'get_board_outline':
@@ -110,9 +116,100 @@ begin
             Result := ExecuteAddVia(RequestData);
         'add_copper_pour':
             Result := ExecuteAddCopperPour(RequestData);
+        // Several commands in one script launch
+        'batch':
+            Result := ExecuteBatch(RequestData);
+        // Ends the resident Serve loop after this response is written
+        'shutdown':
+        begin
+            RESIDENT_RUNNING := False;
+            Result := 'Resident server stopped';
+        end;
     else
-        ShowMessage('Error: Unknown command: ' + CommandName);
+        // A modal dialog would stall the resident loop
+        if not RESIDENT_RUNNING then
+            ShowMessage('Error: Unknown command: ' + CommandName);
+    end;
+end;
+
+// Run each sub-command of a batch request in order and return a JSON array
+// with one {"success": ..., "result"/"error": ...} object per command.
+// Sub-commands start at their own "command" line; the globals RequestData
+// and Params are pointed at that slice while it runs, so the executors parse
+// their parameters exactly as they do for a single request.
+function ExecuteBatch(BatchRequest: TStringList): String;
+var
+    i, j: Integer;
+    Line, SubCommand, SubResult: String;
+    ValueStart: Integer;
+    SavedRequestData, SavedParams: TStringList;
+    SubRequest, SubParams, Results: TStringList;
+begin
+    SavedRequestData := RequestData;
+    SavedParams := Params;
+    Results := TStringList.Create;
+    try
+        // Skip past the top-level "command": "batch" line
+        i := 0;
+        while (i < BatchRequest.Count) and (Pos('"command":', BatchRequest[i]) = 0) do
+            i := i + 1;
+        i := i + 1;
+
+        while i < BatchRequest.Count do
+        begin
+            Line := BatchRequest[i];
+            i := i + 1;
+
+            if Pos('"command":', Line) > 0 then
+            begin
+                ValueStart := Pos(':', Line) + 1;
+                SubCommand := TrimJSON(Copy(Line, ValueStart, Length(Line) - ValueStart + 1));
+
+                // Collect the lines up to the next sub-command
+                SubRequest := TStringList.Create;
+                SubParams := TStringList.Create;
+                SubParams.Delimiter := '=';
+                try
+                    SubRequest.Add(Line);
+                    while (i < BatchRequest.Count) and (Pos('"command":', BatchRequest[i]) = 0) do
+                    begin
+                        SubRequest.Add(BatchRequest[i]);
+                        i := i + 1;
+                    end;
+
+                    RequestData := SubRequest;
+                    Params := SubParams;
+                    for j := 1 to SubRequest.Count - 1 do
+                        ExtractParameter(SubRequest[j]);
+
+                    if SubCommand = 'batch' then
+                        SubResult := 'ERROR: Batches cannot be nested'
+                    else
+                    begin
+                        try
+                            SubResult := ExecuteCommand(SubCommand);
+                        except
+                            SubResult := 'ERROR: Exception occurred during ' + SubCommand;
+                        end;
+                    end;
+                finally
+                    RequestData := SavedRequestData;
+                    Params := SavedParams;
+                    SubRequest.Free;
+                    SubParams.Free;
+                end;
+
+                Results.Add(Trim(BuildResponseJSON(SubResult <> '', SubResult, 'Command execution failed')));
+            end;
+        end;
+
+        Result := BuildJSONArray(Results);
+    finally
+        RequestData := SavedRequestData;
+        Params := SavedParams;
+        Results.Free;
     end;
+end;
 
 
 end.
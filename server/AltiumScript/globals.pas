@@ -11,6 +11,7 @@ uses
 const
     constScriptProjectName = 'Altium_API';
     eClassMemberKind_Net = 1;
+    RESIDENT_POLL_MS = 20;  // Idle poll interval of the resident Serve loop
 
 var
     RequestData : TStringList;
@@ -18,7 +19,10 @@ var
     Params : TStringList;
     REQUEST_FILE : String;
     RESPONSE_FILE : String;
+    REQUEST_ID : String;
     ROOT_DIR: String;
+    SPOOL_DIR : String;
+    RESIDENT_RUNNING : Boolean;
 
 // Wrapper functions to access Altium's global objects from units
 function GetPCBServer: IPCB_ServerInterface;
@@ -52,6 +56,7 @@ begin
     // Set the file paths
     REQUEST_FILE := ROOT_DIR + 'request.json';
     RESPONSE_FILE := ROOT_DIR + 'response.json';
+    SPOOL_DIR := ROOT_DIR + 'spool\';
 end;
 
 end.
@@ -9,7 +9,10 @@ uses
     PCB, Classes, SysUtils, globals, json_utils;
 
 procedure ExtractParameter(Line: String);
+function BuildResponseJSON(Success: Boolean; Data: String; ErrorMsg: String): String;
 procedure WriteResponse(Success: Boolean; Data: String; ErrorMsg: String);
+function StreamDirectory: String;
+function WriteStreamPart(Records: TStringList; PartIndex: Integer): Integer;
 
 implementation
 
@@ -46,12 +49,12 @@ begin
 end;
 
 
-procedure WriteResponse(Success: Boolean; Data: String; ErrorMsg: String);
+// Build the {"success": ..., "result"/"error": ...} object for one command
+function BuildResponseJSON(Success: Boolean; Data: String; ErrorMsg: String): String;
 var
     ActualSuccess: Boolean;
     ActualErrorMsg: String;
     ResultProps: TStringList;
-    Response: TStringList;
 begin
     // Check if Data contains an error message
     if (Pos('ERROR:', Data) = 1) then
@@ -67,7 +70,6 @@ begin
 
     // Create response props
     ResultProps := TStringList.Create;
-    Response := TStringList.Create;
 
     try
         // Add properties
@@ -86,13 +88,40 @@ begin
             AddJSONProperty(ResultProps, 'error', ActualErrorMsg);
         end;
 
-        // Build response
-        Response.Text := BuildJSONObject(ResultProps);
-        Response.SaveToFile(RESPONSE_FILE);
+        Result := BuildJSONObject(ResultProps);
     finally
         ResultProps.Free;
-        Response.Free;
     end;
 end;
 
+procedure WriteResponse(Success: Boolean; Data: String; ErrorMsg: String);
+begin
+    // Build response and write it atomically with its envelope header
+    WriteEnvelopeToFile(BuildResponseJSON(Success, Data, ErrorMsg), RESPONSE_FILE, REQUEST_ID);
+end;
+
+// Directory receiving the NDJSON part files of the current streamed request
+function StreamDirectory: String;
+begin
+    Result := ROOT_DIR + 'stream_' + REQUEST_ID + '\';
+end;
+
+// Write Records as NDJSON part number PartIndex (part_00000.ndjson, ...),
+// clear Records and return the next part index. Parts are renamed into
+// place, so the bridge can parse each one as soon as it appears.
+function WriteStreamPart(Records: TStringList; PartIndex: Integer): Integer;
+var
+    PartName: String;
+begin
+    if not DirectoryExists(StreamDirectory) then
+        CreateDir(StreamDirectory);
+
+    PartName := IntToStr(PartIndex);
+    PartName := 'part_' + StringOfChar('0', 5 - Length(PartName)) + PartName + '.ndjson';
+    SaveLinesAtomic(Records, StreamDirectory + PartName);
+
+    Records.Clear;
+    Result := PartIndex + 1;
+end;
+
 end.
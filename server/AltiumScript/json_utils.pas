@@ -16,6 +16,13 @@ function JSONPairStr(const Name, Value: String; IsString: Boolean): String;
 function BuildJSONObject(Pairs: TStringList; IndentLevel: Integer = 0): String;
 function BuildJSONArray(Items: TStringList; ArrayName: String = ''; IndentLevel: Integer = 0): String;
 function WriteJSONToFile(JSON: TStringList; FileName: String = ''): String;
+function BuildJSONLine(Pairs: TStringList): String;
+function BuildJSONInlineArray(Items: TStringList; ArrayName: String): String;
+procedure SaveLinesAtomic(Lines: TStringList; FileName: String);
+function Utf8CodePoint(const S: String; var I: Integer): Integer;
+function Utf8Length(const S: String): Integer;
+function Adler32Hex(const S: String): String;
+procedure WriteEnvelopeToFile(Body: String; FileName: String; RequestId: String);
 procedure AddJSONProperty(List: TStringList; Name: String; Value: String; IsString: Boolean = True);
 procedure AddJSONNumber(List: TStringList; Name: String; Value: Double);
 procedure AddJSONInteger(List: TStringList; Name: String; Value: Integer);
@@ -127,14 +134,178 @@ begin
     end;
 end;
 
-// Function to convert JSON TStringList to string
+// Return the JSON TStringList as text. If FileName names a file (not the
+// output directory some callers pass), the JSON is also saved there with
+// SaveLinesAtomic so a reader never sees a partially written file
 function WriteJSONToFile(JSON: TStringList; FileName: String = ''): String;
 begin
-    // Simply return the JSON as text
-    // The FileName parameter is kept for compatibility but not used
+    if (FileName <> '') and not DirectoryExists(FileName) then
+        SaveLinesAtomic(JSON, FileName);
     Result := JSON.Text;
 end;
 
+// Build a JSON object on a single line (one NDJSON record)
+function BuildJSONLine(Pairs: TStringList): String;
+var
+    i: Integer;
+begin
+    Result := '{';
+    for i := 0 to Pairs.Count - 1 do
+    begin
+        if i > 0 then
+            Result := Result + ', ';
+        Result := Result + Pairs[i];
+    end;
+    Result := Result + '}';
+end;
+
+// Build a named JSON array on a single line, for use inside BuildJSONLine
+function BuildJSONInlineArray(Items: TStringList; ArrayName: String): String;
+var
+    i: Integer;
+begin
+    Result := '"' + JSONEscapeString(ArrayName) + '": [';
+    for i := 0 to Items.Count - 1 do
+    begin
+        if i > 0 then
+            Result := Result + ', ';
+        Result := Result + Items[i];
+    end;
+    Result := Result + ']';
+end;
+
+// Save Lines as UTF-8 under a temporary name and rename it into place so
+// the Python bridge never reads a partially written file
+procedure SaveLinesAtomic(Lines: TStringList; FileName: String);
+var
+    TempFile: String;
+begin
+    TempFile := FileName + '.tmp';
+    if FileExists(TempFile) then
+        DeleteFile(TempFile);
+    Lines.SaveToFile(TempFile, TEncoding.UTF8);
+
+    if FileExists(FileName) then
+        DeleteFile(FileName);
+    RenameFile(TempFile, FileName);
+end;
+
+// Code point of the character at S[I], joining a UTF-16 surrogate pair.
+// I is left on the last Char read.
+function Utf8CodePoint(const S: String; var I: Integer): Integer;
+var
+    Low: Integer;
+begin
+    Result := Ord(S[I]);
+    if (Result >= $D800) and (Result <= $DBFF) and (I < Length(S)) then
+    begin
+        Low := Ord(S[I + 1]);
+        if (Low >= $DC00) and (Low <= $DFFF) then
+        begin
+            Result := $10000 + ((Result - $D800) shl 10) + (Low - $DC00);
+            I := I + 1;
+        end;
+    end;
+end;
+
+// Length of S in bytes once encoded as UTF-8
+function Utf8Length(const S: String): Integer;
+var
+    I, C: Integer;
+begin
+    Result := 0;
+    I := 1;
+    while I <= Length(S) do
+    begin
+        C := Utf8CodePoint(S, I);
+        if C < $80 then
+            Result := Result + 1
+        else if C < $800 then
+            Result := Result + 2
+        else if C < $10000 then
+            Result := Result + 3
+        else
+            Result := Result + 4;
+        I := I + 1;
+    end;
+end;
+
+// Adler-32 checksum of the UTF-8 bytes of S as 8 lowercase hex digits
+// (B then A). The two halves are kept apart so nothing overflows a signed
+// 32-bit Integer.
+function Adler32Hex(const S: String): String;
+var
+    I, J, C, Count, A, B: Integer;
+    Bytes: array[0..3] of Integer;
+begin
+    A := 1;
+    B := 0;
+    I := 1;
+    while I <= Length(S) do
+    begin
+        C := Utf8CodePoint(S, I);
+        if C < $80 then
+        begin
+            Bytes[0] := C;
+            Count := 1;
+        end
+        else if C < $800 then
+        begin
+            Bytes[0] := $C0 or (C shr 6);
+            Bytes[1] := $80 or (C and $3F);
+            Count := 2;
+        end
+        else if C < $10000 then
+        begin
+            Bytes[0] := $E0 or (C shr 12);
+            Bytes[1] := $80 or ((C shr 6) and $3F);
+            Bytes[2] := $80 or (C and $3F);
+            Count := 3;
+        end
+        else
+        begin
+            Bytes[0] := $F0 or (C shr 18);
+            Bytes[1] := $80 or ((C shr 12) and $3F);
+            Bytes[2] := $80 or ((C shr 6) and $3F);
+            Bytes[3] := $80 or (C and $3F);
+            Count := 4;
+        end;
+        for J := 0 to Count - 1 do
+        begin
+            A := (A + Bytes[J]) mod 65521;
+            B := (B + A) mod 65521;
+        end;
+        I := I + 1;
+    end;
+    Result := LowerCase(IntToHex(B, 4) + IntToHex(A, 4));
+end;
+
+// Write Body to FileName behind a one-line envelope header carrying the
+// request id, body length and Adler-32 checksum. The file is written as
+// UTF-8 with SaveLinesAtomic, and the length and checksum are those of the
+// UTF-8 bytes, so non-ASCII text (Ohm and micro signs, curly quotes) survives the trip.
+procedure WriteEnvelopeToFile(Body: String; FileName: String; RequestId: String);
+var
+    Output: TStringList;
+    Header: String;
+begin
+    Output := TStringList.Create;
+    try
+        // Normalise line breaks the way SaveToFile writes them so the
+        // length and checksum describe the exact bytes on disk
+        Output.Text := Body;
+        Body := Output.Text;
+
+        Header := '{"request_id": "' + JSONEscapeString(RequestId) + '", ' +
+                  '"length": ' + IntToStr(Utf8Length(Body)) + ', ' +
+                  '"adler32": "' + Adler32Hex(Body) + '"}';
+        Output.Text := Header + #13#10 + Body;
+        SaveLinesAtomic(Output, FileName);
+    finally
+        Output.Free;
+    end;
+end;
+
 // Helper function to add a simple property to a JSON object
 procedure AddJSONProperty(List: TStringList; Name: String; Value: String; IsString: Boolean = True);
 begin
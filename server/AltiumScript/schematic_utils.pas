@@ -12,7 +12,10 @@ function CreateSchematicSymbol(SymbolName: String; PinsList: TStringList): Strin
 function GetSchematicData(ROOT_DIR: String): String;
 function GetSchematicComponentsWithParameters(ROOT_DIR: String): String;
 function CheckSchematicPCBSync(ROOT_DIR: String): String;
+function CompileDesignProject(Project: IProject): Boolean;
+procedure FillPinNetMap(Project: IProject; PinNetMap: TStringList);
 function GetWholeDesignJSON(ROOT_DIR: String): String;
+function GetWholeDesignNDJSON(ROOT_DIR: String): String;
 
 implementation
 
@@ -906,6 +909,72 @@ begin
     end;
 end;
 
+// Compile the project so the Design Manager connectivity data is populated.
+// Returns False if the flattened document is still missing afterwards.
+function CompileDesignProject(Project: IProject): Boolean;
+begin
+    // ALWAYS trigger full IDE compilation to ensure net connectivity data is populated
+    ResetParameters;
+    AddStringParameter('Action', 'Compile');
+    AddStringParameter('ObjectKind', 'Project');
+    RunProcess('WorkspaceManager:Compile');
+
+    // Wait for compilation to complete
+    Sleep(8000);  // Wait 8 seconds for compilation to finish
+
+    // VERIFIED: DM_Compile (from GetPinData.pas line 90)
+    // Call DM_Compile AFTER RunProcess to refresh the Design Manager data
+    Project.DM_Compile;
+
+    // Verify compilation succeeded
+    Result := Project.DM_DocumentFlattened <> Nil;
+end;
+
+// Fill PinNetMap with 'Designator|PinNumber=NetName' for every schematic pin
+// This uses INetItem.DM_NetName instead of IPin.DM_FlattenedNetName
+procedure FillPinNetMap(Project: IProject; PinNetMap: TStringList);
+var
+    Doc     : IDocument;
+    Net     : INet;
+    NetPin  : INetItem;
+    NetName : String;
+    i, j, k : Integer;
+begin
+    // Build pin-to-net map by iterating through nets (GetPinData.pas approach)
+    For i := 0 to Project.DM_LogicalDocumentCount - 1 Do
+    Begin
+        Doc := Project.DM_LogicalDocuments(i);
+
+        If Doc.DM_DocumentKind = 'SCH' Then
+        Begin
+            // VERIFIED: DM_NetCount and DM_Nets (from GetPinData.pas line 114, 116)
+            For j := 0 to Doc.DM_NetCount - 1 Do
+            Begin
+                Net := Doc.DM_Nets(j);
+
+                // Get net name from first pin (GetPinData.pas line 121, 65)
+                NetName := '';
+                if Net.DM_PinCount > 0 then
+                begin
+                    NetPin := Net.DM_Pins(0);
+                    // VERIFIED: DM_NetName on INetItem (GetPinData.pas line 65)
+                    NetName := NetPin.DM_NetName;
+                end;
+
+                // Map all pins in this net to the net name
+                // VERIFIED: DM_PinCount and DM_Pins (from GetPinData.pas line 121, 122)
+                For k := 0 to Net.DM_PinCount - 1 Do
+                Begin
+                    NetPin := Net.DM_Pins(k);
+                    // Create unique key: ComponentDesignator|PinNumber
+                    // VERIFIED: DM_LogicalPartDesignator (GetPinData.pas line 124) and DM_PinNumber (line 66)
+                    PinNetMap.Values[NetPin.DM_LogicalPartDesignator + '|' + NetPin.DM_PinNumber] := NetName;
+                End;
+            End;
+        End;
+    End;
+end;
+
 // Function to get the entire schematic design in one JSON call
 // This combines component data, parameters, pins, and nets
 // Uses ONLY verified DM (Design Manager) interface methods from working examples
@@ -914,7 +983,6 @@ var
     Workspace       : IWorkspace;
     Project         : IProject;
     Doc             : IDocument;
-    FlatHierarchy   : IDocument;
     Net             : INet;
     DMComp          : IComponent;
     DMPart          : IPart;
@@ -939,7 +1007,7 @@ var
     PinName         : String;
     NetName         : String;
 
-    i, j, k         : Integer;
+    i, j            : Integer;
     PartIdx         : Integer;
     PinIdx          : Integer;
 begin
@@ -955,22 +1023,7 @@ begin
         Exit;
     end;
 
-    // ALWAYS trigger full IDE compilation to ensure net connectivity data is populated
-    ResetParameters;
-    AddStringParameter('Action', 'Compile');
-    AddStringParameter('ObjectKind', 'Project');
-    RunProcess('WorkspaceManager:Compile');
-
-    // Wait for compilation to complete
-    Sleep(8000);  // Wait 8 seconds for compilation to finish
-
-    // VERIFIED: DM_Compile (from GetPinData.pas line 90)
-    // Call DM_Compile AFTER RunProcess to refresh the Design Manager data
-    Project.DM_Compile;
-
-    // Verify compilation succeeded
-    FlatHierarchy := Project.DM_DocumentFlattened;
-    If (FlatHierarchy = Nil) Then
+    If not CompileDesignProject(Project) Then
     Begin
         Result := '{"error": "Project compilation failed - DM_DocumentFlattened is still nil after compilation"}';
         Exit;
@@ -986,39 +1039,7 @@ begin
     PinNetMap.Duplicates := dupIgnore;
 
     try
-        // Build pin-to-net map by iterating through nets (GetPinData.pas approach)
-        For i := 0 to Project.DM_LogicalDocumentCount - 1 Do
-        Begin
-            Doc := Project.DM_LogicalDocuments(i);
-
-            If Doc.DM_DocumentKind = 'SCH' Then
-            Begin
-                // VERIFIED: DM_NetCount and DM_Nets (from GetPinData.pas line 114, 116)
-                For j := 0 to Doc.DM_NetCount - 1 Do
-                Begin
-                    Net := Doc.DM_Nets(j);
-
-                    // Get net name from first pin (GetPinData.pas line 121, 65)
-                    NetName := '';
-                    if Net.DM_PinCount > 0 then
-                    begin
-                        NetPin := Net.DM_Pins(0);
-                        // VERIFIED: DM_NetName on INetItem (GetPinData.pas line 65)
-                        NetName := NetPin.DM_NetName;
-                    end;
-
-                    // Map all pins in this net to the net name
-                    // VERIFIED: DM_PinCount and DM_Pins (from GetPinData.pas line 121, 122)
-                    For k := 0 to Net.DM_PinCount - 1 Do
-                    Begin
-                        NetPin := Net.DM_Pins(k);
-                        // Create unique key: ComponentDesignator|PinNumber
-                        // VERIFIED: DM_LogicalPartDesignator (GetPinData.pas line 124) and DM_PinNumber (line 66)
-                        PinNetMap.Values[NetPin.DM_LogicalPartDesignator + '|' + NetPin.DM_PinNumber] := NetName;
-                    End;
-                End;
-            End;
-        End;
+        FillPinNetMap(Project, PinNetMap);
 
         // Second pass: Get component data
         // VERIFIED: DM_LogicalDocumentCount and DM_LogicalDocuments (from GetPinData.pas line 109, 111)
@@ -1193,4 +1214,205 @@ begin
 end;
 
 
+// Streaming variant of GetWholeDesignJSON. Instead of building one large
+// string, records are written as NDJSON (one object per line) into numbered
+// part files in StreamDirectory, chunk_records records per part:
+//   {"type": "project", "path": ...}   (first record)
+//   {"type": "component", "designator": ..., "sheet": ..., "pins": [...]}
+//   {"type": "net", "name": ..., "pin_count": ...}
+// The bridge parses each part as soon as it is renamed into place. The
+// response only carries the number of parts and records written.
+function GetWholeDesignNDJSON(ROOT_DIR: String): String;
+var
+    Workspace       : IWorkspace;
+    Project         : IProject;
+    Doc             : IDocument;
+    Net             : INet;
+    DMComp          : IComponent;
+    DMPart          : IPart;
+    DMPin           : IPin;
+    NetPin          : INetItem;
+
+    Records         : TStringList;
+    RecordProps     : TStringList;
+    PinsArray       : TStringList;
+    PinProps        : TStringList;
+    PinNetMap       : TStringList;
+
+    Designator      : String;
+    PinNumber       : String;
+    NetName         : String;
+
+    ChunkRecords    : Integer;
+    PartIndex       : Integer;
+    RecordCount     : Integer;
+    i, j            : Integer;
+    PartIdx         : Integer;
+    PinIdx          : Integer;
+begin
+    Result := '';
+
+    Workspace := GetWorkspace;
+    Project := Workspace.DM_FocusedProject;
+
+    If (Project = Nil) Then
+    begin
+        Result := 'ERROR: No project is currently open';
+        Exit;
+    end;
+
+    If not CompileDesignProject(Project) Then
+    Begin
+        Result := 'ERROR: Project compilation failed - DM_DocumentFlattened is still nil after compilation';
+        Exit;
+    End;
+
+    ChunkRecords := StrToIntDef(Params.Values['chunk_records'], 200);
+    if ChunkRecords < 1 then
+        ChunkRecords := 1;
+    PartIndex := 0;
+    RecordCount := 0;
+
+    Records := TStringList.Create;
+    PinNetMap := TStringList.Create;
+    PinNetMap.Duplicates := dupIgnore;
+
+    try
+        FillPinNetMap(Project, PinNetMap);
+
+        // Project record, so the bridge knows which project the design belongs to
+        RecordProps := TStringList.Create;
+        try
+            AddJSONProperty(RecordProps, 'type', 'project');
+            AddJSONProperty(RecordProps, 'path', Project.DM_ProjectFullPath);
+            Records.Add(BuildJSONLine(RecordProps));
+            RecordCount := RecordCount + 1;
+        finally
+            RecordProps.Free;
+        end;
+
+        // Component records
+        For i := 0 to Project.DM_LogicalDocumentCount - 1 Do
+        Begin
+            Doc := Project.DM_LogicalDocuments(i);
+
+            If Doc.DM_DocumentKind = 'SCH' Then
+            Begin
+                For j := 0 to Doc.DM_ComponentCount - 1 Do
+                Begin
+                    DMComp := Doc.DM_Components(j);
+                    Designator := DMComp.DM_LogicalDesignator;
+
+                    RecordProps := TStringList.Create;
+                    PinsArray := TStringList.Create;
+                    try
+                        AddJSONProperty(RecordProps, 'type', 'component');
+                        AddJSONProperty(RecordProps, 'designator', Designator);
+                        AddJSONProperty(RecordProps, 'sheet', ExtractFileName(Doc.DM_FullPath));
+
+                        // Same pin rules as GetWholeDesignJSON: every pin of a
+                        // single-part component, connected pins of multi-part ones
+                        if (DMComp.DM_SubPartCount = 1) then
+                        begin
+                            for PinIdx := 0 to DMComp.DM_PinCount - 1 do
+                            begin
+                                DMPin := DMComp.DM_Pins(PinIdx);
+                                PinNumber := DMPin.DM_PinNumber;
+                                NetName := PinNetMap.Values[Designator + '|' + PinNumber];
+                                if NetName = '' then
+                                    NetName := '?';
+
+                                PinProps := TStringList.Create;
+                                try
+                                    AddJSONProperty(PinProps, 'name', PinNumber);
+                                    AddJSONProperty(PinProps, 'net', NetName);
+                                    PinsArray.Add(BuildJSONLine(PinProps));
+                                finally
+                                    PinProps.Free;
+                                end;
+                            end;
+                        end
+                        else if (DMComp.DM_SubPartCount > 1) then
+                        begin
+                            for PartIdx := 0 to DMComp.DM_SubPartCount - 1 do
+                            begin
+                                DMPart := DMComp.DM_SubParts(PartIdx);
+                                for PinIdx := 0 to DMPart.DM_PinCount - 1 do
+                                begin
+                                    DMPin := DMPart.DM_Pins(PinIdx);
+                                    PinNumber := DMPin.DM_PinNumber;
+                                    NetName := PinNetMap.Values[Designator + '|' + PinNumber];
+
+                                    if (NetName <> '') then
+                                    begin
+                                        PinProps := TStringList.Create;
+                                        try
+                                            AddJSONProperty(PinProps, 'name', PinNumber);
+                                            AddJSONProperty(PinProps, 'net', NetName);
+                                            PinsArray.Add(BuildJSONLine(PinProps));
+                                        finally
+                                            PinProps.Free;
+                                        end;
+                                    end;
+                                end;
+                            end;
+                        end;
+
+                        RecordProps.Add(BuildJSONInlineArray(PinsArray, 'pins'));
+                        Records.Add(BuildJSONLine(RecordProps));
+                        RecordCount := RecordCount + 1;
+                    finally
+                        PinsArray.Free;
+                        RecordProps.Free;
+                    end;
+
+                    if Records.Count >= ChunkRecords then
+                        PartIndex := WriteStreamPart(Records, PartIndex);
+                End;
+            End;
+        End;
+
+        // Net records
+        For i := 0 to Project.DM_LogicalDocumentCount - 1 Do
+        Begin
+            Doc := Project.DM_LogicalDocuments(i);
+
+            for j := 0 to Doc.DM_NetCount - 1 do
+            begin
+                Net := Doc.DM_Nets(j);
+
+                NetName := '';
+                if Net.DM_PinCount > 0 then
+                begin
+                    NetPin := Net.DM_Pins(0);
+                    NetName := NetPin.DM_NetName;
+                end;
+
+                RecordProps := TStringList.Create;
+                try
+                    AddJSONProperty(RecordProps, 'type', 'net');
+                    AddJSONProperty(RecordProps, 'name', NetName);
+                    AddJSONInteger(RecordProps, 'pin_count', Net.DM_PinCount);
+                    Records.Add(BuildJSONLine(RecordProps));
+                    RecordCount := RecordCount + 1;
+                finally
+                    RecordProps.Free;
+                end;
+
+                if Records.Count >= ChunkRecords then
+                    PartIndex := WriteStreamPart(Records, PartIndex);
+            end;
+        End;
+
+        if Records.Count > 0 then
+            PartIndex := WriteStreamPart(Records, PartIndex);
+
+        Result := '{"parts": ' + IntToStr(PartIndex) + ', "records": ' + IntToStr(RecordCount) + '}';
+    finally
+        Records.Free;
+        PinNetMap.Free;
+    end;
+end;
+
+
 end.
@@ -2,18 +2,99 @@
 Altium Bridge - Manages communication with Altium DelphiScript
 """
 import asyncio
+import copy
 import json
 import subprocess
+import time
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 import logging
 import glob
 import re
 import os
+import shutil
+
+from bridge_cache import BridgeCache
+from bridge_protocol import (
+    EnvelopeError,
+    decode_envelope,
+    new_request_id,
+    read_ndjson,
+    request_file_name,
+    response_file_name,
+    stream_dir_name,
+    stream_part_name,
+    write_json_atomic,
+)
+from request_scheduler import RequestScheduler
+from response_waiter import ResponseWaiter, create_response_waiter
 
 logger = logging.getLogger(__name__)
 
+# How requests reach the DelphiScript side
+TRANSPORT_LAUNCH = "launch"      # One X2.EXE script launch per request
+TRANSPORT_RESIDENT = "resident"  # Requests dropped into the spool of a resident Serve loop
+TRANSPORTS = (TRANSPORT_LAUNCH, TRANSPORT_RESIDENT)
+
+# Commands that do not modify the design or write files. These may run
+# concurrently with each other; every other command is treated as mutating
+# and runs alone, in the order it was issued. run_output_jobs (writes output
+# files) and layout_duplicator (selects objects and writes its result file)
+# are deliberately left out.
+READ_ONLY_COMMANDS = frozenset({
+    "get_component_pins",
+    "get_all_nets",
+    "get_all_component_data",
+    "take_view_screenshot",
+    "get_library_symbol_reference",
+    "get_schematic_data",
+    "get_schematic_components_with_parameters",
+    "check_schematic_pcb_sync",
+    "get_whole_design_json",
+    "stream_whole_design",
+    "get_pcb_layers",
+    "get_board_outline",
+    "get_pcb_layer_stackup",
+    "get_selected_components_coordinates",
+    "get_pcb_rules",
+    "get_output_job_containers",
+    "get_project_info",
+    "list_component_libraries",
+    "search_components",
+    "get_component_from_library",
+    "search_footprints",
+})
+
+# Read-only commands whose result depends only on the design, so it can be
+# served from the cache until the next mutation. Selection-, view- and
+# file-dependent queries are left out.
+CACHEABLE_COMMANDS = READ_ONLY_COMMANDS - {
+    "take_view_screenshot",
+    "get_library_symbol_reference",
+    "get_selected_components_coordinates",
+    "stream_whole_design",  # Answered in part files, see stream_script
+}
+
+
+def is_read_only_command(command: str, params: Optional[Dict[str, Any]] = None) -> bool:
+    """
+    Check if a command leaves the design unchanged.
+
+    A batch is read-only only if every one of its sub-commands is.
+    """
+    if command == "batch":
+        return all(
+            is_read_only_command(sub_request.get("command", ""))
+            for sub_request in (params or {}).get("commands", [])
+        )
+    return command in READ_ONLY_COMMANDS
+
+
+class ScriptStreamError(RuntimeError):
+    """Raised when a streamed command fails or its part files are incomplete"""
+
+
 @dataclass
 class ScriptResult:
     """Result from Altium script execution"""
@@ -37,6 +118,7 @@ class AltiumConfig:
         self.config_file = config_file
         self.altium_exe_path = ""
         self.script_path = ""
+        self.transport = TRANSPORT_LAUNCH
         self.load_config()
 
     def load_config(self):
@@ -47,6 +129,7 @@ class AltiumConfig:
                     config = json.load(f)
                     self.altium_exe_path = config.get("altium_exe_path", "")
                     self.script_path = config.get("script_path", "")
+                    self.transport = config.get("transport", TRANSPORT_LAUNCH)
                 logger.info(f"Loaded configuration from {self.config_file}")
             except Exception as e:
                 logger.error(f"Error loading configuration: {e}")
@@ -94,7 +177,8 @@ class AltiumConfig:
         """Save configuration to file"""
         config = {
             "altium_exe_path": self.altium_exe_path,
-            "script_path": self.script_path
+            "script_path": self.script_path,
+            "transport": self.transport
         }
 
         try:
@@ -123,13 +207,32 @@ class AltiumBridge:
 
     Handles async communication with Altium using file-based IPC
     (can be upgraded to named pipes or ZeroMQ later).
+
+    Every request carries a correlation id and travels in its own files, so
+    read-only requests can be in flight together while mutating requests
+    keep strict ordering (see RequestScheduler).
+
+    Two transports are supported:
+    - "launch": every request is written to request_<id>.json and an X2.EXE
+      script launch (Run) answers the pending requests
+    - "resident": the script is launched once (Serve) and stays loaded,
+      answering the requests dropped into the spool directory
     """
 
-    def __init__(self, mcp_dir: Path, default_script_path: Path):
+    def __init__(
+        self,
+        mcp_dir: Path,
+        default_script_path: Path,
+        response_waiter: Optional[ResponseWaiter] = None,
+        transport: Optional[str] = None,
+        resident_start_timeout: float = 60.0,
+        resident_heartbeat_timeout: float = 10.0,
+        max_concurrent_reads: int = 8
+    ):
         self.mcp_dir = mcp_dir
-        self.request_path = mcp_dir / "request.json"
-        self.response_path = mcp_dir / "response.json"
         self.config_path = mcp_dir / "config.json"
+        self.spool_dir = mcp_dir / "spool"
+        self.ready_path = self.spool_dir / "server.ready"
 
         # Ensure the MCP directory exists
         self.mcp_dir.mkdir(exist_ok=True)
@@ -142,7 +245,26 @@ class AltiumBridge:
             self.config.script_path = str(default_script_path)
             self.config.save_config()
 
-        self._lock = asyncio.Lock()  # Ensure serial access
+        # Detects the response file as soon as Altium writes it
+        self.response_waiter = response_waiter or create_response_waiter()
+
+        self.transport = transport or self.config.transport
+        if self.transport not in TRANSPORTS:
+            raise ValueError(f"Unknown transport {self.transport!r} (expected one of {', '.join(TRANSPORTS)})")
+        self.resident_start_timeout = resident_start_timeout
+        self.resident_heartbeat_timeout = resident_heartbeat_timeout
+        self._spool_sequence = 0
+        self._resident_lock = asyncio.Lock()  # One Serve launch at a time
+
+        # Reads overlap, mutations run alone and in order
+        self._scheduler = RequestScheduler(max_concurrent_reads)
+
+        # Query results for the current design generation
+        self.cache = BridgeCache()
+
+        # Identical read-only calls in flight, shared by everyone asking for them
+        self._inflight: Dict[Tuple[str, int], "asyncio.Future[ScriptResult]"] = {}
+        self._mutations_issued = 0
 
     async def initialize(self):
         """Initialize the bridge"""
@@ -151,6 +273,7 @@ class AltiumBridge:
 
         logger.info(f"Altium executable: {self.config.altium_exe_path}")
         logger.info(f"Script project: {self.config.script_path}")
+        logger.info(f"Transport: {self.transport}")
 
     async def call_script(
         self,
@@ -161,6 +284,14 @@ class AltiumBridge:
         """
         Call an Altium DelphiScript command.
 
+        Results of CACHEABLE_COMMANDS are served from the cache until the
+        next mutating command (or invalidate_cache) changes the design.
+
+        Concurrent calls of the same read-only command with equal params are
+        coalesced: the first one runs, the others wait for it and get their
+        own copy of its result. A call issued after a mutation never joins a
+        read issued before it.
+
         Args:
             command: Command name
             params: Command parameters
@@ -169,104 +300,480 @@ class AltiumBridge:
         Returns:
             ScriptResult with command output
         """
-        async with self._lock:  # Serialize calls
+        if not is_read_only_command(command, params):
+            self._mutations_issued += 1
+            return await self._call_script(command, params, timeout, read_only=False)
+
+        key = (BridgeCache.make_key(command, params), self._mutations_issued)
+        shared = self._inflight.get(key)
+        if shared is not None:
             try:
-                # Clean up any existing response file
-                if self.response_path.exists():
-                    self.response_path.unlink()
+                result = await asyncio.shield(shared)
+            except asyncio.CancelledError:
+                if not shared.cancelled():
+                    raise
+                # The caller running the shared request was cancelled: run it ourselves
+                return await self.call_script(command, params, timeout)
+            return ScriptResult(success=result.success, data=copy.deepcopy(result.data), error=result.error)
+
+        # The first caller runs the request inline, so it joins the scheduler
+        # queue in issue order, and hands the outcome to everyone who joined
+        shared = asyncio.get_running_loop().create_future()
+        self._inflight[key] = shared
+        try:
+            result = await self._call_script(command, params, timeout, read_only=True)
+        except asyncio.CancelledError:
+            shared.cancel()
+            raise
+        except Exception as e:
+            shared.set_exception(e)
+            shared.exception()  # Retrieved here in case nobody joined
+            raise
+        else:
+            shared.set_result(result)
+        finally:
+            del self._inflight[key]
+        return result
 
-                # Write request file with command and parameters
-                request_data = {
-                    "command": command,
-                    **params  # Include parameters directly in the main JSON object
-                }
-
-                with open(self.request_path, 'w') as f:
-                    json.dump(request_data, f, indent=2)
-
-                logger.info(f"Wrote request file for command: {command}")
-
-                # Run the Altium script
-                success = await self._run_altium_script()
-                if not success:
-                    return ScriptResult(
-                        success=False,
-                        data=None,
-                        error="Failed to run Altium script"
-                    )
-
-                # Wait for the response file with timeout
-                logger.info(f"Waiting for response file to appear...")
-                start_time = asyncio.get_event_loop().time()
-                while not self.response_path.exists():
-                    if asyncio.get_event_loop().time() - start_time > timeout:
-                        return ScriptResult(
-                            success=False,
-                            data=None,
-                            error=f"Script timeout after {timeout}s"
-                        )
-                    await asyncio.sleep(0.5)
-
-                # Read the response file
-                logger.info("Response file found, reading response")
-                with open(self.response_path, "r") as f:
-                    response_text = f.read()
-
-                # Log the raw response for debugging
-                logger.debug(f"Raw response (first 200 chars): {response_text[:200]}")
-
-                # Parse the JSON response with detailed error handling
-                try:
-                    response = json.loads(response_text)
-                    logger.info(f"Successfully parsed JSON response")
-                except json.JSONDecodeError as e:
-                    logger.error(f"Error parsing JSON response: {e}")
-                    # Try to manually fix common JSON issues
-                    logger.info("Attempting to fix JSON response...")
-                    fixed_text = response_text
+    async def _call_script(
+        self,
+        command: str,
+        params: Dict[str, Any],
+        timeout: float,
+        read_only: bool
+    ) -> ScriptResult:
+        """Run one command in its scheduler slot, through the cache"""
+        async with self._scheduler.slot(read_only):
+            # Looked up only once the slot is held, so a read queued behind a
+            # mutation never sees the pre-mutation result
+            if command in CACHEABLE_COMMANDS:
+                hit, data = self.cache.lookup(command, params)
+                if hit:
+                    return ScriptResult(success=True, data=data, error=None)
+
+            generation = self.cache.generation
+            try:
+                result = await self._execute(command, params, timeout)
+            finally:
+                if not read_only:
+                    # The design may have changed, even if the command failed part way
+                    self.cache.invalidate()
+
+            if command in CACHEABLE_COMMANDS and result.success:
+                self.cache.store(command, params, result.data, generation)
+            return result
+
+    async def _execute(self, command: str, params: Dict[str, Any], timeout: float) -> ScriptResult:
+        """Send one request to Altium and wait for its response"""
+        request_path = None
+        try:
+            # Write request file with command and parameters
+            request_id = new_request_id()
+            request_data = {
+                "command": command,
+                "request_id": request_id,
+                **params  # Include parameters directly in the main JSON object
+            }
+            # Hand the request to Altium
+            request_path = await self._submit_request(request_data)
+            if request_path is None:
+                return ScriptResult(
+                    success=False,
+                    data=None,
+                    error="Failed to run Altium script"
+                )
 
-                    # Fix double-quoted JSON arrays
-                    if '"[' in fixed_text and ']"' in fixed_text:
-                        fixed_text = fixed_text.replace('"[', '[').replace(']"', ']')
+            return await self._read_response(request_id, timeout)
 
-                    # Handle escaped quotes in JSON strings
-                    fixed_text = fixed_text.replace('\\"', '"')
+        except Exception as e:
+            logger.error(f"Script execution failed: {e}")
+            return ScriptResult(
+                success=False,
+                data=None,
+                error=str(e)
+            )
+        finally:
+            # Withdraw a request Altium has not picked up (e.g. after a
+            # timeout) so it cannot run later, out of order
+            if request_path is not None:
+                request_path.unlink(missing_ok=True)
+
+    async def stream_script(
+        self,
+        command: str,
+        params: Dict[str, Any],
+        timeout: float = 120.0
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Call a streamed Altium command and yield its records as they arrive.
 
+        The script writes NDJSON part files while it is still exporting; each
+        part is parsed and its records yielded as soon as it appears, so only
+        one part is held in memory at a time and processing overlaps with the
+        export. The request holds its scheduler slot until the iteration
+        finishes, so iterate to the end (or close the iterator).
+
+        Args:
+            command: Streamed command name (e.g. stream_whole_design)
+            params: Command parameters
+            timeout: Timeout in seconds for the whole export
+
+        Yields:
+            One dict per NDJSON record
+
+        Raises:
+            ScriptStreamError: If the command fails or parts are missing
+        """
+        read_only = is_read_only_command(command, params)
+        if not read_only:
+            self._mutations_issued += 1
+
+        async with self._scheduler.slot(read_only):
+            request_id = new_request_id()
+            stream_dir = self.mcp_dir / stream_dir_name(request_id)
+            stream_dir.mkdir(exist_ok=True)
+            request_path = None
+            response_task = None
+            try:
+                request_path = await self._submit_request({
+                    "command": command,
+                    "request_id": request_id,
+                    **params
+                })
+                if request_path is None:
+                    raise ScriptStreamError("Failed to run Altium script")
+                response_task = asyncio.ensure_future(self._read_response(request_id, timeout))
+
+                part = 0
+                while True:
+                    part_path = stream_dir / stream_part_name(part)
+                    if part_path.exists():
+                        try:
+                            records = read_ndjson(part_path)
+                        except ValueError as e:
+                            raise ScriptStreamError(f"Invalid record in {part_path.name}: {e}")
+                        part_path.unlink()
+                        part += 1
+                        for record in records:
+                            yield record
+                        continue
+
+                    if response_task.done():
+                        # The response is written after the last part
+                        result = response_task.result()
+                        if not result.success:
+                            raise ScriptStreamError(result.error)
+                        summary = result.data if isinstance(result.data, dict) else {}
+                        parts = summary.get("parts", part)
+                        if part < parts:
+                            raise ScriptStreamError(f"Stream ended after {part} of {parts} parts")
+                        return
+
+                    # Wake up for the next part or the response, whichever comes first
+                    part_task = asyncio.ensure_future(self.response_waiter.wait(part_path, timeout))
                     try:
-                        response = json.loads(fixed_text)
-                        logger.info("Successfully parsed fixed JSON response")
-                    except json.JSONDecodeError as e2:
-                        logger.error(f"Still failed to parse JSON after fixes: {e2}")
-                        return ScriptResult(
-                            success=False,
-                            data=None,
-                            error=f"Invalid JSON response: {e}"
-                        )
-
-                # Parse result
-                if response.get("success"):
-                    return ScriptResult(
-                        success=True,
-                        data=response.get("result"),
-                        error=None
-                    )
-                else:
-                    return ScriptResult(
-                        success=False,
-                        data=None,
-                        error=response.get("error", "Unknown error")
-                    )
+                        await asyncio.wait({response_task, part_task}, return_when=asyncio.FIRST_COMPLETED)
+                    finally:
+                        part_task.cancel()
+            finally:
+                if response_task is not None:
+                    response_task.cancel()
+                if request_path is not None:
+                    request_path.unlink(missing_ok=True)
+                shutil.rmtree(stream_dir, ignore_errors=True)
+                if not read_only:
+                    self.cache.invalidate()
+
+    def request_path_for(self, request_id: str) -> Path:
+        """Request file used by the launch transport for this request"""
+        return self.mcp_dir / request_file_name(request_id)
+
+    def response_path_for(self, request_id: str) -> Path:
+        """Response file Altium writes for this request"""
+        return self.mcp_dir / response_file_name(request_id)
+
+    async def _submit_request(self, request_data: Dict[str, Any]) -> Optional[Path]:
+        """
+        Deliver a request over the configured transport.
 
-            except Exception as e:
-                logger.error(f"Script execution failed: {e}")
+        Args:
+            request_data: Request object including command and request_id
+
+        Returns:
+            Path of the request file, or None if it could not be handed to Altium
+        """
+        if self.transport == TRANSPORT_RESIDENT:
+            return await self._spool_request(request_data)
+
+        request_path = self.request_path_for(request_data["request_id"])
+        write_json_atomic(request_path, request_data)
+        logger.info(f"Wrote request file for command: {request_data['command']}")
+
+        # Run the Altium script
+        if not await self._run_altium_script():
+            request_path.unlink(missing_ok=True)
+            return None
+        return request_path
+
+    async def _spool_request(self, request_data: Dict[str, Any]) -> Optional[Path]:
+        """
+        Drop a request into the spool of the resident Serve loop.
+
+        Spool files are named by a zero-padded, strictly increasing sequence
+        number; the loop serves them in name order, so requests are answered
+        in the order they were written.
+        """
+        if not await self._ensure_resident():
+            return None
+
+        self._spool_sequence = max(self._spool_sequence + 1, time.time_ns())
+        spool_path = self.spool_dir / f"{self._spool_sequence:020d}_{request_data['request_id']}.json"
+        write_json_atomic(spool_path, request_data)
+
+        logger.info(f"Spooled request for command: {request_data['command']}")
+        return spool_path
+
+    def _resident_alive(self) -> bool:
+        """
+        Whether the resident Serve loop is running.
+
+        The loop rewrites its ready marker about once a second while idle,
+        so a marker older than resident_heartbeat_timeout was left behind by
+        a loop that is gone (Altium closed or crashed). A loop busy with a
+        long command cannot refresh it, so while spooled requests are still
+        waiting for an answer the marker is trusted; they are withdrawn when
+        they time out.
+        """
+        try:
+            age = time.time() - self.ready_path.stat().st_mtime
+        except FileNotFoundError:
+            return False
+        return age <= self.resident_heartbeat_timeout or any(self.spool_dir.glob("*.json"))
+
+    async def _ensure_resident(self) -> bool:
+        """Start the resident Serve loop unless it is already running"""
+        async with self._resident_lock:
+            if self._resident_alive():
+                return True
+
+            if self.ready_path.exists():
+                logger.warning("Resident script loop stopped refreshing its ready marker; restarting it")
+                self.ready_path.unlink(missing_ok=True)
+
+            self.spool_dir.mkdir(exist_ok=True)
+            logger.info("Starting resident Altium script loop")
+            if not await self._run_altium_script("Serve"):
+                return False
+
+            if not await self.response_waiter.wait(self.ready_path, self.resident_start_timeout):
+                logger.error(f"Resident script loop did not start within {self.resident_start_timeout}s")
+                return False
+            return True
+
+    async def stop_resident(self, timeout: float = 30.0) -> bool:
+        """
+        Stop the resident Serve loop.
+
+        Sends a "shutdown" request; the loop answers it, leaves the loop and
+        then removes its ready marker.
+
+        Args:
+            timeout: Timeout in seconds
+
+        Returns:
+            True if the loop has stopped (or was not running)
+        """
+        if self.transport != TRANSPORT_RESIDENT:
+            return True
+        if not self._resident_alive():
+            self.ready_path.unlink(missing_ok=True)
+            return True
+
+        result = await self.call_script("shutdown", {}, timeout)
+        if not result.success:
+            logger.error(f"Resident script loop did not acknowledge shutdown: {result.error}")
+            return False
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self.ready_path.exists():
+            if loop.time() >= deadline:
+                logger.error("Resident script loop acknowledged shutdown but did not exit")
+                return False
+            await asyncio.sleep(0.01)
+
+        logger.info("Resident Altium script loop stopped")
+        return True
+
+    async def call_script_batch(
+        self,
+        commands: List[Tuple[str, Dict[str, Any]]],
+        timeout: float = 120.0
+    ) -> List[ScriptResult]:
+        """
+        Call several Altium DelphiScript commands in a single script launch.
+
+        The commands run in order inside one "batch" request and their results
+        come back together in one response file, so the launch and script
+        compile cost is paid once instead of once per command.
+
+        Args:
+            commands: List of (command name, command parameters) tuples
+            timeout: Timeout in seconds for the whole batch
+
+        Returns:
+            One ScriptResult per command, in the same order. If the batch
+            itself fails (launch error, timeout, bad response) every entry
+            carries that error. In a read-only batch, commands whose result
+            is cached are answered from the cache and not sent.
+        """
+        if not commands:
+            return []
+
+        sub_requests = []
+        for command, params in commands:
+            if command == "batch":
+                raise ValueError("Batches cannot be nested")
+            if "command" in params:
+                raise ValueError(f"Parameters for {command} must not contain a 'command' key")
+            sub_requests.append({"command": command, **params})
+
+        read_only = is_read_only_command("batch", {"commands": sub_requests})
+        async with self._scheduler.slot(read_only):
+            # A read-only batch only sends the commands missing from the cache
+            results: List[Optional[ScriptResult]] = [None] * len(commands)
+            if read_only:
+                for i, (command, params) in enumerate(commands):
+                    if command in CACHEABLE_COMMANDS:
+                        hit, data = self.cache.lookup(command, params)
+                        if hit:
+                            results[i] = ScriptResult(success=True, data=data, error=None)
+
+            pending = [i for i, result in enumerate(results) if result is None]
+            if not pending:
+                return results
+
+            generation = self.cache.generation
+            try:
+                batch_results = await self._execute_batch([sub_requests[i] for i in pending], timeout)
+            finally:
+                if not read_only:
+                    self.cache.invalidate()
+
+            for i, result in zip(pending, batch_results):
+                results[i] = result
+                command, params = commands[i]
+                if read_only and command in CACHEABLE_COMMANDS and result.success:
+                    self.cache.store(command, params, result.data, generation)
+            return results
+
+    async def _execute_batch(self, sub_requests: List[Dict[str, Any]], timeout: float) -> List[ScriptResult]:
+        """Send one batch request and split its response into per-command results"""
+        batch_result = await self._execute("batch", {"commands": sub_requests}, timeout)
+        if not batch_result.success:
+            return [
+                ScriptResult(success=False, data=None, error=batch_result.error)
+                for _ in sub_requests
+            ]
+
+        responses = batch_result.data if isinstance(batch_result.data, list) else []
+        if len(responses) != len(sub_requests):
+            error = f"Batch returned {len(responses)} results for {len(sub_requests)} commands"
+            logger.error(error)
+            return [ScriptResult(success=False, data=None, error=error) for _ in sub_requests]
+
+        return [self._to_script_result(response) for response in responses]
+
+    @staticmethod
+    def _to_script_result(response: Dict[str, Any]) -> ScriptResult:
+        """Convert a {"success", "result"/"error"} response object to a ScriptResult"""
+        if response.get("success"):
+            return ScriptResult(
+                success=True,
+                data=response.get("result"),
+                error=None
+            )
+        else:
+            return ScriptResult(
+                success=False,
+                data=None,
+                error=response.get("error", "Unknown error")
+            )
+
+    async def _read_response(self, request_id: str, timeout: float) -> ScriptResult:
+        """
+        Wait for the response envelope matching request_id and parse it.
+
+        A response file whose envelope carries a different request id is
+        discarded and the wait continues for the remaining time. The response
+        file is removed once it has been read.
+
+        Args:
+            request_id: Id written into the request file
+            timeout: Timeout in seconds
+
+        Returns:
+            ScriptResult with command output
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        response_path = self.response_path_for(request_id)
+
+        logger.info("Waiting for response file to appear...")
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0 or not await self.response_waiter.wait(response_path, remaining):
                 return ScriptResult(
                     success=False,
                     data=None,
-                    error=str(e)
+                    error=f"Script timeout after {timeout}s"
                 )
 
-    async def _run_altium_script(self) -> bool:
-        """Run the Altium bridge script"""
+            # The file is renamed into place, so it is always complete here
+            raw = response_path.read_bytes()
+            response_path.unlink(missing_ok=True)
+            try:
+                response_request_id, body = decode_envelope(raw)
+            except EnvelopeError as e:
+                logger.error(f"Invalid response envelope: {e}")
+                return ScriptResult(
+                    success=False,
+                    data=None,
+                    error=f"Invalid response envelope: {e}"
+                )
+
+            if response_request_id == request_id:
+                break
+
+            logger.warning(
+                f"Discarding stale response for request {response_request_id} "
+                f"(waiting for {request_id})"
+            )
+
+        logger.debug(f"Raw response (first 200 bytes): {body[:200]!r}")
+
+        try:
+            response = json.loads(body.decode("utf-8"))
+            logger.info("Successfully parsed JSON response")
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            logger.error(f"Error parsing JSON response: {e}")
+            return ScriptResult(
+                success=False,
+                data=None,
+                error=f"Invalid JSON response: {e}"
+            )
+
+        # Parse result
+        return self._to_script_result(response)
+
+    async def _run_altium_script(self, proc_name: str = "Run") -> bool:
+        """
+        Run the Altium bridge script.
+
+        Args:
+            proc_name: Entry point in Altium_API.pas ("Run" for one request,
+                       "Serve" for the resident loop)
+        """
         if not os.path.exists(self.config.altium_exe_path):
             logger.error(f"Altium executable not found at: {self.config.altium_exe_path}")
             return False
@@ -277,7 +784,7 @@ class AltiumBridge:
 
         try:
             # Command format: "X2.EXE" -RScriptingSystem:RunScript(ProjectName="path\file.PrjScr"|ProcName="ModuleName>Run")
-            command = f'"{self.config.altium_exe_path}" -RScriptingSystem:RunScript(ProjectName="{self.config.script_path}"^|ProcName="Altium_API>Run")'
+            command = f'"{self.config.altium_exe_path}" -RScriptingSystem:RunScript(ProjectName="{self.config.script_path}"^|ProcName="Altium_API>{proc_name}")'
 
             logger.info(f"Running command: {command}")
 
@@ -294,14 +801,21 @@ class AltiumBridge:
 
     async def cleanup(self):
         """Cleanup resources"""
-        # Clean up temp files
-        for path in [self.request_path, self.response_path]:
+        await self.stop_resident()
+
+        # Clean up request files nobody picked up and responses nobody read
+        for path in [*self.mcp_dir.glob(request_file_name("*")),
+                     *self.mcp_dir.glob(response_file_name("*"))]:
             if path.exists():
                 try:
                     path.unlink()
                 except Exception as e:
                     logger.warning(f"Failed to cleanup {path}: {e}")
 
+        # Parts of streamed responses nobody consumed
+        for path in self.mcp_dir.glob(stream_dir_name("*")):
+            shutil.rmtree(path, ignore_errors=True)
+
     @property
     def status(self) -> str:
         """Get bridge status"""
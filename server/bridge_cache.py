@@ -0,0 +1,103 @@
+"""
+Bridge cache - read-through cache of Altium query results
+
+Many tools start from the same full-board query (get_all_component_data,
+get_all_nets, ...), and each one used to cost a complete iteration of the
+board inside Altium. BridgeCache keeps successful query results keyed by
+command + params.
+
+The cache tracks a design "generation". Any mutating command bumps it, as
+does an explicit invalidate() for edits made by hand in Altium, and every
+bump drops all cached entries. A result is only stored if the generation has
+not moved since its request was issued, so a query that raced a change
+cannot repopulate the cache with pre-change data.
+"""
+import copy
+import json
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+
+class BridgeCache:
+    """LRU cache of query results for one design generation"""
+
+    def __init__(self, max_entries: int = 64):
+        """
+        Args:
+            max_entries: Maximum number of cached results (least recently
+                         used entries are evicted first)
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def generation(self) -> int:
+        """Current design generation"""
+        return self._generation
+
+    @staticmethod
+    def make_key(command: str, params: Dict[str, Any]) -> str:
+        """Build a cache key that does not depend on parameter order"""
+        return json.dumps([command, params], sort_keys=True, default=str)
+
+    def lookup(self, command: str, params: Dict[str, Any]) -> Tuple[bool, Any]:
+        """
+        Look up a cached result.
+
+        Returns:
+            Tuple of (hit, data). data is a private copy, so callers may
+            modify it freely.
+        """
+        key = self.make_key(command, params)
+        if key not in self._entries:
+            self.misses += 1
+            return False, None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, copy.deepcopy(self._entries[key])
+
+    def store(self, command: str, params: Dict[str, Any], data: Any, generation: int) -> bool:
+        """
+        Cache a result.
+
+        Args:
+            command: Command name
+            params: Command parameters
+            data: Result data
+            generation: Generation observed when the request was issued
+
+        Returns:
+            True if stored, False if the design changed in the meantime
+        """
+        if generation != self._generation:
+            return False
+
+        key = self.make_key(command, params)
+        self._entries[key] = copy.deepcopy(data)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return True
+
+    def invalidate(self) -> None:
+        """Start a new design generation and drop every cached result"""
+        self._generation += 1
+        self._entries.clear()
+        self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            "generation": self._generation,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "invalidations": self.invalidations
+        }
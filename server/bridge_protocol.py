@@ -0,0 +1,162 @@
+"""
+Bridge file protocol - atomic writes and checksummed response envelopes
+
+Requests and responses are written under a temporary name and renamed into
+place, so neither side ever opens a half-written file. Every response starts
+with a one-line envelope header in front of the JSON body:
+
+    {"request_id": "3f2a...", "length": 1234, "adler32": "0a1b2c3d"}
+    {
+      "success": true,
+      "result": ...
+    }
+
+Bodies are UTF-8. length is the body size in bytes and adler32 the Adler-32
+checksum of those bytes, so the reader can check the body is complete before
+it parses it, and request_id lets it discard a stale response left behind by
+an earlier request.
+
+Each request travels in its own request_<id>.json and is answered in its own
+response_<id>.json, so several requests can be in flight at once.
+
+Streamed commands (stream_whole_design) also write their payload as NDJSON,
+one JSON record per line, into numbered part files in stream_<id>/
+(part_00000.ndjson, part_00001.ndjson, ...). Each part is renamed into place
+once complete, and the response written after the last part reports how
+many parts there are.
+"""
+import json
+import os
+import uuid
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+_UTF8_BOM = b"\xef\xbb\xbf"
+
+
+class EnvelopeError(ValueError):
+    """Raised when a response file is not a valid, complete envelope"""
+
+
+def new_request_id() -> str:
+    """Generate a unique request id"""
+    return uuid.uuid4().hex
+
+
+def request_file_name(request_id: str) -> str:
+    """Name of the file carrying the request with this id"""
+    return f"request_{request_id}.json"
+
+
+def response_file_name(request_id: str) -> str:
+    """Name of the file carrying the response to the request with this id"""
+    return f"response_{request_id}.json"
+
+
+def stream_dir_name(request_id: str) -> str:
+    """Name of the directory receiving the parts of a streamed response"""
+    return f"stream_{request_id}"
+
+
+def stream_part_name(index: int) -> str:
+    """Name of part number index of a streamed response"""
+    return f"part_{index:05d}.ndjson"
+
+
+def read_ndjson(path: Path) -> List[Dict[str, Any]]:
+    """
+    Parse one NDJSON part file.
+
+    Raises:
+        ValueError: If a line is not valid JSON
+    """
+    raw = path.read_bytes()
+    if raw.startswith(_UTF8_BOM):
+        raw = raw[len(_UTF8_BOM):]
+    return [json.loads(line) for line in raw.decode("utf-8").splitlines() if line.strip()]
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """
+    Write data to path via a temporary file and an atomic rename.
+
+    Args:
+        path: Destination file
+        data: Bytes to write
+    """
+    temp_path = path.with_name(path.name + ".tmp")
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+
+def write_json_atomic(path: Path, data: Dict[str, Any]) -> None:
+    """
+    Serialize data as indented JSON and write it atomically.
+
+    The DelphiScript request parser reads one key per line, so requests
+    must keep the indented layout.
+
+    Args:
+        path: Destination file
+        data: JSON-serializable object
+    """
+    write_atomic(path, json.dumps(data, indent=2).encode("utf-8"))
+
+
+def encode_envelope(request_id: str, body: bytes) -> bytes:
+    """
+    Prefix a response body with its envelope header.
+
+    Args:
+        request_id: Id of the request this response answers
+        body: Encoded JSON response body
+
+    Returns:
+        Header line, CRLF, then the body
+    """
+    header = json.dumps({
+        "request_id": request_id,
+        "length": len(body),
+        "adler32": f"{zlib.adler32(body):08x}"
+    })
+    return header.encode("ascii") + b"\r\n" + body
+
+
+def decode_envelope(raw: bytes) -> Tuple[str, bytes]:
+    """
+    Split a response file into its request id and verified body.
+
+    Args:
+        raw: Complete contents of the response file
+
+    Returns:
+        Tuple of (request_id, body bytes)
+
+    Raises:
+        EnvelopeError: If the header is missing or malformed, or the body
+                       length or checksum does not match the header
+    """
+    if raw.startswith(_UTF8_BOM):
+        raw = raw[len(_UTF8_BOM):]
+
+    header_line, separator, body = raw.partition(b"\n")
+    if not separator:
+        raise EnvelopeError("Response has no envelope header (rebuild Altium_API.pas)")
+
+    try:
+        header = json.loads(header_line.decode("ascii").strip())
+        request_id = str(header["request_id"])
+        length = int(header["length"])
+        checksum = int(header["adler32"], 16)
+    except (UnicodeDecodeError, ValueError, TypeError, KeyError) as e:
+        raise EnvelopeError(f"Malformed envelope header: {e}")
+
+    if len(body) != length:
+        raise EnvelopeError(f"Body length mismatch: header says {length} bytes, got {len(body)}")
+
+    if zlib.adler32(body) != checksum:
+        raise EnvelopeError("Body checksum mismatch")
+
+    return request_id, body
@@ -0,0 +1,315 @@
+"""
+Design librarians - one long-lived Librarian per open project
+
+Building an AltiumJSONAdapter and Librarian transforms every component and
+rebuilds the Atlas, which the schematic tools used to do on every query.
+DesignLibrarians keeps one Librarian per project and only marks it dirty
+when the design actually changed. That is decided in two cheap steps:
+
+1. the bridge cache generation, bumped by every mutating command and by
+   invalidate_cache: while it is unchanged the current Librarian is used
+   without asking Altium anything
+2. once it has moved, the design is exported again and fingerprinted, and
+   the project's Librarian is only refreshed if the fingerprint differs
+
+With a snapshot directory, each rebuilt Librarian is also saved to disk
+(schematic_core.snapshot), keyed by the project path and the modification
+times of the project file and its documents. After a restart, the first
+query loads the last project's snapshot if none of those files changed
+since, without asking Altium. Edits Altium has not saved and a different
+project opened meanwhile are not visible to that check; invalidate_cache
+forces a fresh export.
+
+Extra power-rail net patterns for a team's naming conventions can be given
+in the SCHEMATIC_POWER_NET_PATTERNS environment variable (see
+configure_power_net_patterns).
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Mapping, Optional
+
+from schematic_core.adapters.altium_json import AltiumJSONAdapter
+from schematic_core.librarian import Librarian
+from schematic_core.models import DEFAULT_POWER_NET_PATTERNS, set_power_net_patterns
+from schematic_core.snapshot import load_snapshot, read_snapshot_header, save_snapshot
+
+if TYPE_CHECKING:
+    from altium_bridge import AltiumBridge
+
+logger = logging.getLogger(__name__)
+
+
+async def load_whole_design(altium_bridge: "AltiumBridge") -> Dict[str, Any]:
+    """
+    Get the whole design as {"project": ..., "components": [...], "nets": [...]}.
+
+    "project" is the path of the open project file, used to key Librarians
+    and snapshots; it is missing if the script did not report one.
+
+    The design is streamed from Altium record by record (stream_whole_design),
+    so components are parsed while Altium is still exporting, and the result
+    is kept in the bridge cache until the next mutating command. Streaming
+    only bounds the memory used per part file: the records are still
+    assembled into one design dict here, since the Librarian fingerprints and
+    builds its nets from the complete design.
+
+    Raises:
+        ScriptStreamError: If the export fails
+    """
+    hit, design = altium_bridge.cache.lookup("get_whole_design_json", {})
+    if hit:
+        return design
+
+    generation = altium_bridge.cache.generation
+    design = {"components": [], "nets": []}
+    async for record in altium_bridge.stream_script("stream_whole_design", {}):
+        kind = record.pop("type", None)
+        if kind == "component":
+            design["components"].append(record)
+        elif kind == "net":
+            design["nets"].append(record)
+        elif kind == "project":
+            design["project"] = record.get("path", "")
+
+    altium_bridge.cache.store("get_whole_design_json", {}, design, generation)
+    return design
+
+
+def configure_power_net_patterns(extra: Optional[str] = None) -> None:
+    """
+    Add power-rail net patterns to the defaults.
+
+    Args:
+        extra: Semicolon-separated regular expressions (e.g. "^AVDD;^VPP_.*");
+               defaults to the SCHEMATIC_POWER_NET_PATTERNS environment variable
+
+    Raises:
+        re.error: If a pattern does not compile
+    """
+    if extra is None:
+        extra = os.getenv("SCHEMATIC_POWER_NET_PATTERNS", "")
+    patterns = [p.strip() for p in extra.split(";") if p.strip()]
+    set_power_net_patterns(DEFAULT_POWER_NET_PATTERNS + tuple(patterns))
+
+
+def load_design_file(path: str, snapshot_dir: Optional[Path] = None) -> Librarian:
+    """
+    Librarian for a saved design revision.
+
+    Snapshots are pickles, so only files inside snapshot_dir (which the
+    server writes itself) are opened as snapshots; any other path is read
+    as design JSON.
+
+    Args:
+        path: A design JSON file as written by get_whole_design_json, or a
+              design snapshot in snapshot_dir (see DesignLibrarians)
+        snapshot_dir: Directory snapshots may be loaded from (None: JSON only)
+
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If the file is neither a snapshot in snapshot_dir nor a
+                    design JSON file
+    """
+    resolved = Path(path).resolve()
+    if snapshot_dir is not None and resolved.is_relative_to(Path(snapshot_dir).resolve()):
+        if read_snapshot_header(resolved) is not None:
+            return load_snapshot(resolved, AltiumJSONAdapter({"components": []}))
+    librarian = Librarian(AltiumJSONAdapter(resolved))
+    librarian.refresh()
+    return librarian
+
+
+def design_fingerprint(design: Mapping[str, Any]) -> str:
+    """Content hash of an exported design, independent of dict key order"""
+    payload = json.dumps(design, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def project_document_mtimes(project_path: str) -> Optional[Dict[str, Optional[int]]]:
+    """
+    Modification times (ns) of a project file and the documents it lists.
+
+    Documents are read from the DocumentPath entries of the project file,
+    relative to its directory. A document that does not exist maps to None.
+
+    Returns:
+        path -> mtime, or None if the project file cannot be read
+    """
+    try:
+        project_stat = os.stat(project_path)
+        with open(project_path, "r", encoding="utf-8", errors="replace") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+
+    project_dir = os.path.dirname(project_path)
+    mtimes: Dict[str, Optional[int]] = {project_path: project_stat.st_mtime_ns}
+    for line in lines:
+        key, sep, value = line.partition("=")
+        if not sep or key.strip().lower() != "documentpath" or not value.strip():
+            continue
+        document = os.path.join(project_dir, value.strip().replace("\\", os.sep))
+        try:
+            mtimes[document] = os.stat(document).st_mtime_ns
+        except OSError:
+            mtimes[document] = None
+    return mtimes
+
+
+@dataclass
+class _ProjectLibrarian:
+    fingerprint: str
+    adapter: AltiumJSONAdapter
+    librarian: Librarian
+
+
+class DesignLibrarians:
+    """Long-lived Librarians for the projects seen through one bridge"""
+
+    def __init__(self, altium_bridge: "AltiumBridge", max_projects: int = 4,
+                 snapshot_dir: Optional[Path] = None):
+        """
+        Args:
+            altium_bridge: Bridge used to export designs
+            max_projects: Number of projects kept warm (least recently used
+                          projects are dropped first)
+            snapshot_dir: Directory for on-disk snapshots (None disables them)
+        """
+        self.altium_bridge = altium_bridge
+        self.max_projects = max_projects
+        self.snapshot_dir = Path(snapshot_dir) if snapshot_dir is not None else None
+        self._projects: "OrderedDict[str, _ProjectLibrarian]" = OrderedDict()
+        self._current: Optional[str] = None
+        self._generation: Optional[int] = None
+        self._lock = asyncio.Lock()  # Concurrent tool calls share one export
+        self.exports = 0
+        self.rebuilds = 0
+        self.snapshot_loads = 0
+
+    async def get(self) -> Librarian:
+        """
+        Librarian for the currently open project, refreshed only if its design changed.
+
+        Raises:
+            ScriptStreamError: If the design has to be exported and the export fails
+        """
+        async with self._lock:
+            return await self._get()
+
+    @asynccontextmanager
+    async def checkout(self) -> AsyncIterator[Librarian]:
+        """
+        Librarian for the currently open project, held for exclusive use.
+
+        The Librarian is refreshed here, on the event loop, and no other call
+        can update it until the block exits, so it can be handed to a worker
+        thread for a long export or diff. Other queries wait meanwhile.
+
+        Raises:
+            ScriptStreamError: If the design has to be exported and the export fails
+        """
+        async with self._lock:
+            librarian = await self._get()
+            librarian.refresh()
+            yield librarian
+
+    async def _get(self) -> Librarian:
+        """get() with the lock already held."""
+        generation = self.altium_bridge.cache.generation
+        if generation == self._generation and self._current in self._projects:
+            self._projects.move_to_end(self._current)
+            return self._projects[self._current].librarian
+
+        if self._current is None and self.snapshot_dir is not None:
+            # First query since start: try the last project's snapshot
+            entry = self._load_latest_snapshot()
+            if entry is not None:
+                self._generation = generation
+                return entry.librarian
+
+        design = await load_whole_design(self.altium_bridge)
+        self.exports += 1
+        # The generation from before the export: a change made meanwhile
+        # makes the next call export again
+        self._generation = generation
+        self._current = design.get("project", "")
+        rebuilds = self.rebuilds
+        librarian = self._update(self._current, design)
+        if self.rebuilds != rebuilds and self.snapshot_dir is not None:
+            self._save_snapshot(self._current)
+        return librarian
+
+    def _update(self, project: str, design: Mapping[str, Any]) -> Librarian:
+        fingerprint = design_fingerprint(design)
+        entry = self._projects.get(project)
+
+        if entry is None:
+            adapter = AltiumJSONAdapter(design)
+            entry = _ProjectLibrarian(fingerprint, adapter, Librarian(adapter))
+            self._projects[project] = entry
+            self.rebuilds += 1
+            while len(self._projects) > self.max_projects:
+                self._projects.popitem(last=False)
+        elif entry.fingerprint != fingerprint:
+            entry.adapter.set_source(design)
+            entry.librarian.mark_dirty()
+            entry.fingerprint = fingerprint
+            self.rebuilds += 1
+
+        self._projects.move_to_end(project)
+        return entry.librarian
+
+    def _snapshot_path(self, project: str) -> Path:
+        digest = hashlib.blake2b(project.encode("utf-8"), digest_size=8).hexdigest()
+        return self.snapshot_dir / f"design_{digest}.snapshot"
+
+    def _save_snapshot(self, project: str) -> None:
+        mtimes = project_document_mtimes(project) if project else None
+        if mtimes is None:
+            return  # Nothing to key the snapshot on
+        entry = self._projects[project]
+        try:
+            save_snapshot(entry.librarian, self._snapshot_path(project), {
+                "project": project,
+                "documents": mtimes,
+                "fingerprint": entry.fingerprint,
+            })
+        except Exception as e:
+            logger.warning(f"Could not save design snapshot for {project}: {e}")
+
+    def _load_latest_snapshot(self) -> Optional[_ProjectLibrarian]:
+        """Load the most recently saved snapshot if its project files are unchanged."""
+        try:
+            snapshots = sorted(self.snapshot_dir.glob("design_*.snapshot"),
+                               key=lambda p: p.stat().st_mtime_ns, reverse=True)
+        except OSError:
+            return None
+        if not snapshots:
+            return None
+
+        path = snapshots[0]
+        header = read_snapshot_header(path)
+        if header is None or project_document_mtimes(header["project"]) != header["documents"]:
+            return None
+
+        # The adapter gets a source only when the design changes
+        adapter = AltiumJSONAdapter({"components": []})
+        try:
+            librarian = load_snapshot(path, adapter)
+        except Exception as e:
+            logger.warning(f"Could not load design snapshot {path}: {e}")
+            return None
+
+        project = header["project"]
+        entry = _ProjectLibrarian(header["fingerprint"], adapter, librarian)
+        self._projects[project] = entry
+        self._current = project
+        self.snapshot_loads += 1
+        return entry
@@ -11,8 +11,10 @@ site.addsitedir(str(pathlib.Path(__file__).with_name("lib")))
 # ------------------------------------------------------------
 
 from mcp.server.fastmcp import FastMCP
+import asyncio
 import logging
 from pathlib import Path
+from typing import Tuple
 
 # Import our modules
 from altium_bridge import AltiumBridge
@@ -31,72 +33,79 @@ from tools import (
     register_board_tools,
     register_routing_tools,
     register_distributor_tools,
-    register_api_search_tools
+    register_api_search_tools,
+    register_cache_tools
 )
 from prompts import register_workflow_prompts
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('altium_mcp.log')
-    ]
-)
 logger = logging.getLogger("AltiumMCPServer")
 
 # Set MCP_DIR to the directory of the current Python file
 MCP_DIR = Path(__file__).parent
 DEFAULT_SCRIPT_PATH = MCP_DIR / "AltiumScript" / "Altium_API.PrjScr"
 
-# Initialize FastMCP server
-mcp = FastMCP(
-    "AltiumMCP"
-)
-
-# Initialize Altium bridge (manages DelphiScript communication)
-altium_bridge = AltiumBridge(MCP_DIR, DEFAULT_SCRIPT_PATH)
 
 # ============================================================================
-# REGISTER RESOURCES - Read-only project state
+# SERVER SETUP
 # ============================================================================
-logger.info("Registering resources...")
-register_project_resources(mcp, altium_bridge)
-register_board_resources(mcp, altium_bridge)
+# Done on demand rather than at import: export workers (Librarian.export_all)
+# are spawned processes that import this file again as __mp_main__, and only
+# need the schematic code.
+
+def create_server() -> Tuple[FastMCP, AltiumBridge]:
+    """Create the MCP server and Altium bridge with everything registered"""
+    # Initialize FastMCP server
+    mcp = FastMCP(
+        "AltiumMCP"
+    )
+
+    # Initialize Altium bridge (manages DelphiScript communication)
+    altium_bridge = AltiumBridge(MCP_DIR, DEFAULT_SCRIPT_PATH)
+
+    # ============================================================================
+    # REGISTER RESOURCES - Read-only project state
+    # ============================================================================
+    logger.info("Registering resources...")
+    register_project_resources(mcp, altium_bridge)
+    register_board_resources(mcp, altium_bridge)
+
+    # ============================================================================
+    # REGISTER TOOLS - Actions that modify the design
+    # ============================================================================
+    logger.info("Registering tools...")
+    register_component_tools(mcp, altium_bridge)
+    register_component_ops_tools(mcp, altium_bridge)
+    register_net_tools(mcp, altium_bridge)
+    register_layer_tools(mcp, altium_bridge)
+    register_schematic_tools(mcp, altium_bridge)
+    register_layout_tools(mcp, altium_bridge)
+    register_output_tools(mcp, altium_bridge)
+    register_project_tools(mcp, altium_bridge)
+    register_library_tools(mcp, altium_bridge)
+    register_analysis_tools(mcp, altium_bridge)
+    register_board_tools(mcp, altium_bridge)
+    register_routing_tools(mcp, altium_bridge)
+    register_cache_tools(mcp, altium_bridge)
+    logger.info("Registering distributor and component intelligence tools...")
+    register_distributor_tools(mcp, altium_bridge)
+    logger.info("Registering API search tools...")
+    register_api_search_tools(mcp)
+
+    # ============================================================================
+    # REGISTER PROMPTS - Guided workflows
+    # ============================================================================
+    logger.info("Registering prompts...")
+    register_workflow_prompts(mcp)
+
+    return mcp, altium_bridge
 
-# ============================================================================
-# REGISTER TOOLS - Actions that modify the design
-# ============================================================================
-logger.info("Registering tools...")
-register_component_tools(mcp, altium_bridge)
-register_component_ops_tools(mcp, altium_bridge)
-register_net_tools(mcp, altium_bridge)
-register_layer_tools(mcp, altium_bridge)
-register_schematic_tools(mcp, altium_bridge)
-register_layout_tools(mcp, altium_bridge)
-register_output_tools(mcp, altium_bridge)
-register_project_tools(mcp, altium_bridge)
-register_library_tools(mcp, altium_bridge)
-register_analysis_tools(mcp, altium_bridge)
-register_board_tools(mcp, altium_bridge)
-register_routing_tools(mcp, altium_bridge)
-logger.info("Registering distributor and component intelligence tools...")
-register_distributor_tools(mcp, altium_bridge)
-logger.info("Registering API search tools...")
-register_api_search_tools(mcp)
-
-# ============================================================================
-# REGISTER PROMPTS - Guided workflows
-# ============================================================================
-logger.info("Registering prompts...")
-register_workflow_prompts(mcp)
 
 # ============================================================================
 # LIFECYCLE MANAGEMENT
 # ============================================================================
 # Note: FastMCP 2.0 handles lifecycle differently - initialization happens
-# automatically when tools are first called. Cleanup can be added if needed.
+# automatically when tools are first called. Cleanup runs in main() once the
+# server exits (stops the resident Altium script loop, if one was started).
 
 
 # ============================================================================
@@ -105,6 +114,17 @@ register_workflow_prompts(mcp)
 
 def main():
     """Run the MCP server"""
+    # Configure logging
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.StreamHandler(),
+            logging.FileHandler('altium_mcp.log')
+        ]
+    )
+    mcp, altium_bridge = create_server()
+
     logger.info("Starting Altium MCP Server v2.0...")
     logger.info(f"Using MCP directory: {MCP_DIR}")
 
@@ -121,7 +141,10 @@ def main():
     print(f"Script Path: {DEFAULT_SCRIPT_PATH}")
 
     # Run with stdio transport (default for Claude Desktop)
-    mcp.run(transport='stdio')
+    try:
+        mcp.run(transport='stdio')
+    finally:
+        asyncio.run(altium_bridge.cleanup())
 
 
 if __name__ == "__main__":
@@ -27,6 +27,9 @@ Example Usage:
         # Check multi-distributor availability
         availability = await client.get_component_availability("ATMEGA328P-PU")
 
+        # Check a whole BOM in a few requests
+        bom = await client.get_components_availability_batch(["LM358", "NE555P"])
+
         # Find alternatives
         alternatives = await client.find_alternatives("2N2222")
 
@@ -40,12 +43,18 @@ References:
 
 import asyncio
 import os
+import random
+from bisect import bisect_right
+from collections import deque
 import time
-from typing import Any, Dict, List, Optional, Union
+from email.utils import parsedate_to_datetime
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set, Union
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 import logging
 
+from part_cache import PartCache, normalize_mpn
+
 try:
     import httpx
 except ImportError:
@@ -53,6 +62,53 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Part fields returned by the availability queries
+PART_FIELDS = """
+    mpn
+    shortDescription
+    manufacturer { name }
+    category { name }
+    bestDatasheet { url }
+    specs { attribute { shortname } displayValue }
+    sellers {
+        company { name }
+        offers {
+            sku
+            inventoryLevel
+            moq
+            packaging
+            clickUrl
+            updated
+            prices { quantity price currency }
+        }
+    }
+"""
+
+# Many MPNs in one request: one match per entry of $queries, in order
+MULTI_MATCH_QUERY = """
+query MultiMatch($queries: [SupPartMatchQuery!]!) {
+    supMultiMatch(queries: $queries) {
+        hits
+        parts {%s}
+    }
+}
+""" % PART_FIELDS
+
+# MPNs per supMultiMatch request (keeps each response well within API limits)
+MULTI_MATCH_BATCH_SIZE = 20
+
+# Candidate parts per MPN, so an exact MPN match can be preferred
+MULTI_MATCH_LIMIT = 3
+
+# Nexar lifecycle spec values -> the statuses the BOM tools report
+LIFECYCLE_STATUSES = {
+    "production": "Active",
+    "active": "Active",
+    "nrnd": "NRND",
+    "not recommended for new designs": "NRND",
+    "obsolete": "Obsolete",
+    "discontinued": "Obsolete",
+}
 
 
 @dataclass
@@ -110,23 +166,19 @@ class DistributorOffer:
     updated_at: Optional[str] = None
     authorized: bool = False
 
+    def __post_init__(self):
+        # Kept sorted by quantity so lookups can bisect
+        self.prices.sort(key=lambda x: x.quantity)
+
     def get_price_at_quantity(self, quantity: int) -> Optional[float]:
         """Get the price for a given quantity"""
         if not self.prices:
             return None
 
-        # Find the applicable price break
-        applicable_price = None
-        for price_break in sorted(self.prices, key=lambda x: x.quantity, reverse=True):
-            if quantity >= price_break.quantity:
-                applicable_price = price_break.price
-                break
-
-        # If no exact match, use the lowest quantity price break
-        if applicable_price is None and self.prices:
-            applicable_price = min(self.prices, key=lambda x: x.quantity).price
-
-        return applicable_price
+        # The highest price break at or below the quantity; below the first
+        # break, use the lowest quantity price break
+        index = bisect_right(self.prices, quantity, key=lambda x: x.quantity)
+        return self.prices[max(index - 1, 0)].price
 
     def __repr__(self):
         return f"DistributorOffer(distributor='{self.distributor}', sku='{self.sku}', stock={self.in_stock})"
@@ -177,38 +229,110 @@ class ComponentDetails:
 
 
 class RateLimiter:
-    """Simple rate limiter to avoid hitting API limits"""
+    """
+    Token-bucket rate limiter to avoid hitting API limits
+
+    Tokens refill continuously at max_requests per time_window, up to burst.
+    acquire() takes a token at once if one is left; otherwise it reserves the
+    next token to come and sleeps until then. Reserving is O(1) and no lock
+    is held while sleeping, so concurrent callers are spaced evenly at the
+    refill rate instead of queueing behind each other.
+
+    When the server throttles anyway, throttle() pauses the bucket for the
+    requested delay and lowers the refill rate; every granted request then
+    wins back a little of the configured rate (additive increase,
+    multiplicative decrease), so throughput settles just under the real quota.
+    Callers already sleeping on a reservation are woken and reserve again in
+    the order they arrived, so they are spaced out from the resume time.
+    """
+
+    # Refill rate kept after each throttle, and its floor, relative to the configured rate
+    THROTTLE_FACTOR = 0.75
+    MIN_RATE_FACTOR = 0.1
+    # Share of the configured rate won back per granted request
+    RECOVERY_STEP = 0.02
 
-    def __init__(self, max_requests: int = 10, time_window: float = 1.0):
+    def __init__(self, max_requests: int = 10, time_window: float = 1.0, burst: Optional[int] = None):
         """
         Initialize rate limiter
 
         Args:
             max_requests: Maximum number of requests allowed in the time window
             time_window: Time window in seconds
+            burst: Requests that may go out back to back (defaults to max_requests)
         """
         self.max_requests = max_requests
         self.time_window = time_window
-        self.requests: List[float] = []
-        self._lock = asyncio.Lock()
+        self.burst = burst if burst is not None else max_requests
+        self.nominal_rate = max_requests / time_window
+        self.rate = self.nominal_rate
+        self.throttles = 0
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        # Bumped by throttle(); a reservation made under an older generation is void
+        self._generation = 0
+        # Futures of callers sleeping on a reservation, in arrival order
+        self._sleepers: Deque[asyncio.Future] = deque()
+
+    def _reserve(self) -> float:
+        """Take a token; returns how long to wait before using it"""
+        now = time.monotonic()
+        if now > self._updated:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+        self._tokens -= 1
+        if self.rate < self.nominal_rate:
+            self.rate = min(self.nominal_rate, self.rate + self.nominal_rate * self.RECOVERY_STEP)
+        ready_at = self._updated + max(0.0, -self._tokens) / self.rate
+        return max(0.0, ready_at - now)
 
     async def acquire(self):
         """Wait if necessary to respect rate limits"""
-        async with self._lock:
-            now = time.time()
-            # Remove requests outside the time window
-            self.requests = [req_time for req_time in self.requests
-                           if now - req_time < self.time_window]
+        loop = asyncio.get_running_loop()
+        while True:
+            wait = self._reserve()
+            if wait <= 0:
+                return
+            logger.debug(f"Rate limit reached, sleeping for {wait:.2f}s")
+            generation = self._generation
+            wake = loop.create_future()
+            timer = loop.call_later(wait, _resolve, wake)
+            self._sleepers.append(wake)
+            try:
+                await wake
+            finally:
+                timer.cancel()
+                if self._generation == generation:
+                    self._sleepers.remove(wake)
+            if self._generation == generation:
+                return
+            # A throttle while we slept voided the reservation: queue again
+
+    def throttle(self, delay: float) -> None:
+        """
+        Back off after the server rejected a request for exceeding its quota
 
-            if len(self.requests) >= self.max_requests:
-                # Wait until the oldest request falls outside the window
-                sleep_time = self.time_window - (now - self.requests[0])
-                if sleep_time > 0:
-                    logger.debug(f"Rate limit reached, sleeping for {sleep_time:.2f}s")
-                    await asyncio.sleep(sleep_time)
-                    self.requests.pop(0)
+        No token is granted for `delay` seconds and the bucket restarts empty
+        afterwards, at a lower refill rate. Sleeping callers give up their
+        reservations and reserve again, first come first served.
 
-            self.requests.append(now)
+        Args:
+            delay: Seconds to pause (e.g. the server's Retry-After)
+        """
+        self.throttles += 1
+        self.rate = max(self.nominal_rate * self.MIN_RATE_FACTOR, self.rate * self.THROTTLE_FACTOR)
+        self._updated = max(self._updated, time.monotonic() + delay)
+        self._tokens = 0.0
+        self._generation += 1
+        sleepers, self._sleepers = self._sleepers, deque()
+        for wake in sleepers:
+            _resolve(wake)
+
+
+def _resolve(future: asyncio.Future) -> None:
+    """Complete a sleeper's future unless it is already done (or cancelled)"""
+    if not future.done():
+        future.set_result(None)
 
 
 class NexarClient:
@@ -231,11 +355,21 @@ class NexarClient:
     AUTH_URL = "https://identity.nexar.com/connect/token"
     API_URL = "https://api.nexar.com/graphql"
 
+    # Token requests allowed per minute (tokens last an hour, so this is only a safety net)
+    AUTH_REQUESTS_PER_MINUTE = 5
+
+    # Retries after HTTP 429 before giving up, and the backoff used when the
+    # server sends no Retry-After: base * 2^attempt (capped), with jitter
+    MAX_RETRIES = 5
+    BACKOFF_BASE = 0.5
+    BACKOFF_MAX = 30.0
+
     def __init__(
         self,
         client_id: Optional[str] = None,
         client_secret: Optional[str] = None,
-        max_requests_per_second: int = 10
+        max_requests_per_second: int = 10,
+        cache: Optional[PartCache] = None
     ):
         """
         Initialize Nexar API client
@@ -244,6 +378,7 @@ class NexarClient:
             client_id: OAuth2 client ID (defaults to NEXAR_CLIENT_ID env var)
             client_secret: OAuth2 client secret (defaults to NEXAR_CLIENT_SECRET env var)
             max_requests_per_second: Maximum API requests per second for rate limiting
+            cache: Persistent part cache for availability lookups (None to always query)
 
         Raises:
             ValueError: If credentials are not provided
@@ -260,6 +395,11 @@ class NexarClient:
         self._token: Optional[AuthToken] = None
         self._http_client = httpx.AsyncClient(timeout=30.0)
         self._rate_limiter = RateLimiter(max_requests=max_requests_per_second, time_window=1.0)
+        self._auth_rate_limiter = RateLimiter(max_requests=self.AUTH_REQUESTS_PER_MINUTE, time_window=60.0)
+        self._auth_lock = asyncio.Lock()
+        self.cache = cache
+        self._revalidating: Set[str] = set()
+        self._revalidation_tasks: Set[asyncio.Task] = set()
 
         logger.info("NexarClient initialized")
 
@@ -267,6 +407,11 @@ class NexarClient:
         """Check if API credentials are configured"""
         return bool(self.client_id and self.client_secret)
 
+    async def close(self) -> None:
+        """Finish background cache refreshes and close the HTTP connections"""
+        await self.wait_for_revalidation()
+        await self._http_client.aclose()
+
     async def authenticate(self) -> None:
         """
         Authenticate with Nexar using OAuth2 client credentials flow
@@ -285,31 +430,78 @@ class NexarClient:
             logger.debug("Using existing valid token")
             return
 
-        logger.info("Authenticating with Nexar API...")
-
-        response = await self._http_client.post(
-            self.AUTH_URL,
-            data={
-                "grant_type": "client_credentials",
-                "client_id": self.client_id,
-                "client_secret": self.client_secret,
-                "scope": "supply.domain"  # Required scope for component search
-            },
-            headers={
-                "Content-Type": "application/x-www-form-urlencoded"
-            }
-        )
+        # Concurrent callers share one token request
+        async with self._auth_lock:
+            if self._token and not self._token.is_expired:
+                return
+
+            logger.info("Authenticating with Nexar API...")
+
+            response = await self._post(
+                self.AUTH_URL,
+                self._auth_rate_limiter,
+                data={
+                    "grant_type": "client_credentials",
+                    "client_id": self.client_id,
+                    "client_secret": self.client_secret,
+                    "scope": "supply.domain"  # Required scope for component search
+                },
+                headers={
+                    "Content-Type": "application/x-www-form-urlencoded"
+                }
+            )
 
-        response.raise_for_status()
-        data = response.json()
+            response.raise_for_status()
+            data = response.json()
 
-        self._token = AuthToken(
-            access_token=data["access_token"],
-            token_type=data["token_type"],
-            expires_at=datetime.now() + timedelta(seconds=data["expires_in"])
-        )
+            self._token = AuthToken(
+                access_token=data["access_token"],
+                token_type=data["token_type"],
+                expires_at=datetime.now() + timedelta(seconds=data["expires_in"])
+            )
+
+            logger.info("Successfully authenticated with Nexar API")
+
+    async def _post(self, url: str, rate_limiter: RateLimiter, **kwargs) -> httpx.Response:
+        """
+        POST through a rate limiter, retrying while the server answers 429
 
-        logger.info("Successfully authenticated with Nexar API")
+        Each 429 throttles the limiter for the server's Retry-After, or for a
+        jittered exponential backoff if it sends none, so every request
+        sharing the limiter backs off together.
+
+        Returns:
+            The first response that is not a 429, or the last 429 after
+            MAX_RETRIES retries
+        """
+        for attempt in range(self.MAX_RETRIES + 1):
+            await rate_limiter.acquire()
+            response = await self._http_client.post(url, **kwargs)
+            if response.status_code != 429 or attempt == self.MAX_RETRIES:
+                return response
+
+            delay = self._retry_delay(response, attempt)
+            logger.warning(f"Throttled by {url} (HTTP 429), retrying in {delay:.2f}s")
+            rate_limiter.throttle(delay)
+
+        return response
+
+    @classmethod
+    def _retry_delay(cls, response: httpx.Response, attempt: int) -> float:
+        """Seconds to wait after a 429: Retry-After if given, else jittered exponential backoff"""
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                pass
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+
+        backoff = min(cls.BACKOFF_MAX, cls.BACKOFF_BASE * 2 ** attempt)
+        return random.uniform(backoff / 2, backoff)
 
     async def _graphql_query(self, query: str, variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
@@ -327,7 +519,6 @@ class NexarClient:
             ValueError: If the response contains errors
         """
         await self.authenticate()
-        await self._rate_limiter.acquire()
 
         headers = {
             "Authorization": f"Bearer {self._token.access_token}",
@@ -341,8 +532,9 @@ class NexarClient:
 
         logger.debug(f"Executing GraphQL query: {query[:100]}...")
 
-        response = await self._http_client.post(
+        response = await self._post(
             self.API_URL,
+            self._rate_limiter,
             json=payload,
             headers=headers
         )
@@ -355,3 +547,144 @@ class NexarClient:
             raise ValueError(f"GraphQL errors: {'; '.join(error_messages)}")
 
         return data.get("data", {})
+
+    async def get_component_availability(self, mpn: str) -> Optional[Dict[str, Any]]:
+        """
+        Get availability, pricing and lifecycle data for one component
+
+        Args:
+            mpn: Manufacturer part number
+
+        Returns:
+            Part data (see get_components_availability_batch), or None if not found
+        """
+        results = await self.get_components_availability_batch([mpn])
+        return results.get(mpn.strip())
+
+    async def get_components_availability_batch(
+        self,
+        mpns: Iterable[str],
+        batch_size: int = MULTI_MATCH_BATCH_SIZE
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Get availability data for many components, several MPNs per request
+
+        MPNs are deduplicated and looked up batch_size at a time with one
+        supMultiMatch query per batch, so a BOM costs a handful of round
+        trips instead of one per line. With a cache, only misses are
+        queried; stale entries are returned as they are and refreshed in the
+        background.
+
+        Args:
+            mpns: Manufacturer part numbers (duplicates and blanks are ignored)
+            batch_size: MPNs per GraphQL request
+
+        Returns:
+            Dictionary mapping each (stripped) MPN to its part data, or None if
+            not found. Part data has the Nexar part fields (mpn, manufacturer,
+            category, bestDatasheet, sellers, ...) plus description and
+            lifecycleStatus ("Active", "NRND", "Obsolete" or Nexar's own value).
+
+        Raises:
+            httpx.HTTPError: If a request fails
+            ValueError: If the response contains errors
+        """
+        unique = list(dict.fromkeys(mpn.strip() for mpn in mpns if mpn and mpn.strip()))
+        if self.cache is None:
+            return await self._fetch_availability(unique, batch_size)
+
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        cached = self.cache.get_many(unique)
+        missing, stale = [], []
+        for mpn in unique:
+            entry = cached.get(normalize_mpn(mpn))
+            if entry is None:
+                missing.append(mpn)
+            else:
+                results[mpn] = entry.part
+                if entry.stale:
+                    stale.append(mpn)
+
+        if stale:
+            self._revalidate(stale, batch_size)
+        if missing:
+            fetched = await self._fetch_availability(missing, batch_size)
+            self.cache.put_many(fetched)
+            results.update(fetched)
+
+        return {mpn: results[mpn] for mpn in unique}
+
+    async def _fetch_availability(
+        self,
+        mpns: List[str],
+        batch_size: int
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Query Nexar for the MPNs, batch_size per supMultiMatch request"""
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+
+        for start in range(0, len(mpns), batch_size):
+            batch = mpns[start:start + batch_size]
+            data = await self._graphql_query(MULTI_MATCH_QUERY, {
+                "queries": [{"mpn": mpn, "limit": MULTI_MATCH_LIMIT} for mpn in batch]
+            })
+            matches = data.get("supMultiMatch") or []
+            for index, mpn in enumerate(batch):
+                parts = (matches[index] or {}).get("parts") if index < len(matches) else None
+                results[mpn] = self._pick_part(mpn, parts or [])
+
+        return results
+
+    def _revalidate(self, mpns: List[str], batch_size: int) -> None:
+        """Refresh stale cache entries in the background (once per MPN at a time)"""
+        pending = [mpn for mpn in mpns if normalize_mpn(mpn) not in self._revalidating]
+        if not pending:
+            return
+        pending_keys = {normalize_mpn(mpn) for mpn in pending}
+        self._revalidating |= pending_keys
+
+        async def refresh() -> None:
+            try:
+                self.cache.put_many(await self._fetch_availability(pending, batch_size))
+            except Exception as e:
+                # The stale entries stay in place until the next attempt
+                logger.warning(f"Background refresh of {len(pending)} cached parts failed: {e}")
+            finally:
+                self._revalidating -= pending_keys
+
+        task = asyncio.ensure_future(refresh())
+        self._revalidation_tasks.add(task)
+        task.add_done_callback(self._revalidation_tasks.discard)
+
+    async def wait_for_revalidation(self) -> None:
+        """Wait for background cache refreshes to finish"""
+        while self._revalidation_tasks:
+            await asyncio.gather(*self._revalidation_tasks)
+
+    @classmethod
+    def _pick_part(cls, mpn: str, parts: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """The part matching the MPN exactly if there is one, else the best match"""
+        if not parts:
+            return None
+        wanted = mpn.upper()
+        part = next((p for p in parts if (p.get("mpn") or "").upper() == wanted), parts[0])
+        return cls._normalize_part(part)
+
+    @staticmethod
+    def _normalize_part(part: Dict[str, Any]) -> Dict[str, Any]:
+        """Add the description and lifecycleStatus keys the BOM tools read"""
+        lifecycle = None
+        for spec in part.get("specs") or []:
+            if (spec.get("attribute") or {}).get("shortname") == "lifecyclestatus":
+                value = spec.get("displayValue") or ""
+                lifecycle = LIFECYCLE_STATUSES.get(value.strip().lower(), value)
+                break
+
+        return {
+            **part,
+            "manufacturer": part.get("manufacturer") or {},
+            "category": part.get("category") or {},
+            "bestDatasheet": part.get("bestDatasheet") or {},
+            "sellers": part.get("sellers") or [],
+            "description": part.get("shortDescription"),
+            "lifecycleStatus": lifecycle,
+        }
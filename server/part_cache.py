@@ -0,0 +1,207 @@
+"""
+Part cache - persistent store of Nexar part data
+
+Part lookups are expensive (API quota and a round trip per batch) but most
+of a part changes rarely: manufacturer, category, specs, datasheet and
+lifecycle status stay put for months, while offers, stock and prices move
+daily. PartCache keeps each part in SQLite keyed by normalized MPN, with
+the two groups of fields stored and timed separately:
+
+- static fields (everything except sellers) expire after static_ttl
+- volatile fields (sellers: offers, stock and prices) expire after volatile_ttl
+
+An entry whose fields are all within their TTL is fresh. One that has
+passed a TTL by less than max_stale is stale: it is still served, and the
+caller refreshes it in the background (stale-while-revalidate). Anything
+older is a miss. MPNs that Nexar does not know are cached too, with the
+volatile TTL, so a BOM full of typos does not re-query them every time.
+
+The cache holds at most max_entries parts; the least recently used ones are
+evicted first.
+"""
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, NamedTuple, Optional
+
+# Fields that change from day to day; everything else is static
+VOLATILE_FIELDS = ("sellers",)
+
+DEFAULT_STATIC_TTL = 30 * 24 * 3600.0
+DEFAULT_VOLATILE_TTL = 6 * 3600.0
+DEFAULT_MAX_STALE = 24 * 3600.0
+DEFAULT_MAX_ENTRIES = 20000
+
+# Keeps IN (...) lists under SQLite's bound-parameter limit
+_QUERY_CHUNK = 500
+
+
+def normalize_mpn(mpn: str) -> str:
+    """Cache key for an MPN: case and surrounding whitespace do not matter"""
+    return mpn.strip().upper()
+
+
+class CachedPart(NamedTuple):
+    """A cache hit: the part data (None if Nexar has no such part) and whether it is stale"""
+    part: Optional[Dict[str, Any]]
+    stale: bool
+
+
+class PartCache:
+    """SQLite-backed part cache with per-field-group TTLs and LRU eviction"""
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        static_ttl: float = DEFAULT_STATIC_TTL,
+        volatile_ttl: float = DEFAULT_VOLATILE_TTL,
+        max_stale: float = DEFAULT_MAX_STALE,
+        max_entries: int = DEFAULT_MAX_ENTRIES
+    ):
+        """
+        Args:
+            db_path: Database file (defaults to ~/.altium-mcp/part_cache.db)
+            static_ttl: Seconds before manufacturer, specs, lifecycle, ... expire
+            volatile_ttl: Seconds before offers, stock and prices expire
+            max_stale: Seconds past a TTL during which an entry is still served
+            max_entries: Maximum number of cached parts
+        """
+        if db_path is None:
+            db_path = Path.home() / ".altium-mcp" / "part_cache.db"
+
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.static_ttl = static_ttl
+        self.volatile_ttl = volatile_ttl
+        self.max_stale = max_stale
+        self.max_entries = max_entries
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+        self._conn = sqlite3.connect(self.db_path)
+        self._init_database()
+
+    def _init_database(self):
+        """Initialize the part cache database"""
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS parts (
+                mpn TEXT PRIMARY KEY,
+                static_data TEXT,
+                static_fetched REAL NOT NULL,
+                volatile_data TEXT,
+                volatile_fetched REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS parts_last_used ON parts (last_used)")
+        self._conn.commit()
+
+    def close(self) -> None:
+        """Close the database connection"""
+        self._conn.close()
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM parts").fetchone()[0]
+
+    def get_many(self, mpns: Iterable[str], now: Optional[float] = None) -> Dict[str, CachedPart]:
+        """
+        Look up parts.
+
+        Args:
+            mpns: MPNs to look up (normalized here)
+            now: Current time (defaults to time.time())
+
+        Returns:
+            Dictionary mapping the normalized MPN of every fresh or stale
+            entry to its CachedPart. Misses are absent.
+        """
+        now = time.time() if now is None else now
+        keys = list(dict.fromkeys(normalize_mpn(mpn) for mpn in mpns))
+        found: Dict[str, CachedPart] = {}
+
+        for start in range(0, len(keys), _QUERY_CHUNK):
+            chunk = keys[start:start + _QUERY_CHUNK]
+            rows = self._conn.execute(
+                "SELECT mpn, static_data, static_fetched, volatile_data, volatile_fetched "
+                f"FROM parts WHERE mpn IN ({','.join('?' * len(chunk))})",
+                chunk
+            ).fetchall()
+            for mpn, static_data, static_fetched, volatile_data, volatile_fetched in rows:
+                static = json.loads(static_data)
+                # Unknown MPNs may appear in the catalog any day
+                static_ttl = self.static_ttl if static is not None else self.volatile_ttl
+                overdue = max(now - static_fetched - static_ttl, now - volatile_fetched - self.volatile_ttl)
+                if overdue >= self.max_stale:
+                    continue
+                part = {**static, **json.loads(volatile_data)} if static is not None else None
+                found[mpn] = CachedPart(part, stale=overdue > 0)
+
+        if found:
+            self._conn.executemany(
+                "UPDATE parts SET last_used = ? WHERE mpn = ?",
+                [(now, mpn) for mpn in found]
+            )
+            self._conn.commit()
+
+        self.stale_hits += sum(entry.stale for entry in found.values())
+        self.hits += sum(not entry.stale for entry in found.values())
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, parts: Dict[str, Optional[Dict[str, Any]]], now: Optional[float] = None) -> None:
+        """
+        Store freshly fetched parts and evict the least recently used ones
+        beyond max_entries.
+
+        Args:
+            parts: MPN -> part data, or None if Nexar has no such part
+            now: Fetch time (defaults to time.time())
+        """
+        if not parts:
+            return
+        now = time.time() if now is None else now
+
+        rows = []
+        for mpn, part in parts.items():
+            if part is None:
+                static, volatile = None, {}
+            else:
+                static = {key: value for key, value in part.items() if key not in VOLATILE_FIELDS}
+                volatile = {key: part[key] for key in VOLATILE_FIELDS if key in part}
+            rows.append((normalize_mpn(mpn), json.dumps(static), now, json.dumps(volatile), now, now))
+
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO parts "
+            "(mpn, static_data, static_fetched, volatile_data, volatile_fetched, last_used) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        self._evict()
+        self._conn.commit()
+
+    def _evict(self) -> None:
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM parts WHERE mpn IN "
+                "(SELECT mpn FROM parts ORDER BY last_used LIMIT ?)",
+                (excess,)
+            )
+
+    def clear(self) -> None:
+        """Drop every cached part"""
+        self._conn.execute("DELETE FROM parts")
+        self._conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache statistics"""
+        return {
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+        }
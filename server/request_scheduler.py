@@ -0,0 +1,101 @@
+"""
+Request scheduler - lets read-only bridge requests overlap
+
+The bridge used to hold one lock around every call, so a slow command held
+up every other request behind it. RequestScheduler hands out slots in
+arrival order instead:
+
+- read-only requests run concurrently with each other (up to a cap)
+- a mutating request waits for everything ahead of it to finish, runs
+  alone, and holds back everything that arrives after it
+
+so reads pipeline while mutations keep their strict ordering.
+"""
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Tuple
+
+
+class RequestScheduler:
+    """First-come, first-served readers/writer scheduling for bridge requests"""
+
+    def __init__(self, max_concurrent_reads: int = 8):
+        """
+        Args:
+            max_concurrent_reads: Upper bound on read-only requests in flight
+                                  (1 restores fully serial behaviour)
+        """
+        if max_concurrent_reads < 1:
+            raise ValueError("max_concurrent_reads must be at least 1")
+        self.max_concurrent_reads = max_concurrent_reads
+        self._waiters: Deque[Tuple[bool, asyncio.Future]] = deque()
+        self._active_reads = 0
+        self._mutation_active = False
+
+    @property
+    def active_reads(self) -> int:
+        """Number of read-only requests currently holding a slot"""
+        return self._active_reads
+
+    @property
+    def mutation_active(self) -> bool:
+        """Whether a mutating request currently holds the bridge"""
+        return self._mutation_active
+
+    @asynccontextmanager
+    async def slot(self, read_only: bool) -> AsyncIterator[None]:
+        """
+        Hold a request slot for the duration of the block.
+
+        Args:
+            read_only: True if the request does not modify the design
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((read_only, future))
+        self._grant()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.cancelled():
+                if (read_only, future) in self._waiters:
+                    self._waiters.remove((read_only, future))
+            else:
+                # Granted just before the cancellation arrived
+                self._release(read_only)
+            self._grant()
+            raise
+
+        try:
+            yield
+        finally:
+            self._release(read_only)
+            self._grant()
+
+    def _release(self, read_only: bool) -> None:
+        if read_only:
+            self._active_reads -= 1
+        else:
+            self._mutation_active = False
+
+    def _grant(self) -> None:
+        """Wake waiters from the head of the queue for as long as they fit"""
+        while self._waiters:
+            read_only, future = self._waiters[0]
+            if future.done():
+                # Cancelled while queued
+                self._waiters.popleft()
+                continue
+
+            if read_only:
+                if self._mutation_active or self._active_reads >= self.max_concurrent_reads:
+                    return
+                self._active_reads += 1
+            else:
+                if self._mutation_active or self._active_reads:
+                    return
+                self._mutation_active = True
+
+            self._waiters.popleft()
+            future.set_result(None)
@@ -0,0 +1,190 @@
+"""
+Response waiters - detect when Altium has written its response file
+
+The bridge used to poll for the response file every 0.5 s, which added up to
+half a second of dead latency to every tool call. A ResponseWaiter completes
+as soon as the file lands:
+
+- InotifyResponseWaiter: Linux filesystem notifications (no polling at all)
+- PollingResponseWaiter: adaptive-backoff polling that starts at a few
+  milliseconds, used on platforms without inotify (e.g. Windows)
+
+Use create_response_waiter() to get the best waiter for the current platform.
+"""
+import asyncio
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+import sys
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseWaiter(ABC):
+    """Waits for a response file to appear on disk"""
+
+    @abstractmethod
+    async def wait(self, path: Path, timeout: float) -> bool:
+        """
+        Wait until a file exists at path.
+
+        Args:
+            path: File to wait for
+            timeout: Timeout in seconds
+
+        Returns:
+            True if the file appeared, False if the timeout expired first
+        """
+
+
+class PollingResponseWaiter(ResponseWaiter):
+    """
+    Poll for the response file with adaptive backoff.
+
+    The interval starts small so fast commands are picked up within a few
+    milliseconds, then grows geometrically up to max_interval so long-running
+    commands do not burn CPU.
+    """
+
+    def __init__(
+        self,
+        initial_interval: float = 0.005,
+        max_interval: float = 0.25,
+        backoff: float = 1.5
+    ):
+        """
+        Args:
+            initial_interval: First poll interval in seconds
+            max_interval: Upper bound for the poll interval in seconds
+            backoff: Multiplier applied to the interval after each poll
+        """
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+
+    async def wait(self, path: Path, timeout: float) -> bool:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        interval = self.initial_interval
+
+        while not path.exists():
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            await asyncio.sleep(min(interval, remaining))
+            interval = min(interval * self.backoff, self.max_interval)
+
+        return True
+
+
+class InotifyResponseWaiter(ResponseWaiter):
+    """
+    Wait for the response file using Linux inotify.
+
+    Watches the parent directory for IN_CLOSE_WRITE (writer finished) and
+    IN_MOVED_TO (atomic rename into place) and completes the future from the
+    event loop's reader callback the moment the file lands.
+    """
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    _EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+    def __init__(self):
+        self._libc = self._load_libc()
+        if self._libc is None:
+            raise OSError("inotify is not available on this platform")
+
+    @staticmethod
+    def _load_libc():
+        """Load libc and check that it exposes the inotify API"""
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        except OSError:
+            return None
+        if not hasattr(libc, "inotify_init1") or not hasattr(libc, "inotify_add_watch"):
+            return None
+        return libc
+
+    @classmethod
+    def is_supported(cls) -> bool:
+        """Check if inotify can be used on this platform"""
+        return cls._load_libc() is not None
+
+    def _parse_event_names(self, data: bytes) -> Iterator[bytes]:
+        """Yield the file names carried by a buffer of inotify events"""
+        offset = 0
+        header_size = self._EVENT_HEADER.size
+        while offset + header_size <= len(data):
+            _, _, _, name_len = self._EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + header_size:offset + header_size + name_len]
+            yield name.rstrip(b"\0")
+            offset += header_size + name_len
+
+    async def wait(self, path: Path, timeout: float) -> bool:
+        loop = asyncio.get_running_loop()
+
+        fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_init1 failed: {os.strerror(errno)}")
+
+        try:
+            wd = self._libc.inotify_add_watch(
+                fd,
+                os.fsencode(str(path.parent)),
+                self.IN_CLOSE_WRITE | self.IN_MOVED_TO
+            )
+            if wd < 0:
+                errno = ctypes.get_errno()
+                raise OSError(errno, f"inotify_add_watch failed: {os.strerror(errno)}")
+
+            # Check only after the watch is armed so a file written in between
+            # cannot be missed
+            if path.exists():
+                return True
+
+            target = os.fsencode(path.name)
+            future = loop.create_future()
+
+            def on_readable():
+                try:
+                    data = os.read(fd, 64 * 1024)
+                except BlockingIOError:
+                    return
+                if future.done():
+                    return
+                if any(name == target for name in self._parse_event_names(data)):
+                    future.set_result(True)
+
+            loop.add_reader(fd, on_readable)
+            try:
+                return await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                return path.exists()
+            finally:
+                loop.remove_reader(fd)
+        finally:
+            os.close(fd)
+
+
+def create_response_waiter() -> ResponseWaiter:
+    """
+    Create the best response waiter for the current platform.
+
+    Returns:
+        InotifyResponseWaiter on Linux, PollingResponseWaiter elsewhere
+    """
+    if InotifyResponseWaiter.is_supported():
+        logger.debug("Using inotify response waiter")
+        return InotifyResponseWaiter()
+
+    logger.debug("Using adaptive polling response waiter")
+    return PollingResponseWaiter()
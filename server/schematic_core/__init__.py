@@ -25,17 +25,28 @@ Example Usage:
     nets = provider.get_nets()
 """
 
-from .models import Pin, Component, Net
+from .models import (
+    Pin, Component, Net, DEFAULT_POWER_NET_PATTERNS, get_power_net_patterns, set_power_net_patterns
+)
 from .interfaces import SchematicProvider
-from .dsl_emitter import emit_page_dsl, emit_context_dsl
+from .dsl_emitter import (
+    emit_page_dsl, emit_context_dsl, iter_page_dsl, iter_context_dsl, estimate_tokens, PinLookup
+)
 
 __all__ = [
     'Pin',
     'Component',
     'Net',
+    'DEFAULT_POWER_NET_PATTERNS',
+    'get_power_net_patterns',
+    'set_power_net_patterns',
     'SchematicProvider',
     'emit_page_dsl',
     'emit_context_dsl',
+    'iter_page_dsl',
+    'iter_context_dsl',
+    'estimate_tokens',
+    'PinLookup',
 ]
 
 __version__ = '0.3.0'
@@ -25,14 +25,23 @@ Field Mapping Summary:
         - Built from component pin connectivity
         - Aggregates all pins on same net
         - Tracks which pages each net appears on
+
+Refdes, pin designator, net and page strings are interned, so every pin,
+net member and page set refers to a single copy of each name.
 """
 
 import json
 import os
 import re
-from typing import List, Dict, Any, Set, Optional
+from collections.abc import Mapping
+from sys import intern
+from typing import IO, List, Dict, Any, Set, Optional, Union
 from ..interfaces import SchematicProvider
 from ..models import Component, Pin, Net
+from .json_stream import load_json_stream
+
+# Anything AltiumJSONAdapter can read a design from
+DesignSource = Union[str, bytes, Mapping, "os.PathLike[str]", IO]
 
 
 class AltiumJSONAdapter(SchematicProvider):
@@ -44,13 +53,17 @@ class AltiumJSONAdapter(SchematicProvider):
     used by the schematic core library.
 
     Usage:
-        >>> with open('design.json', 'r') as f:
-        >>>     json_data = f.read()
-        >>> adapter = AltiumJSONAdapter(json_data)
+        >>> adapter = AltiumJSONAdapter(Path('design.json'))
         >>> adapter.fetch_raw_data()
         >>> components = adapter.get_components()
         >>> nets = adapter.get_nets()
 
+    The design can be given as:
+        - an already parsed dict (used as is, nothing is serialized)
+        - a pathlib.Path / os.PathLike to a JSON file (parsed incrementally)
+        - a binary or text stream (parsed incrementally)
+        - a JSON string or bytes
+
     The JSON format expected:
         {
           "components": [
@@ -80,51 +93,86 @@ class AltiumJSONAdapter(SchematicProvider):
         }
     """
 
-    def __init__(self, json_data: str):
+    def __init__(self, json_data: DesignSource):
         """
-        Initialize the adapter with JSON data.
+        Initialize the adapter with Altium design data.
 
         Args:
-            json_data: JSON string containing Altium schematic data
+            json_data: Parsed design dict, path to a JSON file, binary/text
+                       stream, or JSON string/bytes
 
         Raises:
             ValueError: If JSON is malformed or missing required structure
         """
-        self._raw_json = json_data
+        self._source = json_data
         self._parsed_data: Optional[Dict[str, Any]] = None
         self._ready = False
+        self._page_names: Dict[str, str] = {}  # sheet path -> interned page name
 
     def fetch_raw_data(self) -> None:
         """
-        Parse the JSON data and prepare for component/net extraction.
+        Parse the design data and prepare for component/net extraction.
 
-        This method parses the JSON string provided during initialization and
-        validates the basic structure. Since data is provided at construction,
-        this primarily serves to mark the adapter as ready and perform
-        validation.
+        A dict is used directly and a path is re-read on every call. A stream
+        can only be read once, so later calls reuse what was parsed from it.
 
         Raises:
             ValueError: If JSON is malformed or missing required fields
-            json.JSONDecodeError: If JSON cannot be parsed
+            TypeError: If the source is of an unsupported type
         """
-        try:
-            self._parsed_data = json.loads(self._raw_json)
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Invalid JSON format: {e}")
+        if self._ready and self._is_stream(self._source):
+            return
+
+        self._parsed_data = self._load(self._source)
 
         # Validate required structure
-        if not isinstance(self._parsed_data, dict):
+        if not isinstance(self._parsed_data, Mapping):
             raise ValueError("JSON root must be an object/dictionary")
 
         if "components" not in self._parsed_data:
-            # If no components key, assume empty design
-            self._parsed_data["components"] = []
+            # If no components key, assume empty design (without touching the caller's dict)
+            self._parsed_data = {**self._parsed_data, "components": []}
 
         if not isinstance(self._parsed_data["components"], list):
             raise ValueError("'components' must be an array")
 
         self._ready = True
 
+    def set_source(self, json_data: DesignSource) -> None:
+        """
+        Replace the design data; the next fetch_raw_data() reads the new source.
+
+        This lets a long-lived Librarian keep its provider when the design
+        changes (followed by Librarian.mark_dirty()).
+        """
+        self._source = json_data
+        self._parsed_data = None
+        self._ready = False
+
+    @staticmethod
+    def _is_stream(source: Any) -> bool:
+        return hasattr(source, "read")
+
+    def _load(self, source: DesignSource) -> Any:
+        """Parse the design source into Python objects"""
+        if isinstance(source, Mapping):
+            return source
+
+        if isinstance(source, (str, bytes, bytearray)):
+            try:
+                return json.loads(source)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON format: {e}")
+
+        if isinstance(source, os.PathLike):
+            with open(source, "rb") as f:
+                return load_json_stream(f)
+
+        if self._is_stream(source):
+            return load_json_stream(source)
+
+        raise TypeError(f"Unsupported design source: {type(source).__name__}")
+
     def get_components(self) -> List[Component]:
         """
         Transform Altium component data into unified Component objects.
@@ -180,17 +228,13 @@ class AltiumJSONAdapter(SchematicProvider):
         nets_dict: Dict[str, Dict[str, Any]] = {}
 
         for comp_data in self._parsed_data["components"]:
-            designator = comp_data.get("designator", "")
-            sheet = comp_data.get("sheet", "")
-            page_name = self._extract_filename(sheet)
+            designator = intern(comp_data.get("designator", ""))
+            page_name = self._page_name(comp_data.get("sheet", ""))
 
             pins = comp_data.get("pins", [])
             for pin_data in pins:
-                net_name = pin_data.get("net", "")
-
                 # Handle empty net name (no-connect)
-                if not net_name:
-                    net_name = "NC"
+                net_name = intern(pin_data.get("net", "") or "NC")
 
                 # Initialize net entry if not seen before
                 if net_name not in nets_dict:
@@ -201,7 +245,7 @@ class AltiumJSONAdapter(SchematicProvider):
                     }
 
                 # Add this pin to the net
-                pin_designator = pin_data.get("name", "")
+                pin_designator = intern(pin_data.get("name", ""))
                 nets_dict[net_name]["members"].append((designator, pin_designator))
                 nets_dict[net_name]["pages"].add(page_name)
 
@@ -234,6 +278,7 @@ class AltiumJSONAdapter(SchematicProvider):
         refdes = comp_data.get("designator", "")
         if not refdes:
             raise ValueError("Component missing required 'designator' field")
+        refdes = intern(refdes)
 
         # Extract parameters dict
         parameters = comp_data.get("parameters", {})
@@ -242,8 +287,7 @@ class AltiumJSONAdapter(SchematicProvider):
         value = self._get_component_value(comp_data)
         footprint = comp_data.get("footprint", "")
         mpn = parameters.get("PN", "")
-        sheet = comp_data.get("sheet", "")
-        page = self._extract_filename(sheet)
+        page = self._page_name(comp_data.get("sheet", ""))
         description = comp_data.get("description", "")
 
         # Extract location (x, y)
@@ -289,12 +333,10 @@ class AltiumJSONAdapter(SchematicProvider):
         """
         pins = []
         for pin_data in pins_data:
-            pin_designator = pin_data.get("name", "")
-            net_name = pin_data.get("net", "")
+            pin_designator = intern(pin_data.get("name", ""))
 
             # Handle empty net name (no-connect)
-            if not net_name:
-                net_name = "NC"
+            net_name = intern(pin_data.get("net", "") or "NC")
 
             # Determine if pin name is semantic or just numeric
             pin_name = ""
@@ -340,6 +382,13 @@ class AltiumJSONAdapter(SchematicProvider):
         # Last resort: empty string
         return ""
 
+    def _page_name(self, sheet: str) -> str:
+        """Interned page name for a sheet path, computed once per sheet."""
+        page = self._page_names.get(sheet)
+        if page is None:
+            page = self._page_names[sheet] = intern(self._extract_filename(sheet))
+        return page
+
     def _extract_filename(self, full_path: str) -> str:
         """
         Extract filename from full Windows or Unix path.
@@ -0,0 +1,174 @@
+"""
+Incremental JSON loading for large design exports.
+
+json.load() reads the whole file into one string before parsing, so a large
+design is held in memory twice: once as text and once as Python objects.
+load_json_stream() reads the stream in fixed-size chunks instead and decodes
+the elements of top-level arrays ("components", "nets") one at a time, so
+only the current chunk of text is held next to the parsed result.
+"""
+
+import codecs
+import json
+from typing import Any, BinaryIO, Iterator, TextIO, Union
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = " \t\r\n"
+
+# Literals a value cut off at the end of the buffer may be the start of
+_LITERALS = ("true", "false", "null", "NaN", "Infinity", "-Infinity")
+
+
+class _ChunkReader:
+    """Text buffer over a binary or text stream, refilled on demand"""
+
+    def __init__(self, stream: Union[BinaryIO, TextIO], chunk_size: int):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._decoder = None  # Created on the first bytes chunk
+        self._first_chunk = True
+        self._decode = json.JSONDecoder().raw_decode
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, size: int = 0) -> bool:
+        """
+        Append the next chunk, dropping consumed text. Returns False at EOF.
+
+        Args:
+            size: Bytes/characters to read (default: the reader's chunk size)
+        """
+        if self.eof:
+            return False
+
+        chunk = self._stream.read(size or self._chunk_size)
+        if isinstance(chunk, (bytes, bytearray)):
+            if self._decoder is None:
+                self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+            text = self._decoder.decode(chunk, final=not chunk)
+        else:
+            text = chunk
+            if self._first_chunk and text.startswith("\ufeff"):
+                text = text[1:]
+        self._first_chunk = False
+
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+        if not chunk:
+            self.eof = True
+        return bool(chunk)
+
+    def peek(self) -> str:
+        """Next non-whitespace character, or "" at end of input"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Invalid JSON format: expected {char!r}, found {found or 'end of input'!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """
+        Decode one complete JSON value at the current position.
+
+        A value cut off by the end of the buffer is retried with more text,
+        reading twice as much each time, so a value spanning many chunks is
+        decoded a logarithmic number of times rather than once per chunk.
+        A syntax error inside the buffer is raised at once.
+        """
+        self.peek()
+        size = self._chunk_size
+        while True:
+            try:
+                obj, end = self._decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                if not self._truncated(e) or not self.fill(size):
+                    raise ValueError(f"Invalid JSON format: {e}")
+                size *= 2
+                continue
+
+            # A number at the end of the buffer may continue in the next chunk
+            if end < len(self.buffer) or self.eof or not self.fill(size):
+                self.pos = end
+                return obj
+            size *= 2
+
+    def _truncated(self, error: json.JSONDecodeError) -> bool:
+        """Whether a decode error may be due to the buffer ending mid-value"""
+        rest = self.buffer[error.pos:]
+        if not rest.strip(_WHITESPACE) or error.msg.startswith("Unterminated string"):
+            return True
+        if error.msg == "Expecting value":
+            return any(literal.startswith(rest) for literal in _LITERALS)
+        # An escape sequence cut short, e.g. "\u00
+        return error.msg.startswith("Invalid \\") and len(rest) < 6
+
+    def array_items(self) -> Iterator[Any]:
+        """Decode the elements of the array at the current position one by one"""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("]")
+            return
+
+
+def load_json_stream(stream: Union[BinaryIO, TextIO], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Any:
+    """
+    Parse a JSON document from a stream without reading it into one string.
+
+    Arrays directly under a top-level object are decoded element by element;
+    any other document is decoded as a whole.
+
+    Args:
+        stream: Binary (UTF-8, optional BOM) or text stream
+        chunk_size: Number of bytes/characters read at a time
+
+    Returns:
+        The parsed document
+
+    Raises:
+        ValueError: If the stream is not valid JSON
+    """
+    reader = _ChunkReader(stream, chunk_size)
+    if reader.peek() != "{":
+        result = reader.value()
+    else:
+        reader.pos += 1
+        result = {}
+        if reader.peek() == "}":
+            reader.pos += 1
+        else:
+            while True:
+                key = reader.value()
+                if not isinstance(key, str):
+                    raise ValueError("Invalid JSON format: object keys must be strings")
+                reader.expect(":")
+                if reader.peek() == "[":
+                    result[key] = list(reader.array_items())
+                else:
+                    result[key] = reader.value()
+
+                if reader.peek() == ",":
+                    reader.pos += 1
+                    continue
+                reader.expect("}")
+                break
+
+    if reader.peek():
+        raise ValueError("Invalid JSON format: extra data after the document")
+    return result
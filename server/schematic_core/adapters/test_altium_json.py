@@ -6,15 +6,24 @@ data model, including edge cases like no-connect pins, missing fields, and
 multi-pin components.
 """
 
+import gc
+import io
 import json
+import subprocess
 import sys
 import os
+import tempfile
+import tracemalloc
+from dataclasses import make_dataclass
+from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 from schematic_core.adapters.altium_json import AltiumJSONAdapter
+from schematic_core.adapters.json_stream import load_json_stream
 from schematic_core.models import Component, Pin, Net
+from schematic_core.benchmarking import RUN_BENCHMARKS
 
 
 def test_basic_component_parsing():
@@ -435,6 +444,310 @@ def test_sample_json_file():
     print("[PASS] Sample JSON file test passed")
 
 
+def _design_dict():
+    return {
+        "components": [
+            {
+                "designator": "U1",
+                "sheet": "C:\\Project\\Main.SchDoc",
+                "parameters": {"PN": "LM358", "Comment": "LM358"},
+                "pins": [{"name": "1", "net": "OUT"}, {"name": "4", "net": "GND"}]
+            },
+            {
+                "designator": "R1",
+                "sheet": "C:\\Project\\Main.SchDoc",
+                "parameters": {"Comment": "10k"},
+                "pins": [{"name": "1", "net": "OUT"}, {"name": "2", "net": ""}]
+            }
+        ],
+        "nets": [{"name": "OUT"}, {"name": "GND"}]
+    }
+
+
+def _summary(adapter):
+    adapter.fetch_raw_data()
+    components = adapter.get_components()
+    nets = adapter.get_nets()
+    return (
+        [(c.refdes, c.value, c.page, [(p.designator, p.net) for p in c.pins]) for c in components],
+        sorted((n.name, sorted(n.members)) for n in nets)
+    )
+
+
+def test_mapping_input():
+    """Test that an already parsed dict gives the same result as its JSON string."""
+    design = _design_dict()
+    expected = _summary(AltiumJSONAdapter(json.dumps(design)))
+
+    assert _summary(AltiumJSONAdapter(design)) == expected
+    assert design == _design_dict()  # Caller's dict left untouched
+
+    # A dict without components is an empty design, and is not modified either
+    metadata_only = {"metadata": {"project": "test"}}
+    adapter = AltiumJSONAdapter(metadata_only)
+    adapter.fetch_raw_data()
+    assert adapter.get_components() == []
+    assert "components" not in metadata_only
+
+    print("[PASS] Mapping input test passed")
+
+
+def test_path_and_stream_input():
+    """Test that files and streams are parsed incrementally to the same result."""
+    design = _design_dict()
+    expected = _summary(AltiumJSONAdapter(design))
+    text = json.dumps(design, indent=2)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "design.json"
+        path.write_bytes(b"\xef\xbb\xbf" + text.encode("utf-8"))  # Altium writes a BOM
+        assert _summary(AltiumJSONAdapter(path)) == expected
+
+    assert _summary(AltiumJSONAdapter(io.BytesIO(text.encode("utf-8")))) == expected
+    assert _summary(AltiumJSONAdapter(io.StringIO(text))) == expected
+
+    # A stream is read once; fetching again reuses the parsed data
+    adapter = AltiumJSONAdapter(io.BytesIO(text.encode("utf-8")))
+    assert _summary(adapter) == _summary(adapter)
+
+    print("[PASS] Path and stream input test passed")
+
+
+def test_malformed_stream():
+    """Test error handling for a truncated stream and unsupported sources."""
+    adapter = AltiumJSONAdapter(io.BytesIO(b'{"components": [{"designator": "R1"'))
+    try:
+        adapter.fetch_raw_data()
+        assert False, "Should have raised ValueError"
+    except ValueError as e:
+        assert "Invalid JSON" in str(e)
+
+    try:
+        AltiumJSONAdapter(42).fetch_raw_data()
+        assert False, "Should have raised TypeError"
+    except TypeError:
+        pass
+
+    print("[PASS] Malformed stream test passed")
+
+
+class _CountingStream(io.BytesIO):
+    """BytesIO that records how many bytes each read returned"""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.reads = []
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.reads.append(len(chunk))
+        return chunk
+
+
+def test_stream_chunk_boundaries():
+    """Test that values split across tiny chunks parse, with reads growing geometrically."""
+    design = _design_dict()
+    design["components"][0]["description"] = "Ω µF – € " + "x" * 5000
+    design["components"][0]["dnp"] = True
+    design["components"][0]["variant"] = None
+    data = json.dumps(design, ensure_ascii=False).encode("utf-8")
+
+    for chunk_size in (1, 2, 3, 7):
+        stream = _CountingStream(data)
+        assert load_json_stream(stream, chunk_size) == design
+        # The long description needs far fewer reads than one per chunk
+        assert len(stream.reads) < len(data) // chunk_size // 4
+
+    print("[PASS] Stream chunk boundaries test passed")
+
+
+def test_stream_syntax_error_raised_early():
+    """Test that a syntax error is reported without reading the rest of the stream."""
+    data = b'{"components": [{"designator": "R1",, "pins": []}' + b" " * 100000 + b"]}"
+    stream = _CountingStream(data)
+    try:
+        load_json_stream(stream, chunk_size=64)
+        assert False, "Should have raised ValueError"
+    except ValueError as e:
+        assert "Invalid JSON" in str(e)
+    assert sum(stream.reads) < 1024
+
+    print("[PASS] Stream syntax error test passed")
+
+
+# Runs in a fresh interpreter per measurement so peak RSS is not shared.
+# Peak RSS growth includes loading the design (the same in both modes) and
+# depends on the allocator, so the traced Python allocation peak is
+# reported next to it and used for the check.
+_BENCHMARK_CHILD = """
+import json, resource, sys, time, tracemalloc
+sys.path.insert(0, sys.argv[3])
+from schematic_core.adapters.altium_json import AltiumJSONAdapter
+
+def peak_rss_kb():
+    # ru_maxrss can carry over the parent's peak across fork/exec; VmHWM cannot
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+mode = sys.argv[1]
+base_rss = peak_rss_kb()
+with open(sys.argv[2]) as f:
+    design = json.load(f)
+
+def run():
+    adapter = AltiumJSONAdapter(json.dumps(design) if mode == "round_trip" else design)
+    adapter.fetch_raw_data()
+    adapter.get_components()
+    adapter.get_nets()
+
+start = time.process_time()
+run()
+cpu = time.process_time() - start
+rss_kb = peak_rss_kb() - base_rss
+
+tracemalloc.start()
+run()
+traced_peak = tracemalloc.get_traced_memory()[1]
+print(json.dumps({"cpu": cpu, "rss_kb": rss_kb, "traced_peak": traced_peak}))
+"""
+
+
+def test_input_benchmark():
+    """Benchmark: dumps->loads round trip against handing the adapter a dict (20k pins)."""
+    try:
+        import resource  # noqa: F401
+    except ImportError:
+        print("[SKIP] resource module not available, skipping benchmark")
+        return
+
+    components = [
+        {
+            "designator": f"U{i}",
+            "description": "IC",
+            "footprint": "QFN-10",
+            "sheet": f"C:\\Project\\Sheet{i % 10}.SchDoc",
+            "parameters": {"PN": f"PN{i}", "Comment": f"PN{i}", "MFG": "ACME"},
+            "pins": [{"name": str(p), "net": f"NET{(i * 10 + p) % 5000}"} for p in range(1, 11)]
+        }
+        for i in range(2000)
+    ]
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "design.json"
+        path.write_text(json.dumps({"components": components}))
+
+        results = {}
+        for mode in ("round_trip", "mapping"):
+            runs = [
+                json.loads(subprocess.run(
+                    [sys.executable, "-c", _BENCHMARK_CHILD, mode, str(path), root],
+                    capture_output=True, text=True, check=True
+                ).stdout)
+                for _ in range(5)
+            ]
+            results[mode] = {key: min(r[key] for r in runs) for key in runs[0]}
+
+    print()
+    for mode, r in results.items():
+        print(f"  {mode:10s}: {r['cpu'] * 1000:7.1f} ms CPU, "
+              f"{r['rss_kb'] / 1024:6.1f} MiB peak RSS, "
+              f"{r['traced_peak'] / 2**20:6.1f} MiB traced peak")
+
+    assert results["mapping"]["traced_peak"] < results["round_trip"]["traced_peak"] / 2
+    assert results["mapping"]["cpu"] < results["round_trip"]["cpu"]
+
+    print("[PASS] Input benchmark test passed")
+
+
+def test_shared_strings():
+    """Test that refdes, pin, net and page names are shared between models."""
+    json_data = json.dumps({
+        "components": [
+            {"designator": "R1", "sheet": "Main.SchDoc", "pins": [
+                {"name": "1", "net": "SIGNAL_A"}, {"name": "2", "net": ""}]},
+            {"designator": "R2", "sheet": "Main.SchDoc", "pins": [
+                {"name": "1", "net": "SIGNAL_A"}, {"name": "2", "net": ""}]},
+        ]
+    })
+    adapter = AltiumJSONAdapter(json_data)
+    adapter.fetch_raw_data()
+    r1, r2 = adapter.get_components()
+    nets = {net.name: net for net in adapter.get_nets()}
+
+    assert r1.pins[0].net is r2.pins[0].net is nets["SIGNAL_A"].name
+    assert r1.page is r2.page
+    assert nets["SIGNAL_A"].members[0][0] is r1.refdes
+    assert not hasattr(r1.pins[0], "__dict__")
+
+    print("[PASS] Shared strings test passed")
+
+
+def _copy_str(text: str) -> str:
+    """Equal string that is a separate object (as json.loads produces)."""
+    return (text + ".")[:-1]
+
+
+def test_model_memory():
+    """Benchmark: retained memory of adapter models against plain dataclasses with copied strings."""
+    components = [
+        {
+            "designator": f"U{i}",
+            "sheet": f"C:\\Project\\Sheet{i % 20}.SchDoc",
+            "parameters": {"Comment": "MCU"},
+            "pins": [{"name": f"P{p}", "net": f"NET{(i * 8 + p) // 3}"} for p in range(1, 9)]
+        }
+        for i in range(5000)
+    ]
+    json_data = json.dumps({"components": components})
+    del components
+
+    # Layout before slots and interning: per-instance __dict__, one string
+    # object per occurrence
+    PlainPin = make_dataclass("PlainPin", ["designator", "name", "net"])
+    PlainComponent = make_dataclass("PlainComponent", ["refdes", "page", "pins"])
+    PlainNet = make_dataclass("PlainNet", ["name", "pages", "members"])
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        adapter = AltiumJSONAdapter(json_data)
+        adapter.fetch_raw_data()
+        models = (adapter.get_components(), adapter.get_nets())
+        del adapter
+        gc.collect()
+        model_bytes = tracemalloc.get_traced_memory()[0]
+
+        plain = (
+            [PlainComponent(_copy_str(c.refdes), _copy_str(c.page),
+                            [PlainPin(_copy_str(p.designator), _copy_str(p.name), _copy_str(p.net))
+                             for p in c.pins])
+             for c in models[0]],
+            [PlainNet(_copy_str(n.name), {_copy_str(page) for page in n.pages},
+                      [(_copy_str(r), _copy_str(d)) for r, d in n.members])
+             for n in models[1]],
+        )
+        plain_bytes = tracemalloc.get_traced_memory()[0] - model_bytes
+    finally:
+        tracemalloc.stop()
+
+    pins = sum(len(c.pins) for c in models[0])
+    print()
+    print(f"  slotted + interned: {model_bytes / 2**20:6.2f} MiB ({model_bytes / pins:4.0f} B/pin)")
+    print(f"  plain, copied:      {plain_bytes / 2**20:6.2f} MiB ({plain_bytes / pins:4.0f} B/pin)")
+    assert len(plain[0]) == len(models[0])
+    if RUN_BENCHMARKS:
+        assert model_bytes < plain_bytes * 0.75
+
+    print("[PASS] Model memory benchmark passed")
+
+
 if __name__ == "__main__":
     print("Running Altium JSON Adapter Tests\n")
 
@@ -450,6 +763,14 @@ if __name__ == "__main__":
     test_malformed_json()
     test_missing_components_key()
     test_sample_json_file()
+    test_mapping_input()
+    test_path_and_stream_input()
+    test_malformed_stream()
+    test_stream_chunk_boundaries()
+    test_stream_syntax_error_raised_early()
+    test_input_benchmark()
+    test_shared_strings()
+    test_model_memory()
 
     print("\n" + "="*50)
     print("All tests passed!")
@@ -0,0 +1,236 @@
+"""
+Design diff - what changed between two revisions of a schematic
+
+Compares two Librarians (for example one loaded from a snapshot or an
+exported design file and one for the open design) and reports:
+- Added and removed components
+- Modified components: changed fields, parameter changes and pins moved
+  between nets
+- Added, removed, renamed and modified nets
+
+Components are matched by designator and nets by name. Each side is hashed
+once (Component.content_hash / Net.content_hash) and only entries whose
+hashes differ are compared field by field, so the diff costs time linear
+in the size of the designs plus the size of the changes.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    from .librarian import Librarian
+    from .models import Component, Net
+except ImportError:
+    from librarian import Librarian
+    from models import Component, Net
+
+
+# Fields compared for modified components; parameters and pins are reported separately
+_FIELDS = ("value", "footprint", "mpn", "description", "multipart_parent")
+
+
+def diff_designs(snapshot_a: Librarian, snapshot_b: Librarian) -> Dict[str, Any]:
+    """
+    Diff two revisions of a design.
+
+    Args:
+        snapshot_a: Librarian for the old revision
+        snapshot_b: Librarian for the new revision
+
+    Returns:
+        Dictionary with:
+        - summary: Counts of each kind of change
+        - components: {"added": [...], "removed": [...], "modified": [...]}
+          Added and removed entries give refdes, value and pages. Modified
+          entries give the refdes plus whichever of fields ({name: [old, new]}),
+          parameters ({"added", "removed", "changed"}), pins_moved
+          ([{"pin", "from", "to"}]), pins_added and pins_removed changed.
+        - nets: {"added": [...], "removed": [...], "renamed": [{"from", "to"}],
+          "modified": [{"name", "members_added", "members_removed"}]}
+
+        Pins are written REFDES.PIN. Pin moves between two nets that were
+        only renamed are reported as the rename alone.
+    """
+    snapshot_a.refresh()
+    snapshot_b.refresh()
+
+    nets = _diff_nets(snapshot_a.nets, snapshot_b.nets)
+    renamed = {(entry["from"], entry["to"]) for entry in nets["renamed"]}
+    components = _diff_components(snapshot_a.components, snapshot_b.components, renamed)
+
+    return {
+        "summary": {
+            "components_added": len(components["added"]),
+            "components_removed": len(components["removed"]),
+            "components_modified": len(components["modified"]),
+            "parameter_changes": sum(
+                sum(len(changes) for changes in entry.get("parameters", {}).values())
+                for entry in components["modified"]
+            ),
+            "pins_moved": sum(len(entry.get("pins_moved", ())) for entry in components["modified"]),
+            "nets_added": len(nets["added"]),
+            "nets_removed": len(nets["removed"]),
+            "nets_renamed": len(nets["renamed"]),
+            "nets_modified": len(nets["modified"]),
+        },
+        "components": components,
+        "nets": nets,
+    }
+
+
+def _group_by_refdes(components: Iterable[Component]) -> Dict[str, List[Component]]:
+    parts: Dict[str, List[Component]] = {}
+    for comp in components:
+        parts.setdefault(comp.refdes, []).append(comp)
+    return parts
+
+
+def _summarize(parts: List[Component]) -> Dict[str, Any]:
+    return {"refdes": parts[0].refdes, "value": parts[0].value, "pages": _pages(parts)}
+
+
+def _pages(parts: List[Component]) -> List[str]:
+    return sorted({comp.page for comp in parts})
+
+
+def _diff_components(
+    components_a: List[Component],
+    components_b: List[Component],
+    renamed: Set[Tuple[str, str]]
+) -> Dict[str, List[Dict[str, Any]]]:
+    parts_a = _group_by_refdes(components_a)
+    parts_b = _group_by_refdes(components_b)
+
+    added = [_summarize(parts_b[refdes]) for refdes in sorted(parts_b.keys() - parts_a.keys())]
+    removed = [_summarize(parts_a[refdes]) for refdes in sorted(parts_a.keys() - parts_b.keys())]
+
+    modified = []
+    for refdes in sorted(parts_a.keys() & parts_b.keys()):
+        a, b = parts_a[refdes], parts_b[refdes]
+        if [comp.content_hash() for comp in a] == [comp.content_hash() for comp in b]:
+            continue
+        change = _component_changes(refdes, a, b, renamed)
+        if change is not None:
+            modified.append(change)
+
+    return {"added": added, "removed": removed, "modified": modified}
+
+
+def _component_changes(
+    refdes: str,
+    a: List[Component],
+    b: List[Component],
+    renamed: Set[Tuple[str, str]]
+) -> Optional[Dict[str, Any]]:
+    """Field, parameter and pin changes of one component (all its parts), or None."""
+    change: Dict[str, Any] = {"refdes": refdes}
+
+    fields = {
+        name: [getattr(a[0], name), getattr(b[0], name)]
+        for name in _FIELDS
+        if getattr(a[0], name) != getattr(b[0], name)
+    }
+    if _pages(a) != _pages(b):
+        fields["pages"] = [_pages(a), _pages(b)]
+    locations_a = [list(comp.location) for comp in a]
+    locations_b = [list(comp.location) for comp in b]
+    if locations_a != locations_b:
+        fields["location"] = [locations_a, locations_b]
+    if fields:
+        change["fields"] = fields
+
+    parameters = _diff_parameters(_merged_properties(a), _merged_properties(b))
+    if parameters:
+        change["parameters"] = parameters
+
+    pins_a, pins_b = _pin_nets(a), _pin_nets(b)
+    moved = [
+        {"pin": f"{refdes}.{pin}", "from": pins_a[pin], "to": pins_b[pin]}
+        for pin in pins_a.keys() & pins_b.keys()
+        if pins_a[pin] != pins_b[pin] and (pins_a[pin], pins_b[pin]) not in renamed
+    ]
+    if moved:
+        change["pins_moved"] = sorted(moved, key=lambda entry: entry["pin"])
+    pins_added = sorted(f"{refdes}.{pin}" for pin in pins_b.keys() - pins_a.keys())
+    if pins_added:
+        change["pins_added"] = pins_added
+    pins_removed = sorted(f"{refdes}.{pin}" for pin in pins_a.keys() - pins_b.keys())
+    if pins_removed:
+        change["pins_removed"] = pins_removed
+
+    # Only part order or renamed nets changed
+    return change if len(change) > 1 else None
+
+
+def _merged_properties(parts: List[Component]) -> Dict[str, Any]:
+    properties: Dict[str, Any] = {}
+    for comp in parts:
+        for key, value in comp.properties.items():
+            properties.setdefault(key, value)
+    return properties
+
+
+def _diff_parameters(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    parameters = {}
+    added = {key: b[key] for key in sorted(b.keys() - a.keys())}
+    if added:
+        parameters["added"] = added
+    removed = {key: a[key] for key in sorted(a.keys() - b.keys())}
+    if removed:
+        parameters["removed"] = removed
+    changed = {key: [a[key], b[key]] for key in sorted(a.keys() & b.keys()) if a[key] != b[key]}
+    if changed:
+        parameters["changed"] = changed
+    return parameters
+
+
+def _pin_nets(parts: List[Component]) -> Dict[str, str]:
+    """Pin designator -> net name (empty pins are no-connects) over all parts."""
+    nets: Dict[str, str] = {}
+    for comp in parts:
+        for pin in comp.pins:
+            nets.setdefault(pin.designator, pin.net or "NC")
+    return nets
+
+
+def _member_names(members: Iterable[Tuple[str, str]]) -> List[str]:
+    return sorted(f"{refdes}.{pin}" for refdes, pin in members)
+
+
+def _diff_nets(nets_a: List[Net], nets_b: List[Net]) -> Dict[str, List[Any]]:
+    by_name_a = {net.name: net for net in nets_a}
+    by_name_b = {net.name: net for net in nets_b}
+
+    added_names = by_name_b.keys() - by_name_a.keys()
+    removed_names = by_name_a.keys() - by_name_b.keys()
+
+    # A removed and an added net with exactly the same pins is a rename
+    removed_by_members = {frozenset(by_name_a[name].members): name for name in removed_names}
+    renamed = []
+    for name in sorted(added_names):
+        old_name = removed_by_members.pop(frozenset(by_name_b[name].members), None)
+        if old_name is not None:
+            renamed.append({"from": old_name, "to": name})
+    renamed_from = {entry["from"] for entry in renamed}
+    renamed_to = {entry["to"] for entry in renamed}
+
+    modified = []
+    for name in sorted(by_name_a.keys() & by_name_b.keys()):
+        a, b = by_name_a[name], by_name_b[name]
+        if a.content_hash() == b.content_hash():
+            continue
+        members_a, members_b = set(a.members), set(b.members)
+        entry: Dict[str, Any] = {
+            "name": name,
+            "members_added": _member_names(members_b - members_a),
+            "members_removed": _member_names(members_a - members_b),
+        }
+        if a.pages != b.pages:
+            entry["pages"] = [sorted(a.pages), sorted(b.pages)]
+        modified.append(entry)
+
+    return {
+        "added": sorted(added_names - renamed_to),
+        "removed": sorted(removed_names - renamed_from),
+        "renamed": renamed,
+        "modified": modified,
+    }
@@ -12,27 +12,74 @@ Key Features:
 - Inline pin hints: Format as U1.22(PA9_TX) for named pins
 - Global net summaries: Truncate large nets to first 10 connections
 - Inter-page links: Show LINKS line for nets spanning multiple pages
+- Pin lookup table: Pin references are resolved through maps built once per page
+- Streaming: iter_page_dsl / iter_context_dsl yield the DSL block by block
 """
 
-from typing import List, Dict, Set, Tuple
+from itertools import islice
+from typing import List, Dict, Iterator, Optional, Set, Tuple
 try:
     from .models import Component, Net, Pin
 except ImportError:
     from models import Component, Net, Pin
 
 
+# Pin names that add nothing to a pin reference ("R1.1", not "R1.1(1)")
+_SIMPLE_PIN_NAMES = {"1", "2", "3", "4", "A", "K"}
+
+# Rough size of a token in DSL text, used for budget estimates
+CHARS_PER_TOKEN = 4
+
+
+class PinLookup:
+    """
+    Lookup table for resolving net members to components and pins.
+
+    Built once per page or context bubble and shared by all of its net
+    blocks, so formatting a pin reference is a dict lookup instead of a
+    scan over every component and its pins. When several components share
+    a refdes (or a component repeats a pin designator) the first one wins.
+
+    Attributes:
+        components: refdes -> Component
+        pins: (refdes, pin designator) -> Pin
+    """
+
+    def __init__(self, components: List[Component]):
+        """
+        Build the lookup table.
+
+        Args:
+            components: Components whose pins may be referenced by the nets
+        """
+        self.components: Dict[str, Component] = {}
+        self.pins: Dict[Tuple[str, str], Pin] = {}
+
+        for comp in components:
+            if comp.refdes in self.components:
+                continue
+            self.components[comp.refdes] = comp
+            for pin in comp.pins:
+                self.pins.setdefault((comp.refdes, pin.designator), pin)
+
+
 def emit_page_dsl(
     components: List[Component],
     nets: List[Net],
-    net_page_map: Dict[str, Set[str]]
+    net_page_map: Dict[str, Set[str]],
+    pin_lookup: Optional[PinLookup] = None
 ) -> str:
     """
     Generate DSL for a single schematic page.
 
+    Equivalent to "\n".join(iter_page_dsl(...)).
+
     Args:
         components: List of components on this page
         nets: List of nets with pins on this page
         net_page_map: Dict mapping net names to set of page names (the Atlas)
+        pin_lookup: Lookup table for the page's components (built from
+                    components if not given)
 
     Returns:
         Formatted DSL string for the page
@@ -46,8 +93,40 @@ def emit_page_dsl(
         # NETS
         <net blocks>
     """
+    return "\n".join(iter_page_dsl(components, nets, net_page_map, pin_lookup))
+
+
+def iter_page_dsl(
+    components: List[Component],
+    nets: List[Net],
+    net_page_map: Dict[str, Set[str]],
+    pin_lookup: Optional[PinLookup] = None,
+    start: int = 0
+) -> Iterator[str]:
+    """
+    Generate DSL for a single schematic page lazily, one block at a time.
+
+    Yields section headers, blank separator lines, component blocks and net
+    blocks in output order; joining them with newlines gives the page DSL.
+    Each block is formatted only when requested, so a consumer can stop or
+    page through a large sheet without the whole text being built.
+
+    Args:
+        components: List of components on this page
+        nets: List of nets with pins on this page
+        net_page_map: Dict mapping net names to set of page names (the Atlas)
+        pin_lookup: Lookup table for the page's components (built from
+                    components if not given)
+        start: Index of the first block to yield; the blocks before it are
+               skipped without being formatted
+
+    Yields:
+        DSL blocks (without trailing newlines)
+    """
     if not components:
-        return "# No components on this page\n"
+        if start == 0:
+            yield "# No components on this page\n"
+        return
 
     # Get page name from first component
     page_name = components[0].page if components else "Unknown"
@@ -58,40 +137,46 @@ def emit_page_dsl(
     # Sort nets alphabetically by name
     sorted_nets = sorted(nets, key=lambda n: n.name)
 
-    # Build output
-    lines = [f"# PAGE: {page_name}", ""]
+    # Each section skips what it can of the remaining start offset
+    header = [f"# PAGE: {page_name}", "", "# COMPONENTS"]
+    yield from header[start:]
+    start = max(0, start - len(header))
 
     # COMPONENTS section - only complex components get blocks
-    lines.append("# COMPONENTS")
     complex_components = [c for c in sorted_components if c.is_complex()]
 
     if not complex_components:
-        lines.append("(All components are simple passives - see NETS section)")
+        if start == 0:
+            yield "(All components are simple passives - see NETS section)"
+        start = max(0, start - 1)
     else:
-        for comp in complex_components:
-            block = _format_component_block(comp)
-            lines.append(block)
-
-    lines.append("")
+        for comp in islice(complex_components, start, None):
+            yield _format_component_block(comp)
+        start = max(0, start - len(complex_components))
 
     # NETS section
-    lines.append("# NETS")
-    for net in sorted_nets:
+    separator = ["", "# NETS"]
+    yield from separator[start:]
+    start = max(0, start - len(separator))
+
+    if pin_lookup is None:
+        pin_lookup = PinLookup(sorted_components)
+    for net in islice(sorted_nets, start, None):
         # Use net_page_map to determine if net is inter-page
         net_pages = net_page_map.get(net.name, set())
-        block = _format_net_block(net, net_pages, sorted_components)
-        lines.append(block)
-
-    return "\n".join(lines)
+        yield _format_net_block(net, net_pages, pin_lookup)
 
 
 def emit_context_dsl(
     primary_components: List[Component],
     neighbor_components: List[Component],
-    nets: List[Net]
+    nets: List[Net],
+    pin_lookup: Optional[PinLookup] = None
 ) -> str:
     """
-    Generate DSL for a context bubble (1-hop traversal from primary components).
+    Generate DSL for a context bubble (traversal from primary components).
+
+    Equivalent to "\n".join(iter_context_dsl(...)).
 
     This output includes:
     - Full COMP blocks for primary components
@@ -102,6 +187,8 @@ def emit_context_dsl(
         primary_components: Components explicitly requested for context
         neighbor_components: Components found in 1-hop traversal
         nets: Nets connecting primary and neighbor components
+        pin_lookup: Lookup table for primary and neighbor components (built
+                    from them if not given)
 
     Returns:
         Formatted DSL string for the context bubble
@@ -118,48 +205,99 @@ def emit_context_dsl(
         # NETS
         <net blocks>
     """
+    return "\n".join(iter_context_dsl(primary_components, neighbor_components, nets, pin_lookup))
+
+
+def iter_context_dsl(
+    primary_components: List[Component],
+    neighbor_components: List[Component],
+    nets: List[Net],
+    pin_lookup: Optional[PinLookup] = None
+) -> Iterator[str]:
+    """
+    Generate DSL for a context bubble lazily, one block at a time.
+
+    Args:
+        primary_components: Components explicitly requested for context
+        neighbor_components: Components found in the traversal
+        nets: Nets connecting primary and neighbor components
+        pin_lookup: Lookup table for primary and neighbor components (built
+                    from them if not given)
+
+    Yields:
+        DSL blocks (without trailing newlines), as for iter_page_dsl
+    """
     if not primary_components:
-        return "# No components in context\n"
+        yield "# No components in context\n"
+        return
 
     # Sort components and nets
     sorted_primary = sorted(primary_components, key=lambda c: c.refdes)
     sorted_neighbors = sorted(neighbor_components, key=lambda c: c.refdes)
     sorted_nets = sorted(nets, key=lambda n: n.name)
 
-    # Build output
     primary_refdes = ", ".join(c.refdes for c in sorted_primary)
-    lines = [f"# CONTEXT: {primary_refdes}", ""]
+    yield f"# CONTEXT: {primary_refdes}"
+    yield ""
 
     # COMPONENTS section - primary components only
-    lines.append("# COMPONENTS")
+    # (simple primary components are listed inline in nets)
+    yield "# COMPONENTS"
     for comp in sorted_primary:
         if comp.is_complex():
-            block = _format_component_block(comp)
-            lines.append(block)
-        else:
-            # Simple primary components still get listed (but inline in nets)
-            pass
+            yield _format_component_block(comp)
 
-    lines.append("")
+    yield ""
 
     # CONTEXT_NEIGHBORS section - simplified summaries
     if sorted_neighbors:
-        lines.append("# CONTEXT_NEIGHBORS")
+        yield "# CONTEXT_NEIGHBORS"
         for comp in sorted_neighbors:
             # Format: U2 (LM358) - Dual Op-Amp
-            summary = _format_neighbor_summary(comp)
-            lines.append(summary)
-        lines.append("")
+            yield _format_neighbor_summary(comp)
+        yield ""
 
     # NETS section
-    lines.append("# NETS")
-    all_components = sorted_primary + sorted_neighbors
+    yield "# NETS"
+    if pin_lookup is None:
+        pin_lookup = PinLookup(sorted_primary + sorted_neighbors)
     for net in sorted_nets:
         # For context, we don't have full net_page_map, so just use net.pages
-        block = _format_net_block(net, net.pages, all_components)
-        lines.append(block)
+        yield _format_net_block(net, net.pages, pin_lookup)
 
-    return "\n".join(lines)
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of LLM tokens in a piece of DSL text.
+
+    Args:
+        text: DSL text
+
+    Returns:
+        Approximate token count (CHARS_PER_TOKEN characters per token)
+    """
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def estimate_component_tokens(component: Component, primary: bool = False) -> int:
+    """
+    Estimate the tokens a component's own block adds to a context bubble.
+
+    Complex primary components get a COMP block and active neighbors a
+    summary line; passives only appear in NETS and add nothing here.
+
+    Args:
+        component: Component to estimate
+        primary: True for a primary component, False for a neighbor
+
+    Returns:
+        Approximate token count
+    """
+    if primary:
+        return estimate_tokens(_format_component_block(component)) if component.is_complex() else 0
+    if component.is_passive():
+        return 0
+    return estimate_tokens(_format_neighbor_summary(component))
 
 
 def _format_component_block(component: Component) -> str:
@@ -218,7 +356,7 @@ def _format_component_block(component: Component) -> str:
 def _format_net_block(
     net: Net,
     net_pages: Set[str],
-    components: List[Component]
+    pin_lookup: PinLookup
 ) -> str:
     """
     Format a net block with connectivity information.
@@ -240,7 +378,7 @@ def _format_net_block(
     Args:
         net: Net to format
         net_pages: Set of pages where this net appears
-        components: List of components (for pin lookup)
+        pin_lookup: Lookup table for the components' pins
 
     Returns:
         Formatted net block as multi-line string
@@ -265,7 +403,7 @@ def _format_net_block(
     # CON line - format pin references
     pin_refs = []
     for refdes, pin_designator in net.members:
-        pin_ref = _format_pin_reference(refdes, pin_designator, components)
+        pin_ref = _format_pin_reference(refdes, pin_designator, pin_lookup)
         pin_refs.append(pin_ref)
 
     # Sort pin references alphabetically
@@ -287,7 +425,7 @@ def _format_net_block(
 def _format_pin_reference(
     refdes: str,
     pin_designator: str,
-    components: List[Component]
+    pin_lookup: PinLookup
 ) -> str:
     """
     Format a pin reference for inclusion in a net connection list.
@@ -299,36 +437,19 @@ def _format_pin_reference(
     Args:
         refdes: Component reference designator
         pin_designator: Pin number/identifier
-        components: List of components to lookup pin details
+        pin_lookup: Lookup table to find pin details
 
     Returns:
         Formatted pin reference string
     """
-    # Find the component
-    component = None
-    for comp in components:
-        if comp.refdes == refdes:
-            component = comp
-            break
-
-    # If component not found or is simple, just return refdes.pin
-    if not component:
-        return f"{refdes}.{pin_designator}"
-
-    # Find the pin
-    pin = None
-    for p in component.pins:
-        if p.designator == pin_designator:
-            pin = p
-            break
+    pin = pin_lookup.pins.get((refdes, pin_designator))
 
-    # If pin not found or has no name, simple format
+    # If component or pin not found, or pin has no name, simple format
     if not pin or not pin.name:
         return f"{refdes}.{pin_designator}"
 
     # Check if pin name is "simple" (just numeric or A/K)
-    simple_names = {"1", "2", "3", "4", "A", "K"}
-    if pin.name in simple_names:
+    if pin.name in _SIMPLE_PIN_NAMES:
         return f"{refdes}.{pin_designator}"
 
     # Complex pin with semantic name - include it in parentheses
@@ -6,24 +6,75 @@ extraction. It orchestrates data fetching, caching, and high-level queries for
 the DSL emitter.
 
 Key Responsibilities:
-- State management with "Nuke and Rebuild" pattern
+- State management, patching the state when little changed and
+  otherwise nuking and rebuilding it
 - Building the Atlas (net-to-pages mapping)
+- Building lookup indexes so queries touch only the data they return
 - Providing navigation queries (index, page, context)
-- 1-hop traversal for context bubbles
+- Paging through large pages with resumable cursors
+- Budget-aware k-hop traversal for context bubbles
 """
 
-from typing import List, Dict, Set, Optional
+import base64
+import json
+import multiprocessing
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Iterable, Iterator, Set, Optional, Tuple, Union
 
 try:
     from .interfaces import SchematicProvider
-    from .models import Component, Net, Pin
+    from .models import Component, Net, Pin, get_power_net_patterns, set_power_net_patterns
     from . import dsl_emitter
 except ImportError:
     from interfaces import SchematicProvider
-    from models import Component, Net, Pin
+    from models import Component, Net, Pin, get_power_net_patterns, set_power_net_patterns
     import dsl_emitter
 
 
+# Appended to a context bubble cut short by its token budget
+_TRUNCATED_NOTE = "\n\n(Context truncated at the {budget}-token budget)\n"
+
+
+def _init_export_worker(power_net_patterns: Tuple[str, ...]) -> None:
+    """
+    Set up an export worker process.
+
+    Nets are pickled without their classification, so workers must classify
+    them with the parent's power-net patterns rather than the defaults.
+    """
+    set_power_net_patterns(power_net_patterns)
+
+
+def _write_page_dsl(
+    path: str,
+    components: List[Component],
+    nets: List[Net],
+    net_page_map: Dict[str, Set[str]]
+) -> int:
+    """
+    Stream one page's DSL to a file (runs in an export worker process).
+
+    The file is written under a temporary name and renamed when complete.
+
+    Returns:
+        Number of characters written
+    """
+    tmp_path = path + ".tmp"
+    written = 0
+    with open(tmp_path, "w", encoding="utf-8", newline="\n") as f:
+        for i, block in enumerate(dsl_emitter.iter_page_dsl(components, nets, net_page_map)):
+            if i:
+                f.write("\n")
+                written += 1
+            written += f.write(block)
+    os.replace(tmp_path, path)
+    return written
+
+
 class Librarian:
     """
     Central state manager and navigation layer for schematic data.
@@ -35,14 +86,32 @@ class Librarian:
     The Atlas is a key data structure mapping net names to the set of pages
     where they appear, enabling efficient inter-page signal detection.
 
+    Next to the Atlas, refresh() builds lookup indexes so that page, context
+    and lookup queries cost time proportional to what they return rather
+    than to the size of the schematic. Index lists keep the order of the
+    provider's component and net lists.
+
     Attributes:
         provider: SchematicProvider implementation for data fetching
         dirty: Flag indicating if cached data needs refresh
+        revision: Number of rebuilds so far (page cursors are tied to one)
         components: Cached list of all components
         nets: Cached list of all nets
         net_page_map: The Atlas - maps net names to sets of page names
+        components_by_refdes: refdes -> components with that designator
+                              (one per sheet for multi-sheet parts)
+        nets_by_name: net name -> Net
+        page_components: page name -> components placed on the page
+        page_nets: page name -> nets with a member on the page
+        component_nets: refdes -> nets connected to the component
+        pages: All page names, from components and nets
+        incremental_refreshes: Number of refreshes applied as a patch
     """
 
+    # Above this fraction of changed components or nets, refresh() rebuilds
+    # everything instead of patching
+    INCREMENTAL_MAX_CHANGE = 0.25
+
     def __init__(self, provider: SchematicProvider):
         """
         Initialize the Librarian with a data provider.
@@ -52,23 +121,40 @@ class Librarian:
         """
         self.provider = provider
         self.dirty = True
+        self.revision = 0  # Bumped on every rebuild, invalidates page cursors
         self.components: List[Component] = []
         self.nets: List[Net] = []
         self.net_page_map: Dict[str, Set[str]] = {}  # The Atlas
+        self.components_by_refdes: Dict[str, List[Component]] = {}
+        self.nets_by_name: Dict[str, Net] = {}
+        self.page_components: Dict[str, List[Component]] = {}
+        self.page_nets: Dict[str, List[Net]] = {}
+        self.component_nets: Dict[str, List[Net]] = {}
+        self.pages: Set[str] = set()
+        self._page_net_counts: Dict[str, int] = {}
+        self._refdes_position: Dict[str, int] = {}
+        self._net_position: Dict[int, int] = {}  # id(net) -> index in self.nets
+        self._page_hashes: Dict[str, List[int]] = {}  # page -> component content hashes
+        self.incremental_refreshes = 0
 
     def refresh(self) -> None:
         """
-        Nuke and rebuild all state if dirty flag is set.
+        Rebuild all state from the provider if the dirty flag is set.
 
-        This implements the "Nuke and Rebuild" pattern - no incremental updates,
-        just full refresh when needed. If data is already fresh (dirty=False),
-        this is a no-op.
+        If data is already fresh (dirty=False), this is a no-op. Otherwise
+        the new data is diffed against the current state: components per
+        page by content hash, nets by name and contents. When little changed,
+        unchanged component and net objects are kept and only the affected
+        nets, Atlas entries and net indexes are patched. The first refresh,
+        and any refresh where more than INCREMENTAL_MAX_CHANGE of the
+        components or nets changed, nukes and rebuilds everything.
 
         The refresh process:
         1. Fetch raw data from provider
         2. Get normalized components and nets
-        3. Build the Atlas (net-to-pages mapping)
-        4. Clear dirty flag
+        3. Patch, or rebuild, the Atlas (net-to-pages mapping)
+        4. Patch, or rebuild, the lookup indexes and classify changed nets
+        5. Clear dirty flag
 
         Raises:
             Exception: Propagates any exceptions from the provider
@@ -78,16 +164,303 @@ class Librarian:
 
         # Fetch fresh data from provider
         self.provider.fetch_raw_data()
-        self.components = self.provider.get_components()
-        self.nets = self.provider.get_nets()
+        components = self.provider.get_components()
+        nets = self.provider.get_nets()
+
+        page_hashes: Dict[str, List[int]] = {}
+        for comp in components:
+            page_hashes.setdefault(comp.page, []).append(comp.content_hash())
+
+        if self.revision and self._patch(components, nets, page_hashes):
+            self.incremental_refreshes += 1
+        else:
+            self._rebuild(components, nets, page_hashes)
+
+        self.revision += 1
+        self.dirty = False
+
+    def _rebuild(self, components: List[Component], nets: List[Net],
+                 page_hashes: Dict[str, List[int]]) -> None:
+        """Replace all state with the given components and nets."""
+        self.components = components
+        self.nets = nets
 
         # Build the Atlas - map each net name to its set of pages
         self.net_page_map = {}
         for net in self.nets:
             self.net_page_map[net.name] = net.pages
 
+        self._build_indexes()
+        self._page_hashes = page_hashes
+
+    def _patch(self, components: List[Component], nets: List[Net],
+               page_hashes: Dict[str, List[int]]) -> bool:
+        """
+        Patch the current state to the given components and nets.
+
+        Nothing is modified unless the patch is applied.
+
+        Returns:
+            False if the change is too large, or of a kind (duplicate net
+            names, reordered nets) that needs a full rebuild
+        """
+        # Components: pages whose content hashes differ
+        changed_pages = {
+            page for page in page_hashes.keys() | self._page_hashes.keys()
+            if page_hashes.get(page) != self._page_hashes.get(page)
+        }
+        changed_components = 0
+        for page in changed_pages:
+            old = Counter(self._page_hashes.get(page, ()))
+            new = Counter(page_hashes.get(page, ()))
+            changed_components += sum(((old - new) + (new - old)).values())
+        if changed_components > self.INCREMENTAL_MAX_CHANGE * max(len(components), 1):
+            return False
+
+        # Nets: unchanged nets keep their old objects, which must stay in order
+        names = {net.name for net in nets}
+        if len(names) != len(nets) or len(self.nets_by_name) != len(self.nets):
+            return False
+
+        merged_nets: List[Net] = []
+        changed_old: List[Net] = []
+        changed_new: List[Net] = []
+        last_position = -1
+        for net in nets:
+            old = self.nets_by_name.get(net.name)
+            if old is not None and old.members == net.members and old.pages == net.pages:
+                position = self._net_position[id(old)]
+                if position < last_position:
+                    return False
+                last_position = position
+                merged_nets.append(old)
+            else:
+                merged_nets.append(net)
+                changed_new.append(net)
+                if old is not None:
+                    changed_old.append(old)
+        changed_old.extend(net for net in self.nets if net.name not in names)
+        if len(changed_new) + len(changed_old) > self.INCREMENTAL_MAX_CHANGE * max(len(nets), 1):
+            return False
+
+        # Designators on a changed net, with the pages they were on
+        removed_ids = {id(net) for net in changed_old}
+        added: Dict[str, List[Net]] = {}
+        for net in changed_new:
+            for refdes, _pin_designator in net.members:
+                connected = added.setdefault(refdes, [])
+                if not connected or connected[-1] is not net:
+                    connected.append(net)
+        affected_refdes = set(added)
+        for net in changed_old:
+            affected_refdes.update(refdes for refdes, _pin_designator in net.members)
+        affected_pages = set(changed_pages)
+        for refdes in affected_refdes:
+            affected_pages.update(comp.page for comp in self.components_by_refdes.get(refdes, ()))
+
+        self._patch_components(components, changed_pages)
+        self._page_hashes = page_hashes
+
+        # Atlas, name index and per-page counts of the changed nets
+        self.nets = merged_nets
+        self._net_position = dict(zip(map(id, merged_nets), range(len(merged_nets))))
+        for net in changed_old:
+            for page in net.pages:
+                count = self._page_net_counts[page] - 1
+                if count:
+                    self._page_net_counts[page] = count
+                else:
+                    del self._page_net_counts[page]
+            if net.name not in names:
+                del self.net_page_map[net.name]
+                del self.nets_by_name[net.name]
+        for net in changed_new:
+            net.classify()
+            self.net_page_map[net.name] = net.pages
+            self.nets_by_name[net.name] = net
+            for page in net.pages:
+                self._page_net_counts[page] = self._page_net_counts.get(page, 0) + 1
+
+        # Connected nets of those designators
+        for refdes in affected_refdes:
+            connected = [
+                net for net in self.component_nets.get(refdes, ())
+                if id(net) not in removed_ids
+            ]
+            connected.extend(added.get(refdes, ()))
+            if connected:
+                connected.sort(key=lambda net: self._net_position[id(net)])
+                self.component_nets[refdes] = connected
+            else:
+                self.component_nets.pop(refdes, None)
+            affected_pages.update(comp.page for comp in self.components_by_refdes.get(refdes, ()))
+
+        # Page net lists of changed pages and of pages holding those designators
+        for page in affected_pages:
+            on_page: List[Net] = []
+            seen: Set[int] = set()
+            for comp in self.page_components.get(page, ()):
+                for net in self.component_nets.get(comp.refdes, ()):
+                    if id(net) not in seen:
+                        seen.add(id(net))
+                        on_page.append(net)
+            if on_page:
+                on_page.sort(key=lambda net: self._net_position[id(net)])
+                self.page_nets[page] = on_page
+            else:
+                self.page_nets.pop(page, None)
+
+        self.pages = set(self.page_components) | set(self._page_net_counts)
+        return True
+
+    def _patch_components(self, components: List[Component], changed_pages: Set[str]) -> None:
+        """
+        Patch the component indexes to the given components.
+
+        Components on unchanged pages keep their old objects, and only the
+        index entries of changed pages and their designators are rebuilt.
+        """
+        taken: Dict[str, int] = {}
+        changed: Dict[str, List[Component]] = {}
+        changed_by_refdes: Dict[str, List[Component]] = {}
+        merged: List[Component] = []
+        for comp in components:
+            if comp.page in changed_pages:
+                merged.append(comp)
+                changed.setdefault(comp.page, []).append(comp)
+                changed_by_refdes.setdefault(comp.refdes, []).append(comp)
+            else:
+                index = taken.get(comp.page, 0)
+                merged.append(self.page_components[comp.page][index])
+                taken[comp.page] = index + 1
+
+        affected_refdes: Set[str] = set()
+        for page in changed_pages:
+            affected_refdes.update(comp.refdes for comp in self.page_components.get(page, ()))
+            if page in changed:
+                self.page_components[page] = changed[page]
+                affected_refdes.update(comp.refdes for comp in changed[page])
+            else:
+                self.page_components.pop(page, None)
+
+        self.components = merged
+        refdes_list = [comp.refdes for comp in merged]
+        # Reversed, so the first position of each designator is kept
+        self._refdes_position = dict(zip(reversed(refdes_list), range(len(merged) - 1, -1, -1)))
+        positions = dict(zip(map(id, merged), range(len(merged))))
+
+        for refdes in affected_refdes:
+            comps = [
+                comp for comp in self.components_by_refdes.get(refdes, ())
+                if comp.page not in changed_pages
+            ]
+            comps.extend(changed_by_refdes.get(refdes, ()))
+            if comps:
+                comps.sort(key=lambda comp: positions[id(comp)])
+                self.components_by_refdes[refdes] = comps
+            else:
+                del self.components_by_refdes[refdes]
+
+        # Multi-part designators spread over unchanged pages may have moved
+        # relative to each other
+        for refdes, comps in self.components_by_refdes.items():
+            if len(comps) > 1 and refdes not in affected_refdes:
+                comps.sort(key=lambda comp: positions[id(comp)])
+
+    def _index_components(self) -> Dict[str, List[str]]:
+        """
+        Build the component indexes from the current components.
+
+        Returns:
+            refdes -> pages with a component of that designator
+        """
+        self.components_by_refdes = {}
+        self.page_components = {}
+        self._refdes_position = {}
+        refdes_pages: Dict[str, List[str]] = {}
+
+        for position, comp in enumerate(self.components):
+            self.components_by_refdes.setdefault(comp.refdes, []).append(comp)
+            self.page_components.setdefault(comp.page, []).append(comp)
+            self._refdes_position.setdefault(comp.refdes, position)
+            pages = refdes_pages.setdefault(comp.refdes, [])
+            if comp.page not in pages:
+                pages.append(comp.page)
+
+        return refdes_pages
+
+    def _build_indexes(self) -> None:
+        """Build the lookup indexes from the current components and nets, classifying each net."""
+        refdes_pages = self._index_components()
+
+        self.nets_by_name = {}
+        self.page_nets = {}
+        self.component_nets = {}
+        self._page_net_counts = {}
+        self._net_position = {}
+
+        for position, net in enumerate(self.nets):
+            net.classify()  # Fresh classification flags for the fresh data
+            self.nets_by_name.setdefault(net.name, net)
+            self._net_position[id(net)] = position
+            for page in net.pages:
+                self._page_net_counts[page] = self._page_net_counts.get(page, 0) + 1
+
+            # Nets are visited in order, so a net already added for this
+            # refdes or page is always the last entry of its list
+            for refdes, _pin_designator in net.members:
+                connected = self.component_nets.setdefault(refdes, [])
+                if connected and connected[-1] is net:
+                    continue
+                connected.append(net)
+                for page in refdes_pages.get(refdes, ()):
+                    on_page = self.page_nets.setdefault(page, [])
+                    if not on_page or on_page[-1] is not net:
+                        on_page.append(net)
+
+        self.pages = set(self.page_components) | set(self._page_net_counts)
+
+    # refresh() state saved by snapshots; _net_position (keyed by id()) and
+    # _page_hashes (str hashes differ between processes) are rebuilt on restore
+    _SNAPSHOT_FIELDS = (
+        "components", "nets", "net_page_map", "components_by_refdes", "nets_by_name",
+        "page_components", "page_nets", "component_nets", "pages",
+        "_page_net_counts", "_refdes_position",
+    )
+
+    def snapshot_state(self) -> Dict[str, object]:
+        """State built by refresh(), for saving in a snapshot (see snapshot.py)."""
+        return {name: getattr(self, name) for name in self._SNAPSHOT_FIELDS}
+
+    def restore_snapshot_state(self, state: Dict[str, object]) -> None:
+        """
+        Replace the current state with one from snapshot_state().
+
+        Nets are classified again, since the power-rail patterns may differ
+        from those in use when the snapshot was taken. The Librarian is left
+        clean; a new revision invalidates outstanding page cursors.
+        """
+        for name in self._SNAPSHOT_FIELDS:
+            setattr(self, name, state[name])
+        self._net_position = {}
+        for position, net in enumerate(self.nets):
+            net.classify()
+            self._net_position[id(net)] = position
+        self._page_hashes = {
+            page: [comp.content_hash() for comp in comps]
+            for page, comps in self.page_components.items()
+        }
+        self.revision += 1
         self.dirty = False
 
+    def _components_for(self, refdes_set: Iterable[str]) -> List[Component]:
+        """Components with the given designators, in component list order."""
+        ordered = sorted(
+            (r for r in refdes_set if r in self.components_by_refdes),
+            key=self._refdes_position.__getitem__
+        )
+        return [comp for refdes in ordered for comp in self.components_by_refdes[refdes]]
+
     def get_index(self) -> str:
         """
         Generate high-level schematic overview with page list and inter-page signals.
@@ -119,30 +492,15 @@ class Librarian:
 
         lines = ["# SCHEMATIC INDEX", ""]
 
-        # Build page statistics
-        # Group components by page
-        page_component_counts: Dict[str, int] = {}
-        for comp in self.components:
-            page_component_counts[comp.page] = page_component_counts.get(comp.page, 0) + 1
-
-        # Group nets by page (count nets that appear on each page)
-        page_net_counts: Dict[str, int] = {}
-        for net in self.nets:
-            for page in net.pages:
-                page_net_counts[page] = page_net_counts.get(page, 0) + 1
-
-        # Get all unique pages (from both components and nets)
-        all_pages = set(page_component_counts.keys()) | set(page_net_counts.keys())
-
-        # Pages section
+        # Pages section (component and net counts come from the indexes)
         lines.append("## Pages")
-        if not all_pages:
+        if not self.pages:
             lines.append("(No pages found)")
         else:
             # Sort pages alphabetically
-            for page in sorted(all_pages):
-                comp_count = page_component_counts.get(page, 0)
-                net_count = page_net_counts.get(page, 0)
+            for page in sorted(self.pages):
+                comp_count = len(self.page_components.get(page, ()))
+                net_count = self._page_net_counts.get(page, 0)
                 lines.append(f"- {page} ({comp_count} components, {net_count} nets)")
 
         lines.append("")
@@ -188,52 +546,120 @@ class Librarian:
         Notes:
             - If page doesn't exist, returns a message indicating that
             - Only includes nets that have at least one connection on this page
-            - Uses dsl_emitter.emit_page_dsl() for actual formatting
+            - Uses dsl_emitter.iter_page_dsl() for actual formatting
+        """
+        return "\n".join(self.iter_page(page_name))
+
+    def iter_page(self, page_name: str, start: int = 0) -> Iterator[str]:
+        """
+        Generate the DSL of a single schematic page lazily, block by block.
+
+        Args:
+            page_name: Name of the page to retrieve
+            start: Index of the first block to yield (earlier blocks are not formatted)
+
+        Yields:
+            DSL blocks; joined with newlines they give get_page(page_name)
         """
         self.refresh()
 
-        # Filter components for this page
-        page_components = [c for c in self.components if c.page == page_name]
+        page_components = self.page_components.get(page_name, [])
 
-        # Check if page exists
-        if not page_components:
-            # Check if page exists in nets
-            page_exists = any(page_name in net.pages for net in self.nets)
-            if not page_exists:
-                return f"# PAGE: {page_name}\n\n(Page not found in schematic)\n"
-            else:
-                # Page exists but has no components (only nets)
-                page_components = []
+        # Check if page exists (it may have nets but no components)
+        if not page_components and page_name not in self.pages:
+            if start == 0:
+                yield f"# PAGE: {page_name}\n\n(Page not found in schematic)\n"
+            return
 
-        # Filter nets to include only those with pins on this page
-        # A net appears on this page if any of its member components are on this page
-        page_component_refdes = {c.refdes for c in page_components}
-        page_nets = []
-        for net in self.nets:
-            # Check if any net member is on this page
-            has_connection_on_page = any(
-                refdes in page_component_refdes
-                for refdes, pin_designator in net.members
-            )
-            if has_connection_on_page:
-                page_nets.append(net)
+        # Only nets with at least one member component on this page
+        page_nets = self.page_nets.get(page_name, [])
 
         # Use DSL emitter to format the page
-        return dsl_emitter.emit_page_dsl(page_components, page_nets, self.net_page_map)
+        yield from dsl_emitter.iter_page_dsl(page_components, page_nets, self.net_page_map, start=start)
+
+    def get_page_chunk(
+        self,
+        page_name: str,
+        cursor: Optional[str] = None,
+        max_tokens: Optional[int] = None
+    ) -> Tuple[str, Optional[str]]:
+        """
+        Get one chunk of a page's DSL, resuming where a previous chunk ended.
+
+        Blocks are emitted until the next one would take the chunk past
+        max_tokens (a chunk always holds at least one block). Chunks joined
+        with newlines give get_page(page_name).
+
+        Args:
+            page_name: Name of the page to retrieve
+            cursor: Opaque cursor returned with the previous chunk (None to
+                    start at the beginning of the page)
+            max_tokens: Approximate maximum chunk size in tokens (None = rest
+                        of the page)
 
-    def get_context(self, refdes_list: List[str]) -> str:
+        Returns:
+            (DSL chunk, cursor for the next chunk or None after the last one)
+
+        Raises:
+            ValueError: If the cursor is malformed, belongs to another page,
+                        or the design has changed since it was issued
+        """
+        start = self._decode_page_cursor(cursor, page_name) if cursor else 0
+
+        # The emitter resumes at the cursor's block without formatting the ones before it
+        chunk: List[str] = []
+        tokens = 0
+        for block in self.iter_page(page_name, start):
+            cost = dsl_emitter.estimate_tokens(block) + 1
+            if chunk and max_tokens is not None and tokens + cost > max_tokens:
+                return "\n".join(chunk), self._encode_page_cursor(page_name, start + len(chunk))
+            chunk.append(block)
+            tokens += cost
+
+        return "\n".join(chunk), None
+
+    def _encode_page_cursor(self, page_name: str, block: int) -> str:
+        payload = json.dumps({"page": page_name, "block": block, "revision": self.revision})
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+    def _decode_page_cursor(self, cursor: str, page_name: str) -> int:
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            cursor_page, block, revision = payload["page"], int(payload["block"]), payload["revision"]
+        except (ValueError, TypeError, KeyError):
+            raise ValueError(f"Invalid page cursor: {cursor!r}")
+
+        if cursor_page != page_name:
+            raise ValueError(f"Cursor belongs to page {cursor_page!r}, not {page_name!r}")
+        self.refresh()
+        if revision != self.revision:
+            raise ValueError("The design changed since this cursor was issued; request the page again without a cursor")
+        return block
+
+    def get_context(
+        self,
+        refdes_list: List[str],
+        hops: int = 1,
+        token_budget: Optional[int] = None
+    ) -> str:
         """
-        Generate DSL for context bubble around specific components (1-hop traversal).
+        Generate DSL for context bubble around specific components (k-hop traversal).
 
-        This performs a 1-hop traversal from the primary components:
+        This performs a breadth-first traversal from the primary components:
         1. Get primary components (those in refdes_list)
-        2. Find all nets connected to primary component pins
-        3. Find all neighbor components connected to those nets
+        2. Expand closest-first over the component-net graph for up to `hops`
+           hops; global nets (GND, VCC, ...) are shown but never traversed,
+           so a power rail does not pull the whole design into the bubble
+        3. Stop early once the estimated output reaches `token_budget`
         4. Classify neighbors as passive (inline) or active (summary)
-        5. Handle global nets by potentially truncating connections
+        5. Filter net members to the components in the bubble
 
         Args:
             refdes_list: List of component reference designators to build context around
+            hops: Number of net hops to expand (1 = direct neighbors)
+            token_budget: Approximate maximum size of the output in tokens
+                          (None = unbounded). Primary components are always
+                          included.
 
         Returns:
             Formatted DSL string showing context bubble with primary components,
@@ -258,72 +684,117 @@ class Librarian:
             return "# CONTEXT: (empty)\n\n(No components specified for context)\n"
 
         # Step 1: Get primary components
-        primary_components = [c for c in self.components if c.refdes in refdes_list]
+        primary_components = self._components_for(set(refdes_list))
 
         # Handle case where none of the requested components exist
         if not primary_components:
             missing = ", ".join(refdes_list)
             return f"# CONTEXT: {missing}\n\n(Components not found in schematic)\n"
 
-        # Step 2: Find all nets connected to primary components
+        # Steps 2-3: Breadth-first expansion within the budget
         primary_refdes_set = {c.refdes for c in primary_components}
-        connected_nets = []
-
-        for net in self.nets:
-            # Check if any member of this net is a primary component
-            has_primary = any(
-                refdes in primary_refdes_set
-                for refdes, pin_designator in net.members
-            )
-            if has_primary:
-                connected_nets.append(net)
-
-        # Step 3: Find all neighbor components on those nets
-        neighbor_refdes_set = set()
-
-        for net in connected_nets:
-            for refdes, pin_designator in net.members:
-                # Add to neighbors if not a primary component
-                if refdes not in primary_refdes_set:
-                    neighbor_refdes_set.add(refdes)
-
-        # Get full neighbor component objects
-        all_neighbors = [c for c in self.components if c.refdes in neighbor_refdes_set]
+        distance, expanded_nets, truncated = self._expand_context(
+            primary_components, hops, token_budget
+        )
+        connected_nets = [expanded_nets[position] for position in sorted(expanded_nets)]
 
         # Step 4: Classify neighbors - only active (non-passive) go in CONTEXT_NEIGHBORS
         # Passive components will appear inline in NET lines only
+        all_neighbors = self._components_for(set(distance) - primary_refdes_set)
         neighbor_components = [c for c in all_neighbors if not c.is_passive()]
 
-        # Step 5: Handle global nets
-        # For context DSL, we may want to filter global net members to only show
-        # connections relevant to the context (primary + neighbors)
-        context_refdes = primary_refdes_set | neighbor_refdes_set
-        context_nets = []
-
-        for net in connected_nets:
-            # Filter net members to only those in our context
-            filtered_members = [
-                (refdes, pin_designator)
-                for refdes, pin_designator in net.members
-                if refdes in context_refdes
-            ]
-
-            # Create a filtered version of the net for context
-            # We need to preserve the original net structure but with filtered members
-            # Create a new Net object with filtered data
-            context_net = Net(
+        # Step 5: Filter net members to only those in our context
+        context_nets = [
+            Net(
                 name=net.name,
                 pages=net.pages,
-                members=filtered_members
+                members=[(refdes, pin) for refdes, pin in net.members if refdes in distance]
             )
-            context_nets.append(context_net)
+            for net in connected_nets
+        ]
 
         # Use DSL emitter to format the context
-        return dsl_emitter.emit_context_dsl(
+        dsl = dsl_emitter.emit_context_dsl(
             primary_components,
             neighbor_components,
             context_nets
         )
+        if truncated:
+            dsl += _TRUNCATED_NOTE.format(budget=token_budget)
+        return dsl
+
+    def _expand_context(
+        self,
+        primary_components: List[Component],
+        hops: int,
+        token_budget: Optional[int]
+    ) -> Tuple[Dict[str, int], Dict[int, Net], bool]:
+        """
+        Breadth-first traversal of the component-net graph for get_context.
+
+        Components are visited closest-first. Each net and component adds its
+        estimated share of the output; the traversal stops at the first one
+        that would take the estimate past the budget.
+
+        Returns:
+            (refdes -> hop distance, net position -> expanded net, truncated)
+        """
+        distance: Dict[str, int] = {c.refdes: 0 for c in primary_components}
+        expanded: Dict[int, Net] = {}
+        headers = f"# CONTEXT: {', '.join(distance)}\n\n# COMPONENTS\n\n# CONTEXT_NEIGHBORS\n\n# NETS\n"
+        if token_budget is not None:
+            headers += _TRUNCATED_NOTE.format(budget=token_budget)  # Room for the note
+        spent = dsl_emitter.estimate_tokens(headers) + sum(
+            dsl_emitter.estimate_component_tokens(c, primary=True) for c in primary_components
+        )
+
+        def fits(cost: int) -> bool:
+            nonlocal spent
+            if token_budget is not None and spent + cost > token_budget:
+                return False
+            spent += cost
+            return True
+
+        frontier = sorted(distance, key=self._refdes_position.__getitem__)
+        for hop in range(1, hops + 1):
+            next_frontier = []
+            for refdes in frontier:
+                for net in self.component_nets.get(refdes, ()):
+                    position = self._net_position[id(net)]
+                    if position in expanded:
+                        continue
+                    if not fits(dsl_emitter.estimate_tokens(f"NET {net.name}\n  CON: \n")):
+                        return distance, expanded, True
+                    expanded[position] = net
+
+                    traverse = not net.is_global()
+                    for member, pin_designator in net.members:
+                        if member in distance:
+                            cost = 0
+                        elif traverse:
+                            cost = sum(
+                                dsl_emitter.estimate_component_tokens(c)
+                                for c in self.components_by_refdes.get(member, ())
+                            )
+                        else:
+                            continue  # Not shown: global net outside the bubble
+                        if not fits(cost + self._pin_reference_tokens(member, pin_designator)):
+                            return distance, expanded, True
+                        if member not in distance:
+                            distance[member] = hop
+                            next_frontier.append(member)
+            frontier = next_frontier
+
+        return distance, expanded, False
+
+    def _pin_reference_tokens(self, refdes: str, pin_designator: str) -> int:
+        """Estimated tokens of one pin reference in a CON line, e.g. "U1.22(PA9_TX), "."""
+        pin_name = next(
+            (pin.name for comp in self.components_by_refdes.get(refdes, ())
+             for pin in comp.pins if pin.designator == pin_designator),
+            ""
+        )
+        return dsl_emitter.estimate_tokens(f"{refdes}.{pin_designator}({pin_name}), ")
 
     def mark_dirty(self) -> None:
         """
@@ -346,18 +817,7 @@ class Librarian:
             enumerate available pages.
         """
         self.refresh()
-
-        pages = set()
-
-        # Get pages from components
-        for comp in self.components:
-            pages.add(comp.page)
-
-        # Get pages from nets
-        for net in self.nets:
-            pages.update(net.pages)
-
-        return sorted(pages)
+        return sorted(self.pages)
 
     def get_component(self, refdes: str) -> Optional[Component]:
         """
@@ -375,11 +835,8 @@ class Librarian:
         """
         self.refresh()
 
-        for comp in self.components:
-            if comp.refdes == refdes:
-                return comp
-
-        return None
+        matches = self.components_by_refdes.get(refdes)
+        return matches[0] if matches else None
 
     def get_net(self, net_name: str) -> Optional[Net]:
         """
@@ -396,12 +853,7 @@ class Librarian:
             query individual nets.
         """
         self.refresh()
-
-        for net in self.nets:
-            if net.name == net_name:
-                return net
-
-        return None
+        return self.nets_by_name.get(net_name)
 
     def get_stats(self) -> Dict[str, int]:
         """
@@ -423,9 +875,88 @@ class Librarian:
         stats = {
             'total_components': len(self.components),
             'total_nets': len(self.nets),
-            'total_pages': len(self.get_all_pages()),
+            'total_pages': len(self.pages),
             'inter_page_nets': sum(1 for net in self.nets if net.is_inter_page()),
             'global_nets': sum(1 for net in self.nets if net.is_global()),
         }
 
         return stats
+
+    def export_all(
+        self,
+        out_dir: Union[str, Path],
+        max_workers: Optional[int] = None
+    ) -> Dict[str, object]:
+        """
+        Write the index and every page's DSL to files.
+
+        Pages are emitted in parallel by a process pool, each worker
+        streaming its page to disk block by block. Workers classify nets
+        with this process's power-net patterns. The index is written to
+        index.dsl and each page to <page name>.dsl (characters that are not
+        safe in file names are replaced by "_").
+
+        Args:
+            out_dir: Directory to write to (created if missing)
+            max_workers: Number of worker processes (default: one per CPU,
+                         at most one per page). 1 emits in this process.
+
+        Returns:
+            Dictionary with:
+            - index: Path of the index file
+            - pages: page name -> {"file": path, "chars": characters written}
+        """
+        self.refresh()
+
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+
+        index_path = out_dir / "index.dsl"
+        index_path.write_text(self.get_index(), encoding="utf-8", newline="\n")
+
+        jobs = []
+        used_names: Set[str] = {index_path.name.lower()}
+        for page in sorted(self.pages):
+            file_name = self._page_file_name(page, used_names)
+            components = self.page_components.get(page, [])
+            nets = self.page_nets.get(page, [])
+            net_page_map = {net.name: self.net_page_map.get(net.name, set()) for net in nets}
+            jobs.append((page, str(out_dir / file_name), components, nets, net_page_map))
+
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        max_workers = max(1, min(max_workers, len(jobs)))
+
+        if max_workers == 1:
+            written = [_write_page_dsl(*job[1:]) for job in jobs]
+        else:
+            # Spawned (as on Windows) on every platform, so workers start
+            # from the same clean state wherever the export runs
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_export_worker,
+                initargs=(get_power_net_patterns(),)
+            ) as pool:
+                futures = [pool.submit(_write_page_dsl, *job[1:]) for job in jobs]
+                written = [future.result() for future in futures]
+
+        return {
+            "index": str(index_path),
+            "pages": {
+                job[0]: {"file": job[1], "chars": chars}
+                for job, chars in zip(jobs, written)
+            },
+        }
+
+    @staticmethod
+    def _page_file_name(page: str, used_names: Set[str]) -> str:
+        """File name for a page's DSL, unique (case-insensitively) within one export."""
+        stem = re.sub(r"[^\w.\-]+", "_", page).strip("._") or "page"
+        name = f"{stem}.dsl"
+        suffix = 2
+        while name.lower() in used_names:
+            name = f"{stem}_{suffix}.dsl"
+            suffix += 1
+        used_names.add(name.lower())
+        return name
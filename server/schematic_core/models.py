@@ -4,14 +4,93 @@ Core data models for the Unified Schematic DSL Generator.
 This module provides tool-agnostic data structures representing electronic
 schematic components, pins, and nets. These models form the foundation for
 the schematic core library and are used by all provider adapters.
+
+The models are slotted dataclasses: a full design holds hundreds of
+thousands of Pin objects, and dropping the per-instance __dict__ roughly
+halves their size. Adapters are expected to intern repeated strings (net,
+page and refdes names) so that pins and net members share one copy.
+
+Classification is cached: refdes prefixes map to types through a memoized
+table, and each Net stores its is_global flag until the power-rail patterns
+change (see set_power_net_patterns).
 """
 
 from dataclasses import dataclass, field
-from typing import List, Set, Tuple, Dict, Optional
+from functools import lru_cache
+from typing import Iterable, List, Set, Tuple, Dict, Optional
 import re
 
 
-@dataclass
+# Power/ground net naming patterns (matched at the start of the name,
+# case-insensitive):
+# - GND, PGND, VSS, VCC, VDD, VEE, VBAT, optionally followed by _<anything>
+# - voltage rails like 3V3, 3.3V, +5V, 12V, 1V8
+# - domain-specific like NET_GND, SIGNAL_VCC
+DEFAULT_POWER_NET_PATTERNS: Tuple[str, ...] = (
+    r'^(P?GND|VSS|VCC|VDD|VEE|VBAT)($|_.*)',
+    r'^(\+?(\d+\.?\d*V\d*|\d*\.?\d*V\d+)|\+?(\d+V))',
+    r'^.*_(GND|VCC|VDD)$',
+)
+
+_power_net_patterns: Tuple[str, ...] = DEFAULT_POWER_NET_PATTERNS
+_power_net_regex = re.compile("|".join(f"(?:{p})" for p in _power_net_patterns), re.IGNORECASE)
+_power_net_version = 0  # Bumped when the patterns change; stale Net flags are recomputed
+
+
+def set_power_net_patterns(patterns: Iterable[str]) -> None:
+    """
+    Replace the regular expressions that mark a net as a power/ground rail.
+
+    Patterns are matched case-insensitively at the start of the net name.
+    Use DEFAULT_POWER_NET_PATTERNS + (...) to extend the defaults.
+
+    Args:
+        patterns: Regular expressions
+
+    Raises:
+        re.error: If a pattern does not compile
+    """
+    global _power_net_patterns, _power_net_regex, _power_net_version
+    patterns = tuple(patterns)
+    regex = re.compile("|".join(f"(?:{p})" for p in patterns) or "(?!)", re.IGNORECASE)
+    _power_net_patterns, _power_net_regex = patterns, regex
+    _power_net_version += 1
+
+
+def get_power_net_patterns() -> Tuple[str, ...]:
+    """Regular expressions currently marking a net as a power/ground rail."""
+    return _power_net_patterns
+
+
+# Reference designator prefix -> component type (spec section 3.2)
+_PREFIX_TYPES: Dict[str, str] = {
+    "R": "RES",
+    "C": "CAP",
+    "L": "IND", "FB": "IND",
+    "F": "FUSE",
+    "D": "DIODE", "LED": "DIODE",
+    "Q": "TRANSISTOR",
+    "U": "IC",
+    "J": "CONN", "P": "CONN", "CN": "CONN", "CONN": "CONN",
+    "SW": "SWITCH",
+    "X": "OSC", "Y": "OSC",
+}
+
+_PASSIVE_TYPES = frozenset({"RES", "CAP", "IND", "FUSE"})
+
+
+@lru_cache(maxsize=1 << 16)
+def _refdes_type(refdes: str) -> str:
+    """Component type for a reference designator, memoized per refdes."""
+    # Extract prefix from refdes (e.g., "U" from "U1", "FB" from "FB3")
+    # Handle multi-part components (e.g., "U1A" -> "U")
+    end = 0
+    while end < len(refdes) and refdes[end].isalpha():
+        end += 1
+    return _PREFIX_TYPES.get(refdes[:end].upper(), "ACTIVE")
+
+
+@dataclass(slots=True)
 class Pin:
     """
     Represents a single pin on a component.
@@ -25,8 +104,12 @@ class Pin:
     name: str
     net: str
 
+    def __reduce__(self):
+        # Positional arguments pickle much smaller and faster than slot state
+        return (Pin, (self.designator, self.name, self.net))
 
-@dataclass
+
+@dataclass(slots=True)
 class Component:
     """
     Represents an electronic component in the schematic.
@@ -55,6 +138,27 @@ class Component:
     properties: Dict[str, str]
     multipart_parent: Optional[str] = None
 
+    def __reduce__(self):
+        return (Component, (
+            self.refdes, self.value, self.footprint, self.mpn, self.page, self.description,
+            self.pins, self.location, self.properties, self.multipart_parent
+        ))
+
+    def content_hash(self) -> int:
+        """
+        Hash of every field, for diffing designs and refreshes.
+
+        Like hash(), the value is only comparable within one process.
+        """
+        pins = tuple((pin.designator, pin.name, pin.net) for pin in self.pins)
+        try:
+            return hash((self.refdes, self.value, self.footprint, self.mpn, self.page, self.description,
+                         pins, tuple(self.location), tuple(self.properties.items()),
+                         self.multipart_parent))
+        except TypeError:
+            # Unhashable property values
+            return hash((self.refdes, self.page, pins, repr(self)))
+
     def derived_type(self) -> str:
         """
         Map reference designator prefix to standard component type category.
@@ -63,40 +167,7 @@ class Component:
             Component type string (RES, CAP, IND, FUSE, DIODE, TRANSISTOR,
             IC, CONN, SWITCH, OSC, or ACTIVE)
         """
-        # Extract prefix from refdes (e.g., "U" from "U1", "FB" from "FB3")
-        # Handle multi-part components (e.g., "U1A" -> "U")
-        prefix = ""
-        for char in self.refdes:
-            if char.isalpha():
-                prefix += char
-            else:
-                break
-
-        prefix_upper = prefix.upper()
-
-        # Type mapping table from spec section 3.2
-        if prefix_upper == "R":
-            return "RES"
-        elif prefix_upper == "C":
-            return "CAP"
-        elif prefix_upper in ("L", "FB"):
-            return "IND"
-        elif prefix_upper == "F":
-            return "FUSE"
-        elif prefix_upper in ("D", "LED"):
-            return "DIODE"
-        elif prefix_upper == "Q":
-            return "TRANSISTOR"
-        elif prefix_upper == "U":
-            return "IC"
-        elif prefix_upper in ("J", "P", "CN", "CONN"):
-            return "CONN"
-        elif prefix_upper == "SW":
-            return "SWITCH"
-        elif prefix_upper in ("X", "Y"):
-            return "OSC"
-        else:
-            return "ACTIVE"
+        return _refdes_type(self.refdes)
 
     def is_complex(self) -> bool:
         """
@@ -129,11 +200,10 @@ class Component:
         Returns:
             True if component type is RES, CAP, IND, or FUSE
         """
-        passive_types = {"RES", "CAP", "IND", "FUSE"}
-        return self.derived_type() in passive_types
+        return _refdes_type(self.refdes) in _PASSIVE_TYPES
 
 
-@dataclass
+@dataclass(slots=True)
 class Net:
     """
     Represents a net (electrical connection) in the schematic.
@@ -147,34 +217,51 @@ class Net:
     name: str
     pages: Set[str] = field(default_factory=set)
     members: List[Tuple[str, str]] = field(default_factory=list)
+    _global: Optional[bool] = field(default=None, init=False, repr=False, compare=False)
+    _classified_version: int = field(default=-1, init=False, repr=False, compare=False)
+
+    def __reduce__(self):
+        # The classification is not pickled: patterns may differ where it is loaded
+        return (Net, (self.name, self.pages, self.members))
+
+    def content_hash(self) -> int:
+        """
+        Hash of the net's members and pages, independent of member order.
+
+        Like hash(), the value is only comparable within one process.
+        """
+        return hash((self.name, frozenset(self.members), frozenset(self.pages)))
 
     def is_global(self) -> bool:
         """
         Determine if net should be summarized rather than fully expanded.
 
-        A net is considered global if it matches common power/ground patterns,
+        A net is considered global if it matches the power/ground patterns,
         has many connections (>15), or spans many pages (>3).
 
+        The result is stored on the net (see classify()) and only recomputed
+        after the power-rail patterns change.
+
         Returns:
             True if net should be summarized in DSL output
         """
-        # Check power/ground net naming patterns
-        # Pattern matches: GND, PGND, VSS, VCC, VDD, VEE, VBAT,
-        # voltage rails like 3V3, 3.3V, +5V, 12V, 1V8, etc.
-        # and domain-specific like NET_GND, SIGNAL_VCC, VCC_DIGITAL
-        power_pattern = r'^(P?GND|VSS|VCC|VDD|VEE|VBAT)($|_.*)|^(\+?(\d+\.?\d*V\d*|\d*\.?\d*V\d+)|\+?(\d+V))|^.*_(GND|VCC|VDD)$'
-        if re.match(power_pattern, self.name, re.IGNORECASE):
-            return True
-
-        # More than 15 connections
-        if len(self.members) > 15:
-            return True
+        if self._classified_version != _power_net_version:
+            self.classify()
+        return self._global
 
-        # More than 3 pages
-        if len(self.pages) > 3:
-            return True
+    def classify(self) -> None:
+        """
+        Compute and store the net's classification.
 
-        return False
+        Called by the Librarian on refresh; call it again after changing the
+        members or pages of a net that has already been classified.
+        """
+        self._global = (
+            _power_net_regex.match(self.name) is not None
+            or len(self.members) > 15  # More than 15 connections
+            or len(self.pages) > 3  # More than 3 pages
+        )
+        self._classified_version = _power_net_version
 
     def is_inter_page(self) -> bool:
         """
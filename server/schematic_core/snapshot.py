@@ -0,0 +1,130 @@
+"""
+Design snapshots - a Librarian's normalized state on disk
+
+A snapshot holds everything refresh() builds (components, nets, the Atlas
+and the lookup indexes), so a restarted server can answer queries without
+exporting and normalizing the design again.
+
+File layout:
+    MAGIC | header length (8 bytes, little endian) | header | state
+
+The header is a small pickle with the caller's metadata (for example the
+key a snapshot is valid for) and can be read without touching the state.
+The state is a protocol 5 pickle that is only read by load_snapshot, so
+checking whether a snapshot is usable stays cheap however large the design.
+
+Snapshots are written with pickle and must only be loaded from a directory
+the server itself writes to.
+"""
+
+import gc
+import os
+import pickle
+import struct
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+try:
+    from .interfaces import SchematicProvider
+    from .librarian import Librarian
+except ImportError:
+    from interfaces import SchematicProvider
+    from librarian import Librarian
+
+
+# Bumped whenever the models or the Librarian state change shape
+SNAPSHOT_FORMAT = 1
+
+_MAGIC = b"SCHSNAP\x00"
+_LENGTH = struct.Struct("<Q")
+
+
+def save_snapshot(
+    librarian: Librarian,
+    path: Union[str, Path],
+    header: Optional[Dict[str, Any]] = None
+) -> None:
+    """
+    Write a Librarian's state to a snapshot file.
+
+    The Librarian is refreshed first. The file is written under a temporary
+    name and renamed when complete, so readers never see a partial snapshot.
+
+    Args:
+        librarian: Librarian to save
+        path: Snapshot file path
+        header: Metadata stored next to the state (must be picklable)
+    """
+    librarian.refresh()
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    header_bytes = pickle.dumps({**(header or {}), "format": SNAPSHOT_FORMAT}, protocol=5)
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_MAGIC)
+        f.write(_LENGTH.pack(len(header_bytes)))
+        f.write(header_bytes)
+        pickle.dump(librarian.snapshot_state(), f, protocol=5)
+    os.replace(tmp_path, path)
+
+
+def read_snapshot_header(path: Union[str, Path]) -> Optional[Dict[str, Any]]:
+    """
+    Read a snapshot's header without loading its state.
+
+    Returns:
+        The header, or None if the file is missing, not a snapshot or was
+        written in another snapshot format
+    """
+    try:
+        with open(path, "rb") as f:
+            header = _read_header(f)
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, struct.error):
+        return None
+    if not isinstance(header, dict) or header.get("format") != SNAPSHOT_FORMAT:
+        return None
+    return header
+
+
+def load_snapshot(path: Union[str, Path], provider: SchematicProvider) -> Librarian:
+    """
+    Load a snapshot into a fresh Librarian.
+
+    Args:
+        path: Snapshot file path
+        provider: Provider for the Librarian's next rebuild (it is not asked
+                  for data until the Librarian is marked dirty)
+
+    Returns:
+        Librarian with the saved state, not dirty
+
+    Raises:
+        ValueError: If the file is not a snapshot in the current format
+        OSError: If the file cannot be read
+    """
+    with open(path, "rb") as f:
+        header = _read_header(f)
+        if not isinstance(header, dict) or header.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"Unsupported snapshot format in {path}")
+        # Unpickling allocates hundreds of thousands of objects and nothing
+        # to collect; pausing the collector saves most of the load time
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            state = pickle.load(f)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    librarian = Librarian(provider)
+    librarian.restore_snapshot_state(state)
+    return librarian
+
+
+def _read_header(f) -> Any:
+    if f.read(len(_MAGIC)) != _MAGIC:
+        raise ValueError("Not a schematic snapshot")
+    (length,) = _LENGTH.unpack(f.read(_LENGTH.size))
+    return pickle.loads(f.read(length))
@@ -0,0 +1,204 @@
+"""
+Test suite for the design diff engine
+
+This module tests design_diff.py:
+- Component additions, removals and field changes
+- Parameter changes and pins moved between nets
+- Net additions, removals, renames and membership changes
+- Diff time on large designs
+"""
+
+import copy
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from typing import List
+from models import Component, Net, Pin
+from librarian import Librarian
+from design_diff import diff_designs
+from test_librarian import MockProvider
+from benchmarking import RUN_BENCHMARKS
+
+
+def make_component(refdes, page="Main", value="10k", pins=(), properties=None) -> Component:
+    return Component(
+        refdes, value, "0402", "", page, "", [Pin(d, "", net) for d, net in pins],
+        (0, 0), dict(properties or {})
+    )
+
+
+def make_librarian(components: List[Component]) -> Librarian:
+    """Librarian over the components, with nets derived from their pins"""
+    nets = {}
+    for comp in components:
+        for pin in comp.pins:
+            net = nets.setdefault(pin.net or "NC", Net(pin.net or "NC"))
+            net.members.append((comp.refdes, pin.designator))
+            net.pages.add(comp.page)
+    provider = MockProvider()
+    provider.set_test_data(components, list(nets.values()))
+    return Librarian(provider)
+
+
+def base_design() -> List[Component]:
+    return [
+        make_component("U1", value="STM32", pins=[("1", "3V3"), ("2", "GND"), ("3", "UART_TX"), ("4", "RESET")],
+                       properties={"PN": "STM32F407", "Tolerance": "N/A"}),
+        make_component("R1", pins=[("1", "3V3"), ("2", "RESET")], properties={"PN": "RC0402"}),
+        make_component("C1", value="100n", pins=[("1", "3V3"), ("2", "GND")]),
+        make_component("J1", page="IO", value="HDR", pins=[("1", "UART_TX"), ("2", "GND")]),
+        make_component("U2", page="Main", value="LM358", pins=[("1", "OUT_A")]),
+        make_component("U2", page="IO", value="LM358", pins=[("8", "3V3")]),
+    ]
+
+
+def test_identical_designs():
+    """Test that identical designs (and reordered multi-part sections) give an empty diff."""
+    print("=" * 80)
+    print("TEST: Identical Designs")
+    print("=" * 80)
+
+    design = base_design()
+    reordered = copy.deepcopy(design)
+    reordered[4], reordered[5] = reordered[5], reordered[4]
+
+    diff = diff_designs(make_librarian(design), make_librarian(reordered))
+    assert diff["components"] == {"added": [], "removed": [], "modified": []}
+    assert diff["nets"] == {"added": [], "removed": [], "renamed": [], "modified": []}
+    assert not any(diff["summary"].values())
+
+    print("[PASS] No changes reported")
+    print()
+
+
+def test_component_changes():
+    """Test added, removed and modified components, parameters and pin moves."""
+    print("=" * 80)
+    print("TEST: Component Changes")
+    print("=" * 80)
+
+    old = base_design()
+    new = copy.deepcopy(old)
+    new[1].value = "4k7"                                  # R1 value
+    new[1].properties["PN"] = "RC0402-4K7"                # R1 parameter changed
+    new[0].properties["Height"] = "1.6mm"                 # U1 parameter added
+    del new[0].properties["Tolerance"]                    # U1 parameter removed
+    new[0].pins[3] = Pin("4", "", "NRST")                 # U1.4 moved RESET -> NRST
+    new[2].page = "Power"                                 # C1 moved to another page
+    del new[3]                                            # J1 removed
+    new.append(make_component("D1", page="IO", value="LED", pins=[("1", "UART_TX"), ("2", "GND")]))
+
+    diff = diff_designs(make_librarian(old), make_librarian(new))
+    components = diff["components"]
+
+    assert components["added"] == [{"refdes": "D1", "value": "LED", "pages": ["IO"]}]
+    assert components["removed"] == [{"refdes": "J1", "value": "HDR", "pages": ["IO"]}]
+
+    modified = {entry["refdes"]: entry for entry in components["modified"]}
+    assert sorted(modified) == ["C1", "R1", "U1"]
+    assert modified["R1"]["fields"] == {"value": ["10k", "4k7"]}
+    assert modified["R1"]["parameters"] == {"changed": {"PN": ["RC0402", "RC0402-4K7"]}}
+    assert modified["U1"]["parameters"] == {"added": {"Height": "1.6mm"}, "removed": {"Tolerance": "N/A"}}
+    assert modified["U1"]["pins_moved"] == [{"pin": "U1.4", "from": "RESET", "to": "NRST"}]
+    assert modified["C1"] == {"refdes": "C1", "fields": {"pages": [["Main"], ["Power"]]}}
+
+    summary = diff["summary"]
+    assert (summary["components_added"], summary["components_removed"], summary["components_modified"]) == (1, 1, 3)
+    assert summary["parameter_changes"] == 3
+    assert summary["pins_moved"] == 1
+
+    print("[PASS] Component changes reported")
+    print()
+
+
+def test_net_changes():
+    """Test added, removed, renamed and modified nets."""
+    print("=" * 80)
+    print("TEST: Net Changes")
+    print("=" * 80)
+
+    old = base_design()
+    new = copy.deepcopy(old)
+    new[0].pins[2] = Pin("3", "", "UART1_TX")             # UART_TX renamed to UART1_TX
+    new[3].pins[0] = Pin("1", "", "UART1_TX")
+    new[4].pins[0] = Pin("1", "", "OUT")                   # OUT_A replaced by OUT ...
+    new[3].pins.append(Pin("3", "", "OUT"))                # ... with another member
+    new[1].pins[0] = Pin("1", "", "GND")                   # R1.1 moved 3V3 -> GND
+
+    diff = diff_designs(make_librarian(old), make_librarian(new))
+    nets = diff["nets"]
+
+    assert nets["renamed"] == [{"from": "UART_TX", "to": "UART1_TX"}]
+    assert nets["added"] == ["OUT"]
+    assert nets["removed"] == ["OUT_A"]
+    modified = {entry["name"]: entry for entry in nets["modified"]}
+    assert modified["3V3"]["members_removed"] == ["R1.1"]
+    assert modified["GND"]["members_added"] == ["R1.1"]
+
+    # A renamed net does not show up as moved pins
+    moved = [move for entry in diff["components"]["modified"] for move in entry.get("pins_moved", ())]
+    assert sorted(move["pin"] for move in moved) == ["R1.1", "U2.1"]
+
+    print("[PASS] Net changes reported")
+    print()
+
+
+def create_large_design(pins: int) -> List[Component]:
+    """Two-pin parts chained by nets, `pins` pins in total"""
+    return [
+        make_component(f"R{i}", page=f"PAGE_{i // 200}", pins=[("1", f"N_{i}"), ("2", f"N_{i + 1}")],
+                       properties={"PN": f"RC{i}"})
+        for i in range(pins // 2)
+    ]
+
+
+def test_diff_scaling():
+    """Benchmark: diff time on 7.5k- to 30k-pin revisions with a few ECO changes."""
+    print("=" * 80)
+    print("BENCHMARK: Diff Scaling")
+    print("=" * 80)
+
+    times = {}
+    for pins in (7500, 15000, 30000):
+        old = create_large_design(pins)
+        new = copy.deepcopy(old)
+        for i in range(0, len(new), len(new) // 10):
+            new[i].value = "22k"
+            new[i].pins[1] = Pin("2", "", f"ECO_{i}")
+        a, b = make_librarian(old), make_librarian(new)
+        a.refresh()
+        b.refresh()
+
+        start = time.perf_counter()
+        diff = diff_designs(a, b)
+        times[pins] = time.perf_counter() - start
+
+        assert diff["summary"]["components_modified"] == 10
+        assert diff["summary"]["pins_moved"] == 10
+        print(f"  {pins:6d} pins: {times[pins] * 1000:8.1f} ms")
+
+    # Linear: four times the pins in well under sixteen times the time
+    if RUN_BENCHMARKS:
+        assert times[30000] < times[7500] * 8
+
+    print("[PASS] Diff time grows linearly")
+    print()
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 80)
+    print("DESIGN DIFF TEST SUITE")
+    print("=" * 80 + "\n")
+
+    test_identical_designs()
+    test_component_changes()
+    test_net_changes()
+    test_diff_scaling()
+
+    print("=" * 80)
+    print("ALL TESTS COMPLETED")
+    print("=" * 80)
@@ -5,8 +5,12 @@ This module tests the DSL emitter with realistic data to verify
 correct formatting according to the specification.
 """
 
+import gc
+import time
+
 from models import Component, Net, Pin
-from dsl_emitter import emit_page_dsl, emit_context_dsl
+from dsl_emitter import emit_page_dsl, emit_context_dsl, iter_page_dsl, iter_context_dsl, PinLookup
+from benchmarking import RUN_BENCHMARKS
 
 
 def create_test_data():
@@ -363,8 +367,135 @@ def test_net_classification():
     print("\n")
 
 
+def create_dense_page(count: int, pins: int = 32):
+    """
+    Create a page of `count` ICs with 2 * `pins` named pins each.
+
+    Net N<i>_<p> joins pin p of U<i> to pin pins + p of the next IC, so the
+    page has count * pins nets and twice as many net members.
+    """
+    components = [
+        Component(
+            refdes=f"U{i}",
+            value="FPGA",
+            footprint="BGA-256",
+            mpn="",
+            page="Dense_Page",
+            description="",
+            pins=[Pin(str(p), f"IO_{p}", "") for p in range(1, 2 * pins + 1)],
+            location=(i * 100, 0),
+            properties={},
+        )
+        for i in range(count)
+    ]
+    nets = [
+        Net(
+            name=f"N{i}_{p}",
+            pages={"Dense_Page"},
+            members=[(f"U{i}", str(p)), (f"U{(i + 1) % count}", str(pins + p))],
+        )
+        for i in range(count)
+        for p in range(1, pins + 1)
+    ]
+    return components, nets
+
+
+def test_pin_lookup():
+    """Test that pin references resolve through the lookup table like a first-match search."""
+    print("=" * 80)
+    print("TEST: Pin Lookup Table")
+    print("=" * 80)
+
+    first = Component("U1", "MCU", "", "", "A", "", [Pin("1", "PA0", ""), Pin("1", "PA1", "")], (0, 0), {})
+    second = Component("U1", "MCU", "", "", "A", "", [Pin("1", "PB0", ""), Pin("2", "PB1", "")], (0, 0), {})
+    lookup = PinLookup([first, second])
+
+    assert lookup.components["U1"] is first
+    assert lookup.pins[("U1", "1")].name == "PA0"
+    assert ("U1", "2") not in lookup.pins  # Only the first U1 is searched
+
+    net = Net("SIG", {"A"}, [("U1", "1"), ("U1", "2"), ("R9", "1")])
+    dsl = emit_page_dsl([first, second], [net], {"SIG": {"A"}})
+    assert "CON: R9.1, U1.1(PA0), U1.2" in dsl
+
+    # A prebuilt table gives the same output
+    assert emit_page_dsl([first, second], [net], {"SIG": {"A"}}, lookup) == dsl
+
+    print("[PASS] Pin references resolved correctly")
+    print()
+
+
+def test_iter_dsl():
+    """Test that the generator variants yield the same DSL block by block."""
+    print("=" * 80)
+    print("TEST: Streaming DSL Emission")
+    print("=" * 80)
+
+    components, nets, net_page_map = create_test_data()
+    blocks = list(iter_page_dsl(components, nets, net_page_map))
+    assert "\n".join(blocks) == emit_page_dsl(components, nets, net_page_map)
+    assert blocks[0].startswith("# PAGE:")
+    assert sum(1 for b in blocks if b.startswith("NET ")) == len(nets)
+    # Starting part way through gives the same blocks from there on
+    for start in range(len(blocks) + 2):
+        assert list(iter_page_dsl(components, nets, net_page_map, start=start)) == blocks[start:]
+    assert list(iter_page_dsl([], [], {}, start=1)) == []
+
+    primary = [c for c in components if c.refdes == "U1"]
+    neighbors = [c for c in components if c.refdes != "U1"]
+    assert "\n".join(iter_context_dsl(primary, neighbors, nets)) == emit_context_dsl(primary, neighbors, nets)
+    assert list(iter_context_dsl([], [], [])) == [emit_context_dsl([], [], [])]
+
+    # Blocks are only formatted on demand
+    big_components, big_nets = create_dense_page(200)
+    stream = iter_page_dsl(big_components, big_nets, {})
+    assert next(stream).startswith("# PAGE: Dense_Page")
+    stream.close()
+
+    print("[PASS] Generator output matches emit_*_dsl")
+    print()
+
+
+def test_page_emission_scaling():
+    """Benchmark: emit_page_dsl time per net member as a dense page grows."""
+    print("=" * 80)
+    print("BENCHMARK: Page Emission Scaling")
+    print("=" * 80)
+
+    per_member = {}
+    print(f"  {'ICs':>6} {'members':>8} {'emit':>10} {'per member':>12}")
+    for count in (25, 100, 400, 800):
+        components, nets = create_dense_page(count)
+        members = sum(len(n.members) for n in nets)
+        net_page_map = {n.name: n.pages for n in nets}
+
+        best = float("inf")
+        gc.disable()  # As timeit does, so collections do not blur the curve
+        try:
+            for _ in range(2):
+                start = time.perf_counter()
+                emit_page_dsl(components, nets, net_page_map)
+                best = min(best, time.perf_counter() - start)
+        finally:
+            gc.enable()
+
+        per_member[count] = best / members
+        print(f"  {count:>6} {members:>8} {best * 1000:>8.1f}ms {per_member[count] * 1e6:>10.2f}us")
+
+    # Linear emission keeps the cost per member flat; scanning the page's
+    # components and pins for every member made it grow with the page
+    if RUN_BENCHMARKS:
+        assert per_member[800] < per_member[25] * 2.5
+
+    print("[PASS] Page emission is linear in the number of net members")
+    print()
+
+
 if __name__ == "__main__":
     test_component_classification()
     test_net_classification()
     test_page_dsl()
     test_context_dsl()
+    test_pin_lookup()
+    test_iter_dsl()
+    test_page_emission_scaling()
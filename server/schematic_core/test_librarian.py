@@ -7,18 +7,28 @@ This module tests the Librarian's core functionality including:
 - Index generation
 - Page retrieval
 - Context bubble generation (1-hop traversal)
+- Lookup indexes and query scaling
+- Whole-schematic DSL export
+- Incremental refresh
 """
 
+import random
 import sys
+import tempfile
+import time
+import tracemalloc
 from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
 from typing import List
-from models import Component, Net, Pin
+from models import Component, Net, Pin, DEFAULT_POWER_NET_PATTERNS, set_power_net_patterns
 from interfaces import SchematicProvider
 from librarian import Librarian
+import dsl_emitter
+from dsl_emitter import estimate_tokens
+from benchmarking import RUN_BENCHMARKS, benchmark
 
 
 class MockProvider(SchematicProvider):
@@ -665,6 +675,720 @@ def test_empty_schematic():
     print()
 
 
+def create_chain_schematic(count: int, page_size: int = 50):
+    """
+    Create a schematic of `count` components for index and scaling tests.
+
+    Each component Xi is a two-pin part on page PAGE_<i // page_size>. Net
+    N_i joins pin 2 of Xi to pin 1 of Xi+1, so every page boundary is an
+    inter-page signal. A shared EN net joins pin 3 of every tenth component
+    (an active part) among the first 500, across the first ten pages.
+    """
+    components = []
+    for i in range(count):
+        active = i % 10 == 0 and i < 500
+        pins = [
+            Pin("1", "IN", f"N_{i - 1}" if i > 0 else ""),
+            Pin("2", "OUT", f"N_{i}" if i < count - 1 else ""),
+        ]
+        if active:
+            pins.append(Pin("3", "EN", "EN"))
+        components.append(Component(
+            refdes=f"U{i}" if active else f"R{i}",
+            value="BUF" if active else "10k",
+            footprint="SOT-23" if active else "0402",
+            mpn="SN74LVC1G125" if active else "",
+            page=f"PAGE_{i // page_size}",
+            description="",
+            pins=pins,
+            location=(i % page_size * 100, 0),
+            properties={},
+        ))
+
+    nets = []
+    for i in range(count - 1):
+        a, b = components[i], components[i + 1]
+        nets.append(Net(name=f"N_{i}", pages={a.page, b.page}, members=[(a.refdes, "2"), (b.refdes, "1")]))
+    enabled = [c for c in components if c.refdes.startswith("U")]  # Always the first 500
+    nets.append(Net(name="EN", pages={c.page for c in enabled}, members=[(c.refdes, "3") for c in enabled]))
+
+    return components, nets
+
+
+def test_indexes():
+    """Test that refresh builds the lookup indexes and rebuilds them when dirty."""
+    print("=" * 80)
+    print("TEST: Lookup Indexes")
+    print("=" * 80)
+
+    provider = MockProvider()
+    components, nets = create_multi_page_schematic()
+    provider.set_test_data(components, nets)
+
+    librarian = Librarian(provider)
+    librarian.refresh()
+
+    assert librarian.components_by_refdes["U1"] == [components[0]]
+    assert librarian.nets_by_name["GND"] is nets[0]
+    assert librarian.page_components["Main_Sheet"] == [c for c in components if c.page == "Main_Sheet"]
+    assert [n.name for n in librarian.component_nets["R1"]] == ["UART_TX", "UART_TX_BUF"]
+    assert librarian.pages == {"Main_Sheet", "Power_Module", "Connector_Page"}
+
+    # Page nets keep net list order
+    main_refdes = {c.refdes for c in librarian.page_components["Main_Sheet"]}
+    expected = [n for n in nets if any(r in main_refdes for r, _ in n.members)]
+    assert librarian.page_nets["Main_Sheet"] == expected
+
+    # Indexes are rebuilt from the new data after mark_dirty
+    provider.set_test_data(components[:1], [])
+    librarian.mark_dirty()
+    assert librarian.get_component("R1") is None
+    assert librarian.get_net("GND") is None
+    assert librarian.get_all_pages() == ["Main_Sheet"]
+
+    print("[PASS] Indexes built and rebuilt correctly")
+    print()
+
+
+def test_indexed_queries_match_scan():
+    """Test that indexed page and context queries match a full scan."""
+    print("=" * 80)
+    print("TEST: Indexed Queries Match Full Scan")
+    print("=" * 80)
+
+    provider = MockProvider()
+    components, nets = create_chain_schematic(500)
+    provider.set_test_data(components, nets)
+    librarian = Librarian(provider)
+
+    for page in ("PAGE_0", "PAGE_4", "PAGE_9"):
+        on_page = [c for c in components if c.page == page]
+        refdes = {c.refdes for c in on_page}
+        page_nets = [n for n in nets if any(r in refdes for r, _ in n.members)]
+        assert librarian.get_page(page) == dsl_emitter.emit_page_dsl(on_page, page_nets, librarian.net_page_map)
+
+    for refdes_list in (["R1"], ["U10", "R49", "R50"], ["R499"]):
+        primary = [c for c in components if c.refdes in refdes_list]
+        connected = [n for n in nets if any(r in refdes_list for r, _ in n.members)]
+        # The EN net is global: shown, but not traversed
+        neighbors = {r for n in connected if not n.is_global() for r, _ in n.members} - set(refdes_list)
+        context = set(refdes_list) | neighbors
+        expected = dsl_emitter.emit_context_dsl(
+            primary,
+            [c for c in components if c.refdes in neighbors and not c.is_passive()],
+            [Net(name=n.name, pages=n.pages, members=[m for m in n.members if m[0] in context])
+             for n in connected]
+        )
+        assert librarian.get_context(refdes_list) == expected
+
+    print("[PASS] Indexed queries match full scan")
+    print()
+
+
+def test_query_scaling():
+    """Benchmark: query time as the schematic grows from 100 to 50k components."""
+    print("=" * 80)
+    print("BENCHMARK: Query Scaling")
+    print("=" * 80)
+
+    def best_of(query, repeat=20):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            query()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    timings = {}
+    print(f"  {'components':>10} {'refresh':>10} {'get_page':>10} {'get_context':>12} {'get_component':>14}")
+    for count in (100, 1000, 10000, 50000):
+        provider = MockProvider()
+        provider.set_test_data(*create_chain_schematic(count))
+        librarian = Librarian(provider)
+
+        start = time.perf_counter()
+        librarian.refresh()
+        refresh = time.perf_counter() - start
+
+        middle = count // 2
+        timings[count] = (
+            best_of(lambda: librarian.get_page("PAGE_1")),
+            best_of(lambda: librarian.get_context([f"R{middle + 1}"])),
+            best_of(lambda: librarian.get_component(f"R{count - 1}")),
+        )
+        page, context, lookup = timings[count]
+        print(f"  {count:>10} {refresh * 1000:>8.1f}ms {page * 1000:>8.2f}ms "
+              f"{context * 1000:>10.3f}ms {lookup * 1e6:>12.2f}us")
+
+    # 500x the components: queries only touch what they return, so their
+    # cost must stay far from the 500x a full scan would take
+    if RUN_BENCHMARKS:
+        for small, large in zip(timings[100], timings[50000]):
+            assert large < small * 20 + 0.0005
+
+    print("[PASS] Query time independent of schematic size")
+    print()
+
+
+def add_ground_net(components: List[Component], nets: List[Net]):
+    """Connect pin 9 of every component to one GND net spanning all pages."""
+    for comp in components:
+        comp.pins.append(Pin("9", "GND", "GND"))
+    nets.append(Net(
+        name="GND",
+        pages={c.page for c in components},
+        members=[(c.refdes, "9") for c in components]
+    ))
+
+
+def test_get_context_hops():
+    """Test multi-hop context expansion and that global nets are not traversed."""
+    print("=" * 80)
+    print("TEST: Context Bubble - Multiple Hops")
+    print("=" * 80)
+
+    provider = MockProvider()
+    provider.set_test_data(*create_chain_schematic(100))
+    librarian = Librarian(provider)
+
+    one_hop = librarian.get_context(["R55"])
+    three_hops = librarian.get_context(["R55"], hops=3)
+    print(three_hops)
+    print()
+
+    assert "R56.1" in one_hop and "R57" not in one_hop
+    assert "R58.1" in three_hops and "R59" not in three_hops
+    assert "R52.2" in three_hops and "R51" not in three_hops
+    assert "NET N_57" in three_hops and "NET N_58" not in three_hops
+
+    # Closest-first: the first hop is the same whatever the depth
+    assert librarian.get_context(["R55"], hops=1) == one_hop
+
+    # U1 only reaches U2 through the global 3V3 and GND nets
+    provider = MockProvider()
+    provider.set_test_data(*create_multi_page_schematic())
+    librarian = Librarian(provider)
+    context_dsl = librarian.get_context(["U1"], hops=2)
+    assert "NET 3V3" in context_dsl and "NET GND" in context_dsl
+    assert "U2" not in context_dsl
+    assert "J1" in context_dsl  # Two hops through R1 / R2
+
+    print("[PASS] Multi-hop context expanded correctly")
+    print()
+
+
+def test_get_context_token_budget():
+    """Test that the context bubble stops growing at the token budget."""
+    print("=" * 80)
+    print("TEST: Context Bubble - Token Budget")
+    print("=" * 80)
+
+    provider = MockProvider()
+    provider.set_test_data(*create_chain_schematic(1000))
+    librarian = Librarian(provider)
+
+    unbounded = librarian.get_context(["U400"], hops=100)
+    assert "truncated" not in unbounded
+
+    for budget in (100, 300, 1000):
+        context_dsl = librarian.get_context(["U400"], hops=100, token_budget=budget)
+        print(f"  budget {budget:>5}: {estimate_tokens(context_dsl):>5} tokens")
+        assert estimate_tokens(context_dsl) <= budget
+        assert "truncated at the" in context_dsl
+        assert "COMP U400" in context_dsl
+
+    # Closest components survive truncation
+    small = librarian.get_context(["U400"], hops=100, token_budget=200)
+    assert "R401" in small and "R399" in small
+
+    # Primary components are always shown, even over budget
+    assert "COMP U400" in librarian.get_context(["U400"], token_budget=1)
+
+    print("[PASS] Token budget respected")
+    print()
+
+
+def test_context_bounded_on_large_design():
+    """Benchmark: context bubble size and time on a 50k-component design with a global GND."""
+    print("=" * 80)
+    print("BENCHMARK: Bounded Context Bubbles")
+    print("=" * 80)
+
+    components, nets = create_chain_schematic(50000)
+    add_ground_net(components, nets)
+    provider = MockProvider()
+    provider.set_test_data(components, nets)
+    librarian = Librarian(provider)
+    librarian.refresh()
+
+    for hops, budget in ((1, None), (5, 2000), (1000, 2000), (1000, 8000)):
+        start = time.perf_counter()
+        context_dsl = librarian.get_context(["R25001"], hops=hops, token_budget=budget)
+        elapsed = time.perf_counter() - start
+        tokens = estimate_tokens(context_dsl)
+        print(f"  hops={hops:<5} budget={str(budget):<5} {tokens:>6} tokens {elapsed * 1000:>8.1f}ms")
+
+        # GND is shown with only the bubble's members, never expanded
+        assert context_dsl.count("GND") < 1000
+        if budget:
+            assert tokens <= budget
+        if RUN_BENCHMARKS:
+            assert elapsed < 0.5
+
+    print("[PASS] Context bubbles stay bounded")
+    print()
+
+
+def test_get_page_chunks():
+    """Test paging through a large page with cursors."""
+    print("=" * 80)
+    print("TEST: Paged Page Retrieval")
+    print("=" * 80)
+
+    provider = MockProvider()
+    provider.set_test_data(*create_chain_schematic(1000, page_size=200))
+    librarian = Librarian(provider)
+    full = librarian.get_page("PAGE_1")
+
+    for max_tokens in (50, 500, 2000):
+        chunks = []
+        cursor = None
+        while True:
+            chunk, cursor = librarian.get_page_chunk("PAGE_1", cursor, max_tokens)
+            chunks.append(chunk)
+            if cursor is None:
+                break
+            assert estimate_tokens(chunk) <= max_tokens
+        print(f"  max_tokens {max_tokens:>5}: {len(chunks)} chunks")
+        assert "\n".join(chunks) == full
+        assert len(chunks) > 1
+
+    # Without a limit the whole page comes back at once
+    assert librarian.get_page_chunk("PAGE_1") == (full, None)
+    assert librarian.get_page_chunk("NO_SUCH_PAGE", max_tokens=10)[1] is None
+
+    # Each chunk formats only its own blocks, not the ones before its cursor
+    format_net_block = dsl_emitter._format_net_block
+    formatted = []
+
+    def counting_format_net_block(net, *args):
+        formatted.append(net.name)
+        return format_net_block(net, *args)
+
+    dsl_emitter._format_net_block = counting_format_net_block
+    try:
+        cursor = None
+        while True:
+            _, cursor = librarian.get_page_chunk("PAGE_1", cursor, 500)
+            if cursor is None:
+                break
+    finally:
+        dsl_emitter._format_net_block = format_net_block
+    # The block that ends a chunk is formatted again at the start of the next one
+    assert len(formatted) < 2 * full.count("\nNET ") + 1
+
+    print("[PASS] Page chunks reassemble to the full page")
+    print()
+
+
+def test_get_page_chunk_cursor_errors():
+    """Test that bad, foreign and stale cursors are rejected."""
+    print("=" * 80)
+    print("TEST: Page Cursor Validation")
+    print("=" * 80)
+
+    provider = MockProvider()
+    provider.set_test_data(*create_chain_schematic(400, page_size=200))
+    librarian = Librarian(provider)
+    _, cursor = librarian.get_page_chunk("PAGE_0", max_tokens=100)
+    assert cursor
+
+    for bad_cursor, page, message in (
+        ("not-a-cursor", "PAGE_0", "Invalid page cursor"),
+        (cursor, "PAGE_1", "belongs to page"),
+    ):
+        try:
+            librarian.get_page_chunk(page, bad_cursor, 100)
+            assert False, "cursor accepted"
+        except ValueError as e:
+            assert message in str(e)
+
+    librarian.mark_dirty()
+    try:
+        librarian.get_page_chunk("PAGE_0", cursor, 100)
+        assert False, "stale cursor accepted"
+    except ValueError as e:
+        assert "design changed" in str(e)
+
+    print("[PASS] Invalid cursors rejected")
+    print()
+
+
+def test_get_page_chunk_memory():
+    """Test that a chunk of a large page does not build the whole page text."""
+    print("=" * 80)
+    print("TEST: Paged Page Memory")
+    print("=" * 80)
+
+    provider = MockProvider()
+    provider.set_test_data(*create_chain_schematic(20000, page_size=20000))
+    librarian = Librarian(provider)
+    librarian.refresh()
+
+    tracemalloc.start()
+    try:
+        full = librarian.get_page("PAGE_0")
+        _, full_peak = tracemalloc.get_traced_memory()
+        del full
+        tracemalloc.reset_peak()
+
+        _, cursor = librarian.get_page_chunk("PAGE_0", max_tokens=2000)
+        _, cursor = librarian.get_page_chunk("PAGE_0", cursor, 2000)
+        _, chunk_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    print(f"  whole page:   {full_peak / 1024:8.0f} KiB peak")
+    print(f"  second chunk: {chunk_peak / 1024:8.0f} KiB peak")
+    assert cursor is not None
+    assert chunk_peak < full_peak / 2
+
+    print("[PASS] Chunks stay small")
+    print()
+
+
+def test_export_all():
+    """Test that exported files match get_index and get_page, inline and in worker processes."""
+    print("=" * 80)
+    print("TEST: Whole-Schematic Export")
+    print("=" * 80)
+
+    provider = MockProvider()
+    provider.set_test_data(*create_chain_schematic(300, page_size=50))
+    librarian = Librarian(provider)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        inline = librarian.export_all(Path(temp_dir) / "inline", max_workers=1)
+        pooled = librarian.export_all(Path(temp_dir) / "pooled", max_workers=2)
+
+        assert Path(inline["index"]).read_text(encoding="utf-8") == librarian.get_index()
+        assert sorted(inline["pages"]) == librarian.get_all_pages()
+        for page, entry in inline["pages"].items():
+            text = Path(entry["file"]).read_text(encoding="utf-8")
+            assert text == librarian.get_page(page), page
+            assert entry["chars"] == len(text)
+            assert Path(pooled["pages"][page]["file"]).read_text(encoding="utf-8") == text
+        assert not list(Path(temp_dir).rglob("*.tmp"))
+
+    print(f"[PASS] {len(inline['pages'])} pages exported identically inline and in a pool")
+    print()
+
+
+def test_export_all_power_net_patterns():
+    """Test that worker processes classify nets with the configured power-net patterns."""
+    print("=" * 80)
+    print("TEST: Export With Custom Power-Net Patterns")
+    print("=" * 80)
+
+    components = [
+        Component(f"R{i}", "10k", "0603", "", f"Page{i % 2}", "", [Pin("1", "", "RAIL_AUX")], (0, 0), {})
+        for i in range(12)
+    ]
+    nets = [Net("RAIL_AUX", {"Page0", "Page1"}, [(c.refdes, "1") for c in components])]
+
+    provider = MockProvider()
+    provider.set_test_data(components, nets)
+    librarian = Librarian(provider)
+
+    set_power_net_patterns(DEFAULT_POWER_NET_PATTERNS + ("^RAIL_",))
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            inline = librarian.export_all(Path(temp_dir) / "inline", max_workers=1)
+            pooled = librarian.export_all(Path(temp_dir) / "pooled", max_workers=2)
+            pages = {
+                page: Path(entry["file"]).read_text(encoding="utf-8")
+                for page, entry in inline["pages"].items()
+            }
+            for page, text in pages.items():
+                assert Path(pooled["pages"][page]["file"]).read_text(encoding="utf-8") == text, page
+    finally:
+        set_power_net_patterns(DEFAULT_POWER_NET_PATTERNS)
+
+    # Summarized as a power rail, which the default patterns would not do
+    assert all("LINKS: ALL_PAGES" in text for text in pages.values())
+
+    print("[PASS] Pooled export matches inline export with custom patterns")
+    print()
+
+
+def test_export_all_file_names():
+    """Test that page names are made safe and unique as file names."""
+    print("=" * 80)
+    print("TEST: Export File Names")
+    print("=" * 80)
+
+    components = [
+        Component(f"R{i}", "", "", "", page, "", [Pin("1", "", "N")], (0, 0), {})
+        for i, page in enumerate(["Main.SchDoc", "main.SchDoc", "Sub/Power Supply.SchDoc", "index"])
+    ]
+    nets = [Net("N", {c.page for c in components}, [(c.refdes, "1") for c in components])]
+
+    provider = MockProvider()
+    provider.set_test_data(components, nets)
+    librarian = Librarian(provider)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        result = librarian.export_all(temp_dir, max_workers=1)
+        names = {page: Path(entry["file"]).name for page, entry in result["pages"].items()}
+
+    assert Path(result["index"]).name == "index.dsl"
+    assert names["Sub/Power Supply.SchDoc"] == "Sub_Power_Supply.SchDoc.dsl"
+    assert names["index"] == "index_2.dsl"
+    assert len({name.lower() for name in names.values()}) == 4
+
+    print(f"[PASS] File names: {sorted(names.values())}")
+    print()
+
+
+def test_export_all_benchmark():
+    """Benchmark: whole-schematic export inline against a process pool."""
+    print("=" * 80)
+    print("BENCHMARK: Whole-Schematic Export")
+    print("=" * 80)
+
+    provider = MockProvider()
+    provider.set_test_data(*create_chain_schematic(20000, page_size=1000))
+    librarian = Librarian(provider)
+    librarian.refresh()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        start = time.perf_counter()
+        inline = librarian.export_all(Path(temp_dir) / "inline", max_workers=1)
+        inline_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        pooled = librarian.export_all(Path(temp_dir) / "pooled")
+        pooled_time = time.perf_counter() - start
+
+    chars = sum(entry["chars"] for entry in inline["pages"].values())
+    print(f"  {len(inline['pages'])} pages, {chars / 1024:.0f} KiB of DSL")
+    print(f"  inline:       {inline_time * 1000:8.1f} ms")
+    print(f"  process pool: {pooled_time * 1000:8.1f} ms")
+    assert [e["chars"] for e in pooled["pages"].values()] == [e["chars"] for e in inline["pages"].values()]
+
+    print("[PASS] Export benchmark completed")
+    print()
+
+
+class EditableProvider(SchematicProvider):
+    """
+    Provider over editable component specs, building fresh objects on every
+    fetch and deriving nets from pin connectivity like the Altium adapter.
+
+    Specs are [refdes, page, value, [(pin designator, pin name, net), ...]].
+    """
+
+    def __init__(self, specs):
+        self.specs = specs
+
+    def fetch_raw_data(self) -> None:
+        pass
+
+    def get_components(self) -> List[Component]:
+        return [
+            Component(refdes, value, "0402", "", page, "", [Pin(*pin) for pin in pins], (0, 0), {})
+            for refdes, page, value, pins in self.specs
+        ]
+
+    def get_nets(self) -> List[Net]:
+        nets = {}
+        for refdes, page, _value, pins in self.specs:
+            for designator, _name, net_name in pins:
+                net = nets.setdefault(net_name or "NC", Net(net_name or "NC"))
+                net.members.append((refdes, designator))
+                net.pages.add(page)
+        return list(nets.values())
+
+
+def create_editable_specs(count: int, page_size: int = 20):
+    """Chain of two-pin parts like create_chain_schematic, plus a GND pin on every tenth part"""
+    specs = []
+    for i in range(count):
+        pins = [("1", "IN", f"N_{i - 1}" if i else ""), ("2", "OUT", f"N_{i}")]
+        if i % 10 == 0:
+            pins.append(("3", "GND", "GND"))
+        specs.append([f"R{i}", f"PAGE_{i // page_size}", "10k", pins])
+    return specs
+
+
+def random_edit(rng: random.Random, specs, serial: int) -> None:
+    """Apply one random ECO-style edit to the specs"""
+    pages = sorted({spec[1] for spec in specs}) or ["PAGE_0"]
+    nets = sorted({pin[2] for spec in specs for pin in spec[3] if pin[2]}) or ["N_0"]
+    kind = rng.choices(
+        ["value", "move", "net", "add", "remove", "part", "page"],
+        weights=[4, 2, 4, 3, 2, 1, 0.2]
+    )[0]
+    spec = rng.choice(specs) if specs else None
+
+    if spec is None or kind == "add":
+        pins = [(str(p), "", rng.choice(nets + [f"NEW_{serial}"])) for p in range(1, rng.randint(2, 4))]
+        specs.insert(rng.randint(0, len(specs)), [f"X{serial}", rng.choice(pages), "1k", pins])
+    elif kind == "value":
+        spec[2] = f"{rng.randint(1, 100)}k"
+    elif kind == "move":
+        spec[1] = rng.choice(pages + [f"NEW_PAGE_{serial}"])
+    elif kind == "net":
+        pins = list(spec[3])
+        index = rng.randrange(len(pins))
+        pins[index] = (pins[index][0], pins[index][1], rng.choice(nets + [f"NEW_{serial}", ""]))
+        spec[3] = pins
+    elif kind == "remove":
+        specs.remove(spec)
+    elif kind == "part":
+        # Second part of a multi-part component, on another page
+        specs.append([spec[0], rng.choice(pages), spec[2], [("A1", "", rng.choice(nets))]])
+    else:
+        removed = rng.choice(pages)
+        specs[:] = [s for s in specs if s[1] != removed]
+
+
+def rebuilt_librarian(specs) -> Librarian:
+    """Librarian built from scratch over the specs"""
+    librarian = Librarian(EditableProvider(specs))
+    librarian.refresh()
+    return librarian
+
+
+def assert_same_state(patched: Librarian, rebuilt: Librarian) -> None:
+    """Check that a patched Librarian has exactly the state of a rebuilt one"""
+    def names(index):
+        return {key: [net.name for net in nets] for key, nets in index.items()}
+
+    assert patched.components == rebuilt.components
+    assert patched.nets == rebuilt.nets
+    assert [net.is_global() for net in patched.nets] == [net.is_global() for net in rebuilt.nets]
+    assert patched.net_page_map == rebuilt.net_page_map
+    assert patched.nets_by_name == rebuilt.nets_by_name
+    assert patched.components_by_refdes == rebuilt.components_by_refdes
+    assert patched.page_components == rebuilt.page_components
+    assert names(patched.page_nets) == names(rebuilt.page_nets)
+    assert names(patched.component_nets) == names(rebuilt.component_nets)
+    assert patched._page_net_counts == rebuilt._page_net_counts
+    assert patched._refdes_position == rebuilt._refdes_position
+    assert patched._page_hashes == rebuilt._page_hashes
+    assert patched.pages == rebuilt.pages
+
+    # Index entries refer to the Librarian's own objects
+    for position, net in enumerate(patched.nets):
+        assert patched._net_position[id(net)] == position
+        assert patched.nets_by_name[net.name] is net
+        assert patched.net_page_map[net.name] is net.pages
+    for nets in list(patched.page_nets.values()) + list(patched.component_nets.values()):
+        assert all(patched.nets[patched._net_position[id(net)]] is net for net in nets)
+
+    assert patched.get_index() == rebuilt.get_index()
+    for page in rebuilt.get_all_pages():
+        assert patched.get_page(page) == rebuilt.get_page(page)
+
+
+def test_incremental_refresh_matches_rebuild():
+    """Test that incremental refreshes give the same state as full rebuilds on random edits."""
+    print("=" * 80)
+    print("TEST: Incremental Refresh Equivalence")
+    print("=" * 80)
+
+    rng = random.Random(1234)
+    specs = create_editable_specs(200)
+    librarian = Librarian(EditableProvider(specs))
+    librarian.refresh()
+
+    for round_number in range(300):
+        for edit in range(rng.randint(1, 3)):
+            random_edit(rng, specs, round_number * 10 + edit)
+        librarian.mark_dirty()
+        librarian.refresh()
+        assert_same_state(librarian, rebuilt_librarian(specs))
+
+    print(f"[PASS] 300 edit rounds, {librarian.incremental_refreshes} applied incrementally")
+    assert librarian.incremental_refreshes > 250
+    print()
+
+
+def test_incremental_refresh_fallback():
+    """Test that large changes and reordered nets fall back to a full rebuild."""
+    print("=" * 80)
+    print("TEST: Incremental Refresh Fallback")
+    print("=" * 80)
+
+    specs = create_editable_specs(100)
+    librarian = Librarian(EditableProvider(specs))
+    librarian.refresh()
+
+    # Half the values changed: above INCREMENTAL_MAX_CHANGE
+    for spec in specs[::2]:
+        spec[2] = "22k"
+    librarian.mark_dirty()
+    librarian.refresh()
+    assert librarian.incremental_refreshes == 0
+    assert_same_state(librarian, rebuilt_librarian(specs))
+
+    # Nets in a different order: the net indexes cannot be patched
+    specs.insert(0, specs.pop(50))
+    librarian.mark_dirty()
+    librarian.refresh()
+    assert librarian.incremental_refreshes == 0
+    assert_same_state(librarian, rebuilt_librarian(specs))
+
+    # A single edit is patched
+    specs[10][2] = "47k"
+    librarian.mark_dirty()
+    librarian.refresh()
+    assert librarian.incremental_refreshes == 1
+    assert_same_state(librarian, rebuilt_librarian(specs))
+
+    print("[PASS] Large and reordering changes rebuild")
+    print()
+
+
+@benchmark
+def test_incremental_refresh_benchmark():
+    """Benchmark: refresh after one edit, incremental against a full rebuild."""
+    print("=" * 80)
+    print("BENCHMARK: Incremental Refresh")
+    print("=" * 80)
+
+    specs = create_editable_specs(20000, page_size=500)
+    provider = EditableProvider(specs)
+    librarian = Librarian(provider)
+    librarian.refresh()
+
+    specs[12345][2] = "4k7"
+    components, nets = provider.get_components(), provider.get_nets()
+
+    full = Librarian(MockProvider())
+    full.provider.set_test_data(components, nets)
+    start = time.perf_counter()
+    full.refresh()
+    full_time = time.perf_counter() - start
+
+    # Both refreshes get prebuilt objects, so only the Librarian's work is timed
+    librarian.provider = MockProvider()
+    librarian.provider.set_test_data(provider.get_components(), provider.get_nets())
+    librarian.mark_dirty()
+    start = time.perf_counter()
+    librarian.refresh()
+    patched_time = time.perf_counter() - start
+
+    print(f"  full rebuild: {full_time * 1000:8.1f} ms")
+    print(f"  incremental:  {patched_time * 1000:8.1f} ms")
+    assert librarian.incremental_refreshes == 1
+    assert patched_time < full_time
+
+    print("[PASS] Incremental refresh benchmark completed")
+    print()
+
+
 if __name__ == "__main__":
     print("\n" + "=" * 80)
     print("LIBRARIAN TEST SUITE")
@@ -682,6 +1406,23 @@ if __name__ == "__main__":
     test_get_context_nonexistent()
     test_helper_methods()
     test_empty_schematic()
+    test_indexes()
+    test_indexed_queries_match_scan()
+    test_query_scaling()
+    test_get_context_hops()
+    test_get_context_token_budget()
+    test_context_bounded_on_large_design()
+    test_get_page_chunks()
+    test_get_page_chunk_cursor_errors()
+    test_get_page_chunk_memory()
+    test_export_all()
+    test_export_all_power_net_patterns()
+    test_export_all_file_names()
+    test_export_all_benchmark()
+    test_incremental_refresh_matches_rebuild()
+    test_incremental_refresh_fallback()
+    if RUN_BENCHMARKS:
+        test_incremental_refresh_benchmark()
 
     print("=" * 80)
     print("ALL TESTS COMPLETED")
@@ -0,0 +1,186 @@
+"""
+Test suite for the core data models
+
+This module tests the cached classification in models.py:
+- Power/ground net patterns and their configuration
+- Stored Net.is_global flags
+- Component type lookup by refdes prefix
+"""
+
+import re
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from models import (
+    Component, Net, Pin,
+    DEFAULT_POWER_NET_PATTERNS, get_power_net_patterns, set_power_net_patterns
+)
+from benchmarking import RUN_BENCHMARKS
+
+# The single regex Net.is_global used before the patterns became configurable
+_ORIGINAL_POWER_PATTERN = (
+    r'^(P?GND|VSS|VCC|VDD|VEE|VBAT)($|_.*)|^(\+?(\d+\.?\d*V\d*|\d*\.?\d*V\d+)|\+?(\d+V))|^.*_(GND|VCC|VDD)$'
+)
+
+
+def make_component(refdes: str) -> Component:
+    return Component(refdes, "", "", "", "Main", "", [Pin("1", "", "A")], (0, 0), {})
+
+
+def test_default_power_patterns():
+    """Test that the default pattern list classifies names like the original regex."""
+    print("=" * 80)
+    print("TEST: Default Power Net Patterns")
+    print("=" * 80)
+
+    names = [
+        "GND", "PGND", "gnd", "VSS", "VCC", "VDD", "VEE", "VBAT", "VCC_DIGITAL", "GND_ISO",
+        "3V3", "3.3V", "+5V", "12V", "1V8", "+3V3", "V5", "NET_GND", "SIGNAL_VCC", "AVDD",
+        "UART_TX", "VCCA", "GNDA", "SDA", "Net_U1_5", "VBUS", "5V_USB", "V", "VDD_3V3",
+    ]
+    original = re.compile(_ORIGINAL_POWER_PATTERN, re.IGNORECASE)
+    for name in names:
+        expected = original.match(name) is not None
+        assert Net(name).is_global() == expected, name
+
+    assert get_power_net_patterns() == DEFAULT_POWER_NET_PATTERNS
+
+    print("[PASS] Default patterns match the original classification")
+    print()
+
+
+def test_is_global_stored():
+    """Test that is_global is stored until classify() or a pattern change."""
+    print("=" * 80)
+    print("TEST: Stored Net Classification")
+    print("=" * 80)
+
+    net = Net("SIG", {"A"}, [("R1", "1")])
+    assert not net.is_global()
+
+    # Members added without reclassifying: the stored flag is kept
+    net.members.extend((f"R{i}", "1") for i in range(2, 20))
+    assert not net.is_global()
+    net.classify()
+    assert net.is_global()
+
+    # Flags are not part of equality
+    assert Net("SIG", {"A"}) == Net("SIG", {"A"})
+
+    print("[PASS] Classification stored and recomputed on demand")
+    print()
+
+
+def test_configurable_power_patterns():
+    """Test that changing the power-rail patterns reclassifies stored nets."""
+    print("=" * 80)
+    print("TEST: Configurable Power Net Patterns")
+    print("=" * 80)
+
+    avdd = Net("AVDD_CORE")
+    gnd = Net("GND")
+    assert not avdd.is_global() and gnd.is_global()
+
+    try:
+        set_power_net_patterns(DEFAULT_POWER_NET_PATTERNS + (r"^AVDD",))
+        assert avdd.is_global() and gnd.is_global()
+
+        set_power_net_patterns([r"^AGND$"])
+        assert not gnd.is_global() and Net("agnd").is_global()
+
+        set_power_net_patterns([])
+        assert not gnd.is_global()
+
+        try:
+            set_power_net_patterns(["("])
+            assert False, "invalid pattern accepted"
+        except re.error:
+            pass
+        assert get_power_net_patterns() == ()
+    finally:
+        set_power_net_patterns(DEFAULT_POWER_NET_PATTERNS)
+
+    assert not avdd.is_global() and gnd.is_global()
+
+    print("[PASS] Pattern changes reclassify nets")
+    print()
+
+
+def test_derived_type():
+    """Test the refdes prefix to component type table."""
+    print("=" * 80)
+    print("TEST: Component Type by Refdes Prefix")
+    print("=" * 80)
+
+    expected = {
+        "R1": "RES", "r12": "RES", "C5": "CAP", "L2": "IND", "FB3": "IND", "F1": "FUSE",
+        "D4": "DIODE", "LED7": "DIODE", "Q2": "TRANSISTOR", "U1": "IC", "U1A": "IC",
+        "J1": "CONN", "P3": "CONN", "CN2": "CONN", "CONN4": "CONN", "SW1": "SWITCH",
+        "X1": "OSC", "Y2": "OSC", "TP1": "ACTIVE", "MH1": "ACTIVE", "1": "ACTIVE", "": "ACTIVE",
+    }
+    for refdes, comp_type in expected.items():
+        assert make_component(refdes).derived_type() == comp_type, refdes
+
+    assert make_component("R1").is_passive()
+    assert make_component("F2").is_passive()
+    assert not make_component("U1").is_passive()
+
+    print("[PASS] Component types derived correctly")
+    print()
+
+
+def test_classification_benchmark():
+    """Benchmark: repeated is_global calls on 50k nets, first pass against stored flags."""
+    print("=" * 80)
+    print("BENCHMARK: Net Classification")
+    print("=" * 80)
+
+    nets = [Net(f"NET_{i}_SIGNAL", {"A"}, [("R1", "1"), ("R2", "2")]) for i in range(50000)]
+    original = re.compile(_ORIGINAL_POWER_PATTERN, re.IGNORECASE)
+
+    start = time.perf_counter()
+    for _ in range(3):
+        for net in nets:
+            re.match(_ORIGINAL_POWER_PATTERN, net.name, re.IGNORECASE)
+    uncached = (time.perf_counter() - start) / 3
+
+    start = time.perf_counter()
+    for net in nets:
+        net.classify()
+    classify = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(3):
+        for net in nets:
+            net.is_global()
+    cached = (time.perf_counter() - start) / 3
+
+    print(f"  re.match per call:  {uncached * 1000:7.1f} ms per pass")
+    print(f"  classify once:      {classify * 1000:7.1f} ms")
+    print(f"  stored is_global:   {cached * 1000:7.1f} ms per pass")
+    assert not any(original.match(net.name) for net in nets[:10])
+    if RUN_BENCHMARKS:
+        assert cached < uncached
+
+    print("[PASS] Stored classification is faster than matching per call")
+    print()
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 80)
+    print("MODELS TEST SUITE")
+    print("=" * 80 + "\n")
+
+    test_default_power_patterns()
+    test_is_global_stored()
+    test_configurable_power_patterns()
+    test_derived_type()
+    test_classification_benchmark()
+
+    print("=" * 80)
+    print("ALL TESTS COMPLETED")
+    print("=" * 80)
@@ -0,0 +1,161 @@
+"""
+Test suite for design snapshots
+
+This module tests snapshot.py:
+- Round trips of a Librarian's state
+- Reading headers without the state
+- Rejecting files that are not snapshots
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from librarian import Librarian
+from models import DEFAULT_POWER_NET_PATTERNS, set_power_net_patterns
+from snapshot import SNAPSHOT_FORMAT, load_snapshot, read_snapshot_header, save_snapshot
+from test_librarian import MockProvider, create_chain_schematic
+from benchmarking import RUN_BENCHMARKS
+
+
+def make_librarian(count: int = 300) -> Librarian:
+    provider = MockProvider()
+    provider.set_test_data(*create_chain_schematic(count))
+    librarian = Librarian(provider)
+    librarian.refresh()
+    return librarian
+
+
+def test_snapshot_round_trip():
+    """Test that a loaded snapshot answers queries like the Librarian it was saved from."""
+    print("=" * 80)
+    print("TEST: Snapshot Round Trip")
+    print("=" * 80)
+
+    librarian = make_librarian()
+    provider = MockProvider()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "design.snapshot"
+        save_snapshot(librarian, path, {"project": "A.PrjPcb"})
+        loaded = load_snapshot(path, provider)
+
+    assert not loaded.dirty
+    assert provider.fetch_count == 0
+    assert loaded.get_index() == librarian.get_index()
+    for page in librarian.get_all_pages():
+        assert loaded.get_page(page) == librarian.get_page(page)
+    assert loaded.get_context(["U10"], hops=2) == librarian.get_context(["U10"], hops=2)
+    assert loaded.get_stats() == librarian.get_stats()
+
+    # Shared objects stay shared: index entries are the loaded nets
+    net = loaded.get_net("N_5")
+    assert net is loaded.nets[5]
+    assert loaded.component_nets["R5"][1] is net
+    assert loaded.net_page_map["N_5"] is net.pages
+
+    print("[PASS] Loaded snapshot matches the original Librarian")
+    print()
+
+
+def test_snapshot_header():
+    """Test that headers are read without the state and bad files are rejected."""
+    print("=" * 80)
+    print("TEST: Snapshot Headers")
+    print("=" * 80)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "design.snapshot"
+        save_snapshot(make_librarian(), path, {"project": "A.PrjPcb", "documents": {"A.PrjPcb": 1}})
+        header = read_snapshot_header(path)
+        assert header == {"project": "A.PrjPcb", "documents": {"A.PrjPcb": 1}, "format": SNAPSHOT_FORMAT}
+        assert not list(Path(temp_dir).glob("*.tmp"))
+
+        bad = Path(temp_dir) / "bad.snapshot"
+        bad.write_bytes(b"not a snapshot")
+        assert read_snapshot_header(bad) is None
+        assert read_snapshot_header(Path(temp_dir) / "missing.snapshot") is None
+        try:
+            load_snapshot(bad, MockProvider())
+            assert False, "bad snapshot loaded"
+        except ValueError:
+            pass
+
+    print("[PASS] Headers read, bad files rejected")
+    print()
+
+
+def test_snapshot_reclassifies_nets():
+    """Test that loaded nets are classified with the current power-rail patterns."""
+    print("=" * 80)
+    print("TEST: Snapshot Net Classification")
+    print("=" * 80)
+
+    librarian = make_librarian()
+    assert not librarian.get_net("N_1").is_global()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "design.snapshot"
+        save_snapshot(librarian, path)
+        try:
+            set_power_net_patterns(DEFAULT_POWER_NET_PATTERNS + (r"^N_1$",))
+            loaded = load_snapshot(path, MockProvider())
+            assert loaded.get_net("N_1")._global
+        finally:
+            set_power_net_patterns(DEFAULT_POWER_NET_PATTERNS)
+
+    print("[PASS] Nets classified on load")
+    print()
+
+
+def test_snapshot_benchmark():
+    """Benchmark: loading a snapshot against rebuilding from the provider."""
+    print("=" * 80)
+    print("BENCHMARK: Snapshot Load")
+    print("=" * 80)
+
+    librarian = make_librarian(20000)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "design.snapshot"
+        start = time.perf_counter()
+        save_snapshot(librarian, path)
+        save_time = time.perf_counter() - start
+        size = path.stat().st_size
+
+        start = time.perf_counter()
+        read_snapshot_header(path)
+        header_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        load_snapshot(path, MockProvider()).get_index()
+        load_time = time.perf_counter() - start
+
+    print(f"  snapshot size: {size / 1024:8.0f} KiB")
+    print(f"  save:          {save_time * 1000:8.1f} ms")
+    print(f"  header only:   {header_time * 1000:8.1f} ms")
+    print(f"  load + index:  {load_time * 1000:8.1f} ms")
+    if RUN_BENCHMARKS:
+        assert header_time < load_time
+
+    print("[PASS] Snapshot benchmark completed")
+    print()
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 80)
+    print("SNAPSHOT TEST SUITE")
+    print("=" * 80 + "\n")
+
+    test_snapshot_round_trip()
+    test_snapshot_header()
+    test_snapshot_reclassifies_nets()
+    test_snapshot_benchmark()
+
+    print("=" * 80)
+    print("ALL TESTS COMPLETED")
+    print("=" * 80)
@@ -15,9 +15,11 @@ import asyncio
 import json
 from pathlib import Path
 
-# Import the main module
+# Import the main module and set the server up as main() does
 import main
 
+mcp, altium_bridge = main.create_server()
+
 
 def test_server_initialization():
     """Test that the server initializes correctly"""
@@ -26,8 +28,8 @@ def test_server_initialization():
     print("=" * 80)
 
     try:
-        assert main.mcp is not None, "MCP server not initialized"
-        assert main.altium_bridge is not None, "Altium bridge not initialized"
+        assert mcp is not None, "MCP server not initialized"
+        assert altium_bridge is not None, "Altium bridge not initialized"
         print("✅ Server initialized successfully")
         return True
     except Exception as e:
@@ -43,7 +45,7 @@ def test_tools_registered():
 
     try:
         # Get all registered tools
-        tools = main.mcp.list_tools()
+        tools = mcp.list_tools()
 
         # Expected tools (23 total)
         expected_tools = [
@@ -115,7 +117,7 @@ def test_resources_registered():
 
     try:
         # Get all registered resources
-        resources = main.mcp.list_resources()
+        resources = mcp.list_resources()
 
         # Expected resources (8 total)
         expected_resources = [
@@ -168,7 +170,7 @@ def test_prompts_registered():
 
     try:
         # Get all registered prompts
-        prompts = main.mcp.list_prompts()
+        prompts = mcp.list_prompts()
 
         # Expected prompts (3 total)
         expected_prompts = [
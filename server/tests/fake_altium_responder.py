@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Fake Altium responder for bridge tests and benchmarks
+
+Stands in for one X2.EXE script launch: serves every pending
+request_<id>.json in the MCP directory, waiting a simulated processing delay
+for each, and writes response_<id>.json the way Altium_API.pas does (atomic
+rename, envelope header echoing the request id). The response carries the wall-clock time at which it was
+written so callers can measure pure notification latency. A "batch" request
+is answered with one result object per sub-command, as ExecuteBatch does.
+
+Usage:
+    python fake_altium_responder.py <mcp_dir> [--delay SECONDS]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bridge_protocol import encode_envelope, request_file_name, response_file_name, write_atomic
+
+
+def run_command(command: str, params: dict) -> dict:
+    """Answer a single command by echoing it back"""
+    return {
+        "success": True,
+        "result": {
+            "command": command,
+            "params": params,
+            "units": "\u03a9 \u00b5F \u2013 \u20ac",
+            "written_at": time.time()
+        }
+    }
+
+
+def answer(request: dict, mcp_dir: Path) -> str:
+    """
+    Write the response envelope for a parsed request into mcp_dir.
+
+    Returns:
+        The request's command name
+    """
+    command = request.pop("command", "")
+    request_id = request.pop("request_id", "")
+    if command == "batch":
+        response = {
+            "success": True,
+            "result": [
+                run_command(sub_request.pop("command", ""), sub_request)
+                for sub_request in request.get("commands", [])
+            ]
+        }
+    else:
+        response = run_command(command, request)
+
+    body = json.dumps(response, indent=2, ensure_ascii=False).encode("utf-8")
+    write_atomic(mcp_dir / response_file_name(request_id), encode_envelope(request_id, body))
+    return command
+
+
+def respond(mcp_dir: Path, delay: float = 0.0) -> None:
+    """Answer the pending requests in mcp_dir"""
+    for request_path in sorted(mcp_dir.glob(request_file_name("*"))):
+        try:
+            with open(request_path, "r") as f:
+                request = json.load(f)
+            request_path.unlink()
+        except FileNotFoundError:
+            # Served by another launch
+            continue
+
+        time.sleep(delay)
+
+        answer(request, mcp_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Altium responder")
+    parser.add_argument("mcp_dir", type=Path, help="MCP directory holding the request files")
+    parser.add_argument("--delay", type=float, default=0.0, help="Simulated processing time in seconds")
+    args = parser.parse_args()
+
+    respond(args.mcp_dir, args.delay)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
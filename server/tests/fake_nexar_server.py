@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Fake Nexar API for client tests and benchmarks
+
+Local stand-in for the Nexar identity and GraphQL endpoints: POST /token
+issues a bearer token and POST /graphql answers supMultiMatch queries from
+an in-memory catalog of parts. Each GraphQL request sleeps for a fixed
+latency first, so wall times behave like round trips to the real API, and
+the server records how many requests were in flight at once.
+
+With a quota, GraphQL requests beyond it are answered with HTTP 429 and a
+Retry-After header, like the real API's throttling; throttle_next forces
+the next few requests to be throttled.
+
+Usage in tests:
+    server = FakeNexarServer(make_catalog(100), latency=0.02)
+    server.start()
+    client = NexarClient("id", "secret")
+    client.AUTH_URL, client.API_URL = server.auth_url, server.api_url
+    ...
+    server.stop()
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+TOKEN = "fake-nexar-token"
+
+
+def make_part(mpn: str, stock: int = 1000, lifecycle: str = "Production") -> Dict[str, Any]:
+    """A catalog part shaped like a Nexar SupPart"""
+    return {
+        "mpn": mpn,
+        "shortDescription": f"Test part {mpn}",
+        "manufacturer": {"name": "Acme"},
+        "category": {"name": "Resistors"},
+        "bestDatasheet": {"url": f"https://example.com/{mpn}.pdf"},
+        "specs": [{"attribute": {"shortname": "lifecyclestatus"}, "displayValue": lifecycle}],
+        "sellers": [{
+            "company": {"name": "Distributor A"},
+            "offers": [{
+                "sku": f"A-{mpn}",
+                "inventoryLevel": stock,
+                "moq": 1,
+                "packaging": "Cut Tape",
+                "clickUrl": f"https://example.com/buy/{mpn}",
+                "updated": "2026-01-01T00:00:00Z",
+                "prices": [
+                    {"quantity": 1, "price": 0.10, "currency": "USD"},
+                    {"quantity": 100, "price": 0.05, "currency": "USD"},
+                ],
+            }],
+        }],
+    }
+
+
+def make_catalog(count: int) -> Dict[str, Dict[str, Any]]:
+    """Catalog of `count` parts named PART-0000, PART-0001, ..."""
+    return {f"PART-{i:04d}": make_part(f"PART-{i:04d}") for i in range(count)}
+
+
+class _Server(ThreadingHTTPServer):
+    # Concurrent clients overflow the default backlog of 5, and a dropped
+    # connection attempt costs a one-second SYN retry
+    request_queue_size = 128
+
+
+class FakeNexarServer:
+    """Threaded HTTP server answering token and supMultiMatch requests"""
+
+    def __init__(
+        self,
+        catalog: Dict[str, Dict[str, Any]],
+        latency: float = 0.0,
+        quota: Optional[float] = None,
+        quota_burst: Optional[float] = None,
+        send_retry_after: bool = True
+    ):
+        """
+        Args:
+            catalog: MPN -> part
+            latency: Seconds each GraphQL request takes
+            quota: GraphQL requests per second (token bucket), None for no limit
+            quota_burst: Bucket capacity (defaults to one second of quota)
+            send_retry_after: Whether 429 responses carry Retry-After
+        """
+        self.catalog = {mpn.upper(): part for mpn, part in catalog.items()}
+        self.latency = latency
+        self.quota = quota
+        self.quota_burst = quota_burst if quota_burst is not None else quota
+        self.send_retry_after = send_retry_after
+        self.throttle_next = 0
+        self.throttled = 0
+        self._quota_tokens = self.quota_burst
+        self._quota_updated = time.monotonic()
+        self.graphql_requests = 0
+        self.token_requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.queried_mpns: List[str] = []
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def auth_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/token"
+
+    @property
+    def api_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/graphql"
+
+    def start(self) -> None:
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, like the real API (without Nagle's delay on the
+            # headers-then-body writes of each response)
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if self.path == "/token":
+                    fake._count("token_requests")
+                    self._reply(200, {"access_token": TOKEN, "token_type": "Bearer", "expires_in": 3600})
+                elif self.path == "/graphql":
+                    if self.headers.get("Authorization") != f"Bearer {TOKEN}":
+                        self._reply(401, {"errors": [{"message": "Unauthorized"}]})
+                        return
+                    retry_after = fake._take_quota()
+                    if retry_after is not None:
+                        headers = {"Retry-After": f"{retry_after:.3f}"} if fake.send_retry_after else {}
+                        self._reply(429, {"errors": [{"message": "Too many requests"}]}, headers)
+                        return
+                    fake._enter()
+                    try:
+                        time.sleep(fake.latency)
+                        payload = fake.answer(json.loads(body))
+                    finally:
+                        fake._leave()
+                    self._reply(200, payload)
+                else:
+                    self._reply(404, {})
+
+            def _reply(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = _Server(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+
+    def answer(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """GraphQL response for one request body"""
+        if "supMultiMatch" not in payload.get("query", ""):
+            return {"errors": [{"message": "Unsupported query"}]}
+
+        matches = []
+        for query in payload.get("variables", {}).get("queries", []):
+            with self._lock:
+                self.queried_mpns.append(query["mpn"])
+            part = self.catalog.get(query["mpn"].upper())
+            matches.append({"hits": 1 if part else 0, "parts": [part] if part else []})
+        return {"data": {"supMultiMatch": matches}}
+
+    def _take_quota(self) -> Optional[float]:
+        """None if the request may proceed, else the seconds until it would"""
+        with self._lock:
+            if self.throttle_next > 0:
+                self.throttle_next -= 1
+                self.throttled += 1
+                return 0.05
+            if self.quota is None:
+                return None
+            now = time.monotonic()
+            self._quota_tokens = min(self.quota_burst, self._quota_tokens + (now - self._quota_updated) * self.quota)
+            self._quota_updated = now
+            if self._quota_tokens >= 1:
+                self._quota_tokens -= 1
+                return None
+            self.throttled += 1
+            return (1 - self._quota_tokens) / self.quota
+
+    def _enter(self) -> None:
+        with self._lock:
+            self.graphql_requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def _leave(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
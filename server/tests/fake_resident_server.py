@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Fake resident Altium script loop for bridge tests and benchmarks
+
+Python stand-in for the Serve procedure in Altium_API.pas: writes the
+spool/server.ready marker (rewriting it as a heartbeat while idle and after
+each request), answers the request files dropped into spool/ in file-name
+order (deleting each once answered), and exits after answering a
+"shutdown" request, removing the ready marker last.
+
+Usage:
+    python fake_resident_server.py <mcp_dir> [--delay SECONDS] [--journal FILE]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bridge_protocol import write_atomic
+from fake_altium_responder import answer
+
+IDLE_POLL_INTERVAL = 0.002
+HEARTBEAT_INTERVAL = 1.0
+
+
+def serve(mcp_dir: Path, delay: float = 0.0, journal: Optional[Path] = None) -> None:
+    """Serve spooled requests until a shutdown request arrives"""
+    spool_dir = mcp_dir / "spool"
+    ready_path = spool_dir / "server.ready"
+
+    def beat():
+        write_atomic(ready_path, time.ctime().encode("ascii"))
+        return time.monotonic()
+
+    spool_dir.mkdir(exist_ok=True)
+    last_beat = beat()
+
+    running = True
+    try:
+        while running:
+            pending = sorted(spool_dir.glob("*.json"))
+            for request_path in pending:
+                with open(request_path, "r") as f:
+                    request = json.load(f)
+
+                time.sleep(delay)
+                if journal is not None:
+                    with open(journal, "a") as f:
+                        f.write(request_path.name + "\n")
+
+                command = answer(request, mcp_dir)
+                request_path.unlink()
+                last_beat = beat()
+                if command == "shutdown":
+                    running = False
+                    break
+
+            if not pending:
+                if time.monotonic() - last_beat >= HEARTBEAT_INTERVAL:
+                    last_beat = beat()
+                time.sleep(IDLE_POLL_INTERVAL)
+    finally:
+        ready_path.unlink(missing_ok=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake resident Altium script loop")
+    parser.add_argument("mcp_dir", type=Path, help="MCP directory holding the spool directory")
+    parser.add_argument("--delay", type=float, default=0.0, help="Simulated processing time per request in seconds")
+    parser.add_argument("--journal", type=Path, help="Append the name of each served spool file to this file")
+    args = parser.parse_args()
+
+    serve(args.mcp_dir, args.delay, args.journal)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+"""
+Unit tests and benchmark for quantity-aware BOM costing
+"""
+import importlib.util
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add parent directory to path to import modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fake_nexar_server import FakeNexarServer, make_catalog
+from nexar_client import DistributorOffer, NexarClient, PriceBreak
+from test_nexar_client import FakeBridge
+from tools.distributor_tools import register_distributor_tools
+from schematic_core.benchmarking import benchmark
+
+HAVE_NUMPY = importlib.util.find_spec("numpy") is not None
+
+if HAVE_NUMPY:
+    from bom_costing import BomCostingEngine, cost_bom_at_quantities
+
+
+def offer(sku, prices, moq=1, stock=100000, currency="USD"):
+    return {
+        "sku": sku,
+        "moq": moq,
+        "inventoryLevel": stock,
+        "prices": [{"quantity": q, "price": p, "currency": currency} for q, p in prices],
+    }
+
+
+def part(*sellers):
+    """Part data with sellers given as (distributor, [offers])"""
+    return {"sellers": [{"company": {"name": name}, "offers": offers} for name, offers in sellers]}
+
+
+def line(mpn, designators, part_data):
+    return {"mpn": mpn, "designators": designators, "part": part_data}
+
+
+class TestPriceAtQuantity(unittest.TestCase):
+    """Test DistributorOffer.get_price_at_quantity"""
+
+    def test_price_breaks(self):
+        """Test that the highest break at or below the quantity applies"""
+        offer = DistributorOffer("A", "A-1", 100, 1, prices=[
+            PriceBreak(100, 0.5), PriceBreak(1, 1.0), PriceBreak(10, 0.8)
+        ])
+        self.assertEqual([pb.quantity for pb in offer.prices], [1, 10, 100])
+        self.assertEqual(
+            [offer.get_price_at_quantity(q) for q in (0, 1, 9, 10, 99, 100, 5000)],
+            [1.0, 1.0, 1.0, 0.8, 0.8, 0.5, 0.5]
+        )
+        self.assertIsNone(DistributorOffer("A", "A-1", 0, 1).get_price_at_quantity(5))
+
+
+@unittest.skipUnless(HAVE_NUMPY, "BOM costing requires numpy")
+class TestBomCosting(unittest.TestCase):
+    """Test BomCostingEngine"""
+
+    def test_multiplicity_and_price_breaks(self):
+        """Test that designator counts multiply demand and price breaks apply"""
+        lines = [line("C100N", ["C1", "C2", "C3", "C4"], part(("A", [offer("A-1", [(1, 0.10), (10, 0.05), (1000, 0.01)])])))]
+        result = cost_bom_at_quantities(lines, [1, 3, 250])
+
+        by_quantity = result["lines"][0]["by_quantity"]
+        self.assertEqual(by_quantity["1"]["order_quantity"], 4)
+        self.assertEqual(by_quantity["1"]["extended_cost"], 0.4)
+        self.assertEqual(by_quantity["3"]["unit_price"], 0.05)
+        self.assertEqual(by_quantity["3"]["extended_cost"], 0.6)
+        self.assertEqual(by_quantity["250"]["unit_price"], 0.01)
+        self.assertEqual(result["quantities"][2]["total_cost"], 10.0)
+        self.assertEqual(result["quantities"][2]["cost_per_board"], 0.04)
+
+    def test_cheapest_eligible_offer(self):
+        """Test MOQ, minimum break and stock limits when picking offers"""
+        lines = [line("U1", ["U1"], part(
+            ("Cheap reel", [offer("R-1", [(1, 0.20)], moq=1000)]),
+            ("Small stock", [offer("S-1", [(1, 0.50)], stock=50)]),
+            ("Cut tape", [offer("T-1", [(1, 1.00), (100, 0.90)])]),
+        ))]
+        result = cost_bom_at_quantities(lines, [1, 10, 100, 2000])
+        by_quantity = result["lines"][0]["by_quantity"]
+
+        # 1 board: MOQ 1000 at 0.20 costs 200, 1 from stock at 0.50 wins
+        self.assertEqual(by_quantity["1"]["distributor"], "Small stock")
+        self.assertEqual(by_quantity["10"]["extended_cost"], 5.0)
+        # 100 boards: small stock cannot fill, cut tape at 90 beats the reel at 200
+        self.assertEqual(by_quantity["100"]["distributor"], "Cut tape")
+        self.assertEqual(by_quantity["100"]["extended_cost"], 90.0)
+        # 2000 boards: the reel
+        self.assertEqual(by_quantity["2000"]["distributor"], "Cheap reel")
+        self.assertEqual(by_quantity["2000"]["order_quantity"], 2000)
+
+    def test_minimum_price_break_is_minimum_order(self):
+        """Test that an offer whose first break is above demand sells that break"""
+        lines = [line("R1", ["R1"], part(("A", [offer("A-1", [(5000, 0.001)])])))]
+        entry = cost_bom_at_quantities(lines, [1])["lines"][0]["by_quantity"]["1"]
+        self.assertEqual(entry["order_quantity"], 5000)
+        self.assertEqual(entry["extended_cost"], 5.0)
+
+    def test_unavailable_lines(self):
+        """Test lines with no part, no stock or other currencies"""
+        lines = [
+            line("NOPE", ["U9"], None),
+            line("EMPTY", ["U8"], part(("A", [offer("A-1", [(1, 1.0)], stock=0)]))),
+            line("EUR", ["U7"], part(("A", [offer("A-1", [(1, 1.0)], currency="EUR")]))),
+            line("OK", ["R1"], part(("A", [offer("A-1", [(1, 1.0)])]))),
+        ]
+        result = cost_bom_at_quantities(lines, [1, 10])
+
+        self.assertEqual([entry["lines_unavailable"] for entry in result["quantities"]], [3, 3])
+        self.assertEqual(result["quantities"][1]["total_cost"], 10.0)
+        self.assertEqual([entry["found"] for entry in result["lines"]], [False, True, True, True])
+        self.assertIsNone(result["lines"][1]["by_quantity"]["1"])
+        self.assertEqual(cost_bom_at_quantities(lines, [10], currency="EUR")["quantities"][0]["total_cost"], 10.0)
+
+    def test_empty_bom(self):
+        """Test a BOM without offers"""
+        result = cost_bom_at_quantities([line("NOPE", ["U1"], None)], [1, 10])
+        self.assertEqual([entry["total_cost"] for entry in result["quantities"]], [0.0, 0.0])
+
+    def test_matches_per_offer_reference(self):
+        """Test the vectorized pass against costing each offer with DistributorOffer"""
+        rng = random.Random(7)
+        lines = []
+        for i in range(60):
+            sellers = []
+            for s in range(rng.randint(0, 4)):
+                breaks = sorted(rng.sample([1, 10, 25, 100, 500, 1000, 2500, 10000], rng.randint(1, 5)))
+                price = rng.uniform(0.01, 5.0)
+                prices = [(q, round(price * (0.9 ** n), 4)) for n, q in enumerate(breaks)]
+                sellers.append((f"D{s}", [offer(f"D{s}-{i}", prices, moq=rng.choice([1, 1, 10, 100]),
+                                                stock=rng.choice([0, 50, 5000, 10 ** 7]))]))
+            lines.append(line(f"P{i}", [f"X{i}_{n}" for n in range(rng.randint(1, 8))], part(*sellers)))
+
+        quantities = [1, 10, 100, 1000, 10000]
+        result = cost_bom_at_quantities(lines, quantities)
+
+        for bom_line, costed in zip(lines, result["lines"]):
+            for boards in quantities:
+                needed = len(bom_line["designators"]) * boards
+                best = None
+                for seller in bom_line["part"]["sellers"]:
+                    for o in seller["offers"]:
+                        reference = DistributorOffer(seller["company"]["name"], o["sku"], o["inventoryLevel"], o["moq"],
+                                                     prices=[PriceBreak(p["quantity"], p["price"]) for p in o["prices"]])
+                        order = max(needed, reference.moq, reference.prices[0].quantity)
+                        if order > reference.in_stock:
+                            continue
+                        cost = order * reference.get_price_at_quantity(order)
+                        if best is None or cost < best - 1e-9:
+                            best = cost
+                chosen = costed["by_quantity"][str(boards)]
+                if best is None:
+                    self.assertIsNone(chosen)
+                else:
+                    self.assertAlmostEqual(chosen["extended_cost"], round(best, 4), places=4)
+
+    @benchmark
+    def test_benchmark_costing(self):
+        """Benchmark: a 300-line BOM with 10 offers per line at five build quantities"""
+        rng = random.Random(3)
+        lines = [
+            line(f"P{i}", [f"X{i}_{n}" for n in range(rng.randint(1, 20))], part(*[
+                (f"D{s}", [offer(f"D{s}-{i}", [(1, 1.0), (10, 0.8), (100, 0.5), (1000, 0.3), (10000, 0.2)],
+                                 moq=rng.choice([1, 10, 100]), stock=rng.choice([1000, 10 ** 6]))])
+                for s in range(10)
+            ]))
+            for i in range(300)
+        ]
+
+        start = time.perf_counter()
+        engine = BomCostingEngine(lines)
+        load = time.perf_counter() - start
+
+        start = time.perf_counter()
+        engine.cost()
+        sweep = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for bom_line in lines:
+            for boards in (1, 10, 100, 1000, 10000):
+                for seller in bom_line["part"]["sellers"]:
+                    for o in seller["offers"]:
+                        DistributorOffer("", o["sku"], o["inventoryLevel"], o["moq"], prices=[
+                            PriceBreak(p["quantity"], p["price"]) for p in o["prices"]
+                        ]).get_price_at_quantity(len(bom_line["designators"]) * boards)
+        per_offer = time.perf_counter() - start
+
+        print()
+        print(f"  load arrays:          {load * 1000:7.1f} ms")
+        print(f"  vectorized sweep:     {sweep * 1000:7.1f} ms")
+        print(f"  per-offer (Python):   {per_offer * 1000:7.1f} ms")
+        self.assertLess(sweep, per_offer)
+
+
+@unittest.skipUnless(HAVE_NUMPY, "BOM costing requires numpy")
+class TestCostBomTool(unittest.IsolatedAsyncioTestCase):
+    """Test the cost_bom_at_quantities tool against the fake Nexar API"""
+
+    def setUp(self):
+        self.server = FakeNexarServer(make_catalog(10))
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        for patcher in (
+            mock.patch.dict(os.environ, {"NEXAR_CLIENT_ID": "id", "NEXAR_CLIENT_SECRET": "secret"}),
+            mock.patch.object(NexarClient, "AUTH_URL", self.server.auth_url),
+            mock.patch.object(NexarClient, "API_URL", self.server.api_url),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        components = [{"designator": f"C{i}", "parameters": {"MPN": "PART-0001"}} for i in range(4)]
+        components.append({"designator": "U1", "parameters": {"MPN": "NOPE-1"}})
+        components.append({"designator": "J1", "parameters": {}})
+
+        self.tools = {}
+        tools = self.tools
+
+        class Collector:
+            def tool(self):
+                def decorator(func):
+                    tools[func.__name__] = func
+                    return func
+                return decorator
+
+        register_distributor_tools(Collector(), FakeBridge(components, Path(temp_dir.name)))
+
+    async def test_cost_bom(self):
+        """Test costing a BOM with a shared MPN, an unknown MPN and a part without MPN"""
+        result = json.loads(await self.tools["cost_bom_at_quantities"](build_quantities=[1, 25]))
+
+        self.assertTrue(result["success"])
+        self.assertEqual(result["not_found"], ["NOPE-1"])
+        self.assertEqual(result["components_without_mpn"], 1)
+        # Four capacitors per board: 4 x 0.10 for one board, 100 x 0.05 for 25 boards
+        self.assertEqual([entry["total_cost"] for entry in result["summary"]], [0.4, 5.0])
+        self.assertEqual([entry["lines_unavailable"] for entry in result["summary"]], [1, 1])
+        capacitors = next(entry for entry in result["lines"] if entry["mpn"] == "PART-0001")
+        self.assertEqual(capacitors["designators"], ["C0", "C1", "C2", "C3"])
+
+    async def test_rejects_bad_quantities(self):
+        """Test that build quantities below one are rejected"""
+        result = json.loads(await self.tools["cost_bom_at_quantities"](build_quantities=[0]))
+        self.assertFalse(result["success"])
+
+
+if __name__ == "__main__":
+    unittest.main()
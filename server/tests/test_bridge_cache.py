@@ -0,0 +1,168 @@
+"""
+Unit tests for the bridge query cache
+"""
+import asyncio
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add parent directory to path to import modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bridge_cache import BridgeCache
+from bridge_protocol import encode_envelope, write_atomic
+from test_request_scheduler import SimulatedAltiumBridge
+from tools.cache_tools import register_cache_tools
+
+
+class TestBridgeCache(unittest.TestCase):
+    """Test cases for BridgeCache"""
+
+    def setUp(self):
+        self.cache = BridgeCache(max_entries=2)
+
+    def test_hit_and_miss_counters(self):
+        """Test that lookups are counted as hits or misses"""
+        self.assertEqual(self.cache.lookup("get_all_nets", {}), (False, None))
+        self.cache.store("get_all_nets", {}, ["GND"], self.cache.generation)
+        self.assertEqual(self.cache.lookup("get_all_nets", {}), (True, ["GND"]))
+
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (1, 1, 1))
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+    def test_key_ignores_param_order(self):
+        """Test that equal params in a different order share an entry"""
+        self.cache.store("get_component_pins", {"a": 1, "b": 2}, "pins", self.cache.generation)
+        self.assertTrue(self.cache.lookup("get_component_pins", {"b": 2, "a": 1})[0])
+        self.assertFalse(self.cache.lookup("get_component_pins", {"a": 1})[0])
+
+    def test_callers_get_private_copies(self):
+        """Test that modifying returned data does not corrupt the cache"""
+        self.cache.store("get_all_component_data", {}, [{"designator": "R1"}], self.cache.generation)
+        _, data = self.cache.lookup("get_all_component_data", {})
+        data[0]["designator"] = "XX"
+        data.append({})
+        self.assertEqual(self.cache.lookup("get_all_component_data", {})[1], [{"designator": "R1"}])
+
+    def test_invalidate_starts_new_generation(self):
+        """Test that invalidation drops entries and rejects results from the old generation"""
+        generation = self.cache.generation
+        self.cache.store("get_all_nets", {}, ["GND"], generation)
+        self.cache.invalidate()
+
+        self.assertEqual(self.cache.generation, generation + 1)
+        self.assertFalse(self.cache.lookup("get_all_nets", {})[0])
+        self.assertFalse(self.cache.store("get_all_nets", {}, ["GND"], generation))
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first"""
+        for command in ("a", "b"):
+            self.cache.store(command, {}, command, self.cache.generation)
+        self.cache.lookup("a", {})
+        self.cache.store("c", {}, "c", self.cache.generation)
+        self.assertTrue(self.cache.lookup("a", {})[0])
+        self.assertFalse(self.cache.lookup("b", {})[0])
+
+
+class TestBridgeCaching(unittest.IsolatedAsyncioTestCase):
+    """Test cases for caching in AltiumBridge"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.bridge = SimulatedAltiumBridge(Path(self.temp_dir.name))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def altium_calls(self, command):
+        return sum(1 for entry in self.bridge.timeline if entry[0] == command)
+
+    async def test_repeated_query_served_from_cache(self):
+        """Test that get_all_component_data reaches Altium once"""
+        for _ in range(5):
+            result = await self.bridge.call_script("get_all_component_data", {})
+            self.assertTrue(result.success, result.error)
+        self.assertEqual(self.altium_calls("get_all_component_data"), 1)
+        self.assertEqual(self.bridge.cache.hits, 4)
+
+    async def test_mutation_invalidates(self):
+        """Test that a mutating command makes the next query go to Altium"""
+        await self.bridge.call_script("get_all_component_data", {})
+        await self.bridge.call_script("move_components", {"designators": ["R1"], "x_offset": 1})
+        await self.bridge.call_script("get_all_component_data", {})
+        self.assertEqual(self.altium_calls("get_all_component_data"), 2)
+        self.assertEqual(self.bridge.cache.generation, 1)
+
+    async def test_queued_read_sees_mutation(self):
+        """Test that a read issued behind a mutation is not answered from the old cache"""
+        await self.bridge.call_script("get_all_component_data", {})
+        await asyncio.gather(
+            self.bridge.call_script("delete_component", {"designator": "R1"}),
+            self.bridge.call_script("get_all_component_data", {})
+        )
+        self.assertEqual(self.altium_calls("get_all_component_data"), 2)
+
+    async def test_uncacheable_and_failed_results_not_cached(self):
+        """Test that selection queries and failures always reach Altium"""
+        for _ in range(2):
+            await self.bridge.call_script("get_selected_components_coordinates", {})
+        self.assertEqual(self.altium_calls("get_selected_components_coordinates"), 2)
+
+        async def fail(request):
+            body = json.dumps({"success": False, "error": "No PCB open"}).encode("utf-8")
+            write_atomic(self.bridge.response_path_for(request["request_id"]),
+                         encode_envelope(request["request_id"], body))
+        self.bridge._answer = fail
+        for _ in range(2):
+            result = await self.bridge.call_script("get_pcb_rules", {})
+            self.assertFalse(result.success)
+        self.assertEqual(self.bridge.cache.stats()["entries"], 0)
+
+    async def test_read_only_batch_sends_only_misses(self):
+        """Test that a read-only batch takes cached results from the cache"""
+        await self.bridge.call_script("get_all_component_data", {})
+        components, nets = await self.bridge.call_script_batch([
+            ("get_all_component_data", {}),
+            ("get_all_nets", {})
+        ])
+        self.assertTrue(components.success and nets.success)
+        self.assertEqual(self.altium_calls("get_all_component_data"), 1)
+        self.assertEqual(self.altium_calls("batch"), 1)
+
+        # Everything cached now: no launch at all
+        await self.bridge.call_script_batch([("get_all_component_data", {}), ("get_all_nets", {})])
+        self.assertEqual(self.altium_calls("batch"), 1)
+
+    async def test_invalidate_cache_tool(self):
+        """Test the invalidate_cache and get_cache_stats tools"""
+        class FakeMCP:
+            def __init__(self):
+                self.tools = {}
+
+            def tool(self):
+                def decorator(func):
+                    self.tools[func.__name__] = func
+                    return func
+                return decorator
+
+        mcp = FakeMCP()
+        register_cache_tools(mcp, self.bridge)
+
+        await self.bridge.call_script("get_all_component_data", {})
+        await self.bridge.call_script("get_all_component_data", {})
+        stats = json.loads(await mcp.tools["get_cache_stats"]())
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+        response = json.loads(await mcp.tools["invalidate_cache"]())
+        self.assertTrue(response["success"])
+        self.assertEqual(response["cache"]["entries"], 0)
+        await self.bridge.call_script("get_all_component_data", {})
+        self.assertEqual(self.altium_calls("get_all_component_data"), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,377 @@
+"""
+Unit tests for the bridge file protocol (atomic writes, response envelopes)
+"""
+import asyncio
+import json
+import sys
+import tempfile
+import unittest
+import zlib
+from pathlib import Path
+
+# Add parent directory to path to import modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from altium_bridge import AltiumBridge
+from bridge_protocol import (
+    EnvelopeError,
+    decode_envelope,
+    encode_envelope,
+    new_request_id,
+    request_file_name,
+    response_file_name,
+    write_atomic,
+    write_json_atomic,
+)
+from fake_altium_responder import respond
+
+
+def pascal_adler32_hex(text: str) -> str:
+    """Python port of Adler32Hex in json_utils.pas (over the UTF-8 bytes)"""
+    a, b = 1, 0
+    for code_point in map(ord, text):
+        if code_point < 0x80:
+            data = [code_point]
+        elif code_point < 0x800:
+            data = [0xC0 | (code_point >> 6), 0x80 | (code_point & 0x3F)]
+        elif code_point < 0x10000:
+            data = [0xE0 | (code_point >> 12), 0x80 | ((code_point >> 6) & 0x3F), 0x80 | (code_point & 0x3F)]
+        else:
+            data = [0xF0 | (code_point >> 18), 0x80 | ((code_point >> 12) & 0x3F),
+                    0x80 | ((code_point >> 6) & 0x3F), 0x80 | (code_point & 0x3F)]
+        for byte in data:
+            a = (a + byte) % 65521
+            b = (b + a) % 65521
+    return f"{b:04X}{a:04X}".lower()
+
+
+def pascal_utf8_length(text: str) -> int:
+    """Python port of Utf8Length in json_utils.pas"""
+    return sum(1 if c < 0x80 else 2 if c < 0x800 else 3 if c < 0x10000 else 4 for c in map(ord, text))
+
+
+def pascal_write_envelope(body: str, request_id: str) -> bytes:
+    """Bytes WriteEnvelopeToFile leaves on disk (SaveToFile with TEncoding.UTF8)"""
+    header = (f'{{"request_id": "{request_id}", "length": {pascal_utf8_length(body)}, '
+              f'"adler32": "{pascal_adler32_hex(body)}"}}')
+    return b"\xef\xbb\xbf" + (header + "\r\n" + body).encode("utf-8")
+
+
+def pascal_split_batch(lines):
+    """Python port of the sub-request slicing in ExecuteBatch (command_router.pas)"""
+    def trim_json(value):
+        return value.replace('"', '').replace(',', '').strip()
+
+    i = 0
+    while i < len(lines) and '"command":' not in lines[i]:
+        i += 1
+    i += 1
+
+    sub_requests = []
+    while i < len(lines):
+        line = lines[i]
+        i += 1
+        if '"command":' not in line:
+            continue
+        params = {}
+        while i < len(lines) and '"command":' not in lines[i]:
+            # ExtractParameter
+            name, colon, value = lines[i].partition(':')
+            if colon:
+                params[trim_json(name)] = value if '[' in value else trim_json(value)
+            i += 1
+        sub_requests.append((trim_json(line.partition(':')[2]), params))
+    return sub_requests
+
+
+class TestEnvelope(unittest.TestCase):
+    """Test cases for encode_envelope / decode_envelope"""
+
+    def setUp(self):
+        self.body = json.dumps({"success": True, "result": [1, 2, 3]}, indent=2).encode("utf-8")
+
+    def test_round_trip(self):
+        """Test that an encoded envelope decodes to the same id and body"""
+        request_id, body = decode_envelope(encode_envelope("abc123", self.body))
+        self.assertEqual(request_id, "abc123")
+        self.assertEqual(body, self.body)
+
+    def test_truncated_body_rejected(self):
+        """Test that a partially written body is rejected"""
+        raw = encode_envelope("abc123", self.body)
+        with self.assertRaises(EnvelopeError):
+            decode_envelope(raw[:-5])
+
+    def test_corrupted_body_rejected(self):
+        """Test that a body with the right length but wrong bytes is rejected"""
+        raw = bytearray(encode_envelope("abc123", self.body))
+        raw[-3] ^= 0x01
+        with self.assertRaises(EnvelopeError):
+            decode_envelope(bytes(raw))
+
+    def test_missing_header_rejected(self):
+        """Test that a bare JSON body (old script) is rejected"""
+        with self.assertRaises(EnvelopeError):
+            decode_envelope(b'{"success": true}')
+        with self.assertRaises(EnvelopeError):
+            decode_envelope(self.body)
+
+    def test_utf8_bom_tolerated(self):
+        """Test that a BOM written by SaveToFile is skipped"""
+        raw = b"\xef\xbb\xbf" + encode_envelope("abc123", self.body)
+        self.assertEqual(decode_envelope(raw), ("abc123", self.body))
+
+    def test_pascal_checksum_matches(self):
+        """Test that the DelphiScript Adler-32 agrees with zlib"""
+        text = '{\r\n  "success": true,\r\n  "result": "R1 10k"\r\n}\r\n'
+        self.assertEqual(pascal_adler32_hex(text), f"{zlib.adler32(text.encode('ascii')):08x}")
+
+        # A file written the way WriteEnvelopeToFile does must decode
+        self.assertEqual(decode_envelope(pascal_write_envelope(text, "id1")), ("id1", text.encode("ascii")))
+
+    def test_pascal_envelope_non_ascii(self):
+        """Test that length and checksum cover the UTF-8 bytes of non-ASCII text"""
+        text = '{\r\n  "result": "R1 10k\u03a9 \u00b15% \u20ac0.01 \u2013 \u2019x\u2019 \u2122 \U0001f50c"\r\n}\r\n'
+        encoded = text.encode("utf-8")
+        self.assertEqual(pascal_utf8_length(text), len(encoded))
+        self.assertEqual(pascal_adler32_hex(text), f"{zlib.adler32(encoded):08x}")
+
+        request_id, body = decode_envelope(pascal_write_envelope(text, "id1"))
+        self.assertEqual(json.loads(body.decode("utf-8"))["result"], json.loads(text)["result"])
+
+    def test_file_names_carry_request_id(self):
+        """Test that request and response files are named after the request id"""
+        self.assertEqual(request_file_name("abc123"), "request_abc123.json")
+        self.assertEqual(response_file_name("abc123"), "response_abc123.json")
+
+    def test_request_ids_unique(self):
+        """Test that request ids do not repeat"""
+        self.assertEqual(len({new_request_id() for _ in range(1000)}), 1000)
+
+
+class TestAtomicWrite(unittest.TestCase):
+    """Test cases for write_atomic / write_json_atomic"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.temp_dir.name) / "request.json"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_write_replaces_and_leaves_no_temp_file(self):
+        """Test that the destination is replaced and the temp file is gone"""
+        self.path.write_text("old")
+        write_atomic(self.path, b"new")
+        self.assertEqual(self.path.read_bytes(), b"new")
+        self.assertEqual([p.name for p in self.path.parent.iterdir()], ["request.json"])
+
+    def test_json_is_one_key_per_line(self):
+        """Test that requests keep the indented layout the DelphiScript parser needs"""
+        write_json_atomic(self.path, {"command": "get_project_info", "request_id": "x"})
+        lines = self.path.read_text().splitlines()
+        self.assertIn('  "command": "get_project_info",', lines)
+        self.assertIn('  "request_id": "x"', lines)
+
+
+class ScriptedBridge(AltiumBridge):
+    """AltiumBridge whose 'script launch' writes pre-scripted response files"""
+
+    def __init__(self, mcp_dir: Path, responder):
+        super().__init__(mcp_dir, mcp_dir / "Altium_API.PrjScr")
+        self.responder = responder
+        self.launches = 0
+
+    async def _run_altium_script(self) -> bool:
+        self.launches += 1
+        self.request_path = next(self.mcp_dir.glob(request_file_name("*")))
+        request = json.loads(self.request_path.read_text())
+        self.response_path = self.response_path_for(request["request_id"])
+        asyncio.get_running_loop().call_later(0.01, self.responder, self, request)
+        return True
+
+
+class TestBridgeEnvelopeHandling(unittest.IsolatedAsyncioTestCase):
+    """Test cases for how AltiumBridge reads envelopes"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.mcp_dir = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    @staticmethod
+    def body(result) -> bytes:
+        return json.dumps({"success": True, "result": result}).encode("utf-8")
+
+    async def test_request_id_round_trip(self):
+        """Test that the request carries an id and the matching response is accepted"""
+        def responder(bridge, request):
+            write_atomic(bridge.response_path, encode_envelope(request["request_id"], self.body("ok")))
+
+        result = await ScriptedBridge(self.mcp_dir, responder).call_script("get_project_info", {})
+        self.assertTrue(result.success, result.error)
+        self.assertEqual(result.data, "ok")
+
+    async def test_stale_response_discarded(self):
+        """Test that a response for another request is skipped, not returned"""
+        def responder(bridge, request):
+            write_atomic(bridge.response_path, encode_envelope("stale", self.body("old")))
+
+            def write_real():
+                write_atomic(bridge.response_path, encode_envelope(request["request_id"], self.body("new")))
+            asyncio.get_running_loop().call_later(0.05, write_real)
+
+        result = await ScriptedBridge(self.mcp_dir, responder).call_script("get_project_info", {}, timeout=5)
+        self.assertTrue(result.success, result.error)
+        self.assertEqual(result.data, "new")
+
+    async def test_corrupt_response_reported(self):
+        """Test that a response failing its checksum is reported as an error"""
+        def responder(bridge, request):
+            raw = bytearray(encode_envelope(request["request_id"], self.body("ok")))
+            raw[-2] ^= 0x01
+            write_atomic(bridge.response_path, bytes(raw))
+
+        result = await ScriptedBridge(self.mcp_dir, responder).call_script("get_project_info", {})
+        self.assertFalse(result.success)
+        self.assertIn("envelope", result.error)
+
+    async def test_non_ascii_response(self):
+        """Test that a UTF-8 body with non-ASCII characters decodes intact"""
+        value = "10k\u03a9 \u00b11% \u2013 \u20ac0.02 \u2019Acme\u2122\u2019"
+
+        def responder(bridge, request):
+            body = json.dumps({"success": True, "result": value}, ensure_ascii=False).encode("utf-8")
+            write_atomic(bridge.response_path, b"\xef\xbb\xbf" + encode_envelope(request["request_id"], body))
+
+        result = await ScriptedBridge(self.mcp_dir, responder).call_script("get_project_info", {})
+        self.assertTrue(result.success, result.error)
+        self.assertEqual(result.data, value)
+
+    async def test_error_response(self):
+        """Test that a script-side failure is passed through"""
+        def responder(bridge, request):
+            body = json.dumps({"success": False, "error": "No PCB open"}).encode("utf-8")
+            write_atomic(bridge.response_path, encode_envelope(request["request_id"], body))
+
+        result = await ScriptedBridge(self.mcp_dir, responder).call_script("get_pcb_rules", {})
+        self.assertFalse(result.success)
+        self.assertEqual(result.error, "No PCB open")
+
+
+class TestBridgeBatch(unittest.IsolatedAsyncioTestCase):
+    """Test cases for AltiumBridge.call_script_batch"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.mcp_dir = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    @staticmethod
+    def reply(bridge, results):
+        request_id = json.loads(bridge.request_path.read_text())["request_id"]
+        body = json.dumps({"success": True, "result": results}).encode("utf-8")
+        write_atomic(bridge.response_path, encode_envelope(request_id, body))
+
+    async def test_batch_runs_in_one_launch(self):
+        """Test that all commands run in one launch and results keep their order"""
+        bridge = ScriptedBridge(self.mcp_dir, lambda bridge, request: respond(bridge.mcp_dir))
+        results = await bridge.call_script_batch([
+            ("get_all_component_data", {}),
+            ("get_all_nets", {}),
+            ("get_component_pins", {"designators": ["R1", "C2"]})
+        ])
+
+        self.assertEqual(bridge.launches, 1)
+        self.assertEqual(
+            [r.data["command"] for r in results],
+            ["get_all_component_data", "get_all_nets", "get_component_pins"]
+        )
+        self.assertEqual(results[2].data["params"], {"designators": ["R1", "C2"]})
+        self.assertEqual(results[0].data["units"], "\u03a9 \u00b5F \u2013 \u20ac")
+
+    async def test_request_splits_like_execute_batch(self):
+        """Test that the request file slices cleanly into one sub-request per command"""
+        captured = {}
+
+        def responder(bridge, request):
+            captured["lines"] = bridge.request_path.read_text().splitlines()
+            self.reply(bridge, [{"success": True, "result": "ok"}] * 3)
+
+        await ScriptedBridge(self.mcp_dir, responder).call_script_batch([
+            ("get_project_info", {}),
+            ("move_components", {"x_offset": 10, "rotation": 90}),
+            ("get_pcb_rules", {})
+        ])
+
+        first_command = next(line for line in captured["lines"] if '"command":' in line)
+        self.assertIn('"batch"', first_command)
+
+        sub_requests = pascal_split_batch(captured["lines"])
+        self.assertEqual([command for command, _ in sub_requests],
+                         ["get_project_info", "move_components", "get_pcb_rules"])
+        self.assertEqual(sub_requests[1][1]["x_offset"], "10")
+        self.assertEqual(sub_requests[1][1]["rotation"], "90")
+        self.assertNotIn("request_id", sub_requests[0][1])
+
+    async def test_sub_command_failure_is_per_entry(self):
+        """Test that one failing sub-command does not fail the others"""
+        def responder(bridge, request):
+            self.reply(bridge, [
+                {"success": True, "result": {"project_path": "C:/a.PrjPcb"}},
+                {"success": False, "error": "No PCB open"}
+            ])
+
+        info, rules = await ScriptedBridge(self.mcp_dir, responder).call_script_batch([
+            ("get_project_info", {}),
+            ("get_pcb_rules", {})
+        ])
+        self.assertTrue(info.success)
+        self.assertEqual(info.data["project_path"], "C:/a.PrjPcb")
+        self.assertFalse(rules.success)
+        self.assertEqual(rules.error, "No PCB open")
+
+    async def test_batch_failure_applies_to_every_entry(self):
+        """Test that a failed batch response is reported for every command"""
+        def responder(bridge, request):
+            body = json.dumps({"success": False, "error": "Unknown command: batch"}).encode("utf-8")
+            write_atomic(bridge.response_path, encode_envelope(request["request_id"], body))
+
+        results = await ScriptedBridge(self.mcp_dir, responder).call_script_batch([
+            ("get_all_component_data", {}),
+            ("get_all_nets", {})
+        ])
+        self.assertEqual(len(results), 2)
+        for result in results:
+            self.assertFalse(result.success)
+            self.assertEqual(result.error, "Unknown command: batch")
+
+    async def test_result_count_mismatch_reported(self):
+        """Test that a response with the wrong number of results is rejected"""
+        def responder(bridge, request):
+            self.reply(bridge, [{"success": True, "result": "ok"}])
+
+        results = await ScriptedBridge(self.mcp_dir, responder).call_script_batch([
+            ("get_all_component_data", {}),
+            ("get_all_nets", {})
+        ])
+        self.assertTrue(all(not r.success for r in results))
+        self.assertIn("1 results for 2 commands", results[0].error)
+
+    async def test_invalid_batches(self):
+        """Test empty, nested and 'command'-keyed batches"""
+        bridge = ScriptedBridge(self.mcp_dir, lambda bridge, request: None)
+        self.assertEqual(await bridge.call_script_batch([]), [])
+        with self.assertRaises(ValueError):
+            await bridge.call_script_batch([("batch", {})])
+        with self.assertRaises(ValueError):
+            await bridge.call_script_batch([("get_all_nets", {"command": "x"})])
+        self.assertEqual(bridge.launches, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
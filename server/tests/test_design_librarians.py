@@ -0,0 +1,402 @@
+"""
+Unit tests for the long-lived per-project Librarians
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+import unittest.mock
+from pathlib import Path
+
+# Add parent directory to path to import modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from design_librarians import (
+    DesignLibrarians,
+    configure_power_net_patterns,
+    design_fingerprint,
+    load_design_file,
+    load_whole_design,
+    project_document_mtimes,
+)
+from schematic_core.adapters.altium_json import AltiumJSONAdapter
+from schematic_core.benchmarking import RUN_BENCHMARKS
+from schematic_core.librarian import Librarian
+from schematic_core.models import DEFAULT_POWER_NET_PATTERNS, Net, get_power_net_patterns
+from schematic_core.snapshot import save_snapshot
+from test_streamed_responses import StreamingAltiumBridge, make_design_records
+
+
+def project_records(path, components=20):
+    return [{"type": "project", "path": path}, *make_design_records(components)]
+
+
+class TestDesignFingerprint(unittest.TestCase):
+    """Test cases for design_fingerprint"""
+
+    def test_key_order_does_not_matter(self):
+        """Test that equal designs give equal fingerprints"""
+        a = {"components": [{"designator": "R1", "sheet": "A"}], "nets": []}
+        b = {"nets": [], "components": [{"sheet": "A", "designator": "R1"}]}
+        self.assertEqual(design_fingerprint(a), design_fingerprint(b))
+
+    def test_content_matters(self):
+        """Test that a changed net gives a different fingerprint"""
+        a = {"components": [{"designator": "R1", "pins": [{"name": "1", "net": "A"}]}]}
+        b = {"components": [{"designator": "R1", "pins": [{"name": "1", "net": "B"}]}]}
+        self.assertNotEqual(design_fingerprint(a), design_fingerprint(b))
+
+
+class _Unpickled:
+    """Counts how often it is unpickled, standing in for a malicious payload"""
+
+    loads = 0
+
+    def __reduce__(self):
+        return _record_unpickle, ()
+
+
+def _record_unpickle():
+    _Unpickled.loads += 1
+    return None
+
+
+def load_design_file_from(directory: Path, design) -> Librarian:
+    path = directory / "design.json"
+    path.write_text(json.dumps(design))
+    return load_design_file(str(path))
+
+
+class TestLoadDesignFile(unittest.TestCase):
+    """Test cases for load_design_file"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.temp_dir.name)
+        records = list(make_design_records(10))
+        self.design = {"components": [{k: v for k, v in r.items() if k != "type"} for r in records[:10]]}
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_design_json_and_snapshot(self):
+        """Test that design JSON files and snapshots load to the same Librarian state"""
+        path = self.directory / "whole_design_json.json"
+        path.write_text(json.dumps(self.design))
+        from_json = load_design_file(str(path))
+
+        snapshot = self.directory / "snapshots" / "design.snapshot"
+        save_snapshot(from_json, snapshot)
+        from_snapshot = load_design_file(str(snapshot), snapshot_dir=self.directory / "snapshots")
+
+        self.assertEqual(len(from_json.components), 10)
+        self.assertEqual(from_snapshot.get_index(), from_json.get_index())
+
+    def test_snapshot_outside_snapshot_dir_not_unpickled(self):
+        """Test that a snapshot-shaped file elsewhere is never unpickled"""
+        snapshot = self.directory / "elsewhere" / "design.snapshot"
+        save_snapshot(load_design_file_from(self.directory, self.design), snapshot,
+                      header={"payload": _Unpickled()})
+        _Unpickled.loads = 0
+
+        with self.assertRaises(ValueError):
+            load_design_file(str(snapshot), snapshot_dir=self.directory / "snapshots")
+        with self.assertRaises(ValueError):
+            load_design_file(str(self.directory / "snapshots" / ".." / "elsewhere" / "design.snapshot"),
+                             snapshot_dir=self.directory / "snapshots")
+        self.assertEqual(_Unpickled.loads, 0)
+
+        # The same file inside the snapshot directory is a snapshot
+        inside = self.directory / "snapshots" / "design.snapshot"
+        inside.parent.mkdir()
+        inside.write_bytes(snapshot.read_bytes())
+        self.assertEqual(len(load_design_file(str(inside), snapshot_dir=self.directory / "snapshots").components), 10)
+        self.assertGreater(_Unpickled.loads, 0)
+
+    def test_invalid_file(self):
+        """Test that a file that is neither format raises"""
+        path = self.directory / "notes.txt"
+        path.write_text("not a design")
+        with self.assertRaises(ValueError):
+            load_design_file(str(path))
+
+
+class TestConfigurePowerNetPatterns(unittest.TestCase):
+    """Test cases for configure_power_net_patterns"""
+
+    def tearDown(self):
+        configure_power_net_patterns("")
+
+    def test_extra_patterns_added_to_defaults(self):
+        """Test that semicolon-separated patterns extend the defaults"""
+        configure_power_net_patterns(" ^AVDD ; ^VPP_.* ;")
+        self.assertEqual(get_power_net_patterns(), DEFAULT_POWER_NET_PATTERNS + ("^AVDD", "^VPP_.*"))
+        self.assertTrue(Net("VPP_1").is_global())
+        self.assertTrue(Net("GND").is_global())
+
+    def test_environment_variable(self):
+        """Test that patterns are read from SCHEMATIC_POWER_NET_PATTERNS by default"""
+        with unittest.mock.patch.dict("os.environ", {"SCHEMATIC_POWER_NET_PATTERNS": "^AVDD"}):
+            configure_power_net_patterns()
+        self.assertTrue(Net("AVDD").is_global())
+
+
+class TestDesignLibrarians(unittest.IsolatedAsyncioTestCase):
+    """Test cases for DesignLibrarians"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.bridge = StreamingAltiumBridge(Path(self.temp_dir.name), project_records("C:\\A.PrjPcb"))
+        self.librarians = DesignLibrarians(self.bridge)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    async def test_repeated_queries_stay_warm(self):
+        """Test that repeated page and context queries reuse one refreshed Librarian"""
+        librarian = await self.librarians.get()
+        librarian.get_page("Sheet0.SchDoc")
+        components = librarian.components
+
+        for _ in range(10):
+            again = await self.librarians.get()
+            self.assertIs(again, librarian)
+            again.get_page("Sheet1.SchDoc")
+            again.get_context(["U3"])
+            self.assertFalse(again.dirty)
+            self.assertIs(again.components, components)  # Not rebuilt
+
+        self.assertEqual(self.bridge.launches, 1)
+        self.assertEqual((self.librarians.exports, self.librarians.rebuilds), (1, 1))
+
+    async def test_unchanged_export_keeps_state(self):
+        """Test that a mutation that leaves the schematic unchanged does not rebuild"""
+        librarian = await self.librarians.get()
+        librarian.get_index()
+
+        self.bridge.cache.invalidate()
+        self.assertIs(await self.librarians.get(), librarian)
+        self.assertFalse(librarian.dirty)
+        self.assertEqual((self.librarians.exports, self.librarians.rebuilds), (2, 1))
+
+    async def test_changed_export_marks_dirty(self):
+        """Test that a changed design refreshes the project's Librarian"""
+        librarian = await self.librarians.get()
+        self.assertIsNone(librarian.get_component("U25"))
+
+        self.bridge.records = project_records("C:\\A.PrjPcb", components=30)
+        self.bridge.cache.invalidate()
+        self.assertIs(await self.librarians.get(), librarian)
+        self.assertTrue(librarian.dirty)
+        self.assertIsNotNone(librarian.get_component("U25"))
+        self.assertEqual(self.librarians.rebuilds, 2)
+
+    async def test_one_librarian_per_project(self):
+        """Test that switching projects keeps each project's Librarian"""
+        first = await self.librarians.get()
+        first.get_index()
+
+        self.bridge.records = project_records("C:\\B.PrjPcb")
+        self.bridge.cache.invalidate()
+        second = await self.librarians.get()
+        self.assertIsNot(second, first)
+
+        self.bridge.records = project_records("C:\\A.PrjPcb")
+        self.bridge.cache.invalidate()
+        self.assertIs(await self.librarians.get(), first)
+        self.assertFalse(first.dirty)
+
+    async def test_checkout_holds_librarian(self):
+        """Test that a checked-out Librarian is refreshed and not updated until released"""
+        librarian = await self.librarians.get()
+        self.bridge.records = project_records("C:\\A.PrjPcb", components=30)
+        self.bridge.cache.invalidate()
+
+        async with self.librarians.checkout() as held:
+            self.assertIs(held, librarian)
+            self.assertFalse(held.dirty)  # Refreshed before it is handed out
+            self.assertIsNotNone(held.get_component("U25"))
+
+            self.bridge.records = project_records("C:\\A.PrjPcb", components=40)
+            self.bridge.cache.invalidate()
+            waiting = asyncio.ensure_future(self.librarians.get())
+            await asyncio.sleep(0.05)
+            self.assertFalse(waiting.done())
+            self.assertIsNone(held.get_component("U35"))
+
+        self.assertIs(await waiting, librarian)
+        self.assertIsNotNone(librarian.get_component("U35"))
+
+    async def test_warm_queries_faster_than_rebuild(self):
+        """Benchmark: page queries on a warm Librarian against a new Librarian per query"""
+        self.bridge.records = project_records("C:\\A.PrjPcb", components=2000)
+        self.bridge.part_delay = 0
+        librarian = await self.librarians.get()  # Export once; both variants start from the cached design
+        librarian.get_page("Sheet0.SchDoc")
+        components = librarian.components
+
+        start = time.perf_counter()
+        for _ in range(10):
+            # What every schematic tool call used to do
+            Librarian(AltiumJSONAdapter(await load_whole_design(self.bridge))).get_page("Sheet0.SchDoc")
+        rebuilt = (time.perf_counter() - start) / 10
+
+        start = time.perf_counter()
+        for _ in range(10):
+            warm_librarian = await self.librarians.get()
+            warm_librarian.get_page("Sheet0.SchDoc")
+            self.assertIs(warm_librarian, librarian)
+        warm = (time.perf_counter() - start) / 10
+
+        print()
+        print(f"  new Librarian per query: {rebuilt * 1000:8.1f} ms")
+        print(f"  warm Librarian:          {warm * 1000:8.1f} ms")
+        # The warm queries neither exported nor rebuilt anything
+        self.assertEqual(self.bridge.launches, 1)
+        self.assertEqual((self.librarians.exports, self.librarians.rebuilds), (1, 1))
+        self.assertIs(librarian.components, components)
+        if RUN_BENCHMARKS:
+            self.assertLess(warm * 2, rebuilt)
+
+
+def write_project(directory: Path, sheets: int = 4) -> str:
+    """A project file listing Sheet<i>.SchDoc documents, with the documents"""
+    (directory / "Sub").mkdir()
+    lines = ["[Design]", "Version=1.0"]
+    for i in range(sheets):
+        document = f"Sub\\Sheet{i}.SchDoc" if i == sheets - 1 else f"Sheet{i}.SchDoc"
+        (directory / document.replace("\\", os.sep)).write_text(f"sheet {i}")
+        lines += ["", f"[Document{i + 1}]", f"DocumentPath={document}"]
+    project = directory / "A.PrjPcb"
+    project.write_text("\r\n".join(lines))
+    return str(project)
+
+
+def touch(path: Path) -> None:
+    """Move a file's modification time forward"""
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestProjectDocumentMtimes(unittest.TestCase):
+    """Test cases for project_document_mtimes"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_lists_project_and_documents(self):
+        """Test that the project file and every DocumentPath entry are stat'ed"""
+        project = write_project(self.directory)
+        mtimes = project_document_mtimes(project)
+        self.assertEqual(len(mtimes), 5)
+        self.assertIn(str(self.directory / "Sub" / "Sheet3.SchDoc"), mtimes)
+        self.assertTrue(all(mtime is not None for mtime in mtimes.values()))
+
+    def test_missing_files(self):
+        """Test that a missing document maps to None and a missing project to None"""
+        project = write_project(self.directory)
+        (self.directory / "Sheet0.SchDoc").unlink()
+        self.assertIsNone(project_document_mtimes(project)[str(self.directory / "Sheet0.SchDoc")])
+        self.assertIsNone(project_document_mtimes(str(self.directory / "B.PrjPcb")))
+
+
+class TestDesignSnapshots(unittest.IsolatedAsyncioTestCase):
+    """Test cases for DesignLibrarians snapshots"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.temp_dir.name)
+        self.project = write_project(self.directory)
+        self.snapshot_dir = self.directory / "snapshots"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def start_server(self, components=20):
+        """A fresh bridge and DesignLibrarians, as after a server restart"""
+        mcp_dir = Path(tempfile.mkdtemp(dir=self.temp_dir.name))
+        bridge = StreamingAltiumBridge(mcp_dir, project_records(self.project, components))
+        return bridge, DesignLibrarians(bridge, snapshot_dir=self.snapshot_dir)
+
+    async def test_restart_uses_snapshot(self):
+        """Test that a restarted server answers from the snapshot without Altium"""
+        _, librarians = self.start_server()
+        index = (await librarians.get()).get_index()
+        self.assertEqual(len(list(self.snapshot_dir.glob("*.snapshot"))), 1)
+
+        bridge, librarians = self.start_server()
+        librarian = await librarians.get()
+        self.assertEqual(librarian.get_index(), index)
+        self.assertEqual(librarian.get_page("Sheet1.SchDoc"), (await librarians.get()).get_page("Sheet1.SchDoc"))
+        self.assertEqual(bridge.launches, 0)
+        self.assertEqual((librarians.snapshot_loads, librarians.exports), (1, 0))
+
+    async def test_changed_document_ignores_snapshot(self):
+        """Test that a saved document change makes the restarted server export"""
+        _, librarians = self.start_server()
+        await librarians.get()
+
+        touch(self.directory / "Sub" / "Sheet3.SchDoc")
+        bridge, librarians = self.start_server(components=30)
+        self.assertIsNotNone((await librarians.get()).get_component("U25"))
+        self.assertEqual(bridge.launches, 1)
+        self.assertEqual(librarians.snapshot_loads, 0)
+
+    async def test_snapshot_librarian_rebuilds_on_change(self):
+        """Test that a Librarian loaded from a snapshot follows later design changes"""
+        _, librarians = self.start_server()
+        await librarians.get()
+
+        bridge, librarians = self.start_server()
+        librarian = await librarians.get()
+
+        # Same design exported again: the stored fingerprint avoids a rebuild
+        bridge.cache.invalidate()
+        self.assertIs(await librarians.get(), librarian)
+        self.assertFalse(librarian.dirty)
+        self.assertEqual(librarians.rebuilds, 0)
+
+        bridge.records = project_records(self.project, components=30)
+        bridge.cache.invalidate()
+        self.assertIs(await librarians.get(), librarian)
+        self.assertIsNotNone(librarian.get_component("U25"))
+        self.assertEqual(librarians.rebuilds, 1)
+
+    async def test_no_snapshot_without_project_file(self):
+        """Test that designs whose project file cannot be read are not snapshotted"""
+        bridge, librarians = self.start_server()
+        bridge.records = project_records("C:\\A.PrjPcb")
+        await librarians.get()
+        self.assertEqual(list(self.snapshot_dir.glob("*")), [])
+
+    async def test_snapshot_faster_than_export(self):
+        """Benchmark: first query after a restart, from a snapshot and from an export"""
+        bridge, librarians = self.start_server(components=2000)
+        bridge.part_delay = 0
+        start = time.perf_counter()
+        (await librarians.get()).get_index()
+        exported = time.perf_counter() - start
+
+        bridge, librarians = self.start_server(components=2000)
+        start = time.perf_counter()
+        (await librarians.get()).get_index()
+        loaded = time.perf_counter() - start
+
+        print()
+        print(f"  export + build: {exported * 1000:8.1f} ms")
+        print(f"  snapshot load:  {loaded * 1000:8.1f} ms")
+        self.assertEqual(bridge.launches, 0)
+        self.assertEqual((librarians.snapshot_loads, librarians.exports), (1, 0))
+        if RUN_BENCHMARKS:
+            self.assertLess(loaded * 2, exported)
+
+
+if __name__ == '__main__':
+    unittest.main()
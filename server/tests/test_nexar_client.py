@@ -0,0 +1,597 @@
+"""
+Unit tests and BOM-size benchmark for batched Nexar availability queries
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add parent directory to path to import modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fake_nexar_server import FakeNexarServer, make_catalog, make_part
+import httpx
+
+from nexar_client import NexarClient, RateLimiter
+from part_cache import PartCache
+from tools.distributor_tools import lookup_bom, register_distributor_tools
+from schematic_core.benchmarking import benchmark
+
+
+class FakeNexarTestCase(unittest.IsolatedAsyncioTestCase):
+    """Test case with a fake Nexar API and a client pointed at it"""
+
+    latency = 0.0
+
+    def setUp(self):
+        catalog = make_catalog(100)
+        catalog["NE555P"] = make_part("NE555P", lifecycle="Obsolete")
+        catalog["LM358"] = make_part("LM358", stock=5, lifecycle="NRND")
+        self.server = FakeNexarServer(catalog, latency=self.latency)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+
+    def make_client(self, max_requests_per_second: int = 1000) -> NexarClient:
+        client = NexarClient("id", "secret", max_requests_per_second=max_requests_per_second)
+        client.AUTH_URL = self.server.auth_url
+        client.API_URL = self.server.api_url
+        return client
+
+
+class TestAvailabilityBatch(FakeNexarTestCase):
+    """Test get_components_availability_batch against the fake API"""
+
+    async def asyncSetUp(self):
+        self.client = self.make_client()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+
+    async def test_batch_returns_part_per_mpn(self):
+        """Test that each MPN maps to its part, with lifecycle and description"""
+        results = await self.client.get_components_availability_batch(["PART-0001", "NE555P", "NOPE-1"])
+
+        self.assertEqual(set(results), {"PART-0001", "NE555P", "NOPE-1"})
+        self.assertEqual(results["PART-0001"]["mpn"], "PART-0001")
+        self.assertEqual(results["PART-0001"]["lifecycleStatus"], "Active")
+        self.assertEqual(results["PART-0001"]["description"], "Test part PART-0001")
+        self.assertEqual(results["NE555P"]["lifecycleStatus"], "Obsolete")
+        self.assertIsNone(results["NOPE-1"])
+        self.assertEqual(self.server.graphql_requests, 1)
+        self.assertEqual(self.server.token_requests, 1)
+
+    async def test_batch_dedupes_and_chunks(self):
+        """Test that duplicate and blank MPNs are dropped and batches are chunked"""
+        mpns = [f"PART-{i:04d}" for i in range(45)] * 2 + ["", "  "]
+        results = await self.client.get_components_availability_batch(mpns, batch_size=20)
+
+        self.assertEqual(len(results), 45)
+        self.assertTrue(all(results.values()))
+        self.assertEqual(self.server.graphql_requests, 3)
+        self.assertEqual(len(self.server.queried_mpns), 45)
+
+    async def test_single_lookup_uses_batch(self):
+        """Test that get_component_availability is a batch of one"""
+        part = await self.client.get_component_availability(" LM358 ")
+        self.assertEqual(part["lifecycleStatus"], "NRND")
+        self.assertIsNone(await self.client.get_component_availability("NOPE-1"))
+        self.assertEqual(self.server.graphql_requests, 2)
+
+    async def test_exact_match_preferred(self):
+        """Test that an exact MPN match wins over a better-ranked near match"""
+        parts = [make_part("LM358DR"), make_part("lm358")]
+        self.assertEqual(NexarClient._pick_part("LM358", parts)["mpn"], "lm358")
+        self.assertEqual(NexarClient._pick_part("LM358X", parts)["mpn"], "LM358DR")
+        self.assertIsNone(NexarClient._pick_part("LM358", []))
+
+
+class FakeBridgeResponse:
+    def __init__(self, data):
+        self.success = True
+        self.data = data
+        self.error = None
+
+
+class FakeBridge:
+    """Bridge returning a fixed component list"""
+
+    def __init__(self, components, mcp_dir):
+        self.components = components
+        self.mcp_dir = mcp_dir
+
+    async def call_script(self, command, params):
+        return FakeBridgeResponse(self.components)
+
+
+class TestBomTools(FakeNexarTestCase):
+    """Test that the BOM tools check the whole BOM in batched requests"""
+
+    def register_tools(self, components):
+        tools = {}
+
+        class Collector:
+            def tool(self):
+                def decorator(func):
+                    tools[func.__name__] = func
+                    return func
+                return decorator
+
+        # The tools' client reads the URLs on every request
+        for patcher in (
+            mock.patch.dict(os.environ, {"NEXAR_CLIENT_ID": "id", "NEXAR_CLIENT_SECRET": "secret"}),
+            mock.patch.object(NexarClient, "AUTH_URL", self.server.auth_url),
+            mock.patch.object(NexarClient, "API_URL", self.server.api_url),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        register_distributor_tools(Collector(), FakeBridge(components, Path(temp_dir.name)))
+        return tools
+
+    def make_components(self):
+        components = [
+            {"designator": f"R{i}", "parameters": {"MPN": f"PART-{i % 25:04d}"}}
+            for i in range(50)
+        ]
+        components.append({"designator": "U1", "parameters": {"Part Number": "NE555P"}})
+        components.append({"designator": "U2", "parameters": {"Manufacturer Part Number": "LM358"}})
+        components.append({"designator": "U3", "parameters": {"ManufacturerPartNumber": "NOPE-1"}})
+        components.append({"designator": "J1", "parameters": {}})
+        return components
+
+    async def test_check_bom_availability(self):
+        """Test check_bom_availability over a BOM with shared and unknown MPNs"""
+        tools = self.register_tools(self.make_components())
+        result = json.loads(await tools["check_bom_availability"]())
+
+        self.assertTrue(result["success"])
+        self.assertEqual(result["summary"]["total_components_checked"], 53)
+        self.assertEqual(result["summary"]["components_available"], 52)
+        analysis = {line["designator"]: line for line in result["detailed_analysis"]}
+        self.assertEqual(analysis["R30"]["mpn"], "PART-0005")
+        self.assertEqual(analysis["R30"]["status"], "available")
+        self.assertEqual(analysis["U3"]["status"], "not_found")
+        self.assertNotIn("J1", analysis)
+        issues = {(issue["designator"], issue["issue"]) for issue in result["issues"]}
+        self.assertIn(("U1", "Lifecycle: Obsolete"), issues)
+        self.assertIn(("U2", "Low stock: 5 units"), issues)
+
+        # 28 distinct MPNs: two requests instead of 53
+        self.assertEqual(self.server.graphql_requests, 2)
+
+    async def test_validate_bom_lifecycle(self):
+        """Test validate_bom_lifecycle sorts parts by the batched lifecycle data"""
+        tools = self.register_tools(self.make_components())
+        result = json.loads(await tools["validate_bom_lifecycle"]())
+
+        self.assertTrue(result["success"])
+        summary = result["summary"]
+        self.assertEqual(
+            (summary["active"], summary["nrnd"], summary["obsolete"], summary["not_found"]),
+            (50, 1, 1, 1)
+        )
+        self.assertEqual(self.server.graphql_requests, 2)
+
+    async def test_repeat_check_served_from_cache(self):
+        """Test that a second BOM check makes no API requests"""
+        tools = self.register_tools(self.make_components())
+        first = json.loads(await tools["check_bom_availability"]())
+        second = json.loads(await tools["check_bom_availability"]())
+
+        self.assertEqual(second, first)
+        self.assertEqual(self.server.graphql_requests, 2)
+
+
+def bom_lines(count, distinct):
+    """`count` BOM lines sharing `distinct` MPNs"""
+    return [
+        ({"designator": f"C{i}", "parameters": {}}, f"PART-{i % distinct:04d}")
+        for i in range(count)
+    ]
+
+
+class TestBomLookupPipeline(FakeNexarTestCase):
+    """Test the deduplicating, bounded-concurrency BOM lookup"""
+
+    latency = 0.02
+
+    async def asyncSetUp(self):
+        self.client = self.make_client()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+
+    async def test_shared_mpns_looked_up_once(self):
+        """Test that MPNs shared by many designators are queried once and reported per part"""
+        progress = []
+        results = await lookup_bom(
+            self.client, bom_lines(60, 12), batch_size=5,
+            on_progress=lambda done, total, mpn, part: progress.append((done, total, mpn, part is not None))
+        )
+
+        self.assertEqual(len(results), 12)
+        self.assertEqual(sorted(self.server.queried_mpns), sorted(results))
+        self.assertEqual(self.server.graphql_requests, 3)
+        self.assertEqual([entry[0] for entry in progress], list(range(1, 13)))
+        self.assertTrue(all(total == 12 and found for _, total, _, found in progress))
+
+    async def test_concurrency_is_bounded(self):
+        """Test that no more than `concurrency` requests are in flight"""
+        await self.client.authenticate()
+        await lookup_bom(self.client, bom_lines(12, 12), concurrency=3, batch_size=1)
+
+        self.assertEqual(self.server.graphql_requests, 12)
+        self.assertEqual(self.server.max_in_flight, 3)
+
+    async def test_unknown_mpns_reported(self):
+        """Test that MPNs missing from the catalog come back as None"""
+        lines = bom_lines(4, 4) + [({"designator": "U9"}, "NOPE-1")]
+        results = await lookup_bom(self.client, lines)
+        self.assertIsNone(results["NOPE-1"])
+        self.assertEqual(sum(part is not None for part in results.values()), 4)
+
+
+class TestCachedClient(FakeNexarTestCase):
+    """Test availability lookups through a PartCache"""
+
+    async def asyncSetUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = PartCache(Path(self.temp_dir.name) / "part_cache.db", volatile_ttl=3600.0)
+        self.client = self.make_client()
+        self.client.cache = self.cache
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        self.cache.close()
+        self.temp_dir.cleanup()
+
+    async def test_only_misses_are_queried(self):
+        """Test that cached MPNs (found or not) are not queried again"""
+        await self.client.get_components_availability_batch(["PART-0001", "NOPE-1"])
+        results = await self.client.get_components_availability_batch(["part-0001", "NOPE-1", "PART-0002"])
+
+        self.assertEqual(results["part-0001"]["mpn"], "PART-0001")
+        self.assertIsNone(results["NOPE-1"])
+        self.assertEqual(self.server.queried_mpns, ["PART-0001", "NOPE-1", "PART-0002"])
+        self.assertEqual(list(results), ["part-0001", "NOPE-1", "PART-0002"])
+
+    async def test_stale_entries_refreshed_in_background(self):
+        """Test that stale parts are served at once and refreshed afterwards"""
+        old = make_part("PART-0001", stock=1)
+        self.cache.put_many({"PART-0001": old}, now=time.time() - 2 * 3600)
+
+        results = await self.client.get_components_availability_batch(["PART-0001"])
+        self.assertEqual(results["PART-0001"], old)
+
+        await self.client.wait_for_revalidation()
+        self.assertEqual(self.server.graphql_requests, 1)
+        refreshed = self.cache.get_many(["PART-0001"])["PART-0001"]
+        self.assertFalse(refreshed.stale)
+        self.assertEqual(refreshed.part["sellers"][0]["offers"][0]["inventoryLevel"], 1000)
+
+    async def test_failed_refresh_keeps_stale_entry(self):
+        """Test that a failed background refresh leaves the stale part in place"""
+        self.cache.put_many({"PART-0001": make_part("PART-0001")}, now=time.time() - 2 * 3600)
+        self.server.stop()
+
+        await self.client.get_components_availability_batch(["PART-0001"])
+        await self.client.wait_for_revalidation()
+        self.assertTrue(self.cache.get_many(["PART-0001"])["PART-0001"].stale)
+
+
+class TestRateLimiter(unittest.IsolatedAsyncioTestCase):
+    """Test the token-bucket rate limiter"""
+
+    def test_burst_then_refill_rate(self):
+        """Test that a burst is granted at once and the rest is reserved at the refill rate"""
+        clock = [100.0]
+        with mock.patch("nexar_client.time.monotonic", side_effect=lambda: clock[0]):
+            limiter = RateLimiter(max_requests=20, time_window=1.0, burst=5)
+            waits = [limiter._reserve() for _ in range(15)]
+            self.assertEqual(waits[:5], [0.0] * 5)
+            # Evenly spaced after the burst
+            for i, wait in enumerate(waits[5:], 1):
+                self.assertAlmostEqual(wait, i * 0.05)
+
+            # Once the reservations are paid back, the bucket refills up to the burst only
+            clock[0] += 1.0
+            self.assertEqual([limiter._reserve() for _ in range(5)], [0.0] * 5)
+            self.assertAlmostEqual(limiter._reserve(), 0.05)
+
+    async def test_throttle_pauses_and_slows(self):
+        """Test that throttle() pauses the bucket, lowers the rate and lets it recover"""
+        limiter = RateLimiter(max_requests=100, time_window=1.0)
+        limiter.throttle(0.2)
+        self.assertLess(limiter.rate, limiter.nominal_rate)
+
+        start = time.monotonic()
+        await limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.19)
+
+        for _ in range(20):
+            await limiter.acquire()
+        self.assertEqual(limiter.rate, limiter.nominal_rate)
+
+    async def test_throttle_voids_sleeping_reservation(self):
+        """Test that a caller already waiting for a token also honours a throttle"""
+        limiter = RateLimiter(max_requests=10, time_window=1.0, burst=1)
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0.02)
+
+        throttled_at = time.monotonic()
+        limiter.throttle(0.3)
+        await waiter
+        self.assertGreaterEqual(time.monotonic() - throttled_at, 0.29)
+
+    async def test_throttle_requeues_sleepers_in_order(self):
+        """Test that sleepers voided by a throttle go out first come first served, spaced at the new rate"""
+        limiter = RateLimiter(max_requests=20, time_window=1.0, burst=1)
+        await limiter.acquire()
+        released = []
+        # When each caller's latest reservation makes its token available
+        ready_at = {}
+        reserve = limiter._reserve
+
+        def record_reservation():
+            wait = reserve()
+            ready_at[indexes[asyncio.current_task()]] = time.monotonic() + wait
+            return wait
+
+        limiter._reserve = record_reservation
+        indexes = {}
+
+        async def acquire(index):
+            indexes[asyncio.current_task()] = index
+            await limiter.acquire()
+            released.append(index)
+
+        waiters = []
+        for index in range(6):
+            waiters.append(asyncio.ensure_future(acquire(index)))
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.01)
+
+        limiter.throttle(0.2)
+        resume_at, throttled_rate = limiter._updated, limiter.rate
+        # A caller arriving after the throttle queues behind the earlier ones
+        waiters.append(asyncio.ensure_future(acquire(6)))
+        await asyncio.gather(*waiters)
+
+        self.assertEqual(released, list(range(7)))
+        ready = [ready_at[index] for index in range(7)]
+        self.assertGreaterEqual(ready[0], resume_at)
+        self.assertEqual(ready, sorted(ready))
+        # Seven tokens from an empty bucket at the resume time, at a rate between
+        # the throttled and the configured one, not behind the voided reservations
+        self.assertGreaterEqual(ready[-1], resume_at + 7 / limiter.nominal_rate - 1e-9)
+        self.assertLessEqual(ready[-1], resume_at + 7 / throttled_rate + 1e-9)
+
+
+class TestRetryDelay(unittest.TestCase):
+    """Test the delay chosen after an HTTP 429"""
+
+    def response(self, **headers):
+        return httpx.Response(429, headers=headers)
+
+    def test_retry_after_seconds(self):
+        """Test that Retry-After in seconds is honoured"""
+        self.assertEqual(NexarClient._retry_delay(self.response(**{"Retry-After": "2"}), 0), 2.0)
+        self.assertEqual(NexarClient._retry_delay(self.response(**{"Retry-After": "0.25"}), 3), 0.25)
+
+    def test_retry_after_date(self):
+        """Test that Retry-After as an HTTP date is honoured"""
+        from email.utils import formatdate
+        delay = NexarClient._retry_delay(self.response(**{"Retry-After": formatdate(time.time() + 10, usegmt=True)}), 0)
+        self.assertTrue(8.5 < delay <= 10.0, delay)
+
+    def test_jittered_exponential_backoff(self):
+        """Test the backoff used without Retry-After"""
+        base = NexarClient.BACKOFF_BASE
+        for attempt in range(4):
+            delays = {NexarClient._retry_delay(self.response(), attempt) for _ in range(20)}
+            self.assertTrue(all(base * 2 ** attempt / 2 <= delay <= base * 2 ** attempt for delay in delays))
+            self.assertGreater(len(delays), 1)
+        self.assertLessEqual(NexarClient._retry_delay(self.response(), 20), NexarClient.BACKOFF_MAX)
+
+
+class TestThrottling(FakeNexarTestCase):
+    """Test retries when the API answers HTTP 429"""
+
+    async def asyncSetUp(self):
+        self.client = self.make_client()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+
+    async def test_retries_after_429(self):
+        """Test that throttled requests are retried after Retry-After"""
+        self.server.throttle_next = 2
+        results = await self.client.get_components_availability_batch(["PART-0001"])
+
+        self.assertIsNotNone(results["PART-0001"])
+        self.assertEqual(self.server.throttled, 2)
+        self.assertEqual(self.server.graphql_requests, 1)
+        self.assertEqual(self.client._rate_limiter.throttles, 2)
+
+    async def test_backoff_without_retry_after(self):
+        """Test that 429s without Retry-After back off and retry"""
+        self.server.send_retry_after = False
+        self.server.throttle_next = 2
+        self.client.BACKOFF_BASE = 0.02
+        results = await self.client.get_components_availability_batch(["PART-0001"])
+        self.assertIsNotNone(results["PART-0001"])
+
+    async def test_gives_up_after_max_retries(self):
+        """Test that a request still throttled after MAX_RETRIES fails"""
+        self.server.throttle_next = 10
+        self.client.MAX_RETRIES = 2
+        with self.assertRaises(httpx.HTTPStatusError):
+            await self.client.get_components_availability_batch(["PART-0001"])
+        self.assertEqual(self.server.throttled, 3)
+
+    async def test_concurrent_callers_authenticate_once(self):
+        """Test that concurrent first requests share one token request"""
+        await asyncio.gather(*(
+            self.client.get_components_availability_batch([f"PART-{i:04d}"]) for i in range(5)
+        ))
+        self.assertEqual(self.server.token_requests, 1)
+
+
+@benchmark
+class TestRateLimiterBenchmark(unittest.IsolatedAsyncioTestCase):
+    """Wall-clock spacing of the requests the rate limiter lets through"""
+
+    async def test_burst_then_refill_rate(self):
+        """Test that a burst goes out at once and the rest at the refill rate"""
+        limiter = RateLimiter(max_requests=20, time_window=1.0, burst=5)
+        start = time.monotonic()
+        grants = []
+
+        async def acquire():
+            await limiter.acquire()
+            grants.append(time.monotonic() - start)
+
+        await asyncio.gather(*(acquire() for _ in range(15)))
+        grants.sort()
+        self.assertLess(grants[4], 0.05)
+        self.assertGreaterEqual(grants[-1], 0.45)
+        self.assertLess(grants[-1], 0.7)
+        # Evenly spaced after the burst
+        gaps = [b - a for a, b in zip(grants[5:], grants[6:])]
+        self.assertTrue(all(0.03 < gap < 0.08 for gap in gaps), gaps)
+
+
+@benchmark
+class TestBatchBenchmark(FakeNexarTestCase):
+    """Benchmark wall time against BOM size, per-part against batched lookups"""
+
+    latency = 0.02
+
+    async def lookup_per_part(self, client, mpns):
+        for mpn in mpns:
+            await client.get_components_availability_batch([mpn])
+
+    async def test_benchmark_bom_sizes(self):
+        """Benchmark: wall time for 10- to 100-line BOMs at 20 ms per round trip"""
+        client = self.make_client()
+        await client.authenticate()
+        try:
+            print()
+            for size in (10, 50, 100):
+                mpns = [f"PART-{i:04d}" for i in range(size)]
+
+                start = time.perf_counter()
+                await self.lookup_per_part(client, mpns)
+                per_part = time.perf_counter() - start
+
+                start = time.perf_counter()
+                results = await client.get_components_availability_batch(mpns)
+                batched = time.perf_counter() - start
+
+                self.assertEqual(len(results), size)
+                print(f"  {size:4d} parts: per-part {per_part * 1000:7.1f} ms, "
+                      f"batched {batched * 1000:7.1f} ms ({per_part / batched:4.1f}x)")
+                self.assertLess(batched, per_part)
+        finally:
+            await client.close()
+
+    async def test_benchmark_pipeline_against_rate_limit(self):
+        """Benchmark: one MPN per request, serial against the concurrent pipeline"""
+        client = self.make_client(max_requests_per_second=40)
+        lines = bom_lines(150, 50)
+        self.server.latency = 0.05
+        try:
+            await client.authenticate()
+            start = time.perf_counter()
+            await lookup_bom(client, lines, concurrency=1, batch_size=1)
+            serial = time.perf_counter() - start
+
+            # A fresh rate-limit window for the concurrent run
+            await asyncio.sleep(1.0)
+            start = time.perf_counter()
+            results = await lookup_bom(client, lines, concurrency=8, batch_size=1)
+            concurrent = time.perf_counter() - start
+        finally:
+            await client.close()
+
+        print()
+        print("  150 lines / 50 MPNs, 40 requests/s, 50 ms round trips")
+        print(f"  serial:     {serial * 1000:7.1f} ms")
+        print(f"  concurrent: {concurrent * 1000:7.1f} ms")
+        self.assertEqual(len(results), 50)
+        self.assertLess(concurrent, serial)
+        # 50 requests with a burst of 40 at 40 per second
+        self.assertGreaterEqual(concurrent, 0.25)
+
+    async def test_benchmark_warm_cache(self):
+        """Benchmark: a 300-line BOM check, cold against warm part cache"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = PartCache(Path(temp_dir) / "part_cache.db")
+            client = self.make_client()
+            client.cache = cache
+            lines = bom_lines(300, 150)
+            try:
+                start = time.perf_counter()
+                await lookup_bom(client, lines)
+                cold = time.perf_counter() - start
+                cold_requests = self.server.graphql_requests
+
+                start = time.perf_counter()
+                results = await lookup_bom(client, lines)
+                warm = time.perf_counter() - start
+            finally:
+                await client.close()
+                cache.close()
+
+        print()
+        print(f"  cold cache: {cold * 1000:7.1f} ms, {cold_requests} requests")
+        print(f"  warm cache: {warm * 1000:7.1f} ms, {self.server.graphql_requests - cold_requests} requests")
+        self.assertEqual(len(results), 150)
+        self.assertEqual(self.server.graphql_requests, cold_requests)
+        self.assertLess(warm, cold)
+
+    async def fan_out_against_quota(self, client_rate):
+        client = self.make_client(max_requests_per_second=client_rate)
+        try:
+            await client.authenticate()
+            start = time.perf_counter()
+            results = await lookup_bom(client, bom_lines(90, 90), concurrency=16, batch_size=1)
+            elapsed = time.perf_counter() - start
+        finally:
+            await client.close()
+        self.assertEqual(len(results), 90)
+        return elapsed
+
+    async def test_benchmark_fan_out_against_quota(self):
+        """Benchmark: 90 one-MPN requests against a 30 requests/s server quota"""
+        self.server.quota = self.server.quota_burst = 30.0
+        self.server._quota_tokens = 30.0
+        # Burst of 30, then 60 requests at 30 per second
+        ideal = 2.0
+
+        elapsed = await self.fan_out_against_quota(30)
+        throttled_at_quota = self.server.throttled
+
+        await asyncio.sleep(1.0)
+        elapsed_over = await self.fan_out_against_quota(75)
+        throttled_over = self.server.throttled - throttled_at_quota
+
+        print()
+        print(f"  client at quota:      {elapsed:5.2f} s ({90 / elapsed:5.1f} requests/s), {throttled_at_quota} throttled")
+        print(f"  client at 2.5x quota: {elapsed_over:5.2f} s ({90 / elapsed_over:5.1f} requests/s), {throttled_over} throttled")
+        print(f"  ideal:                {ideal:5.2f} s")
+        self.assertLess(elapsed, ideal * 1.3 + 0.2)
+        self.assertLessEqual(throttled_at_quota, 5)
+        self.assertLess(elapsed_over, ideal * 2 + 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
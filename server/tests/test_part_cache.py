@@ -0,0 +1,107 @@
+"""
+Unit tests for the persistent part cache
+"""
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add parent directory to path to import modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fake_nexar_server import make_part
+from part_cache import PartCache, normalize_mpn
+
+HOUR = 3600.0
+
+
+class TestPartCache(unittest.TestCase):
+    """Test cases for PartCache"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.temp_dir.name) / "part_cache.db"
+        self.cache = self.make_cache()
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.cache.close()
+        self.temp_dir.cleanup()
+
+    def make_cache(self, **kwargs) -> PartCache:
+        options = {"static_ttl": 100 * HOUR, "volatile_ttl": HOUR, "max_stale": 10 * HOUR}
+        options.update(kwargs)
+        return PartCache(self.db_path, **options)
+
+    def test_normalize_mpn(self):
+        """Test that keys ignore case and surrounding whitespace"""
+        self.assertEqual(normalize_mpn("  lm358dr "), "LM358DR")
+
+    def test_round_trip(self):
+        """Test that stored parts come back whole, under normalized keys"""
+        part = make_part("LM358")
+        self.cache.put_many({"lm358 ": part, "NOPE-1": None}, now=0)
+
+        found = self.cache.get_many(["LM358", "nope-1", "OTHER"], now=1)
+        self.assertEqual(set(found), {"LM358", "NOPE-1"})
+        self.assertEqual(found["LM358"].part, part)
+        self.assertFalse(found["LM358"].stale)
+        self.assertIsNone(found["NOPE-1"].part)
+        self.assertEqual(self.cache.get_stats()["misses"], 1)
+
+    def test_persists_across_instances(self):
+        """Test that a new cache on the same file sees earlier parts"""
+        self.cache.put_many({"LM358": make_part("LM358")})
+        self.cache.close()
+
+        self.cache = self.make_cache()
+        self.assertIn("LM358", self.cache.get_many(["LM358"]))
+
+    def test_volatile_fields_expire_first(self):
+        """Test fresh, stale and expired entries as the volatile TTL passes"""
+        self.cache.put_many({"LM358": make_part("LM358")}, now=0)
+
+        self.assertFalse(self.cache.get_many(["LM358"], now=0.5 * HOUR)["LM358"].stale)
+        stale = self.cache.get_many(["LM358"], now=5 * HOUR)["LM358"]
+        self.assertTrue(stale.stale)
+        self.assertEqual(stale.part["sellers"], make_part("LM358")["sellers"])
+        self.assertNotIn("LM358", self.cache.get_many(["LM358"], now=12 * HOUR))
+
+        stats = self.cache.get_stats()
+        self.assertEqual((stats["hits"], stats["stale_hits"], stats["misses"]), (1, 1, 1))
+
+    def test_static_ttl_applies(self):
+        """Test that static fields expire on their own TTL"""
+        self.cache.close()
+        self.cache = self.make_cache(static_ttl=2 * HOUR, volatile_ttl=100 * HOUR)
+        self.cache.put_many({"LM358": make_part("LM358")}, now=0)
+
+        self.assertFalse(self.cache.get_many(["LM358"], now=HOUR)["LM358"].stale)
+        self.assertTrue(self.cache.get_many(["LM358"], now=3 * HOUR)["LM358"].stale)
+
+    def test_unknown_mpns_use_volatile_ttl(self):
+        """Test that not-found entries expire like stock, not like specs"""
+        self.cache.put_many({"NOPE-1": None}, now=0)
+        self.assertTrue(self.cache.get_many(["NOPE-1"], now=2 * HOUR)["NOPE-1"].stale)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used parts are evicted past max_entries"""
+        self.cache.close()
+        self.cache = self.make_cache(max_entries=3)
+        self.cache.put_many({"A": make_part("A"), "B": make_part("B"), "C": make_part("C")}, now=0)
+        self.cache.get_many(["A"], now=1)
+        self.cache.put_many({"D": make_part("D")}, now=2)
+
+        self.assertEqual(len(self.cache), 3)
+        self.assertEqual(set(self.cache.get_many(["A", "B", "C", "D"], now=3)), {"A", "C", "D"})
+
+    def test_large_lookup(self):
+        """Test lookups larger than one query chunk"""
+        self.cache.put_many({f"P{i}": make_part(f"P{i}") for i in range(1200)})
+        self.assertEqual(len(self.cache.get_many(f"P{i}" for i in range(1300))), 1200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,258 @@
+"""
+Unit tests and throughput benchmark for concurrent bridge requests
+"""
+import asyncio
+import json
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+# Add parent directory to path to import modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from altium_bridge import AltiumBridge, is_read_only_command
+from bridge_protocol import encode_envelope, request_file_name, write_atomic
+from request_scheduler import RequestScheduler
+from schematic_core.benchmarking import RUN_BENCHMARKS, benchmark
+
+
+class SimulatedAltiumBridge(AltiumBridge):
+    """
+    AltiumBridge answered in-process by a simulated Altium.
+
+    Each launch picks up every pending request file and answers each one
+    after its command's latency. The simulated side records when every
+    command ran so tests can check what overlapped.
+    """
+
+    def __init__(self, mcp_dir: Path, latencies=None, default_latency: float = 0.02, **kwargs):
+        super().__init__(mcp_dir, mcp_dir / "Altium_API.PrjScr", **kwargs)
+        self.latencies = latencies or {}
+        self.default_latency = default_latency
+        self.timeline = []  # (command, label, start, end)
+        self._tasks = set()
+
+    async def _run_altium_script(self, proc_name: str = "Run") -> bool:
+        for request_path in sorted(self.mcp_dir.glob(request_file_name("*"))):
+            request = json.loads(request_path.read_text())
+            request_path.unlink()
+            task = asyncio.ensure_future(self._answer(request))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def _answer(self, request):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await asyncio.sleep(self.latencies.get(request["command"], self.default_latency))
+        self.timeline.append((request["command"], request.get("label"), start, loop.time()))
+
+        if request["command"] == "batch":
+            result = [{"success": True, "result": sub.get("label")} for sub in request["commands"]]
+        else:
+            result = request.get("label")
+        body = json.dumps({"success": True, "result": result}).encode("utf-8")
+        write_atomic(
+            self.response_path_for(request["request_id"]),
+            encode_envelope(request["request_id"], body)
+        )
+
+
+class TestRequestScheduler(unittest.IsolatedAsyncioTestCase):
+    """Test cases for RequestScheduler"""
+
+    async def hold(self, scheduler, read_only, events, name, duration=0.02):
+        async with scheduler.slot(read_only):
+            events.append(("start", name))
+            await asyncio.sleep(duration)
+            events.append(("end", name))
+
+    async def test_reads_overlap(self):
+        """Test that read-only slots are held concurrently"""
+        scheduler = RequestScheduler()
+        events = []
+        await asyncio.gather(*(self.hold(scheduler, True, events, f"r{i}") for i in range(3)))
+        self.assertEqual([kind for kind, _ in events[:3]], ["start"] * 3)
+
+    async def test_mutation_runs_alone_in_order(self):
+        """Test that a mutation waits for earlier reads and holds back later ones"""
+        scheduler = RequestScheduler()
+        events = []
+        await asyncio.gather(
+            self.hold(scheduler, True, events, "r1"),
+            self.hold(scheduler, True, events, "r2"),
+            self.hold(scheduler, False, events, "m1"),
+            self.hold(scheduler, True, events, "r3"),
+            self.hold(scheduler, False, events, "m2"),
+        )
+        self.assertEqual(events, [
+            ("start", "r1"), ("start", "r2"), ("end", "r1"), ("end", "r2"),
+            ("start", "m1"), ("end", "m1"),
+            ("start", "r3"), ("end", "r3"),
+            ("start", "m2"), ("end", "m2"),
+        ])
+
+    async def test_read_cap(self):
+        """Test that no more than max_concurrent_reads reads run at once"""
+        scheduler = RequestScheduler(max_concurrent_reads=2)
+        peak = 0
+
+        async def read():
+            nonlocal peak
+            async with scheduler.slot(True):
+                peak = max(peak, scheduler.active_reads)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(read() for _ in range(6)))
+        self.assertEqual(peak, 2)
+        self.assertEqual(scheduler.active_reads, 0)
+
+    async def test_cancelled_waiter_does_not_block_queue(self):
+        """Test that a request cancelled while queued is skipped"""
+        scheduler = RequestScheduler()
+        events = []
+        first = asyncio.ensure_future(self.hold(scheduler, False, events, "m1", 0.05))
+        await asyncio.sleep(0)
+        queued = asyncio.ensure_future(self.hold(scheduler, False, events, "m2"))
+        after = asyncio.ensure_future(self.hold(scheduler, True, events, "r1"))
+        await asyncio.sleep(0)
+
+        queued.cancel()
+        await asyncio.gather(first, after, return_exceptions=True)
+        self.assertNotIn(("start", "m2"), events)
+        self.assertIn(("end", "r1"), events)
+        self.assertFalse(scheduler.mutation_active)
+
+    def test_invalid_cap(self):
+        """Test that a read cap below one is rejected"""
+        with self.assertRaises(ValueError):
+            RequestScheduler(max_concurrent_reads=0)
+
+
+class TestCommandClassification(unittest.TestCase):
+    """Test cases for is_read_only_command"""
+
+    def test_commands(self):
+        """Test that queries are read-only and edits are not"""
+        self.assertTrue(is_read_only_command("get_project_info"))
+        self.assertTrue(is_read_only_command("get_all_nets"))
+        self.assertFalse(is_read_only_command("move_components"))
+        self.assertFalse(is_read_only_command("shutdown"))
+        self.assertFalse(is_read_only_command("some_new_command"))
+
+    def test_commands_that_write_files(self):
+        """Test that queries which write files or change the selection are serialized"""
+        self.assertFalse(is_read_only_command("run_output_jobs"))
+        self.assertFalse(is_read_only_command("layout_duplicator"))
+        reads = {"commands": [{"command": "get_all_nets"}, {"command": "run_output_jobs"}]}
+        self.assertFalse(is_read_only_command("batch", reads))
+
+    def test_batch(self):
+        """Test that a batch is read-only only if all its commands are"""
+        reads = {"commands": [{"command": "get_all_nets"}, {"command": "get_pcb_rules"}]}
+        mixed = {"commands": [{"command": "get_all_nets"}, {"command": "move_components"}]}
+        self.assertTrue(is_read_only_command("batch", reads))
+        self.assertFalse(is_read_only_command("batch", mixed))
+
+
+class TestConcurrentBridge(unittest.IsolatedAsyncioTestCase):
+    """Test cases for concurrent requests through AltiumBridge"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.mcp_dir = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    async def test_fast_read_not_blocked_by_slow_read(self):
+        """Test that get_project_info returns while get_all_component_data is still running"""
+        bridge = SimulatedAltiumBridge(self.mcp_dir, latencies={"get_all_component_data": 1.0})
+        slow = asyncio.ensure_future(bridge.call_script("get_all_component_data", {"label": "slow"}))
+        await asyncio.sleep(0)
+
+        start = time.perf_counter()
+        result = await bridge.call_script("get_project_info", {"label": "fast"})
+        self.assertTrue(result.success, result.error)
+        if RUN_BENCHMARKS:
+            self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertFalse(slow.done())
+        await slow
+
+    async def test_mutations_keep_strict_order(self):
+        """Test that mutations never overlap another request and run in issue order"""
+        bridge = SimulatedAltiumBridge(self.mcp_dir)
+        calls = ["get_project_info", "get_all_nets", "move_components", "get_pcb_rules",
+                 "get_all_nets", "delete_component", "get_project_info", "move_components"]
+        results = await asyncio.gather(*(
+            bridge.call_script(command, {"label": i}) for i, command in enumerate(calls)
+        ))
+
+        self.assertEqual([r.data for r in results], list(range(len(calls))))
+        for command, label, start, end in bridge.timeline:
+            if is_read_only_command(command):
+                continue
+            for other_command, other_label, other_start, other_end in bridge.timeline:
+                if other_label < label:
+                    self.assertLessEqual(other_end, start)
+                elif other_label > label:
+                    self.assertGreaterEqual(other_start, end)
+
+    async def test_response_files_removed(self):
+        """Test that no request or response files are left behind"""
+        bridge = SimulatedAltiumBridge(self.mcp_dir)
+        await asyncio.gather(*(bridge.call_script("get_all_nets", {}) for _ in range(5)))
+        self.assertEqual(sorted(p.name for p in self.mcp_dir.glob("re*_*.json")), [])
+
+
+@benchmark
+class TestThroughputBenchmark(unittest.IsolatedAsyncioTestCase):
+    """
+    Throughput of a mixed workload (mostly reads, one mutation in ten) with
+    the old fully serial bridge against concurrent reads.
+    """
+
+    CALLS = 40
+    LATENCY = 0.02
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.mcp_dir = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    async def measure(self, max_concurrent_reads: int) -> float:
+        bridge = SimulatedAltiumBridge(
+            self.mcp_dir,
+            default_latency=self.LATENCY,
+            max_concurrent_reads=max_concurrent_reads
+        )
+        calls = [
+            "move_components" if i % 10 == 9 else "get_all_component_data"
+            for i in range(self.CALLS)
+        ]
+        start = time.perf_counter()
+        # Distinct params so every read reaches the simulated Altium
+        results = await asyncio.gather(*(
+            bridge.call_script(command, {"call": i}) for i, command in enumerate(calls)
+        ))
+        elapsed = time.perf_counter() - start
+        self.assertTrue(all(r.success for r in results))
+        return self.CALLS / elapsed
+
+    async def test_concurrent_reads_against_serial(self):
+        """Benchmark: requests per second, serial against concurrent reads"""
+        serial = await self.measure(max_concurrent_reads=1)
+        concurrent = await self.measure(max_concurrent_reads=8)
+
+        print()
+        print(f"  serial:           {serial:7.1f} requests/s")
+        print(f"  concurrent reads: {concurrent:7.1f} requests/s")
+        self.assertGreater(concurrent, serial * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
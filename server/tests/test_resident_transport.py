@@ -0,0 +1,261 @@
+"""
+Unit tests and benchmark for the resident (spool directory) bridge transport
+"""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+# Add parent directory to path to import modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from altium_bridge import TRANSPORT_LAUNCH, TRANSPORT_RESIDENT, AltiumBridge
+from bridge_protocol import write_json_atomic
+from schematic_core.benchmarking import RUN_BENCHMARKS
+from test_response_waiter import FakeResponderBridge
+
+RESIDENT_SCRIPT = Path(__file__).parent / "fake_resident_server.py"
+
+
+def start_resident(mcp_dir: Path, delay: float = 0.0, journal: Path = None) -> subprocess.Popen:
+    args = [sys.executable, str(RESIDENT_SCRIPT), str(mcp_dir), "--delay", str(delay)]
+    if journal is not None:
+        args += ["--journal", str(journal)]
+    return subprocess.Popen(args)
+
+
+class ResidentBridge(AltiumBridge):
+    """AltiumBridge whose Serve launch starts the Python stand-in loop"""
+
+    def __init__(self, mcp_dir: Path, delay: float = 0.0, **kwargs):
+        super().__init__(mcp_dir, mcp_dir / "Altium_API.PrjScr", transport=TRANSPORT_RESIDENT, **kwargs)
+        self.delay = delay
+        self.processes = []
+
+    async def _run_altium_script(self, proc_name: str = "Run") -> bool:
+        if proc_name != "Serve":
+            raise AssertionError(f"Resident transport launched {proc_name}")
+        self.processes.append(start_resident(self.mcp_dir, self.delay))
+        return True
+
+    def reap(self):
+        for process in self.processes:
+            process.wait(timeout=10)
+        self.processes.clear()
+
+
+class TestResidentTransport(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the resident transport"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.mcp_dir = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    async def test_loop_started_once(self):
+        """Test that the first call starts the loop and later calls reuse it"""
+        bridge = ResidentBridge(self.mcp_dir)
+        try:
+            for i in range(5):
+                result = await bridge.call_script("get_project_info", {"call": i}, timeout=10)
+                self.assertTrue(result.success, result.error)
+                self.assertEqual(result.data["params"]["call"], i)
+                self.assertEqual(result.data["units"], "\u03a9 \u00b5F \u2013 \u20ac")
+            self.assertEqual(len(bridge.processes), 1)
+        finally:
+            self.assertTrue(await bridge.stop_resident())
+            bridge.reap()
+
+    async def test_batch_over_resident_transport(self):
+        """Test that batches travel through the spool unchanged"""
+        bridge = ResidentBridge(self.mcp_dir)
+        try:
+            components, nets = await bridge.call_script_batch([
+                ("get_all_component_data", {}),
+                ("get_all_nets", {})
+            ], timeout=10)
+            self.assertEqual(components.data["command"], "get_all_component_data")
+            self.assertEqual(nets.data["command"], "get_all_nets")
+        finally:
+            await bridge.stop_resident()
+            bridge.reap()
+
+    async def test_shutdown_handshake(self):
+        """Test that shutdown is acknowledged, the loop exits and the spool is left empty"""
+        bridge = ResidentBridge(self.mcp_dir)
+        await bridge.call_script("get_project_info", {}, timeout=10)
+        process = bridge.processes[0]
+
+        self.assertTrue(await bridge.stop_resident(timeout=10))
+        self.assertEqual(process.wait(timeout=10), 0)
+        self.assertFalse(bridge.ready_path.exists())
+        self.assertEqual(list(bridge.spool_dir.glob("*.json")), [])
+
+        # Stopping again is a no-op
+        self.assertTrue(await bridge.stop_resident())
+        bridge.reap()
+
+    async def test_spool_names_increase(self):
+        """Test that spool file names sort in submission order"""
+        bridge = ResidentBridge(self.mcp_dir)
+        bridge.spool_dir.mkdir()
+        bridge.ready_path.touch()  # Pretend the loop is up so nothing is served
+
+        for i in range(50):
+            self.assertTrue(await bridge._spool_request({"command": "get_project_info", "request_id": f"r{i}"}))
+
+        written = sorted(bridge.spool_dir.glob("*.json"))
+        self.assertEqual(
+            [json.loads(p.read_text())["request_id"] for p in written],
+            [f"r{i}" for i in range(50)]
+        )
+        self.assertEqual(bridge.processes, [])
+
+    def age_ready_marker(self, bridge, seconds: float) -> None:
+        bridge.spool_dir.mkdir(exist_ok=True)
+        bridge.ready_path.write_text("left behind")
+        stamp = time.time() - seconds
+        os.utime(bridge.ready_path, (stamp, stamp))
+
+    async def test_stale_marker_relaunches(self):
+        """Test that a ready marker left by a dead loop is removed and the loop restarted"""
+        bridge = ResidentBridge(self.mcp_dir, resident_heartbeat_timeout=5)
+        self.age_ready_marker(bridge, 60)
+        try:
+            result = await bridge.call_script("get_project_info", {}, timeout=10)
+            self.assertTrue(result.success, result.error)
+            self.assertEqual(len(bridge.processes), 1)
+            self.assertLess(time.time() - bridge.ready_path.stat().st_mtime, 5)
+        finally:
+            self.assertTrue(await bridge.stop_resident(timeout=10))
+            bridge.reap()
+
+    async def test_busy_loop_not_relaunched(self):
+        """Test that an old marker is trusted while spooled requests are still pending"""
+        bridge = ResidentBridge(self.mcp_dir, resident_heartbeat_timeout=5)
+        self.age_ready_marker(bridge, 60)
+        write_json_atomic(bridge.spool_dir / "00000000000000000001_a.json",
+                          {"command": "run_output_jobs", "request_id": "a"})
+
+        self.assertTrue(await bridge._ensure_resident())
+        self.assertEqual(bridge.processes, [])
+
+        # Once the pending request is withdrawn, the loop counts as gone
+        (bridge.spool_dir / "00000000000000000001_a.json").unlink()
+        self.assertTrue(await bridge.stop_resident())
+        self.assertFalse(bridge.ready_path.exists())
+
+    async def test_loop_refreshes_marker(self):
+        """Test that an idle loop keeps its ready marker fresh"""
+        bridge = ResidentBridge(self.mcp_dir, resident_heartbeat_timeout=5)
+        try:
+            await bridge.call_script("get_project_info", {}, timeout=10)
+            first = bridge.ready_path.stat().st_mtime_ns
+            await asyncio.sleep(1.5)
+            self.assertGreater(bridge.ready_path.stat().st_mtime_ns, first)
+        finally:
+            self.assertTrue(await bridge.stop_resident(timeout=10))
+            bridge.reap()
+
+    def test_transport_from_config(self):
+        """Test that the transport is read from config.json and validated"""
+        (self.mcp_dir / "config.json").write_text(json.dumps({"transport": TRANSPORT_RESIDENT}))
+        bridge = AltiumBridge(self.mcp_dir, self.mcp_dir / "Altium_API.PrjScr")
+        self.assertEqual(bridge.transport, TRANSPORT_RESIDENT)
+
+        bridge = AltiumBridge(self.mcp_dir, self.mcp_dir / "Altium_API.PrjScr", transport=TRANSPORT_LAUNCH)
+        self.assertEqual(bridge.transport, TRANSPORT_LAUNCH)
+
+        with self.assertRaises(ValueError):
+            AltiumBridge(self.mcp_dir, self.mcp_dir / "Altium_API.PrjScr", transport="pipe")
+
+
+class TestResidentLoop(unittest.TestCase):
+    """Test cases for the stand-in loop itself"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.mcp_dir = Path(self.temp_dir.name)
+        self.spool_dir = self.mcp_dir / "spool"
+        self.spool_dir.mkdir()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_spool_served_in_name_order(self):
+        """Test that requests are served by name, not by write time"""
+        names = ["00000000000000000003_c.json", "00000000000000000001_a.json",
+                 "00000000000000000002_b.json"]
+        for name in names:
+            write_json_atomic(self.spool_dir / name, {"command": "get_project_info", "request_id": name})
+        write_json_atomic(self.spool_dir / "00000000000000000009_z.json",
+                          {"command": "shutdown", "request_id": "z"})
+
+        journal = self.mcp_dir / "journal.txt"
+        self.assertEqual(start_resident(self.mcp_dir, journal=journal).wait(timeout=10), 0)
+
+        self.assertEqual(journal.read_text().split(), sorted(names) + ["00000000000000000009_z.json"])
+        self.assertEqual(list(self.spool_dir.iterdir()), [])
+
+
+class TestTransportBenchmark(unittest.IsolatedAsyncioTestCase):
+    """
+    Compare per-call cost of launching a process per request against a
+    resident loop. The launch transport starts a fresh Python process per
+    call, standing in for the X2.EXE launch and script compile.
+    """
+
+    CALLS = 20
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.mcp_dir = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    async def measure(self, bridge) -> float:
+        # Warm-up call (starts the resident loop, if any)
+        await bridge.call_script("get_project_info", {}, timeout=10)
+        start = time.perf_counter()
+        for i in range(self.CALLS):
+            result = await bridge.call_script("get_project_info", {"call": i}, timeout=10)
+            self.assertTrue(result.success, result.error)
+        return (time.perf_counter() - start) / self.CALLS
+
+    async def test_resident_against_launch(self):
+        """Benchmark: per-call time of the resident and launch transports"""
+        launch_bridge = FakeResponderBridge(self.mcp_dir)
+        try:
+            launch = await self.measure(launch_bridge)
+            launches = len(launch_bridge.processes)
+        finally:
+            launch_bridge.reap()
+
+        resident_bridge = ResidentBridge(self.mcp_dir)
+        try:
+            resident = await self.measure(resident_bridge)
+            resident_launches = len(resident_bridge.processes)
+        finally:
+            await resident_bridge.stop_resident()
+            resident_bridge.reap()
+
+        print()
+        print(f"  launch per call:   {launch * 1000:7.2f} ms")
+        print(f"  resident per call: {resident * 1000:7.2f} ms")
+        # One launch per call, against one loop serving every call
+        self.assertEqual(launches, self.CALLS + 1)
+        self.assertEqual(resident_launches, 1)
+        if RUN_BENCHMARKS:
+            self.assertLess(resident, launch)
+
+
+if __name__ == '__main__':
+    unittest.main()
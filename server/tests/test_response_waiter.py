@@ -0,0 +1,184 @@
+"""
+Unit tests and latency benchmark for the bridge response waiters
+"""
+import asyncio
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+# Add parent directory to path to import modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from altium_bridge import AltiumBridge
+from response_waiter import (
+    InotifyResponseWaiter,
+    PollingResponseWaiter,
+    create_response_waiter,
+)
+from schematic_core.benchmarking import RUN_BENCHMARKS, benchmark
+
+RESPONDER_SCRIPT = Path(__file__).parent / "fake_altium_responder.py"
+
+
+class FakeResponderBridge(AltiumBridge):
+    """AltiumBridge that launches the fake responder instead of X2.EXE"""
+
+    def __init__(self, mcp_dir: Path, delay: float = 0.0, **kwargs):
+        super().__init__(mcp_dir, mcp_dir / "Altium_API.PrjScr", **kwargs)
+        self.delay = delay
+        self.processes = []
+
+    async def _run_altium_script(self) -> bool:
+        self.processes.append(subprocess.Popen([
+            sys.executable, str(RESPONDER_SCRIPT), str(self.mcp_dir),
+            "--delay", str(self.delay)
+        ]))
+        return True
+
+    def reap(self):
+        for process in self.processes:
+            process.wait(timeout=10)
+        self.processes.clear()
+
+
+async def _write_later(path: Path, delay: float):
+    await asyncio.sleep(delay)
+    path.write_text("{}")
+
+
+class ResponseWaiterTestMixin:
+    """Behaviour shared by every ResponseWaiter implementation"""
+
+    def make_waiter(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.temp_dir.name) / "response.json"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    async def test_returns_immediately_if_file_exists(self):
+        """Test that an existing file completes the wait at once"""
+        self.path.write_text("{}")
+        start = time.perf_counter()
+        self.assertTrue(await self.make_waiter().wait(self.path, timeout=5))
+        if RUN_BENCHMARKS:
+            self.assertLess(time.perf_counter() - start, 0.1)
+
+    async def test_detects_file_written_later(self):
+        """Test that a file written during the wait is detected"""
+        writer = asyncio.ensure_future(_write_later(self.path, 0.05))
+        self.assertTrue(await self.make_waiter().wait(self.path, timeout=5))
+        await writer
+
+    async def test_detects_atomic_rename(self):
+        """Test that a file renamed into place is detected"""
+        async def rename_later():
+            await asyncio.sleep(0.05)
+            temp_path = self.path.with_suffix(".tmp")
+            temp_path.write_text("{}")
+            temp_path.replace(self.path)
+
+        writer = asyncio.ensure_future(rename_later())
+        self.assertTrue(await self.make_waiter().wait(self.path, timeout=5))
+        await writer
+
+    async def test_ignores_other_files(self):
+        """Test that unrelated files in the directory do not complete the wait"""
+        other = self.path.with_name("request.json")
+        writer = asyncio.ensure_future(_write_later(other, 0.01))
+        self.assertFalse(await self.make_waiter().wait(self.path, timeout=0.2))
+        await writer
+
+    async def test_timeout(self):
+        """Test that the wait gives up after the timeout"""
+        start = time.perf_counter()
+        self.assertFalse(await self.make_waiter().wait(self.path, timeout=0.1))
+        if RUN_BENCHMARKS:
+            self.assertLess(time.perf_counter() - start, 1.0)
+
+
+class TestPollingResponseWaiter(ResponseWaiterTestMixin, unittest.IsolatedAsyncioTestCase):
+    """Test cases for PollingResponseWaiter"""
+
+    def make_waiter(self):
+        return PollingResponseWaiter()
+
+
+@unittest.skipUnless(InotifyResponseWaiter.is_supported(), "inotify not available")
+class TestInotifyResponseWaiter(ResponseWaiterTestMixin, unittest.IsolatedAsyncioTestCase):
+    """Test cases for InotifyResponseWaiter"""
+
+    def make_waiter(self):
+        return InotifyResponseWaiter()
+
+
+class TestCreateResponseWaiter(unittest.TestCase):
+    """Test cases for create_response_waiter"""
+
+    def test_prefers_inotify_when_supported(self):
+        """Test that the factory picks the best available waiter"""
+        waiter = create_response_waiter()
+        if InotifyResponseWaiter.is_supported():
+            self.assertIsInstance(waiter, InotifyResponseWaiter)
+        else:
+            self.assertIsInstance(waiter, PollingResponseWaiter)
+
+
+@benchmark
+class TestResponseLatencyBenchmark(unittest.IsolatedAsyncioTestCase):
+    """
+    Measure how long call_script takes to notice response.json.
+
+    Latency is the time between the fake responder writing the file and
+    call_script returning, so process start-up cost is excluded.
+    """
+
+    CALLS = 5
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.mcp_dir = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    async def measure(self, waiter) -> float:
+        bridge = FakeResponderBridge(self.mcp_dir, delay=0.02, response_waiter=waiter)
+        latencies = []
+        try:
+            for i in range(self.CALLS):
+                result = await bridge.call_script("get_project_info", {"call": i})
+                returned_at = time.time()
+                self.assertTrue(result.success, result.error)
+                self.assertEqual(result.data["params"]["call"], i)
+                latencies.append(returned_at - result.data["written_at"])
+        finally:
+            bridge.reap()
+        return sum(latencies) / len(latencies)
+
+    async def test_latency_against_fixed_polling(self):
+        """Benchmark: event-driven waiters against the old 0.5 s poll"""
+        legacy = await self.measure(PollingResponseWaiter(initial_interval=0.5, max_interval=0.5))
+        adaptive = await self.measure(PollingResponseWaiter())
+        results = {"fixed 0.5s poll": legacy, "adaptive poll": adaptive}
+
+        if InotifyResponseWaiter.is_supported():
+            results["inotify"] = await self.measure(InotifyResponseWaiter())
+
+        print()
+        for name, latency in results.items():
+            print(f"  {name:<16} mean notice latency: {latency * 1000:7.2f} ms")
+
+        self.assertLess(adaptive, legacy)
+        if "inotify" in results:
+            self.assertLess(results["inotify"], legacy)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+"""
+Unit tests for single-flight coalescing of identical bridge calls
+"""
+import asyncio
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add parent directory to path to import modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from test_request_scheduler import SimulatedAltiumBridge
+from test_response_waiter import FakeResponderBridge
+
+BURST = 50
+
+
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+    """Test cases for coalescing concurrent identical calls in AltiumBridge"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.mcp_dir = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def altium_calls(self, bridge, command):
+        return sum(1 for entry in bridge.timeline if entry[0] == command)
+
+    async def test_burst_launches_once(self):
+        """Test that a burst of identical calls launches the fake responder once"""
+        bridge = FakeResponderBridge(self.mcp_dir, delay=0.1)
+        try:
+            results = await asyncio.gather(*(
+                bridge.call_script("get_all_component_data", {}, timeout=10) for _ in range(BURST)
+            ))
+            launches = len(bridge.processes)
+        finally:
+            bridge.reap()
+
+        self.assertTrue(all(r.success for r in results), results[0].error)
+        self.assertEqual(launches, 1)
+        self.assertEqual(len({id(r.data) for r in results}), BURST)
+
+    async def test_uncacheable_command_coalesced(self):
+        """Test that coalescing does not depend on the cache"""
+        bridge = SimulatedAltiumBridge(self.mcp_dir)
+        results = await asyncio.gather(*(
+            bridge.call_script("get_selected_components_coordinates", {"label": "sel"})
+            for _ in range(BURST)
+        ))
+        self.assertEqual([r.data for r in results], ["sel"] * BURST)
+        self.assertEqual(self.altium_calls(bridge, "get_selected_components_coordinates"), 1)
+
+        # Once finished, the next call goes to Altium again
+        await bridge.call_script("get_selected_components_coordinates", {"label": "sel"})
+        self.assertEqual(self.altium_calls(bridge, "get_selected_components_coordinates"), 2)
+
+    async def test_different_params_not_coalesced(self):
+        """Test that calls with different params each run"""
+        bridge = SimulatedAltiumBridge(self.mcp_dir)
+        await asyncio.gather(*(
+            bridge.call_script("get_component_pins", {"designators": [f"R{i}"]}) for i in range(5)
+        ))
+        self.assertEqual(self.altium_calls(bridge, "get_component_pins"), 5)
+
+    async def test_mutations_not_coalesced(self):
+        """Test that identical mutating calls all run"""
+        bridge = SimulatedAltiumBridge(self.mcp_dir)
+        await asyncio.gather(*(
+            bridge.call_script("move_components", {"designators": ["R1"], "x_offset": 1})
+            for _ in range(3)
+        ))
+        self.assertEqual(self.altium_calls(bridge, "move_components"), 3)
+
+    async def test_read_after_mutation_not_joined(self):
+        """Test that a read issued after a mutation does not share an earlier read"""
+        bridge = SimulatedAltiumBridge(self.mcp_dir)
+        await asyncio.gather(
+            bridge.call_script("get_all_component_data", {}),
+            bridge.call_script("delete_component", {"designator": "R1"}),
+            bridge.call_script("get_all_component_data", {})
+        )
+        self.assertEqual(self.altium_calls(bridge, "get_all_component_data"), 2)
+
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        """Test that cancelling the caller running the shared request does not fail the others"""
+        bridge = SimulatedAltiumBridge(self.mcp_dir, default_latency=0.05)
+        first = asyncio.ensure_future(bridge.call_script("get_all_nets", {"label": "nets"}))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(bridge.call_script("get_all_nets", {"label": "nets"}))
+        await asyncio.sleep(0.01)
+
+        first.cancel()
+        result = await second
+        self.assertTrue(first.cancelled())
+        self.assertTrue(result.success, result.error)
+        self.assertEqual(result.data, "nets")
+
+    async def test_cancelled_joiner_does_not_cancel_shared_call(self):
+        """Test that cancelling a caller that joined leaves the shared call running"""
+        bridge = SimulatedAltiumBridge(self.mcp_dir, default_latency=0.05)
+        first = asyncio.ensure_future(bridge.call_script("get_all_nets", {"label": "nets"}))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(bridge.call_script("get_all_nets", {"label": "nets"}))
+        await asyncio.sleep(0.01)
+
+        second.cancel()
+        result = await first
+        self.assertTrue(result.success, result.error)
+        self.assertEqual(self.altium_calls(bridge, "get_all_nets"), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,212 @@
+"""
+Unit tests for streamed (NDJSON part file) bridge responses
+"""
+import asyncio
+import json
+import sys
+import tempfile
+import tracemalloc
+import unittest
+from pathlib import Path
+
+# Add parent directory to path to import modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from altium_bridge import AltiumBridge, ScriptStreamError
+from bridge_protocol import (
+    encode_envelope,
+    request_file_name,
+    stream_dir_name,
+    stream_part_name,
+    write_atomic,
+)
+from design_librarians import load_whole_design
+
+
+def make_design_records(components: int, pins: int = 8):
+    """Records in the order GetWholeDesignNDJSON writes them"""
+    for i in range(components):
+        yield {
+            "type": "component",
+            "designator": f"U{i}",
+            "sheet": f"Sheet{i % 4}.SchDoc",
+            "comment": "10k\u03a9 \u00b11% \u2013 \u2019fitted\u2019",
+            "pins": [{"name": str(p), "net": f"NET_{i}_{p}"} for p in range(1, pins + 1)]
+        }
+    for i in range(components):
+        yield {"type": "net", "name": f"NET_{i}", "pin_count": pins}
+
+
+class StreamingAltiumBridge(AltiumBridge):
+    """
+    AltiumBridge answered in-process by a simulated GetWholeDesignNDJSON.
+
+    Parts are written one at a time, part_delay apart, followed by the
+    response. The writer records when each part and the response appeared.
+    """
+
+    def __init__(self, mcp_dir: Path, records, chunk_records: int = 100, part_delay: float = 0.01,
+                 response=None, skip_part=None):
+        super().__init__(mcp_dir, mcp_dir / "Altium_API.PrjScr")
+        self.records = records
+        self.chunk_records = chunk_records
+        self.part_delay = part_delay
+        self.response = response
+        self.skip_part = skip_part
+        self.launches = 0
+        self.events = []  # ("part", index, time) / ("response", None, time)
+        self._tasks = set()
+
+    async def _run_altium_script(self, proc_name: str = "Run") -> bool:
+        self.launches += 1
+        for request_path in sorted(self.mcp_dir.glob(request_file_name("*"))):
+            request = json.loads(request_path.read_text())
+            request_path.unlink()
+            task = asyncio.ensure_future(self._export(request))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def _export(self, request):
+        loop = asyncio.get_running_loop()
+        request_id = request["request_id"]
+        stream_dir = self.mcp_dir / stream_dir_name(request_id)
+        parts = 0
+        count = 0
+        chunk = []
+
+        def flush():
+            nonlocal parts, chunk
+            if parts != self.skip_part:
+                # UTF-8 with a BOM, as SaveLinesAtomic writes them
+                body = "".join(json.dumps(record, ensure_ascii=False) + "\r\n" for record in chunk)
+                write_atomic(stream_dir / stream_part_name(parts), b"\xef\xbb\xbf" + body.encode("utf-8"))
+            self.events.append(("part", parts, loop.time()))
+            parts += 1
+            chunk = []
+
+        for record in self.records:
+            chunk.append(record)
+            count += 1
+            if len(chunk) >= self.chunk_records:
+                flush()
+                await asyncio.sleep(self.part_delay)
+        if chunk:
+            flush()
+
+        response = self.response or {"success": True, "result": {"parts": parts, "records": count}}
+        write_atomic(
+            self.response_path_for(request_id),
+            encode_envelope(request_id, json.dumps(response).encode("utf-8"))
+        )
+        self.events.append(("response", None, loop.time()))
+
+
+class TestStreamScript(unittest.IsolatedAsyncioTestCase):
+    """Test cases for AltiumBridge.stream_script"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.mcp_dir = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    async def collect(self, bridge):
+        return [record async for record in bridge.stream_script("stream_whole_design", {}, timeout=10)]
+
+    async def test_records_in_order(self):
+        """Test that every record is yielded once, in order, and the parts are removed"""
+        expected = list(make_design_records(250))
+        bridge = StreamingAltiumBridge(self.mcp_dir, expected, chunk_records=64)
+        self.assertEqual(await self.collect(bridge), expected)
+        self.assertEqual(list(self.mcp_dir.glob(stream_dir_name("*"))), [])
+
+    async def test_processing_overlaps_export(self):
+        """Test that the first records are yielded before the export has finished"""
+        bridge = StreamingAltiumBridge(self.mcp_dir, make_design_records(500), part_delay=0.02)
+        loop = asyncio.get_running_loop()
+        first_record_at = None
+        async for _ in bridge.stream_script("stream_whole_design", {}, timeout=10):
+            if first_record_at is None:
+                first_record_at = loop.time()
+
+        response_at = next(t for kind, _, t in bridge.events if kind == "response")
+        self.assertLess(first_record_at, response_at)
+
+    async def test_failure_raises(self):
+        """Test that a failed export raises ScriptStreamError and cleans up"""
+        bridge = StreamingAltiumBridge(self.mcp_dir, [], response={
+            "success": False, "error": "No project is currently open"
+        })
+        with self.assertRaisesRegex(ScriptStreamError, "No project"):
+            await self.collect(bridge)
+        self.assertEqual(list(self.mcp_dir.glob(stream_dir_name("*"))), [])
+
+    async def test_missing_part_raises(self):
+        """Test that a part missing from the stream is reported"""
+        bridge = StreamingAltiumBridge(self.mcp_dir, make_design_records(50), chunk_records=20, skip_part=1)
+        with self.assertRaisesRegex(ScriptStreamError, "1 of 5 parts"):
+            await self.collect(bridge)
+
+    async def test_peak_memory_bounded_by_part_size(self):
+        """Test that consuming a stream never holds the whole design in memory"""
+        records = list(make_design_records(2000))
+        whole = json.dumps({"components": records[:2000], "nets": records[2000:]})
+
+        tracemalloc.start()
+        try:
+            json.loads(whole)
+            _, whole_peak = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+
+            bridge = StreamingAltiumBridge(self.mcp_dir, make_design_records(2000), part_delay=0)
+            count = 0
+            async for _ in bridge.stream_script("stream_whole_design", {}, timeout=10):
+                count += 1
+            _, streamed_peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        print()
+        print(f"  whole json.loads: {whole_peak / 1024:8.0f} KiB peak")
+        print(f"  streamed:         {streamed_peak / 1024:8.0f} KiB peak")
+        self.assertEqual(count, len(records))
+        self.assertLess(streamed_peak, whole_peak / 4)
+
+
+class TestLoadWholeDesign(unittest.IsolatedAsyncioTestCase):
+    """Test cases for load_whole_design"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.mcp_dir = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    async def test_assembles_and_caches_design(self):
+        """Test that streamed records are assembled into the get_whole_design_json shape"""
+        bridge = StreamingAltiumBridge(self.mcp_dir, list(make_design_records(30)))
+        design = await load_whole_design(bridge)
+
+        self.assertEqual(len(design["components"]), 30)
+        self.assertEqual(len(design["nets"]), 30)
+        self.assertNotIn("type", design["components"][0])
+        self.assertEqual(design["components"][0]["pins"][0], {"name": "1", "net": "NET_0_1"})
+
+        self.assertEqual(await load_whole_design(bridge), design)
+        self.assertEqual(bridge.launches, 1)
+
+    async def test_shares_cache_with_get_whole_design_json(self):
+        """Test that a design cached by get_whole_design_json is not streamed again"""
+        bridge = StreamingAltiumBridge(self.mcp_dir, [])
+        cached = {"components": [{"designator": "R1", "sheet": "A.SchDoc", "pins": []}], "nets": []}
+        bridge.cache.store("get_whole_design_json", {}, cached, bridge.cache.generation)
+
+        self.assertEqual(await load_whole_design(bridge), cached)
+        self.assertEqual(bridge.launches, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
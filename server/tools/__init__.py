@@ -16,6 +16,7 @@ from .board_tools import register_board_tools
 from .routing_tools import register_routing_tools
 from .distributor_tools import register_distributor_tools
 from .api_search_tools import register_api_search_tools
+from .cache_tools import register_cache_tools
 
 __all__ = [
     'register_component_tools',
@@ -31,5 +32,6 @@ __all__ = [
     'register_board_tools',
     'register_routing_tools',
     'register_distributor_tools',
-    'register_api_search_tools'
+    'register_api_search_tools',
+    'register_cache_tools'
 ]
@@ -41,19 +41,22 @@ def register_analysis_tools(mcp: "FastMCP", altium_bridge: "AltiumBridge"):
             - progress: Trend analysis comparing to previous runs
             - run_id: Database ID for this DRC run
         """
-        # Get current project path if not provided
-        if not project_path:
-            project_info = await altium_bridge.call_script("get_project_info", {})
+        # Run DRC using existing Altium command
+        # Note: Using get_pcb_rules as a proxy - in a real implementation,
+        # you would use a dedicated DRC command
+        if project_path:
+            drc_result = await altium_bridge.call_script("get_pcb_rules", {})
+        else:
+            # Fetch the current project path in the same script launch
+            project_info, drc_result = await altium_bridge.call_script_batch([
+                ("get_project_info", {}),
+                ("get_pcb_rules", {})
+            ])
             if project_info.success and project_info.data:
                 project_path = project_info.data.get("project_path", "unknown_project")
             else:
                 project_path = "unknown_project"
 
-        # Run DRC using existing Altium command
-        # Note: Using get_pcb_rules as a proxy - in a real implementation,
-        # you would use a dedicated DRC command
-        drc_result = await altium_bridge.call_script("get_pcb_rules", {})
-
         if not drc_result.success:
             return json.dumps({
                 "success": False,
@@ -143,8 +146,11 @@ def register_analysis_tools(mcp: "FastMCP", altium_bridge: "AltiumBridge"):
             - summary: Human-readable summary of findings
             - confidence scores for each detected pattern
         """
-        # Get all components
-        components_result = await altium_bridge.call_script("get_all_component_data", {})
+        # Get all components and nets in one script launch
+        components_result, nets_result = await altium_bridge.call_script_batch([
+            ("get_all_component_data", {}),
+            ("get_all_nets", {})
+        ])
         if not components_result.success:
             return json.dumps({
                 "success": False,
@@ -153,8 +159,6 @@ def register_analysis_tools(mcp: "FastMCP", altium_bridge: "AltiumBridge"):
 
         components = components_result.data if components_result.data else []
 
-        # Get all nets
-        nets_result = await altium_bridge.call_script("get_all_nets", {})
         if not nets_result.success:
             return json.dumps({
                 "success": False,
@@ -0,0 +1,43 @@
+"""
+Bridge cache tool handlers
+"""
+import json
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from mcp.server.fastmcp import FastMCP
+    from ..altium_bridge import AltiumBridge
+
+
+def register_cache_tools(mcp: "FastMCP", altium_bridge: "AltiumBridge"):
+    """Register bridge cache tools"""
+
+    @mcp.tool()
+    async def invalidate_cache() -> str:
+        """
+        Discard all cached Altium query results
+
+        Component, net and rule queries are cached until a tool changes the
+        design. Call this after editing the design by hand in Altium so the
+        next query reads the current state.
+
+        Returns:
+            JSON object with the cache statistics after invalidation
+        """
+        altium_bridge.cache.invalidate()
+        return json.dumps({
+            "success": True,
+            "message": "Cache invalidated",
+            "cache": altium_bridge.cache.stats()
+        }, indent=2)
+
+    @mcp.tool()
+    async def get_cache_stats() -> str:
+        """
+        Get hit/miss statistics for the Altium query cache
+
+        Returns:
+            JSON object with generation, entries, hits, misses, hit_rate
+            and invalidations
+        """
+        return json.dumps(altium_bridge.cache.stats(), indent=2)
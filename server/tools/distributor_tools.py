@@ -4,23 +4,106 @@ Distributor integration tool handlers
 These tools provide access to real-time component availability, pricing,
 and lifecycle information through the Nexar API.
 """
+import asyncio
 import json
-from typing import TYPE_CHECKING
+import logging
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
 from pathlib import Path
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from nexar_client import NexarClient
+from nexar_client import MULTI_MATCH_BATCH_SIZE, NexarClient
+from part_cache import PartCache
 
 if TYPE_CHECKING:
     from mcp.server.fastmcp import FastMCP
     from ..altium_bridge import AltiumBridge
 
+logger = logging.getLogger(__name__)
+
+# Component parameters that may hold the manufacturer part number
+MPN_PARAMETERS = ("Part Number", "MPN", "Manufacturer Part Number", "ManufacturerPartNumber")
+
+
+def _find_mpn(parameters: Dict[str, Any]) -> Optional[str]:
+    """Manufacturer part number from a component's parameters, if any"""
+    for name in MPN_PARAMETERS:
+        if parameters.get(name):
+            return parameters[name]
+    return None
+
+
+def _bom_lines(components_data: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], str]]:
+    """(component, MPN) for every component with an MPN, in schematic order"""
+    lines = []
+    for component in components_data:
+        mpn = _find_mpn(component.get("parameters", {}))
+        # Components without MPN (like connectors, test points, etc.) are skipped
+        if mpn:
+            lines.append((component, mpn))
+    return lines
+
+
+# Lookup requests in flight at once during a BOM check (the client's rate limiter still applies)
+BOM_LOOKUP_CONCURRENCY = 4
+
+# on_progress(parts_done, parts_total, mpn, part_data)
+ProgressCallback = Callable[[int, int, str, Optional[Dict[str, Any]]], None]
+
+
+async def lookup_bom(
+    nexar_client: NexarClient,
+    bom_lines: List[Tuple[Dict[str, Any], str]],
+    concurrency: int = BOM_LOOKUP_CONCURRENCY,
+    batch_size: int = MULTI_MATCH_BATCH_SIZE,
+    on_progress: Optional[ProgressCallback] = None
+) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Look up the parts of a BOM concurrently
+
+    The MPNs of bom_lines are deduplicated (every designator sharing an MPN
+    costs one lookup), split into batches of batch_size, and fetched with at
+    most `concurrency` requests in flight. Every request still goes through
+    the client's rate limiter, so a large BOM takes about as long as the rate
+    limit allows instead of the sum of its round trips.
+
+    Args:
+        nexar_client: Client to query
+        bom_lines: (component, MPN) pairs as returned by _bom_lines
+        concurrency: Maximum requests in flight
+        batch_size: MPNs per request
+        on_progress: Called once per distinct MPN as its lookup completes
+
+    Returns:
+        Dictionary mapping each stripped MPN to its part data, or None if not
+        found. Callers fan the result back out to their designators.
+    """
+    mpns = list(dict.fromkeys(mpn.strip() for _, mpn in bom_lines))
+    batches = [mpns[start:start + batch_size] for start in range(0, len(mpns), batch_size)]
+    semaphore = asyncio.Semaphore(concurrency)
+    results: Dict[str, Optional[Dict[str, Any]]] = {}
+
+    async def fetch(batch: List[str]) -> None:
+        async with semaphore:
+            found = await nexar_client.get_components_availability_batch(batch, batch_size=batch_size)
+        for mpn in batch:
+            results[mpn] = found.get(mpn)
+            if on_progress is not None:
+                on_progress(len(results), len(mpns), mpn, results[mpn])
+
+    await asyncio.gather(*(fetch(batch) for batch in batches))
+    return results
+
+
+def _log_progress(done: int, total: int, mpn: str, part_data: Optional[Dict[str, Any]]) -> None:
+    logger.info(f"[BOM] {done}/{total} {mpn}: {'found' if part_data else 'not found'}")
+
 
 def register_distributor_tools(mcp: "FastMCP", altium_bridge: "AltiumBridge"):
     """Register all distributor-related tools"""
 
-    # Initialize Nexar client (will check environment variables for credentials)
-    nexar_client = NexarClient()
+    # Initialize Nexar client (will check environment variables for credentials);
+    # part data is cached on disk so repeat BOM checks skip the API
+    nexar_client = NexarClient(cache=PartCache(altium_bridge.mcp_dir / "part_cache.db"))
 
     def _check_api_configured() -> tuple[bool, dict]:
         """Check if Nexar API is configured and return appropriate response"""
@@ -259,24 +342,14 @@ def register_distributor_tools(mcp: "FastMCP", altium_bridge: "AltiumBridge"):
             components_available = 0
             components_checked = 0
 
-            for component in components_data:
-                designator = component.get("designator", "")
-                parameters = component.get("parameters", {})
-
-                # Try to find MPN in parameters (common parameter names)
-                mpn = (parameters.get("Part Number") or
-                       parameters.get("MPN") or
-                       parameters.get("Manufacturer Part Number") or
-                       parameters.get("ManufacturerPartNumber"))
-
-                if not mpn:
-                    # Skip components without MPN (like connectors, test points, etc.)
-                    continue
+            # Look up each distinct MPN once, concurrently
+            bom_lines = _bom_lines(components_data)
+            availability = await lookup_bom(nexar_client, bom_lines, on_progress=_log_progress)
 
+            for component, mpn in bom_lines:
+                designator = component.get("designator", "")
                 components_checked += 1
-
-                # Check availability for this component
-                part_data = await nexar_client.get_component_availability(mpn)
+                part_data = availability.get(mpn.strip())
 
                 if not part_data:
                     components_with_issues.append({
@@ -345,6 +418,7 @@ def register_distributor_tools(mcp: "FastMCP", altium_bridge: "AltiumBridge"):
                 "success": True,
                 "summary": {
                     "total_components_checked": components_checked,
+                    "unique_mpns": len(availability),
                     "components_available": components_available,
                     "components_with_issues": len(components_with_issues),
                     "estimated_unit_cost": round(total_cost_estimate, 2),
@@ -521,23 +595,15 @@ def register_distributor_tools(mcp: "FastMCP", altium_bridge: "AltiumBridge"):
 
             components_checked = 0
 
-            for component in components_data:
-                designator = component.get("designator", "")
-                parameters = component.get("parameters", {})
-
-                # Find MPN
-                mpn = (parameters.get("Part Number") or
-                       parameters.get("MPN") or
-                       parameters.get("Manufacturer Part Number") or
-                       parameters.get("ManufacturerPartNumber"))
-
-                if not mpn:
-                    continue
+            # Look up each distinct MPN once, concurrently
+            bom_lines = _bom_lines(components_data)
+            availability = await lookup_bom(nexar_client, bom_lines, on_progress=_log_progress)
 
+            for component, mpn in bom_lines:
+                designator = component.get("designator", "")
                 components_checked += 1
-
-                # Check lifecycle status
-                lifecycle_status = await nexar_client.check_lifecycle_status(mpn)
+                part_data = availability.get(mpn.strip())
+                lifecycle_status = part_data.get("lifecycleStatus") if part_data else None
 
                 component_info = {
                     "designator": designator,
@@ -588,6 +654,7 @@ def register_distributor_tools(mcp: "FastMCP", altium_bridge: "AltiumBridge"):
                 "summary": {
                     "health_score": round(health_score, 1),
                     "total_components_checked": components_checked,
+                    "unique_mpns": len(availability),
                     "active": len(lifecycle_summary["Active"]),
                     "nrnd": len(lifecycle_summary["NRND"]),
                     "obsolete": len(lifecycle_summary["Obsolete"]),
@@ -703,3 +770,101 @@ def register_distributor_tools(mcp: "FastMCP", altium_bridge: "AltiumBridge"):
                 "error": f"Price comparison failed: {str(e)}",
                 "mpn": mpn
             }, indent=2)
+
+    @mcp.tool()
+    async def cost_bom_at_quantities(build_quantities: Optional[list[int]] = None, currency: str = "USD") -> str:
+        """
+        Cost the whole BOM at several build quantities
+
+        Unlike check_bom_availability's single-unit estimate, this counts how
+        many times each part is used per board, applies distributor price
+        breaks and MOQs, and only picks offers with enough stock for the
+        order, choosing the cheapest such offer for every line.
+
+        Args:
+            build_quantities: Numbers of boards to cost (default: 1, 10, 100, 1000, 10000)
+            currency: Currency of the prices to use (default: USD)
+
+        Returns:
+            JSON object with:
+            - Per build quantity: total cost, cost per board, lines costed and
+              lines no offer can fill
+            - Per BOM line: quantity per board, designators and the chosen
+              offer (distributor, SKU, order quantity, unit and extended price)
+              at each build quantity
+            - MPNs not found and components without an MPN
+
+        Example:
+            cost_bom_at_quantities(build_quantities=[5, 50, 500])
+        """
+        configured, error_response = _check_api_configured()
+        if not configured:
+            return json.dumps(error_response, indent=2)
+
+        try:
+            # NumPy is only needed by this tool
+            from bom_costing import DEFAULT_BUILD_QUANTITIES, BomCostingEngine
+        except ImportError as e:
+            return json.dumps({
+                "success": False,
+                "error": f"BOM costing requires NumPy (pip install numpy): {str(e)}"
+            }, indent=2)
+
+        quantities = build_quantities or list(DEFAULT_BUILD_QUANTITIES)
+        if any(quantity < 1 for quantity in quantities):
+            return json.dumps({
+                "success": False,
+                "error": "Build quantities must be at least 1"
+            }, indent=2)
+
+        try:
+            response = await altium_bridge.call_script("get_schematic_components_with_parameters", {})
+
+            if not response.success:
+                return json.dumps({
+                    "error": f"Failed to get BOM data: {response.error}",
+                    "message": "Ensure a project is open and compiled in Altium"
+                }, indent=2)
+
+            components_data = response.data
+            if not components_data:
+                return json.dumps({
+                    "error": "No components found in schematic",
+                    "message": "Open and compile a project in Altium first"
+                }, indent=2)
+
+            bom_lines = _bom_lines(components_data)
+            availability = await lookup_bom(nexar_client, bom_lines, on_progress=_log_progress)
+
+            # One costing line per distinct MPN, used once per designator
+            designators_by_mpn: Dict[str, List[str]] = {}
+            for component, mpn in bom_lines:
+                designators_by_mpn.setdefault(mpn.strip(), []).append(component.get("designator", ""))
+            costing_lines = [
+                {"mpn": mpn, "designators": designators, "part": availability.get(mpn)}
+                for mpn, designators in designators_by_mpn.items()
+            ]
+
+            costing = BomCostingEngine(costing_lines, currency).cost(quantities)
+
+            result = {
+                "success": True,
+                "currency": costing["currency"],
+                "summary": costing["quantities"],
+                "lines": costing["lines"],
+                "not_found": [line["mpn"] for line in costing_lines if line["part"] is None],
+                "components_without_mpn": len(components_data) - len(bom_lines),
+                "message": "; ".join(
+                    f"{entry['boards']} boards: {entry['total_cost']:.2f} {currency} "
+                    f"({entry['lines_unavailable']} lines unavailable)"
+                    for entry in costing["quantities"]
+                )
+            }
+
+            return json.dumps(result, indent=2)
+
+        except Exception as e:
+            return json.dumps({
+                "success": False,
+                "error": f"BOM costing failed: {str(e)}"
+            }, indent=2)
@@ -1,12 +1,18 @@
 """
 Schematic-related tool handlers
 """
+import asyncio
 import json
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
+from altium_bridge import ScriptStreamError
+from design_librarians import (
+    DesignLibrarians, configure_power_net_patterns, load_design_file, load_whole_design
+)
 from response_helpers import format_large_response_summary
+from schematic_core.design_diff import diff_designs
 
 if TYPE_CHECKING:
     from mcp.server.fastmcp import FastMCP
@@ -16,6 +22,13 @@ if TYPE_CHECKING:
 def register_schematic_tools(mcp: "FastMCP", altium_bridge: "AltiumBridge"):
     """Register all schematic-related tools"""
 
+    # Team-specific power rails from SCHEMATIC_POWER_NET_PATTERNS
+    configure_power_net_patterns()
+
+    # One warm Librarian per project, shared by the schematic DSL tools and
+    # snapshotted to disk so a restarted server can answer without Altium
+    librarians = DesignLibrarians(altium_bridge, snapshot_dir=altium_bridge.mcp_dir / "snapshots")
+
     @mcp.tool()
     async def get_symbol_placement_rules() -> str:
         """
@@ -234,6 +247,7 @@ def register_schematic_tools(mcp: "FastMCP", altium_bridge: "AltiumBridge"):
 
         Returns:
             JSON object with:
+            - project: Path of the open project file
             - components: Array of all components with pins and parameters
             - nets: Array of all nets with page counts
 
@@ -241,14 +255,12 @@ def register_schematic_tools(mcp: "FastMCP", altium_bridge: "AltiumBridge"):
             Use this as the data source for schematic analysis, DSL generation,
             or any operation that needs complete schematic connectivity.
         """
-        response = await altium_bridge.call_script("get_whole_design_json", {})
-
-        if not response.success:
-            return json.dumps({"error": f"Failed to get whole design: {response.error}"})
-
-        design_data = response.data
+        try:
+            design_data = await load_whole_design(altium_bridge)
+        except ScriptStreamError as e:
+            return json.dumps({"error": f"Failed to get whole design: {e}"})
 
-        if not design_data:
+        if not design_data["components"]:
             return json.dumps({"error": "No design data found. Please ensure a project is open."})
 
         # Handle large responses by writing to disk if needed
@@ -277,22 +289,12 @@ def register_schematic_tools(mcp: "FastMCP", altium_bridge: "AltiumBridge"):
         Returns:
             Human-readable text index in DSL format
         """
-        # Import schematic core modules
-        from schematic_core.adapters.altium_json import AltiumJSONAdapter
-        from schematic_core.librarian import Librarian
-
         try:
-            # Get design data from Altium
-            response = await altium_bridge.call_script("get_whole_design_json", {})
-
-            if not response.success:
-                return f"Error: Failed to get design data: {response.error}"
-
-            design_json = json.dumps(response.data)
-
-            # Transform through adapter and generate index
-            adapter = AltiumJSONAdapter(design_json)
-            librarian = Librarian(adapter)
+            # Warm Librarian, refreshed only if the design changed
+            try:
+                librarian = await librarians.get()
+            except ScriptStreamError as e:
+                return f"Error: Failed to get design data: {e}"
 
             return librarian.get_index()
 
@@ -300,7 +302,7 @@ def register_schematic_tools(mcp: "FastMCP", altium_bridge: "AltiumBridge"):
             return f"Error generating schematic index: {str(e)}"
 
     @mcp.tool()
-    async def get_schematic_page(page_name: str) -> str:
+    async def get_schematic_page(page_name: str, cursor: str = "", max_tokens: Optional[int] = None) -> str:
         """
         Get an LLM-optimized DSL representation of a single schematic page.
 
@@ -310,8 +312,15 @@ def register_schematic_tools(mcp: "FastMCP", altium_bridge: "AltiumBridge"):
         - Net connectivity with inter-page links
         - Global nets with connection summaries
 
+        The whole page is returned unless max_tokens is given; then large
+        pages come in chunks of about max_tokens tokens. A chunk that does not
+        finish the page ends with a "# MORE:" line giving the cursor to pass
+        back for the next chunk.
+
         Args:
             page_name: Name of the schematic sheet (e.g., "Power_Switches.SchDoc")
+            cursor: Cursor from the previous chunk's "# MORE:" line (empty for the start of the page)
+            max_tokens: Approximate maximum chunk size in tokens (default: whole page)
 
         Perfect for:
         - Focused analysis of one schematic sheet
@@ -321,40 +330,39 @@ def register_schematic_tools(mcp: "FastMCP", altium_bridge: "AltiumBridge"):
         Returns:
             DSL format text optimized for LLM consumption
         """
-        from schematic_core.adapters.altium_json import AltiumJSONAdapter
-        from schematic_core.librarian import Librarian
-
         try:
-            # Get design data from Altium
-            response = await altium_bridge.call_script("get_whole_design_json", {})
-
-            if not response.success:
-                return f"Error: Failed to get design data: {response.error}"
-
-            design_json = json.dumps(response.data)
-
-            # Transform and generate page DSL
-            adapter = AltiumJSONAdapter(design_json)
-            librarian = Librarian(adapter)
-
-            return librarian.get_page(page_name)
+            # Warm Librarian, refreshed only if the design changed
+            try:
+                librarian = await librarians.get()
+            except ScriptStreamError as e:
+                return f"Error: Failed to get design data: {e}"
+
+            chunk, next_cursor = librarian.get_page_chunk(page_name, cursor or None, max_tokens or None)
+            if next_cursor:
+                chunk += (
+                    f'\n\n# MORE: call get_schematic_page(page_name="{page_name}", '
+                    f'cursor="{next_cursor}", max_tokens={max_tokens}) for the rest of this page'
+                )
+            return chunk
 
         except Exception as e:
             return f"Error generating page DSL: {str(e)}"
 
     @mcp.tool()
-    async def get_schematic_context(refdes_list: list[str]) -> str:
+    async def get_schematic_context(refdes_list: list[str], hops: int = 1, token_budget: int = 8000) -> str:
         """
         Get a "context bubble" around specific components.
 
-        Performs a 1-hop graph traversal to show:
+        Performs a closest-first graph traversal of up to `hops` hops to show:
         - Primary components (full details with all pins)
         - Connected nets
         - Neighbor components (summary for active, inline for passive)
-        - Smart truncation of global nets (GND, VCC)
+        - Smart truncation of global nets (GND, VCC), which are never traversed
 
         Args:
             refdes_list: List of component designators (e.g., ["U1", "R5", "C10"])
+            hops: Number of net hops to follow (default 1 = direct neighbors)
+            token_budget: Approximate maximum response size in tokens (default 8000)
 
         Perfect for:
         - Understanding what connects to a specific IC
@@ -363,30 +371,105 @@ def register_schematic_tools(mcp: "FastMCP", altium_bridge: "AltiumBridge"):
 
         Example:
             get_schematic_context(["U1"]) - Shows U1 and everything directly connected
+            get_schematic_context(["J3"], hops=3) - Follows J3's signals through series parts
 
         Returns:
             DSL format showing focused connectivity context
         """
-        from schematic_core.adapters.altium_json import AltiumJSONAdapter
-        from schematic_core.librarian import Librarian
+        try:
+            # Warm Librarian, refreshed only if the design changed
+            try:
+                librarian = await librarians.get()
+            except ScriptStreamError as e:
+                return f"Error: Failed to get design data: {e}"
+
+            return librarian.get_context(refdes_list, hops=hops, token_budget=token_budget)
+
+        except Exception as e:
+            return f"Error generating context: {str(e)}"
 
+    @mcp.tool()
+    async def export_schematic_dsl(output_dir: str = "") -> str:
+        """
+        Export the whole schematic as DSL files: the index plus one file per page.
+
+        Pages are emitted in parallel worker processes and streamed straight to
+        disk, so large designs can be read file by file instead of page by page
+        through get_schematic_page.
+
+        Args:
+            output_dir: Directory to write to (default: dsl_export in the MCP directory)
+
+        Returns:
+            JSON with the index file path and each page's file path and size
+        """
         try:
-            # Get design data from Altium
-            response = await altium_bridge.call_script("get_whole_design_json", {})
+            out_dir = Path(output_dir) if output_dir else altium_bridge.mcp_dir / "dsl_export"
+            loop = asyncio.get_running_loop()
+
+            # Warm Librarian, refreshed only if the design changed and held
+            # so no other call updates it while the worker thread reads it
+            try:
+                async with librarians.checkout() as librarian:
+                    # Emission is CPU-bound; keep the event loop free while it runs
+                    result = await loop.run_in_executor(None, librarian.export_all, out_dir)
+            except ScriptStreamError as e:
+                return f"Error: Failed to get design data: {e}"
+
+            return json.dumps({
+                "output_dir": str(out_dir),
+                "page_count": len(result["pages"]),
+                **result
+            }, indent=2)
+
+        except Exception as e:
+            return f"Error exporting schematic DSL: {str(e)}"
+
+    @mcp.tool()
+    async def diff_schematic_designs(design_a_path: str, design_b_path: str = "") -> str:
+        """
+        Diff two revisions of a schematic, e.g. to review an ECO.
 
-            if not response.success:
-                return f"Error: Failed to get design data: {response.error}"
+        Reports added, removed and modified components (field and parameter
+        changes, pins moved between nets) and added, removed, renamed and
+        modified nets.
 
-            design_json = json.dumps(response.data)
+        Args:
+            design_a_path: Old revision: a design JSON file written by
+                           get_whole_design_json, or a design snapshot from
+                           the snapshots folder of the MCP directory (other
+                           paths are always read as JSON)
+            design_b_path: New revision, in the same formats (default: the
+                           currently open design)
 
-            # Transform and generate context DSL
-            adapter = AltiumJSONAdapter(design_json)
-            librarian = Librarian(adapter)
+        Example:
+            diff_schematic_designs("C:/.../large_responses/whole_design_json_20250101_120000.json")
 
-            return librarian.get_context(refdes_list)
+        Returns:
+            JSON with a summary of the changes and the changes themselves
+        """
+        try:
+            loop = asyncio.get_running_loop()
+            design_a = await loop.run_in_executor(None, load_design_file, design_a_path, librarians.snapshot_dir)
+
+            if design_b_path:
+                design_b = await loop.run_in_executor(None, load_design_file, design_b_path, librarians.snapshot_dir)
+                diff = await loop.run_in_executor(None, diff_designs, design_a, design_b)
+            else:
+                # Warm Librarian, refreshed only if the design changed and held
+                # so no other call updates it while the worker thread diffs it
+                try:
+                    async with librarians.checkout() as design_b:
+                        diff = await loop.run_in_executor(None, diff_designs, design_a, design_b)
+                except ScriptStreamError as e:
+                    return json.dumps({"error": f"Failed to get design data: {e}"})
+
+            # Handle large responses by writing to disk if needed
+            output_dir = altium_bridge.mcp_dir / "large_responses"
+            return format_large_response_summary(diff, output_dir, "design_diff")
 
         except Exception as e:
-            return f"Error generating context: {str(e)}"
+            return json.dumps({"error": f"Failed to diff designs: {str(e)}"})
 
     @mcp.tool()
     async def rebuild_delphiscript() -> str: